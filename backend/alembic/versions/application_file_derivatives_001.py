@@ -0,0 +1,45 @@
+"""Upload-time derivative columns on application_files.
+
+Uploads now get a background pass that hashes the original, renders the
+normalized PDF page the merged export appends, builds a JPEG thumbnail for
+images and runs OCR. The derivatives live in MinIO next to the original;
+these columns record the hash and where the derivatives were written.
+
+Revision ID: application_file_derivatives_001
+Revises: roster_item_display_fields_001
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "application_file_derivatives_001"
+down_revision: Union[str, None] = "roster_item_display_fields_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "application_files"
+COLUMNS = (
+    ("content_sha256", 64),
+    ("normalized_object_name", 500),
+    ("thumbnail_object_name", 500),
+)
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    existing = {c["name"] for c in inspector.get_columns(TABLE)}
+    for name, length in COLUMNS:
+        if name not in existing:
+            op.add_column(TABLE, sa.Column(name, sa.String(length=length), nullable=True))
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    existing = {c["name"] for c in inspector.get_columns(TABLE)}
+    for name, _ in reversed(COLUMNS):
+        if name in existing:
+            op.drop_column(TABLE, name)
@@ -0,0 +1,88 @@
+"""Store the application snapshots as JSONB and index the keys listings filter on.
+
+``applications.student_data`` / ``submitted_form_data`` were plain ``json``,
+so every college-scope or 學號 filter re-parsed the text of every row
+(``json_extract_path_text`` over a sequential scan). As ``jsonb`` they are
+parsed once on write, and the expression indexes below let the planner go
+straight to the matching rows:
+
+  ix_applications_student_data_<key>   (student_data ->> '<key>')
+  ix_applications_student_data_college_code
+      COALESCE(NULLIF(TRIM(student_data ->> k), ''), ...) over the
+      college_scope.COLLEGE_CODE_KEYS precedence
+
+The index expressions are the ones ``app.utils.json_fields`` /
+``college_scope.resolved_college_code_expr`` render — keep them identical,
+or PostgreSQL silently stops using the index.
+
+The column type change rewrites ``applications`` under an ACCESS EXCLUSIVE
+lock; run it in a maintenance window on a large table. PostgreSQL only — on
+other dialects this is a no-op.
+
+Revision ID: jsonb_snapshot_columns_001
+Revises: notification_read_watermarks_001
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "jsonb_snapshot_columns_001"
+down_revision: Union[str, None] = "notification_read_watermarks_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "applications"
+JSON_COLUMNS = ("student_data", "submitted_form_data")
+INDEXED_KEYS = ("std_stdcode", "std_academyno", "std_degree", "trm_academyno")
+COLLEGE_CODE_KEYS = ("std_academyno", "academy_code", "college_code", "std_college")
+COLLEGE_CODE_INDEX = "ix_applications_student_data_college_code"
+
+
+def _index_expressions() -> dict:
+    indexes = {f"ix_applications_student_data_{key}": f"(student_data ->> '{key}')" for key in INDEXED_KEYS}
+    college_code = ", ".join(f"NULLIF(TRIM(student_data ->> '{key}'), '')" for key in COLLEGE_CODE_KEYS)
+    indexes[COLLEGE_CODE_INDEX] = f"(COALESCE({college_code}))"
+    return indexes
+
+
+def _column_types(bind) -> dict:
+    rows = bind.execute(
+        sa.text(
+            "SELECT column_name, data_type FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = :table"
+        ),
+        {"table": TABLE},
+    )
+    return {name: data_type for name, data_type in rows}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    column_types = _column_types(bind)
+    for column in JSON_COLUMNS:
+        if column_types.get(column) == "json":
+            op.execute(f"ALTER TABLE {TABLE} ALTER COLUMN {column} TYPE JSONB USING {column}::jsonb")
+
+    for name, expression in _index_expressions().items():
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {TABLE} ({expression})")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    for name in _index_expressions():
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+    column_types = _column_types(bind)
+    for column in JSON_COLUMNS:
+        if column_types.get(column) == "jsonb":
+            op.execute(f"ALTER TABLE {TABLE} ALTER COLUMN {column} TYPE JSON USING {column}::json")
@@ -0,0 +1,42 @@
+"""Per-user read watermark for system announcements.
+
+"Mark all as read" used to insert one notification_reads row per unread
+system announcement. It now records the highest announcement id the user
+has seen in ``notification_read_watermarks``; announcements at or below the
+mark count as read. Existing notification_reads rows keep working for
+announcements read one by one above the mark.
+
+Revision ID: notification_read_watermarks_001
+Revises: storage_blobs_001
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "notification_read_watermarks_001"
+down_revision: Union[str, None] = "storage_blobs_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "notification_read_watermarks"
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if TABLE not in inspector.get_table_names():
+        op.create_table(
+            TABLE,
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("last_announcement_id", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if TABLE in inspector.get_table_names():
+        op.drop_table(TABLE)
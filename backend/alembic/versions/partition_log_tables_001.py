@@ -0,0 +1,178 @@
+"""Partition audit_logs / email_history by month; trigram indexes for their search.
+
+Both tables only ever grow. They become range-partitioned by calendar month
+(UTC) on their timestamp — ``audit_logs.created_at``,
+``email_history.sent_at`` — with one ``<table>_pYYYYMM`` partition per month
+from the oldest row to three months ahead, plus ``<table>_default`` for
+anything outside them. ``app.services.log_partitions`` premakes future
+months daily and drops months past the configured retention.
+
+PostgreSQL requires the partition key in every unique constraint, so the
+primary key becomes ``(id, <timestamp>)``; ids still come from the same
+sequence and stay unique. Indexes, foreign keys and triggers (the
+audit_logs append-only trigger) are carried over from the old table. A NULL
+``audit_logs.created_at`` (never written by the app — it has a server
+default) is stored as the epoch, in the default partition.
+
+The admin search (``ilike '%term%'``) gets pg_trgm GIN indexes:
+audit_logs description / resource_name / resource_id and
+email_history.recipient_email.
+
+The rebuild copies each table under an ACCESS EXCLUSIVE lock; run it in a
+maintenance window. PostgreSQL only — on other dialects this is a no-op.
+
+Revision ID: partition_log_tables_001
+Revises: jsonb_snapshot_columns_001
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "partition_log_tables_001"
+down_revision: Union[str, None] = "jsonb_snapshot_columns_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> partition key column
+PARTITIONED_TABLES = {"audit_logs": "created_at", "email_history": "sent_at"}
+PREMAKE_MONTHS = 3
+TRGM_INDEXES = {
+    "ix_audit_logs_description_trgm": ("audit_logs", "description"),
+    "ix_audit_logs_resource_name_trgm": ("audit_logs", "resource_name"),
+    "ix_audit_logs_resource_id_trgm": ("audit_logs", "resource_id"),
+    "ix_email_history_recipient_email_trgm": ("email_history", "recipient_email"),
+}
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bound(month: date) -> str:
+    return f"'{month:%Y-%m-%d} 00:00:00+00'"
+
+
+def _is_partitioned(bind, table: str) -> bool:
+    return (
+        bind.execute(
+            sa.text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"), {"table": table}
+        ).scalar()
+        is not None
+    )
+
+
+def _carried_over(bind, table: str) -> list:
+    """DDL re-creating the table's secondary indexes, foreign keys and triggers.
+
+    Unique indexes other than the primary key are not carried over (neither
+    table has one; on the partitioned side they would need the partition key).
+    """
+    indexes = bind.execute(
+        sa.text(
+            "SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i "
+            "WHERE i.indrelid = to_regclass(:table) AND NOT i.indisprimary AND NOT i.indisunique"
+        ),
+        {"table": table},
+    ).scalars()
+    foreign_keys = bind.execute(
+        sa.text(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(:table) AND contype = 'f'"
+        ),
+        {"table": table},
+    ).all()
+    triggers = bind.execute(
+        sa.text(
+            "SELECT pg_get_triggerdef(oid) FROM pg_trigger WHERE tgrelid = to_regclass(:table) AND NOT tgisinternal"
+        ),
+        {"table": table},
+    ).scalars()
+    statements = [ddl.replace(" ON ONLY ", " ON ") for ddl in indexes]
+    statements += [f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}" for name, definition in foreign_keys]
+    statements += list(triggers)
+    return statements
+
+
+def _rebuild(table: str, column: str, partitioned: bool) -> None:
+    """Copy ``table`` into a new (partitioned or plain) table of the same name."""
+    bind = op.get_bind()
+    old = f"{table}_{'unpartitioned' if partitioned else 'partitioned'}"
+    carried_over = _carried_over(bind, table)
+    columns = list(
+        bind.execute(
+            sa.text(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = :table ORDER BY ordinal_position"
+            ),
+            {"table": table},
+        ).scalars()
+    )
+    column_list = ", ".join(columns)
+    select_list = ", ".join(
+        f"COALESCE({name}, 'epoch'::timestamptz)" if partitioned and name == column else name for name in columns
+    )
+
+    op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+    if partitioned:
+        op.execute(
+            f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE ({column})"
+        )
+        oldest = bind.execute(sa.text(f"SELECT min({column}) FROM {old}")).scalar()
+        this_month = datetime.now(timezone.utc).date().replace(day=1)
+        month = min(oldest.astimezone(timezone.utc).date().replace(day=1), this_month) if oldest else this_month
+        while month <= _add_months(this_month, PREMAKE_MONTHS):
+            op.execute(
+                f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ({_bound(month)}) TO ({_bound(_add_months(month, 1))})"
+            )
+            month = _add_months(month, 1)
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+    else:
+        op.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+
+    op.execute(f"INSERT INTO {table} ({column_list}) SELECT {select_list} FROM {old}")
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence(:old, 'id')"), {"old": old}).scalar()
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+    op.execute(f"DROP TABLE {old}")
+
+    primary_key = f"id, {column}" if partitioned else "id"
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({primary_key})")
+    for statement in carried_over:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    inspector = sa.inspect(bind)
+    existing_tables = inspector.get_table_names()
+
+    for table, column in PARTITIONED_TABLES.items():
+        if table in existing_tables and not _is_partitioned(bind, table):
+            _rebuild(table, column, partitioned=True)
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, (table, column) in TRGM_INDEXES.items():
+        if table in existing_tables:
+            op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    for name in TRGM_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    for table, column in PARTITIONED_TABLES.items():
+        if _is_partitioned(bind, table):
+            _rebuild(table, column, partitioned=False)
@@ -0,0 +1,100 @@
+"""Materialize 系統月份數 into received_months_system_ledger.
+
+One row per (學號, scholarship_configuration_id) holding the months this
+system's own rosters have contributed: ``system_months`` over every included
+item, ``paid_months`` over COMPLETED/LOCKED rosters whose application is not
+soft-deleted. The distribution grid, the PhD 36-month check and the student
+history total read it by key instead of re-aggregating payment_roster_items.
+
+The table is backfilled here with the same aggregate
+app.services.received_months_service maintains; the statement is written out
+verbatim so later edits to the service cannot change what this migration did.
+``python -m app.scripts.rebuild_received_months_ledger --verify`` compares the
+two at any time.
+
+Revision ID: received_months_system_ledger_001
+Revises: email_timing_three_triggers_001
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "received_months_system_ledger_001"
+down_revision: Union[str, None] = "email_timing_three_triggers_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "received_months_system_ledger"
+
+BACKFILL_SQL = """
+    INSERT INTO received_months_system_ledger
+        (student_number, scholarship_configuration_id, scholarship_type_id, system_months, paid_months)
+    SELECT agg.student_number,
+           agg.scholarship_configuration_id,
+           sc.scholarship_type_id,
+           SUM(agg.months * agg.item_count),
+           SUM(agg.months * agg.paid_count)
+    FROM (
+        SELECT i.student_number AS student_number,
+               r.scholarship_configuration_id AS scholarship_configuration_id,
+               CASE CAST(r.roster_cycle AS VARCHAR)
+                   WHEN 'semi_yearly' THEN 6
+                   WHEN 'yearly' THEN 12
+                   ELSE 1
+               END AS months,
+               COUNT(i.id) AS item_count,
+               SUM(CASE
+                       WHEN CAST(r.status AS VARCHAR) IN ('completed', 'locked')
+                            AND (a.id IS NULL OR a.deleted_at IS NULL) THEN 1
+                       ELSE 0
+                   END) AS paid_count
+        FROM payment_roster_items i
+        JOIN payment_rosters r ON r.id = i.roster_id
+        LEFT JOIN applications a ON a.id = i.application_id
+        WHERE i.is_included = :included
+          AND i.student_number IS NOT NULL
+        GROUP BY i.student_number, r.scholarship_configuration_id, r.roster_cycle
+    ) agg
+    JOIN scholarship_configurations sc ON sc.id = agg.scholarship_configuration_id
+    GROUP BY agg.student_number, agg.scholarship_configuration_id, sc.scholarship_type_id
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if TABLE in sa.inspect(bind).get_table_names():
+        return
+
+    op.create_table(
+        TABLE,
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("student_number", sa.String(length=20), nullable=False),
+        sa.Column("scholarship_configuration_id", sa.Integer(), nullable=False),
+        sa.Column("scholarship_type_id", sa.Integer(), nullable=True),
+        sa.Column("system_months", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("paid_months", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(["scholarship_configuration_id"], ["scholarship_configurations.id"]),
+        sa.ForeignKeyConstraint(["scholarship_type_id"], ["scholarship_types.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "student_number", "scholarship_configuration_id", name="uq_received_months_ledger_student_config"
+        ),
+    )
+    op.create_index("ix_received_months_system_ledger_id", TABLE, ["id"])
+    op.create_index("ix_received_months_system_ledger_scholarship_type_id", TABLE, ["scholarship_type_id"])
+    op.create_index(
+        "ix_received_months_ledger_config_student", TABLE, ["scholarship_configuration_id", "student_number"]
+    )
+
+    bind.execute(sa.text(BACKFILL_SQL), {"included": True})
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if TABLE in sa.inspect(bind).get_table_names():
+        op.drop_table(TABLE)
@@ -0,0 +1,75 @@
+"""Snapshot SIS display fields onto payment_roster_items; keyset index.
+
+GET /payment-rosters/{id}/items used to selectin-load every Application just
+to read 學院代碼 / 學院名稱 / 系所名稱 out of ``student_data`` (decrypting
+std_pid on the way). Roster generation now copies them onto the item; this
+migration adds the columns, backfills them from the application snapshot and
+adds the (roster_id, created_at, id) index the keyset-paged list walks.
+
+Revision ID: roster_item_display_fields_001
+Revises: received_months_system_ledger_001
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "roster_item_display_fields_001"
+down_revision: Union[str, None] = "received_months_system_ledger_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "payment_roster_items"
+INDEX = "ix_payment_roster_items_roster_created_id"
+COLUMNS = (
+    ("college_code", 20),
+    ("college_name", 100),
+    ("department_name", 100),
+)
+
+# Same key precedence as RosterService._create_roster_item.
+BACKFILL_SQL = """
+    UPDATE payment_roster_items AS i
+    SET college_code = COALESCE(
+            NULLIF(a.student_data ->> 'std_academyno', ''),
+            NULLIF(a.student_data ->> 'trm_academyno', '')
+        ),
+        college_name = NULLIF(a.student_data ->> 'trm_academyname', ''),
+        department_name = NULLIF(a.student_data ->> 'trm_depname', ''),
+        student_number = COALESCE(i.student_number, NULLIF(a.student_data ->> 'std_stdcode', ''))
+    FROM applications a
+    WHERE a.id = i.application_id
+      AND a.student_data IS NOT NULL
+      AND i.college_code IS NULL
+      AND i.college_name IS NULL
+      AND i.department_name IS NULL
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing = {c["name"] for c in inspector.get_columns(TABLE)}
+    for name, length in COLUMNS:
+        if name not in existing:
+            op.add_column(TABLE, sa.Column(name, sa.String(length=length), nullable=True))
+
+    if INDEX not in {ix["name"] for ix in inspector.get_indexes(TABLE)}:
+        op.create_index(INDEX, TABLE, ["roster_id", "created_at", "id"])
+
+    if bind.dialect.name == "postgresql":
+        bind.execute(sa.text(BACKFILL_SQL))
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if INDEX in {ix["name"] for ix in inspector.get_indexes(TABLE)}:
+        op.drop_index(INDEX, table_name=TABLE)
+    existing = {c["name"] for c in inspector.get_columns(TABLE)}
+    for name, _ in reversed(COLUMNS):
+        if name in existing:
+            op.drop_column(TABLE, name)
@@ -0,0 +1,57 @@
+"""Content-addressed storage blobs.
+
+Application files are now stored once per distinct content under
+``blobs/{sha[:2]}/{sha}`` in MinIO and ApplicationFile rows reference the
+shared object. ``storage_blobs`` holds one row per blob with its reference
+count; the daily GC reconciles the counts and deletes blobs that stayed
+unreferenced past the grace period. Existing per-application objects are
+left as they are (they are not blobs and keep their old delete path).
+
+Revision ID: storage_blobs_001
+Revises: application_file_derivatives_001
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "storage_blobs_001"
+down_revision: Union[str, None] = "application_file_derivatives_001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "storage_blobs"
+INDEX = "ix_storage_blobs_unreferenced"
+FILES_INDEX = "ix_application_files_object_name"
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if TABLE not in inspector.get_table_names():
+        op.create_table(
+            TABLE,
+            sa.Column("content_sha256", sa.String(length=64), primary_key=True),
+            sa.Column("object_name", sa.String(length=500), nullable=False, unique=True),
+            sa.Column("size", sa.Integer(), nullable=True),
+            sa.Column("content_type", sa.String(length=100), nullable=True),
+            sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("released_at", sa.DateTime(timezone=True), nullable=True),
+        )
+        op.create_index(INDEX, TABLE, ["ref_count", "released_at"])
+
+    # The GC reconciles ref_count with a per-blob COUNT over application_files.
+    if FILES_INDEX not in {ix["name"] for ix in inspector.get_indexes("application_files")}:
+        op.create_index(FILES_INDEX, "application_files", ["object_name"])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if FILES_INDEX in {ix["name"] for ix in inspector.get_indexes("application_files")}:
+        op.drop_index(FILES_INDEX, table_name="application_files")
+    if TABLE in inspector.get_table_names():
+        op.drop_index(INDEX, table_name=TABLE)
+        op.drop_table(TABLE)
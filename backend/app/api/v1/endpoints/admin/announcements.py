@@ -20,6 +20,7 @@ from app.db.deps import get_db
 from app.models.notification import Notification
 from app.models.user import User
 from app.schemas.notification import NotificationCreate, NotificationResponse, NotificationUpdate
+from app.services import notification_counter
 
 logger = logging.getLogger(__name__)
 
@@ -126,6 +127,7 @@ async def create_announcement(
 
     db.add(announcement)
     await db.commit()
+    await notification_counter.announcements_changed()
     await db.refresh(announcement)
 
     logger.info(
@@ -261,6 +263,7 @@ async def update_announcement(
                     setattr(announcement, field, value)
 
     await db.commit()
+    await notification_counter.announcements_changed()
     await db.refresh(announcement)
 
     logger.info(
@@ -336,6 +339,7 @@ async def delete_announcement(id: int, current_user: User = Depends(require_admi
     # Delete announcement
     await db.delete(announcement)
     await db.commit()
+    await notification_counter.announcements_changed()
 
     logger.info(
         "system-announcement deleted: id=%s title=%r by user_id=%s",
@@ -19,6 +19,7 @@ from app.core.security import require_admin
 from app.db.deps import get_db
 from app.models.audit_log import AuditLog
 from app.models.user import User
+from app.services.log_partitions import count_rows
 
 logger = logging.getLogger(__name__)
 
@@ -46,30 +47,36 @@ async def list_audit_logs(
         User.nycu_id.label("actor_nycu_id"),
     ).outerjoin(User, AuditLog.user_id == User.id)
 
+    conditions = []
     if resource_type:
-        stmt = stmt.where(AuditLog.resource_type == resource_type)
+        conditions.append(AuditLog.resource_type == resource_type)
     if resource_id:
-        stmt = stmt.where(AuditLog.resource_id == str(resource_id))
+        conditions.append(AuditLog.resource_id == str(resource_id))
     if action:
-        stmt = stmt.where(AuditLog.action == action)
+        conditions.append(AuditLog.action == action)
     if user_id:
-        stmt = stmt.where(AuditLog.user_id == user_id)
+        conditions.append(AuditLog.user_id == user_id)
     if date_from:
-        stmt = stmt.where(AuditLog.created_at >= date_from)
+        conditions.append(AuditLog.created_at >= date_from)
     if date_to:
-        stmt = stmt.where(AuditLog.created_at <= date_to)
+        conditions.append(AuditLog.created_at <= date_to)
     if search:
+        # Served by the pg_trgm GIN indexes (alembic partition_log_tables_001).
         term = f"%{search}%"
-        stmt = stmt.where(
+        conditions.append(
             or_(
                 AuditLog.description.ilike(term),
                 AuditLog.resource_name.ilike(term),
                 AuditLog.resource_id.ilike(term),
             )
         )
+    stmt = stmt.where(*conditions)
 
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total = (await db.execute(count_stmt)).scalar() or 0
+    count_stmt = select(func.count()).select_from(AuditLog).where(*conditions)
+    if conditions:
+        total = (await db.execute(count_stmt)).scalar() or 0
+    else:
+        total = await count_rows(db, AuditLog.__tablename__, count_stmt)
 
     stmt = stmt.order_by(AuditLog.id.desc()).offset((page - 1) * size).limit(size)
     rows = (await db.execute(stmt)).all()
@@ -13,6 +13,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.cache import invalidate as cache_invalidate
+from app.core.principal_cache import invalidate_principals
 from app.core.security import check_scholarship_permission, get_current_user, require_admin
 from app.db.deps import get_db
 from app.models.scholarship import ScholarshipType
@@ -238,6 +239,7 @@ async def create_scholarship_permission(
     await db.commit()
     await db.refresh(new_permission)
     await cache_invalidate("dashboard:")
+    await invalidate_principals(user_id)
 
     # SECURITY: Permissions are the access-control surface; record who
     # granted which scholarship to whom for the audit trail.
@@ -350,6 +352,7 @@ async def delete_scholarship_permission(
     await db.delete(permission)
     await db.commit()
     await cache_invalidate("dashboard:")
+    await invalidate_principals(target_admin_id)
 
     # SECURITY: Permissions are the access-control surface for admin /
     # college users; the audit trail must persist after the row is gone.
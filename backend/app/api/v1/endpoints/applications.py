@@ -6,7 +6,20 @@ import enum
 import logging
 from typing import Optional
 
-from fastapi import APIRouter, Body, Depends, File, HTTPException, Path, Query, Request, Response, UploadFile, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Body,
+    Depends,
+    File,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
 from sqlalchemy import inspect as sa_inspect
 from pydantic import ValidationError
 from sqlalchemy.exc import IntegrityError
@@ -595,6 +608,7 @@ async def get_application_files(
 
 @router.post("/{id}/files/upload")
 async def upload_file(
+    background_tasks: BackgroundTasks,
     id: int = Path(..., description="Application ID"),
     file: UploadFile = File(...),
     file_type: str = Query("other", description="File type"),
@@ -604,7 +618,7 @@ async def upload_file(
 ):
     """Upload file for application using MinIO"""
     service = ApplicationService(db)
-    result = await service.upload_application_file_minio(id, current_user, file, file_type)
+    result = await service.upload_application_file_minio(id, current_user, file, file_type, background_tasks)
 
     # Log audit trail for document upload
     audit_service = ApplicationAuditService(db)
@@ -633,6 +647,7 @@ async def upload_file(
 
 @router.post("/{id}/files")
 async def upload_file_alias(
+    background_tasks: BackgroundTasks,
     id: int = Path(..., description="Application ID"),
     file: UploadFile = File(...),
     file_type: str = Query("other", description="File type"),
@@ -640,7 +655,7 @@ async def upload_file_alias(
     db: AsyncSession = Depends(get_db),
 ):
     """Upload file for application (alias for /files/upload)"""
-    return await upload_file(id, file, file_type, current_user, db)
+    return await upload_file(background_tasks, id, file, file_type, current_user, db)
 
 
 # Staff/Admin endpoints
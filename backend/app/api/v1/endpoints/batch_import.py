@@ -5,6 +5,7 @@ Provides endpoints for uploading, validating, and confirming
 offline application data imports.
 """
 
+import asyncio
 import logging
 import os
 import re
@@ -132,12 +133,13 @@ async def upload_batch_import_data(
 
     # Additional validation: Try to parse the file structure
     try:
+        # Off the event loop: openpyxl still opens the whole archive for nrows=0.
         if mime_type.startswith("application/vnd"):
             # Verify it's a valid Excel file by attempting to read metadata
-            pd.read_excel(BytesIO(file_content), nrows=0)
+            await asyncio.to_thread(pd.read_excel, BytesIO(file_content), nrows=0)
         elif "csv" in mime_type or mime_type == "text/plain":
             # Verify it's a valid CSV/text file
-            pd.read_csv(BytesIO(file_content), nrows=0)
+            await asyncio.to_thread(pd.read_csv, BytesIO(file_content), nrows=0)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="檔案結構驗證失敗") from e
 
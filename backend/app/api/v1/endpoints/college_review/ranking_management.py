@@ -28,7 +28,7 @@ from app.models.college_review import CollegeRanking, CollegeRankingItem
 from app.models.scholarship import ScholarshipConfiguration, ScholarshipType
 from app.models.student import Academy, Department
 from app.models.user import User, UserRole
-from app.schemas.college_review import RankingImportItem, RankingOrderUpdate, RankingUpdate
+from app.schemas.college_review import RankingImportItem, RankingOrderUpdate, RankingReorderRequest, RankingUpdate
 from app.schemas.response import ApiResponse
 from app.services.college_ranking_export_service import (
     CollegeRankingExportService,
@@ -742,6 +742,78 @@ async def update_ranking_order(
         ) from e
 
 
+@router.patch("/rankings/{ranking_id}/order")
+async def reorder_ranking(
+    request: Request,
+    ranking_id: int,
+    reorder: RankingReorderRequest,
+    current_user: User = Depends(require_college),
+    db: AsyncSession = Depends(get_db),
+):
+    """Reorder a ranking by permutation or drag-and-drop moves; only changed rows are written"""
+
+    try:
+        service = CollegeReviewService(db)
+        # #63: block once college-review deadline has passed (admins bypass).
+        await service.assert_ranking_within_deadline_by_ranking(ranking_id, current_user)
+
+        ranking_row = (
+            await db.execute(select(CollegeRanking).where(CollegeRanking.id == ranking_id))
+        ).scalar_one_or_none()
+        if not ranking_row:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ranking not found")
+        assert_can_manage_ranking(ranking_row, current_user)
+
+        ranking, changes = await service.reorder_ranking(
+            ranking_id,
+            order=reorder.order,
+            moves=[move.model_dump() for move in reorder.moves] if reorder.moves is not None else None,
+        )
+
+        if changes:
+            # G8 (#970): same old/new trace as PUT /order, limited to the moved items.
+            db.add(
+                AuditLog.create_log(
+                    user_id=current_user.id,
+                    action=AuditAction.update.value,
+                    resource_type="college_ranking",
+                    resource_id=str(ranking_id),
+                    description=f"ranking order updated ({len(changes)} item(s) moved)",
+                    old_values={"rank_positions": {str(app_id): old for app_id, old, _new in changes.values()}},
+                    new_values={"rank_positions": {str(app_id): new for app_id, _old, new in changes.values()}},
+                )
+            )
+        await db.commit()
+
+        return ApiResponse(
+            success=True,
+            message="Ranking order updated successfully",
+            data={"id": ranking.id, "updated_at": ranking.updated_at.isoformat(), "moved": len(changes)},
+        )
+
+    except AuthorizationError as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e)) from e
+    except NotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+    except RankingNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+    except RankingModificationError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e)) from e
+    except InvalidRankingDataError as e:
+        logger.warning("Invalid ranking reorder", exc_info=True)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    except CollegeReviewError as e:
+        logger.exception("College review error during ranking reorder")
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)) from e
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Unexpected error reordering ranking")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update ranking order"
+        ) from e
+
+
 async def _resolve_college_name(db: AsyncSession, college_code: Optional[str]) -> str:
     """Resolve a college code to its display name, academies table first.
 
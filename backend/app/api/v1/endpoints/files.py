@@ -2,23 +2,27 @@
 File proxy endpoints for secure file access
 """
 
+import asyncio
+import email.utils
 import logging
 import os
 import urllib.parse
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, status
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.config import settings
 from app.core.security import verify_token
 from app.db.deps import get_db
 from app.models.application import Application, ApplicationFile
 from app.models.user import User, UserRole
 from app.services.auth_service import AuthService
-from app.services.minio_service import minio_service
+from app.services.minio_service import MinIOService, minio_service
 from app.utils.college_scope import (
     college_user_may_access,
     get_application_college_code,
@@ -46,6 +50,13 @@ _SAFE_CONTENT_TYPES = {
 }
 _FALLBACK_CONTENT_TYPE = "application/octet-stream"
 
+# Upload-time derivatives (file_derivative_service) servable via ?variant=.
+# Both are produced by our own renderer, so their types are fixed.
+_VARIANTS = {
+    "thumbnail": ("thumbnail_object_name", "image/jpeg", ".jpg"),
+    "normalized": ("normalized_object_name", "application/pdf", ".pdf"),
+}
+
 
 def _safe_content_type(filename: Optional[str]) -> str:
     """Map a stored filename to a safe, non-scriptable Content-Type."""
@@ -76,18 +87,196 @@ def _assert_college_may_access(current_user: User, application: Application, fil
         raise HTTPException(status_code=404, detail="File not found")
 
 
+# Streamed responses are read from MinIO in chunks of this size.
+_STREAM_CHUNK = 1024 * 1024
+
+
+def _parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``Range: bytes=`` spec into an inclusive (start, end).
+
+    Returns None when the header should be ignored — absent, malformed or a
+    multi-range request, all of which RFC 9110 lets us answer with the full
+    200. A well-formed range that lies entirely outside the object is 416.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = (part.strip() for part in spec.partition("-"))
+    if not sep or not (first or last) or not all(part.isdigit() for part in (first, last) if part):
+        return None
+    if first:
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes.
+        start, end = max(size - int(last), 0), size - 1
+    if start >= size:
+        raise HTTPException(
+            status_code=416, detail="Requested range not satisfiable", headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match uses the weak comparison: a ``W/`` prefix is ignored."""
+    if header.strip() == "*":
+        return True
+    return etag in {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+def _not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """If-None-Match wins; If-Modified-Since is only consulted without it."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    since = _parse_http_date(request.headers.get("if-modified-since"))
+    return since is not None and last_modified is not None and last_modified.replace(microsecond=0) <= since
+
+
+def _range_applies(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """If-Range: honour the range only while the client's copy is current."""
+    if_range = request.headers.get("if-range")
+    if not if_range:
+        return True
+    if if_range.strip().startswith('"'):
+        return if_range.strip() == etag
+    since = _parse_http_date(if_range)
+    return since is not None and last_modified is not None and last_modified.replace(microsecond=0) == since
+
+
+def _strong_etag(object_name: str, content_sha256: Optional[str], minio_etag: Optional[str]) -> str:
+    """Content hash when known (blob name or upload-time hash), else the MinIO ETag."""
+    digest = MinIOService.blob_sha256(object_name) or content_sha256 or (minio_etag or "").strip('"')
+    return f'"{digest}"'
+
+
+def _iter_object(file_stream):
+    # Starlette iterates sync generators in its threadpool, so the blocking
+    # MinIO reads never run on the event loop.
+    try:
+        yield from file_stream.stream(_STREAM_CHUNK)
+    finally:
+        file_stream.close()
+        file_stream.release_conn()
+
+
+async def _hand_off(object_name: str, content_type: str, content_disposition: str) -> Response:
+    """Let the client (presigned) or nginx (x-accel) fetch the bytes from MinIO.
+
+    The safe Content-Type / Content-Disposition are signed into the URL as
+    response-* overrides, so MinIO answers with the headers we would have sent;
+    Range and conditional requests are then handled by MinIO itself.
+    """
+    url = await asyncio.to_thread(
+        minio_service.get_file_download_url,
+        object_name,
+        timedelta(seconds=settings.file_proxy_presigned_ttl_seconds),
+        {"response-content-type": content_type, "response-content-disposition": content_disposition},
+    )
+    if settings.file_proxy_mode == "presigned":
+        # The URL expires quickly: never let a cache replay the redirect.
+        return RedirectResponse(url, status_code=307, headers={"Cache-Control": "no-store"})
+    target = urllib.parse.urlsplit(url)
+    return Response(
+        media_type=content_type,
+        headers={
+            "X-Accel-Redirect": f"{settings.file_proxy_x_accel_prefix.rstrip('/')}{target.path}?{target.query}",
+            "Content-Disposition": content_disposition,
+            "Cache-Control": "no-store",
+            "X-Content-Type-Options": "nosniff",
+        },
+    )
+
+
+async def _serve_object(
+    request: Request,
+    object_name: str,
+    *,
+    content_type: str,
+    filename: str,
+    disposition: str,
+    cache_control: str,
+    content_sha256: Optional[str] = None,
+) -> Response:
+    """Send an already-authorized MinIO object according to ``file_proxy_mode``.
+
+    In stream mode the response carries a strong ETag and Last-Modified,
+    answers If-None-Match / If-Modified-Since with 304, and serves a single
+    ``Range`` (If-Range aware) as 206 from a ranged MinIO GET — PDF viewers and
+    resumed downloads no longer pull the whole object through the backend.
+    """
+    # Handle filename encoding for non-ASCII characters (e.g., Chinese)
+    encoded_filename = urllib.parse.quote(filename, safe="")
+    content_disposition = f"{disposition}; filename*=UTF-8''{encoded_filename}"
+    if settings.file_proxy_mode != "stream":
+        return await _hand_off(object_name, content_type, content_disposition)
+
+    stat = await asyncio.to_thread(minio_service.stat_file, object_name)
+    size = stat.size or 0
+    last_modified = stat.last_modified
+    etag = _strong_etag(object_name, content_sha256, stat.etag)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Cache-Control": cache_control,
+        "ETag": etag,
+        "X-Content-Type-Options": "nosniff",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = email.utils.format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    if _range_applies(request, etag, last_modified):
+        byte_range = _parse_range(request.headers.get("range"), size)
+
+    headers["Content-Disposition"] = content_disposition
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        file_stream = await asyncio.to_thread(minio_service.get_file_stream, object_name)
+        return StreamingResponse(_iter_object(file_stream), media_type=content_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    file_stream = await asyncio.to_thread(minio_service.get_file_range, object_name, start, end - start + 1)
+    return StreamingResponse(_iter_object(file_stream), status_code=206, media_type=content_type, headers=headers)
+
+
 @router.get("/applications/{application_id}/files/{file_id}")
 async def get_file_proxy(
+    request: Request,
     application_id: int = Path(..., description="Application ID"),
     file_id: int = Path(..., description="File ID"),
     # JWTs from this system are dot-separated base64url segments. Constrain
     # length + charset at the FastAPI layer so malformed / oversized strings
     # 422 before they reach verify_token() and get DoS-tested for free.
     token: Optional[str] = Query(None, description="Access token", max_length=2048, pattern=r"^[A-Za-z0-9._-]+$"),
+    variant: Optional[str] = Query(
+        None, description="Precomputed derivative: thumbnail or normalized", pattern=r"^(thumbnail|normalized)$"
+    ),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Proxy endpoint to securely serve files from MinIO
+
+    ``variant`` serves an upload-time derivative instead of the original and
+    404s while it has not been produced (callers fall back to the original).
     """
     try:
         # Manual token verification for direct file access
@@ -173,35 +362,31 @@ async def get_file_proxy(
         if not file_record.object_name:
             raise HTTPException(status_code=404, detail="File object not found")
 
-        file_stream = minio_service.get_file_stream(file_record.object_name)
-
+        object_name = file_record.object_name
+        filename = file_record.filename
         # Determine content type from the validated extension, never from the
         # client-supplied MIME stored at upload time (see _safe_content_type).
         content_type = _safe_content_type(file_record.filename)
-
-        # Create streaming response
-        def generate():
-            try:
-                for chunk in file_stream.stream(1024 * 1024):  # 1MB chunks
-                    yield chunk
-            finally:
-                file_stream.close()
-                file_stream.release_conn()
-
-        # Handle filename encoding for non-ASCII characters (e.g., Chinese)
-        encoded_filename = urllib.parse.quote(file_record.filename, safe="")
+        if variant:
+            column, content_type, extension = _VARIANTS[variant]
+            object_name = getattr(file_record, column)
+            if not object_name:
+                raise HTTPException(status_code=404, detail="File derivative not available")
+            filename = f"{os.path.splitext(file_record.filename or 'file')[0]}{extension}"
 
         # Only render inline for types we recognise as safe; anything unknown is
         # forced to download so the browser never renders it in our origin.
         disposition = "inline" if content_type != _FALLBACK_CONTENT_TYPE else "attachment"
 
-        headers = {
-            "Content-Disposition": f"{disposition}; filename*=UTF-8''{encoded_filename}",
-            "Cache-Control": "private, max-age=3600",  # Cache for 1 hour
-            "X-Content-Type-Options": "nosniff",
-        }
-
-        return StreamingResponse(generate(), media_type=content_type, headers=headers)
+        return await _serve_object(
+            request,
+            object_name,
+            content_type=content_type,
+            filename=filename,
+            disposition=disposition,
+            cache_control="private, max-age=3600",  # Cache for 1 hour, then revalidate by ETag
+            content_sha256=None if variant else file_record.content_sha256,
+        )
 
     except HTTPException:
         raise
@@ -212,6 +397,7 @@ async def get_file_proxy(
 
 @router.get("/applications/{application_id}/files/{file_id}/download")
 async def download_file_proxy(
+    request: Request,
     application_id: int = Path(..., description="Application ID"),
     file_id: int = Path(..., description="File ID"),
     # JWTs from this system are dot-separated base64url segments. Constrain
@@ -307,31 +493,19 @@ async def download_file_proxy(
         if not file_record.object_name:
             raise HTTPException(status_code=404, detail="File object not found")
 
-        file_stream = minio_service.get_file_stream(file_record.object_name)
-
         # Determine content type from the validated extension, never from the
         # client-supplied MIME stored at upload time (see _safe_content_type).
         content_type = _safe_content_type(file_record.filename)
 
-        # Create streaming response with download headers
-        def generate():
-            try:
-                for chunk in file_stream.stream(1024 * 1024):  # 1MB chunks
-                    yield chunk
-            finally:
-                file_stream.close()
-                file_stream.release_conn()
-
-        # Handle filename encoding for non-ASCII characters (e.g., Chinese)
-        encoded_filename = urllib.parse.quote(file_record.filename, safe="")
-
-        headers = {
-            "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}",
-            "Cache-Control": "no-cache",
-            "X-Content-Type-Options": "nosniff",
-        }
-
-        return StreamingResponse(generate(), media_type=content_type, headers=headers)
+        return await _serve_object(
+            request,
+            file_record.object_name,
+            content_type=content_type,
+            filename=file_record.filename,
+            disposition="attachment",
+            cache_control="no-cache",
+            content_sha256=file_record.content_sha256,
+        )
 
     except HTTPException:
         raise
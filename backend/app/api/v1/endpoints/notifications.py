@@ -6,16 +6,21 @@ import logging
 from typing import Any, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy import and_
 from sqlalchemy import func as sa_func
 from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.deps import get_current_user, get_db
+from app.db.session import get_db_session
 from app.models.notification import Notification, NotificationPriority, NotificationType
 from app.models.user import User
 from app.schemas.notification import NotificationCreate
 from app.schemas.response import ApiResponse
+from app.services import notification_counter
 from app.services.notification_service import NotificationService
 
 logger = logging.getLogger(__name__)
@@ -24,6 +29,9 @@ func: Any = sa_func
 
 router = APIRouter()
 
+# EventSource 無法設定 Authorization 標頭，串流端點也接受 ?token=
+_optional_bearer = OAuth2PasswordBearer(tokenUrl=f"{settings.api_v1_str}/auth/login", auto_error=False)
+
 
 @router.get("")
 async def getUserNotifications(
@@ -74,6 +82,36 @@ async def getUnreadNotificationCount(
         raise HTTPException(status_code=500, detail="獲取未讀通知數量失敗") from e
 
 
+@router.get("/stream")
+async def streamUnreadNotificationCount(
+    header_token: Optional[str] = Depends(_optional_bearer),
+    token: Optional[str] = Query(None, description="Access token", max_length=2048, pattern=r"^[A-Za-z0-9._-]+$"),
+):
+    """
+    以 Server-Sent Events 推送未讀通知數量
+    連線時先送出目前數量，之後只在數量變動時推送，取代輪詢 /unread-count
+    """
+    access_token = header_token or token
+    if not access_token:
+        raise HTTPException(status_code=401, detail="Access token required", headers={"WWW-Authenticate": "Bearer"})
+    # No Depends(get_db): a dependency session stays checked out until the
+    # response ends, i.e. for the whole life of the stream.
+    async with get_db_session() as session:
+        current_user = await get_current_user(token=access_token, db=session)
+    user_id = current_user.id
+
+    async def read_count() -> int:
+        # 串流期間不占用請求的 session，每次重新讀取各開一個短 session
+        async with get_db_session() as session:
+            return await NotificationService(session).getUnreadNotificationCount(user_id)
+
+    return StreamingResponse(
+        notification_counter.unread_count_stream(user_id, read_count),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.patch("/{notification_id}/read")
 async def markNotificationAsRead(
     notification_id: int, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
@@ -129,24 +167,10 @@ async def dismissNotification(
     關閉/隱藏通知
     """
     try:
-        # 查詢通知
-        stmt = select(Notification).where(
-            and_(
-                Notification.id == notification_id,
-                or_(Notification.user_id == current_user.id, Notification.user_id.is_(None)),
-            )
-        )
-
-        result = await db.execute(stmt)
-        notification = result.scalar_one_or_none()
-
-        if not notification:
+        service = NotificationService(db)
+        if not await service.dismissNotification(notification_id, current_user.id):
             raise HTTPException(status_code=404, detail="通知不存在")
 
-        # 關閉通知
-        notification.dismiss()
-        await db.commit()
-
         return ApiResponse(success=True, message="通知已關閉", data={"notification_id": notification_id})
 
     except HTTPException:
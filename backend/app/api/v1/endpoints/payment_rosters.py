@@ -3,6 +3,9 @@ Payment roster API endpoints
 造冊相關API端點
 """
 
+import base64
+import binascii
+import json
 import logging
 import os
 from datetime import datetime, timezone
@@ -10,7 +13,7 @@ from typing import Optional
 
 from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, Query, Request, status
 from fastapi.responses import FileResponse
-from sqlalchemy import and_, func, or_, select
+from sqlalchemy import JSON, and_, func, or_, select, tuple_, type_coerce
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload
 from sqlalchemy.sql.functions import count
@@ -21,6 +24,7 @@ from app.core.exceptions import RosterAlreadyExistsError, RosterGenerationError,
 from app.core.path_security import validate_object_name_minio
 from app.core.security import check_user_roles
 from app.db.deps import get_db, get_sync_db
+from app.models.application import Application
 from app.models.payment_roster import (
     MANUAL_EXCLUSION_CATEGORY_LABELS,
     PaymentRoster,
@@ -46,7 +50,10 @@ from app.schemas.roster import (
     RosterAuditLogResponse,
     RosterCreateRequest,
     RosterExportRequest,
+    RosterItemDetailResponse,
+    RosterItemPage,
     RosterItemResponse,
+    RosterItemSummary,
     RosterListResponse,
     RosterResponse,
     RosterStatisticsResponse,
@@ -119,9 +126,96 @@ def _roster_item_dict_with_display_year(item: PaymentRosterItem, roster: Payment
     data = RosterItemResponse.model_validate(item).model_dump(exclude=_HEAVY_ITEM_FIELDS if slim else None)
     if data.get("allocation_year") is None:
         data["allocation_year"] = roster.academic_year
+    if data.get("student_id") is None:
+        data["student_id"] = getattr(item, "student_number", None) or None
     return data
 
 
+# 名單列表的欄位投影：不載入 excel_row_data / verification_snapshot /
+# rule_validation_result / bank_verification_details 等大型 JSON，也不載入
+# Application（其 student_data 每次載入都要解密 std_pid）。完整內容走
+# GET /{roster_id}/items/{item_id}。
+_ITEM_LIST_COLUMNS = (
+    PaymentRosterItem.id,
+    PaymentRosterItem.roster_id,
+    PaymentRosterItem.application_id,
+    PaymentRosterItem.student_id_number,
+    PaymentRosterItem.student_number,
+    PaymentRosterItem.student_name,
+    PaymentRosterItem.student_email,
+    PaymentRosterItem.college_code,
+    PaymentRosterItem.college_name,
+    PaymentRosterItem.department_name,
+    PaymentRosterItem.scholarship_name,
+    PaymentRosterItem.scholarship_amount,
+    PaymentRosterItem.scholarship_subtype,
+    PaymentRosterItem.allocation_year,
+    PaymentRosterItem.allocated_sub_type,
+    PaymentRosterItem.application_identity,
+    PaymentRosterItem.bank_account,
+    PaymentRosterItem.verification_status,
+    PaymentRosterItem.verification_message,
+    PaymentRosterItem.is_included,
+    PaymentRosterItem.exclusion_reason,
+    PaymentRosterItem.failed_rules,
+    PaymentRosterItem.warning_rules,
+    PaymentRosterItem.created_at,
+    PaymentRosterItem.updated_at,
+    # is_eligible 只需要快照中的一個布林值，由資料庫取出即可
+    PaymentRosterItem.rule_validation_result["is_eligible"].label("rule_is_eligible"),
+)
+
+_DISPLAY_FIELDS = ("college_code", "college_name", "department_name")
+
+
+def _encode_item_cursor(created_at: datetime, item_id: int) -> str:
+    """Opaque keyset cursor for the (created_at, id) position of the last row."""
+    raw = json.dumps([created_at.isoformat(), item_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_item_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, item_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="無效的分頁游標") from e
+
+
+async def _legacy_display_fields(db: AsyncSession, application_ids: set) -> dict:
+    """學號/學院/系所 for items generated before those were snapshotted.
+
+    Reads the four keys straight out of the JSON column so the application row
+    (and its encrypted std_pid) is never materialized.
+    """
+    sd = type_coerce(Application.student_data, JSON)
+    stmt = select(
+        Application.id,
+        sd["std_stdcode"].as_string(),
+        sd["std_academyno"].as_string(),
+        sd["trm_academyno"].as_string(),
+        sd["trm_academyname"].as_string(),
+        sd["trm_depname"].as_string(),
+    ).where(Application.id.in_(application_ids))
+    result = await db.execute(stmt)
+    return {
+        app_id: {
+            "student_id": stdcode,
+            "college_code": academyno or trm_academyno,
+            "college_name": academyname,
+            "department_name": depname,
+        }
+        for app_id, stdcode, academyno, trm_academyno, academyname, depname in result.all()
+    }
+
+
+def _fill_missing(data: dict, fallback: Optional[dict]) -> None:
+    for key, value in (fallback or {}).items():
+        if data.get(key) is None:
+            data[key] = value
+
+
 def _generate_payment_roster_inner(
     request: RosterCreateRequest,
     db: Session,
@@ -359,16 +453,18 @@ def generate_payment_roster(
 
     Wraps the generation in a Redis SET-NX-EX mutex so a double-click on
     "產生造冊" can't produce two parallel rosters for the same
-    (scholarship_configuration_id, period_label). The 300s TTL also acts
-    as a safety net if the backend dies mid-generation — the lock auto-
-    expires and the next attempt succeeds.
+    (scholarship_configuration_id, period_label). The lock is renewed while
+    generation runs, so a slow SIS verification pass cannot outlive it; the
+    300s TTL still acts as a safety net if the backend dies mid-generation —
+    renewal stops, the lock auto-expires and the next attempt succeeds.
+    Scheduled generation takes the same key.
     """
     # 檢查權限：只有管理員和處理人員可以產生造冊
     check_user_roles([UserRole.admin, UserRole.super_admin], current_user)
 
     lock_key = f"roster:{request.scholarship_configuration_id}:{request.period_label}"
     try:
-        with with_lock_sync(lock_key, ttl_seconds=300):
+        with with_lock_sync(lock_key, ttl_seconds=300, renew=True):
             return _generate_payment_roster_inner(request, db, current_user)
     except LockBusy as exc:
         # Concurrent generation in flight — fail fast rather than queue.
@@ -1355,7 +1451,8 @@ async def get_payment_roster(
 @router.get("/{roster_id}/items")
 async def get_roster_items(
     roster_id: int,
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="上一頁回傳的 next_cursor"),
+    skip: int = Query(0, ge=0, deprecated=True, description="僅在未提供 cursor 時使用（舊版 offset 分頁）"),
     limit: int = Query(100, ge=1, le=500),
     verification_status: Optional[StudentVerificationStatus] = Query(None),
     is_included: Optional[bool] = Query(None),
@@ -1365,22 +1462,21 @@ async def get_roster_items(
     """
     取得造冊明細項目
     Get roster items
+
+    以 (created_at, id) keyset 分頁：回傳 {items, next_cursor, limit}，
+    next_cursor 帶回 cursor 參數即可取下一頁。列表不含大型 JSON 快照，
+    單筆完整內容請呼叫 GET /{roster_id}/items/{item_id}。
     """
     check_user_roles([UserRole.admin, UserRole.super_admin], current_user)
     try:
         # 檢查造冊是否存在
-        roster_stmt = select(PaymentRoster).where(PaymentRoster.id == roster_id)
-        roster_result = await db.execute(roster_stmt)
-        roster = roster_result.scalar_one_or_none()
+        roster_stmt = select(PaymentRoster.id, PaymentRoster.academic_year).where(PaymentRoster.id == roster_id)
+        roster = (await db.execute(roster_stmt)).one_or_none()
 
         if not roster:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="找不到指定的造冊")
 
-        stmt = (
-            select(PaymentRosterItem)
-            .where(PaymentRosterItem.roster_id == roster_id)
-            .options(selectinload(PaymentRosterItem.application))
-        )
+        stmt = select(*_ITEM_LIST_COLUMNS).where(PaymentRosterItem.roster_id == roster_id)
 
         # 套用篩選條件
         if verification_status:
@@ -1389,27 +1485,43 @@ async def get_roster_items(
             stmt = stmt.where(PaymentRosterItem.is_included.is_(is_included))
 
         # 分頁查詢
-        stmt = stmt.order_by(PaymentRosterItem.created_at).offset(skip).limit(limit)
-        result = await db.execute(stmt)
-        items = result.scalars().all()
+        if cursor:
+            stmt = stmt.where(tuple_(PaymentRosterItem.created_at, PaymentRosterItem.id) > _decode_item_cursor(cursor))
+        elif skip:
+            stmt = stmt.offset(skip)
+        stmt = stmt.order_by(PaymentRosterItem.created_at, PaymentRosterItem.id).limit(limit + 1)
+        rows = (await db.execute(stmt)).mappings().all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        # 欄位快照前產生的舊項目：學號/學院/系所改由申請快照補齊
+        legacy_ids = {
+            row["application_id"]
+            for row in rows
+            if row["student_number"] is None or all(row[f] is None for f in _DISPLAY_FIELDS)
+        }
+        legacy = await _legacy_display_fields(db, legacy_ids) if legacy_ids else {}
 
         items_data = []
-        for item in items:
-            item_dict = _roster_item_dict_with_display_year(item, roster)
-            # 從 application.student_data 補充學號/學院/系所資訊
-            # (PaymentRosterItem 只存 student_id_number=身分證，學號需從快照取得)
-            if item.application and item.application.student_data:
-                sd = item.application.student_data
-                item_dict["student_id"] = sd.get("std_stdcode")
-                item_dict["college_code"] = sd.get("std_academyno") or sd.get("trm_academyno")
-                item_dict["college_name"] = sd.get("trm_academyname")
-                item_dict["department_name"] = sd.get("trm_depname")
-            items_data.append(item_dict)
+        for row in rows:
+            item = dict(row)
+            rule_is_eligible = item.pop("rule_is_eligible")
+            item["is_eligible"] = None if rule_is_eligible is None else bool(rule_is_eligible)
+            item["student_id"] = item.pop("student_number") or None
+            _fill_missing(item, legacy.get(item["application_id"]))
+            if item.get("allocation_year") is None:
+                item["allocation_year"] = roster.academic_year
+            items_data.append(RosterItemSummary.model_validate(item))
+
+        next_cursor = None
+        if has_more and rows:
+            next_cursor = _encode_item_cursor(rows[-1]["created_at"], rows[-1]["id"])
 
         return ApiResponse(
             success=True,
             message="查詢成功",
-            data=items_data,
+            data=RosterItemPage(items=items_data, next_cursor=next_cursor, limit=limit).model_dump(),
         )
 
     except HTTPException:
@@ -1419,6 +1531,46 @@ async def get_roster_items(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="取得造冊明細失敗") from e
 
 
+@router.get("/{roster_id}/items/{item_id}")
+async def get_roster_item(
+    roster_id: int,
+    item_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    取得單一造冊明細完整內容（含資格驗證、學籍驗證、郵局帳號驗證快照與 Excel 列資料）
+    Get one roster item including its JSON snapshots
+    """
+    check_user_roles([UserRole.admin, UserRole.super_admin], current_user)
+    try:
+        stmt = (
+            select(PaymentRosterItem, PaymentRoster.academic_year)
+            .join(PaymentRoster, PaymentRoster.id == PaymentRosterItem.roster_id)
+            .where(PaymentRosterItem.roster_id == roster_id, PaymentRosterItem.id == item_id)
+        )
+        row = (await db.execute(stmt)).one_or_none()
+        if not row:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="找不到指定的造冊明細")
+        item, academic_year = row
+
+        data = RosterItemDetailResponse.model_validate(item).model_dump()
+        if data.get("allocation_year") is None:
+            data["allocation_year"] = academic_year
+        data["student_id"] = item.student_number or None
+        if data["student_id"] is None or all(data.get(f) is None for f in _DISPLAY_FIELDS):
+            legacy = await _legacy_display_fields(db, {item.application_id})
+            _fill_missing(data, legacy.get(item.application_id))
+
+        return ApiResponse(success=True, message="查詢成功", data=data)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception(f"Failed to get roster item {item_id} for roster {roster_id}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="取得造冊明細失敗") from e
+
+
 @router.post("/{roster_id}/lock")
 async def lock_roster(
     roster_id: int,
@@ -2328,7 +2480,7 @@ def reconcile_roster_endpoint(
     touch quota."""
     _require_admin(current_user)
     try:
-        with with_lock_sync(_roster_items_lock_key(roster_id), ttl_seconds=300):
+        with with_lock_sync(_roster_items_lock_key(roster_id), ttl_seconds=300, renew=True):
             svc = RosterService(db)
             result = svc.reconcile_roster(
                 roster_id=roster_id,
@@ -2385,7 +2537,7 @@ def regenerate_roster_endpoint(
     """
     _require_admin(current_user)
     try:
-        with with_lock_sync(_roster_items_lock_key(roster_id), ttl_seconds=300):
+        with with_lock_sync(_roster_items_lock_key(roster_id), ttl_seconds=300, renew=True):
             svc = RosterRegenerationService(db)
             result = svc.regenerate_roster(
                 roster_id=roster_id,
@@ -11,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.functions import count
 
 from app.core.cache import invalidate as cache_invalidate
+from app.core.principal_cache import invalidate_principals
 from app.core.security import get_current_user, require_admin
 from app.db.deps import get_db
 from app.models.user import EmployeeStatus, User, UserRole, UserType
@@ -156,6 +157,7 @@ async def update_my_profile(
 
     await db.commit()
     await db.refresh(current_user)
+    await invalidate_principals(current_user.id)
 
     return {
         "success": True,
@@ -380,6 +382,7 @@ async def update_user(
     await db.refresh(user)
     # Role / college_code change can affect dashboard scope for this admin.
     await cache_invalidate("dashboard:")
+    await invalidate_principals(id)
 
     return {
         "success": True,
@@ -418,6 +421,7 @@ async def delete_user(
     await db.delete(user)
     await db.commit()
     await cache_invalidate("dashboard:")
+    await invalidate_principals(id)
 
     logger.warning(
         "User %s (role=%s) hard-deleted by admin user_id=%s",
@@ -490,6 +494,7 @@ async def update_user_college(
     await db.commit()
     await db.refresh(user)
     await cache_invalidate("dashboard:")
+    await invalidate_principals(id)
 
     logger.info(
         "User %s college_code changed %r → %r by super-admin user_id=%s",
@@ -585,6 +590,7 @@ async def bulk_assign_scholarships(
     await db.commit()
     # Admin scope changed: dashboard cache for this admin must be rebuilt.
     await cache_invalidate("dashboard:")
+    await invalidate_principals(id)
 
     # Get final scholarship list
     final_stmt = (
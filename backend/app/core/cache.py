@@ -35,9 +35,11 @@ Notes for future maintainers:
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import random
+import threading
 import uuid
 from contextlib import asynccontextmanager, contextmanager
 from datetime import date, datetime
@@ -56,6 +58,7 @@ KEY_PREFIX = "cache:v1:"
 
 _async_client: Optional[redis_async.Redis] = None
 _sync_client: Optional[redis_sync.Redis] = None
+_signal_client: Optional[redis_sync.Redis] = None
 
 
 def _redis_url() -> str:
@@ -81,11 +84,74 @@ def get_cache_sync() -> redis_sync.Redis:
     return _sync_client
 
 
+def get_signal_cache_sync() -> redis_sync.Redis:
+    """Sync client with short socket timeouts, for ``fire_signal`` outside a loop."""
+    global _signal_client
+    if _signal_client is None:
+        from app.core.config import settings
+
+        timeout = settings.cache_signal_timeout_seconds
+        _signal_client = redis_sync.from_url(
+            _redis_url(), decode_responses=False, socket_timeout=timeout, socket_connect_timeout=timeout
+        )
+    return _signal_client
+
+
 def reset_clients_for_tests() -> None:
     """Drop the singletons. Used by tests to swap in a FakeRedis."""
-    global _async_client, _sync_client
+    global _async_client, _sync_client, _signal_client
     _async_client = None
     _sync_client = None
+    _signal_client = None
+
+
+# ---------------------------------------------------------------------------
+# Fire-and-forget signals from commit hooks
+# ---------------------------------------------------------------------------
+
+# Strong references: the loop only keeps weak ones to running tasks.
+_pending_signals: set = set()
+
+
+def fire_signal(description: str, command: Callable[[Any], Any]) -> None:
+    """Send a best-effort Redis command without blocking the caller.
+
+    ``command`` receives a client and issues the command, e.g.
+    ``lambda c: c.incr(key)``. ORM ``after_commit`` hooks call this: on the
+    event loop (AsyncSession) the command runs in a background task on the
+    async client, bounded by ``cache_signal_timeout_seconds``; from a plain
+    thread (sync sessions) it runs inline on a client with that socket
+    timeout. Failures are logged, never raised.
+    """
+    from app.core.config import settings
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    if loop is None:
+        try:
+            command(get_signal_cache_sync())
+        except Exception:  # noqa: BLE001
+            logger.warning("%s failed", description, exc_info=True)
+        return
+
+    async def _send() -> None:
+        try:
+            await asyncio.wait_for(command(get_cache()), timeout=settings.cache_signal_timeout_seconds)
+        except Exception:  # noqa: BLE001
+            logger.warning("%s failed", description, exc_info=True)
+
+    task = loop.create_task(_send())
+    _pending_signals.add(task)
+    task.add_done_callback(_pending_signals.discard)
+
+
+async def wait_for_signals() -> None:
+    """Wait for signals fired on this loop (tests, graceful shutdown)."""
+    while _pending_signals:
+        await asyncio.gather(*list(_pending_signals), return_exceptions=True)
 
 
 # ---------------------------------------------------------------------------
@@ -245,8 +311,45 @@ _RELEASE_LUA = (
 )
 
 
+# Extends the TTL only while we still own the token, for the same reason.
+_RENEW_LUA = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "  return redis.call('expire', KEYS[1], ARGV[2]) "
+    "else "
+    "  return 0 "
+    "end"
+)
+
+
+def _renew_interval(ttl_seconds: int) -> float:
+    # Renew at a third of the TTL so two consecutive missed renewals still
+    # leave the lock held.
+    return max(ttl_seconds / 3.0, 0.05)
+
+
+async def _renew_forever(client, full: bytes, token: bytes, ttl_seconds: int) -> None:
+    while True:
+        await asyncio.sleep(_renew_interval(ttl_seconds))
+        try:
+            if not await client.eval(_RENEW_LUA, 1, full, token, ttl_seconds):
+                logger.warning("with_lock: lost %s before renewal; stop renewing", full.decode("utf-8"))
+                return
+        except Exception:  # noqa: BLE001
+            logger.warning("with_lock: renewal failed for %s", full.decode("utf-8"), exc_info=True)
+
+
+def _renew_until(stop: threading.Event, client, full: bytes, token: bytes, ttl_seconds: int) -> None:
+    while not stop.wait(_renew_interval(ttl_seconds)):
+        try:
+            if not client.eval(_RENEW_LUA, 1, full, token, ttl_seconds):
+                logger.warning("with_lock_sync: lost %s before renewal; stop renewing", full.decode("utf-8"))
+                return
+        except Exception:  # noqa: BLE001
+            logger.warning("with_lock_sync: renewal failed for %s", full.decode("utf-8"), exc_info=True)
+
+
 @asynccontextmanager
-async def with_lock(key: str, ttl_seconds: int = 60):
+async def with_lock(key: str, ttl_seconds: int = 60, renew: bool = False):
     """Acquire a distributed mutex via SET NX EX.
 
     Raises ``LockBusy`` if the key is already held. Releases on exit if
@@ -255,6 +358,10 @@ async def with_lock(key: str, ttl_seconds: int = 60):
     Designed for "prevent the same expensive operation from running
     twice concurrently" — e.g. payment-roster generation. NOT a
     fairness primitive; competing callers fail fast rather than wait.
+
+    ``renew=True`` re-extends the TTL every ``ttl_seconds / 3`` for as long
+    as the block runs, so a long job cannot outlive its lock while a crashed
+    holder still frees it within one TTL.
     """
     client = get_cache()
     token = uuid.uuid4().hex.encode("utf-8")
@@ -262,9 +369,12 @@ async def with_lock(key: str, ttl_seconds: int = 60):
     acquired = await client.set(full, token, nx=True, ex=ttl_seconds)
     if not acquired:
         raise LockBusy(full.decode("utf-8"))
+    renewer = asyncio.create_task(_renew_forever(client, full, token, ttl_seconds)) if renew else None
     try:
         yield token.decode("utf-8")
     finally:
+        if renewer is not None:
+            renewer.cancel()
         try:
             await client.eval(_RELEASE_LUA, 1, full, token)
         except Exception:  # noqa: BLE001
@@ -272,18 +382,32 @@ async def with_lock(key: str, ttl_seconds: int = 60):
 
 
 @contextmanager
-def with_lock_sync(key: str, ttl_seconds: int = 60):
+def with_lock_sync(key: str, ttl_seconds: int = 60, renew: bool = False):
     """Sync sibling of ``with_lock``. Same semantics; for sync endpoints
-    (e.g. the payment-roster generator that uses get_sync_db)."""
+    (e.g. the payment-roster generator that uses get_sync_db). With
+    ``renew=True`` a daemon thread keeps extending the TTL."""
     client = get_cache_sync()
     token = uuid.uuid4().hex.encode("utf-8")
     full = (KEY_PREFIX + "lock:" + key).encode("utf-8")
     acquired = client.set(full, token, nx=True, ex=ttl_seconds)
     if not acquired:
         raise LockBusy(full.decode("utf-8"))
+    stop = threading.Event()
+    renewer = None
+    if renew:
+        renewer = threading.Thread(
+            target=_renew_until,
+            args=(stop, client, full, token, ttl_seconds),
+            name=f"lock-renew:{key}",
+            daemon=True,
+        )
+        renewer.start()
     try:
         yield token.decode("utf-8")
     finally:
+        stop.set()
+        if renewer is not None:
+            renewer.join(timeout=5)
         try:
             client.eval(_RELEASE_LUA, 1, full, token)
         except Exception:  # noqa: BLE001
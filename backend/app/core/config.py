@@ -33,6 +33,14 @@ class Settings(BaseSettings):
     # No default values to prevent accidental use of hardcoded credentials
     database_url: str
     database_url_sync: str
+    # Postgres connections this container may open in total, split across its
+    # web_concurrency processes and their async/sync engines
+    # (app.db.session.compute_pool_sizes). 0 keeps the fixed per-process
+    # sizing of 10 + 20 overflow on each engine.
+    db_connection_budget: int = 0
+    # Number of uvicorn worker processes; uvicorn reads the same
+    # WEB_CONCURRENCY variable as its --workers default.
+    web_concurrency: int = 1
 
     # Security
     secret_key: str  # Required: Must be set via SECRET_KEY environment variable
@@ -75,6 +83,33 @@ class Settings(BaseSettings):
     minio_secret_key: str  # Required: Must be set via MINIO_SECRET_KEY environment variable
     minio_bucket: str = "scholarship-files"
     minio_secure: bool = False
+    # Uploads are streamed: objects larger than this go up as multipart
+    # uploads in parts of this size (S3 minimum is 5 MiB).
+    minio_upload_part_size: int = 16 * 1024 * 1024
+    # Content-addressed application files (app.services.blob_store): a blob
+    # whose reference count stayed at zero this long is deleted by the daily GC.
+    blob_gc_grace_hours: int = 72
+    # Merged application PDFs (app.services.pdf_merge): photos are downsampled
+    # to this resolution on the A4 page and re-encoded as JPEG; each rendered
+    # document is cached in MinIO under derivatives/, keyed by the source ETag.
+    merged_pdf_image_dpi: int = 150
+    merged_pdf_jpeg_quality: int = 80
+    merged_pdf_derivative_cache: bool = True
+    # Upload-time derivatives (app.services.file_derivative_service): after an
+    # application file is stored, a background task hashes it, pre-renders
+    # its merged-PDF page, builds a thumbnail and runs OCR when enabled.
+    file_derivatives_enabled: bool = True
+    file_thumbnail_size: int = 320
+    # Application file proxy (endpoints/files.py) after authorization:
+    #   "stream"   — stream from MinIO through the backend (Range/ETag aware).
+    #   "presigned" — 307 to a presigned MinIO URL valid this many seconds;
+    #                 minio_endpoint must then be reachable by browsers.
+    #   "x-accel"  — hand the same presigned path to nginx via X-Accel-Redirect
+    #                under an `internal` location at file_proxy_x_accel_prefix
+    #                that proxies to MinIO with `Host` set to minio_endpoint.
+    file_proxy_mode: str = "stream"
+    file_proxy_presigned_ttl_seconds: int = 60
+    file_proxy_x_accel_prefix: str = "/protected-files"
 
     # OCR Service (Gemini API)
     ocr_service_enabled: bool = False
@@ -86,9 +121,54 @@ class Settings(BaseSettings):
     # Redis Cache
     redis_url: str = "redis://localhost:6379/0"
 
+    # Rate limiting (app.core.rate_limiting): GCRA in one Redis script. With a
+    # non-zero local share each worker may admit that fraction of a key's
+    # last-known remaining quota without a round trip, charging it to Redis
+    # on the next sync; near the limit every request goes to Redis. Keep
+    # workers x share below 1 or the workers together can overshoot the limit.
+    rate_limit_local_share: float = 0.0
+
     # Scheduler Control
     enable_scheduler: bool = True  # Default: enabled for production
+    # With several API workers / replicas (or a `python -m app.worker` node),
+    # only the holder of a Redis lease runs APScheduler (app.core.leader_election).
+    # A crashed leader is replaced within one lease; a clean shutdown hands over
+    # within one poll interval.
+    scheduler_leader_election: bool = True
+    scheduler_leader_lease_seconds: int = 15
+    scheduler_leader_poll_seconds: float = 2.0
     cache_ttl: int = 600  # 10 minutes
+    # Socket / wait timeout for fire-and-forget Redis signals sent from commit
+    # hooks (app.core.cache.fire_signal), so a slow Redis never holds a request.
+    cache_signal_timeout_seconds: float = 0.5
+
+    # Principal cache (app.core.principal_cache): snapshot of the authenticated
+    # user keyed by (user_id, token iat). 0 disables it. Committed user / grant
+    # changes invalidate it on every worker via Redis pub/sub; the shorter
+    # in-process TTL only bounds staleness while Redis is unreachable.
+    principal_cache_ttl_seconds: int = 60
+    principal_cache_local_ttl_seconds: int = 10
+
+    # Reference-data catalog (app.core.refdata_catalog): per-worker snapshot of
+    # scholarship types / configurations / sub-type configs / rules. Workers
+    # poll the Redis generation at most once per check interval. While Redis
+    # is unreachable a snapshot older than the max age is rebuilt from the DB.
+    refdata_catalog_enabled: bool = True
+    refdata_catalog_check_interval_seconds: float = 5.0
+    refdata_catalog_max_age_seconds: float = 60.0
+
+    # Unread-notification counters (app.services.notification_counter): one
+    # Redis integer per user, kept current on create / read / dismiss and
+    # recomputed on a miss. The TTL bounds drift from missed updates. The SSE
+    # stream sends a keepalive comment at this interval and, while Redis
+    # pub/sub is unavailable, re-reads the count instead.
+    notification_unread_counter_ttl_seconds: int = 3600
+    notification_stream_keepalive_seconds: float = 20.0
+
+    # Materialized 系統月份數 (received_months_system_ledger). When enabled the
+    # ORM write hooks in app.services.received_months_service keep it exact and
+    # received-months reads become point lookups instead of roster aggregates.
+    received_months_ledger_enabled: bool = True
 
     # Logging
     log_level: str = "INFO"
@@ -99,6 +179,16 @@ class Settings(BaseSettings):
     enable_metrics: bool = True  # Enable/disable Prometheus metrics collection
     metrics_include_endpoint_labels: bool = True  # Include detailed endpoint labels
     metrics_include_business_metrics: bool = True  # Include business-specific metrics
+    # Add X-DB-Query-Count / X-DB-Query-Time-Ms / X-DB-Duplicate-Queries to every
+    # response (app.db.query_stats). Development aid; ignored in production.
+    db_query_stats_header: bool = False
+    # Event-loop lag / threadpool sampling (app.core.event_loop_monitor).
+    event_loop_monitor_enabled: bool = True
+    event_loop_monitor_interval_seconds: float = 0.5
+    # Debug watchdog: log the event-loop thread's stack whenever the loop is
+    # blocked longer than the threshold (sync I/O, openpyxl, reportlab ...).
+    event_loop_block_debug: bool = False
+    event_loop_block_threshold_seconds: float = 0.25
 
     # PII encryption (issue #73)
     # JSON map of {version: base64url 32-byte key}, e.g. '{"v1": "..."}'.
@@ -140,6 +230,11 @@ class Settings(BaseSettings):
     roster_template_dir: str = "./app/templates"
     roster_export_dir: str = "./exports"
     roster_excel_template: str = "STD_UP_MIXLISTA.xlsx"
+    # Write-only (constant-memory) roster Excel writer. Off by default: it only
+    # takes the template's first sheet name, so the template's other sheets and
+    # page layout are dropped. Enable for very large rosters built without a
+    # template-dependent layout.
+    roster_excel_streaming: bool = False
     roster_retention_days: int = 90  # 造冊檔案保留天數
     roster_minio_bucket: str = "roster-files"  # MinIO bucket for roster files
 
@@ -148,6 +243,25 @@ class Settings(BaseSettings):
     excel_encoding: str = "utf-8-sig"  # UTF-8 with BOM
     excel_auto_width: bool = True  # 自動調整欄寬
 
+    # Batch / supplementary / renewal import writes: at or above this many rows
+    # users, profiles and applications are staged (COPY on PostgreSQL) into a
+    # temp table and merged set-based; smaller imports use per-row ORM writes.
+    import_bulk_write_min_rows: int = 50
+    # Application sequence numbers each worker reserves at a time (hi/lo).
+    # Unused numbers of a block are lost on restart — app_ids may have gaps.
+    app_id_block_size: int = 20
+
+    # Monthly partitions of audit_logs / email_history (app.services.log_partitions):
+    # the daily job keeps this many future months created and drops months
+    # older than the retention. None keeps every month; audit_logs is
+    # append-only evidence, so set its retention only per the 銷毀 schedule.
+    log_partition_premake_months: int = 3
+    audit_log_retention_months: Optional[int] = None
+    email_history_retention_months: Optional[int] = None
+    # Unfiltered audit-log / email-history listings report the planner's row
+    # estimate instead of count(*) once a table holds at least this many rows.
+    estimated_count_min_rows: int = 100000
+
     # Student Verification Enhanced Configuration
     student_verify_timeout: int = 5  # API逾時秒數
     student_verify_retry_count: int = 3  # 重試次數
@@ -158,6 +272,10 @@ class Settings(BaseSettings):
     roster_scheduler_timezone: str = "Asia/Taipei"
     roster_auto_lock_after_completion: bool = False
     roster_max_execution_time_minutes: int = 60
+    # 排程造冊執行位置："thread"（專用執行緒池）、"process"（spawn 程序池），
+    # 或 "inline"（直接在 API 事件迴圈上同步執行，造冊期間會阻塞所有請求）
+    roster_scheduler_execution_mode: str = "thread"
+    roster_scheduler_max_workers: int = 1
 
     # Student Verification Configuration
     student_verification_api_url: Optional[str] = None
@@ -232,6 +350,15 @@ class Settings(BaseSettings):
             return ",".join(v)
         return str(v) if v else "pdf,jpg,jpeg,png,doc,docx"
 
+    @field_validator("file_proxy_mode", mode="before")
+    @classmethod
+    def validate_file_proxy_mode(cls, v) -> str:
+        """Reject unknown modes at startup instead of on the first download"""
+        mode = str(v or "stream").strip().lower()
+        if mode not in ("stream", "presigned", "x-accel"):
+            raise ValueError("FILE_PROXY_MODE must be one of: stream, presigned, x-accel")
+        return mode
+
     @field_validator("upload_dir", mode="before")
     @classmethod
     def create_upload_directory(cls, v: str) -> str:
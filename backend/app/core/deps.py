@@ -7,12 +7,12 @@ from typing import AsyncGenerator, Generator
 import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.dynamic_config import dynamic_config
+from app.core.principal_cache import load_current_user
 from app.db.session import AsyncSessionLocal, SessionLocal
 from app.models.user import User
 
@@ -50,12 +50,11 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
+        issued_at = payload.get("iat")
     except jwt.PyJWTError as exc:
         raise credentials_exception from exc
 
-    stmt = select(User).options(selectinload(User.admin_scholarships)).where(User.id == int(user_id))
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = await load_current_user(db, int(user_id), int(issued_at) if issued_at is not None else None)
     if user is None:
         raise credentials_exception
 
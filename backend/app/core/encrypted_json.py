@@ -6,17 +6,131 @@ This is the single integration point for issue #73: applying
 ``StudentDataJSON`` to ``Application.student_data`` ensures every persist
 encrypts ``std_pid`` and every load decrypts it, so the 30+ call sites that
 read or write that column need no individual changes.
+
+Decryption is deferred: a loaded value is a ``LazyStudentData`` that still
+holds the envelope and decrypts ``std_pid`` the first time it is read. List
+endpoints, analytics and roster loops that never look at the ID no longer
+pay one AES-GCM decrypt per row. Bulk read paths that must not decrypt at
+all load inside ``skip_pii_decryption()``.
 """
 
 from __future__ import annotations
 
-from typing import Any, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
 
+from pydantic_core import SchemaSerializer, core_schema
 from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.types import TypeDecorator
 
 from app.core.pii_crypto import decrypt_pii, encrypt_pii_idempotent, is_encrypted
 
+_PID_KEY = "std_pid"
+
+_decrypt_on_load: ContextVar[bool] = ContextVar("student_data_decrypt_on_load", default=True)
+
+
+@contextmanager
+def skip_pii_decryption() -> Iterator[None]:
+    """Load ``student_data`` inside this block without any decryption.
+
+    ``std_pid`` stays the ``pii:`` envelope for good (also after the block),
+    so use it only for rows whose ID is never displayed or exported. The
+    objects stay in the session's identity map that way: a later query in
+    the same session returns them unchanged. Writing such a row back keeps
+    the envelope as is.
+    """
+    token = _decrypt_on_load.set(False)
+    try:
+        yield
+    finally:
+        _decrypt_on_load.reset(token)
+
+
+class LazyStudentData(dict):
+    """``student_data`` as loaded: ``std_pid`` is decrypted on first read.
+
+    Until then the dict holds the envelope. Every way of reading the value —
+    ``[]`` / ``get`` / ``pop``, ``items()`` / ``values()``, ``copy()``,
+    ``dict(...)`` / ``{**...}``, ``==``, ``json.dumps``, ``jsonable_encoder``
+    and pydantic validation or serialization — decrypts it first and keeps
+    the plaintext in place, so callers see a plain dict. ``repr`` shows the
+    envelope until then.
+
+    Pydantic serializes values in ``Any`` fields (``ApiResponse.data``, the
+    values of a ``Dict[str, Any]``) by their runtime type and reads a dict
+    subclass's storage directly; ``__pydantic_serializer__``, set below the
+    class, routes this type through ``copy()`` instead.
+    """
+
+    __slots__ = ()
+
+    def _reveal(self) -> None:
+        pid = dict.get(self, _PID_KEY)
+        if is_encrypted(pid):
+            dict.__setitem__(self, _PID_KEY, decrypt_pii(pid))
+
+    def __getitem__(self, key: Any) -> Any:
+        if key == _PID_KEY:
+            self._reveal()
+        return dict.__getitem__(self, key)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        if key == _PID_KEY:
+            self._reveal()
+        return dict.get(self, key, default)
+
+    def pop(self, key: Any, *default: Any) -> Any:
+        if key == _PID_KEY:
+            self._reveal()
+        return dict.pop(self, key, *default)
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        if key == _PID_KEY:
+            self._reveal()
+        return dict.setdefault(self, key, default)
+
+    def popitem(self) -> tuple:
+        self._reveal()
+        return dict.popitem(self)
+
+    def items(self):  # type: ignore[override]
+        self._reveal()
+        return dict.items(self)
+
+    def values(self):  # type: ignore[override]
+        self._reveal()
+        return dict.values(self)
+
+    def copy(self) -> dict:
+        self._reveal()
+        return dict(dict.items(self))
+
+    # Overriding __iter__ (unchanged behaviour) makes dict(x), {**x} and
+    # update(x) go through keys() + __getitem__ instead of copying the raw
+    # slots, which would hand out the envelope.
+    def __iter__(self) -> Iterator[Any]:
+        return dict.__iter__(self)
+
+    def __eq__(self, other: object) -> bool:
+        self._reveal()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other: object) -> bool:
+        self._reveal()
+        return dict.__ne__(self, other)
+
+    def envelope_view(self) -> dict:
+        """Plain copy with ``std_pid`` as stored (still encrypted unless already read)."""
+        return dict(dict.items(self))
+
+
+LazyStudentData.__pydantic_serializer__ = SchemaSerializer(  # type: ignore[attr-defined]
+    core_schema.any_schema(serialization=core_schema.plain_serializer_function_ser_schema(LazyStudentData.copy))
+)
+
 
 class StudentDataJSON(TypeDecorator):
     """JSON column that encrypts the ``std_pid`` key at rest.
@@ -27,12 +141,26 @@ class StudentDataJSON(TypeDecorator):
     The decorator is **idempotent**: re-encrypting an already-enveloped value
     is a no-op (see ``encrypt_pii_idempotent``), so the data migration can run
     safely before this column type is in effect and again afterwards.
+
+    Loads return a ``LazyStudentData`` when there is an envelope to decrypt.
+    Saving one whose ``std_pid`` was never read writes the stored envelope
+    back without a decrypt / encrypt round trip.
+
+    On PostgreSQL the column is ``jsonb`` (alembic jsonb_snapshot_columns_001),
+    so ``->>`` filters can use the snapshot expression indexes.
     """
 
     impl = JSON
     cache_ok = True
 
+    def load_dialect_impl(self, dialect: Any) -> Any:
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(JSON())
+
     def process_bind_param(self, value: Optional[dict], dialect: Any) -> Optional[dict]:
+        if isinstance(value, LazyStudentData):
+            value = value.envelope_view()
         if not isinstance(value, dict):
             return value
         pid = value.get("std_pid")
@@ -44,11 +172,9 @@ class StudentDataJSON(TypeDecorator):
         return out
 
     def process_result_value(self, value: Optional[dict], dialect: Any) -> Optional[dict]:
-        if not isinstance(value, dict):
+        if not isinstance(value, dict) or not _decrypt_on_load.get():
             return value
-        pid = value.get("std_pid")
-        if not is_encrypted(pid):
+        if not is_encrypted(value.get("std_pid")):
             return value
-        out = dict(value)
-        out["std_pid"] = decrypt_pii(pid)
-        return out
+        # Copy so the result dict SQLAlchemy handed us keeps the envelope.
+        return LazyStudentData(value)
@@ -0,0 +1,142 @@
+"""
+Event-loop lag, threadpool queues and the blocking-call watchdog
+事件迴圈延遲、執行緒池佇列與阻塞偵測
+
+Every API request shares one event loop per uvicorn worker, so a synchronous
+call on it — ``requests`` in student verification, a MinIO ``put_object``,
+openpyxl / reportlab rendering — stalls every other request for its whole
+duration. ``EventLoopMonitor`` makes those stalls visible:
+
+  • a task sleeps ``event_loop_monitor_interval_seconds`` in a loop and
+    observes how late it woke up in ``event_loop_lag_seconds``;
+  • on the same tick it samples the threadpools work is offloaded to —
+    AnyIO's limiter (sync endpoints and dependencies), the loop's default
+    executor (``asyncio.to_thread``) and the roster job executor — into
+    ``threadpool_queue_depth`` / ``threadpool_busy_workers``;
+  • with ``event_loop_block_debug`` a watchdog thread notices when that tick
+    is overdue by more than ``event_loop_block_threshold_seconds`` and logs
+    the loop thread's current stack, i.e. the coroutine that is blocking it,
+    once per stall.
+
+Pool checkout wait and saturation are instrumented in ``app.db.session`` /
+``update_db_pool_metrics``; everything is exported by ``/metrics``.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Optional
+
+from app.core.metrics import (
+    event_loop_blocked_total,
+    event_loop_lag_seconds,
+    threadpool_busy_workers,
+    threadpool_queue_depth,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _sample_executor(pool: str, executor: Optional[Executor]) -> None:
+    # ThreadPoolExecutor exposes no public queue size; these attributes are
+    # stable across CPython 3.8–3.13. Process pools are not sampled.
+    if not isinstance(executor, ThreadPoolExecutor):
+        return
+    threadpool_queue_depth.labels(pool=pool).set(executor._work_queue.qsize())
+    idle = executor._idle_semaphore._value
+    threadpool_busy_workers.labels(pool=pool).set(max(len(executor._threads) - idle, 0))
+
+
+def sample_threadpools(loop: asyncio.AbstractEventLoop) -> None:
+    """Set the threadpool gauges; must run on ``loop`` (AnyIO's limiter is per loop)."""
+    try:
+        import anyio.to_thread
+
+        stats = anyio.to_thread.current_default_thread_limiter().statistics()
+        threadpool_queue_depth.labels(pool="anyio").set(stats.tasks_waiting)
+        threadpool_busy_workers.labels(pool="anyio").set(stats.borrowed_tokens)
+
+        _sample_executor("asyncio_default", getattr(loop, "_default_executor", None))
+
+        from app.services.roster_scheduler_service import roster_scheduler
+
+        _sample_executor("roster", roster_scheduler._roster_executor)
+    except Exception:  # pylint: disable=broad-exception-caught
+        # Silently fail to avoid breaking the monitor
+        pass
+
+
+class EventLoopMonitor:
+    """Samples loop lag and threadpools; optionally watches for blocking calls."""
+
+    def __init__(self, interval: float = 0.5, block_threshold: Optional[float] = None):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        # time.monotonic() by which the sampling task should have woken up
+        self._deadline: Optional[float] = None
+
+    def start(self) -> None:
+        """Start on the running loop (call from the lifespan)."""
+        self._loop_thread_id = threading.get_ident()
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="event-loop-monitor")
+        if self.block_threshold:
+            self._stopping.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="event-loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = time.monotonic()
+            self._deadline = started + self.interval
+            await asyncio.sleep(self.interval)
+            event_loop_lag_seconds.observe(max(time.monotonic() - started - self.interval, 0.0))
+            sample_threadpools(loop)
+
+    def check_blocked(self) -> Optional[float]:
+        """If the loop is overdue beyond the threshold, log its stack; returns the stall so far."""
+        deadline = self._deadline
+        if deadline is None or not self.block_threshold:
+            return None
+        overdue = time.monotonic() - deadline
+        if overdue <= self.block_threshold:
+            return None
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else "<loop thread not found>\n"
+        event_loop_blocked_total.inc()
+        logger.warning(
+            "Event loop blocked for %.3fs (threshold %.3fs); event-loop thread stack:\n%s",
+            overdue,
+            self.block_threshold,
+            stack.rstrip(),
+        )
+        return overdue
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stopping.wait(self.block_threshold / 2):
+            deadline = self._deadline
+            # One report per stall: the deadline only moves once the loop runs again.
+            if deadline is not None and deadline != reported and self.check_blocked() is not None:
+                reported = deadline
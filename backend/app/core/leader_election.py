@@ -0,0 +1,164 @@
+"""
+Redis-lease leader election for singleton background work.
+
+APScheduler jobs (email processor, deadline checker, roster schedules, batch
+cleanup) must run in exactly one process. Under ``uvicorn --workers N``, with
+several replicas, or next to a ``python -m app.worker`` node, every process
+runs a ``LeaderElector`` and only the lease holder starts the scheduler.
+
+The lease is a single key, ``cache.KEY_PREFIX + "leader:{name}"``:
+
+  • Acquire: ``SET key token NX EX lease``. Standbys retry every
+    ``scheduler_leader_poll_seconds``.
+  • Renew: the leader re-extends the TTL every ``lease / 3`` with the same
+    owner-checked Lua as ``with_lock(renew=True)``.
+  • Lost lease: if a renewal finds another token the leader steps down.
+    If no renewal has succeeded for two thirds of a lease (e.g. Redis
+    unreachable), it steps down while a third of the lease is still left,
+    i.e. before anyone else can acquire. Every Redis call is bounded by a
+    sixth of the lease and the lease is timed from when the call was sent,
+    so a hung call cannot push the step-down past expiry. Two schedulers
+    never overlap.
+  • Handover: ``stop()`` demotes and deletes the key, so a standby takes
+    over within one poll interval. A crashed leader is replaced once its
+    lease expires.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from app.core import cache as cache_mod
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[[], Awaitable[None]]
+
+
+class LeaderElector:
+    """Run ``on_elected`` / ``on_demoted`` as this process gains / loses the lease."""
+
+    def __init__(
+        self,
+        name: str,
+        on_elected: Callback,
+        on_demoted: Callback,
+        *,
+        lease_seconds: Optional[int] = None,
+        poll_seconds: Optional[float] = None,
+    ):
+        self.name = name
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.lease_seconds = lease_seconds or settings.scheduler_leader_lease_seconds
+        self.poll_seconds = poll_seconds or settings.scheduler_leader_poll_seconds
+        self.identity = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._key = f"{cache_mod.KEY_PREFIX}leader:{name}".encode("utf-8")
+        self._token = self.identity.encode("utf-8")
+        self._is_leader = False
+        self._last_renewed = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._is_leader
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"leader-election:{self.name}")
+
+    async def stop(self) -> None:
+        """Step down (if leader), release the lease and stop campaigning."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._is_leader:
+            await self._demote("shutdown")
+            try:
+                await cache_mod.get_cache().eval(cache_mod._RELEASE_LUA, 1, self._key, self._token)
+            except Exception:  # noqa: BLE001
+                logger.warning("leader_election[%s]: release failed", self.name, exc_info=True)
+
+    @property
+    def _step_down_at(self) -> float:
+        """time.monotonic() by which an unrenewed leader must have stepped down."""
+        return self._last_renewed + self.lease_seconds * 2 / 3
+
+    async def _run(self) -> None:
+        while True:
+            await self._tick()
+            if self._is_leader:
+                # Wake up no later than the step-down deadline.
+                delay = min(self.lease_seconds / 3.0, max(self._step_down_at - time.monotonic(), 0.0))
+            else:
+                delay = self.poll_seconds
+            await asyncio.sleep(delay)
+
+    async def _call(self, command: Awaitable):
+        return await asyncio.wait_for(command, timeout=self.lease_seconds / 6.0)
+
+    async def _tick(self) -> None:
+        client = cache_mod.get_cache()
+        sent_at = time.monotonic()
+        if not self._is_leader:
+            try:
+                acquired = await self._call(client.set(self._key, self._token, nx=True, ex=self.lease_seconds))
+            except Exception:  # noqa: BLE001
+                logger.warning("leader_election[%s]: acquire failed", self.name, exc_info=True)
+                return
+            if acquired:
+                await self._elect(sent_at)
+            return
+
+        if sent_at >= self._step_down_at:
+            await self._demote("lease about to expire without renewal")
+            return
+        try:
+            renewed = await self._call(client.eval(cache_mod._RENEW_LUA, 1, self._key, self._token, self.lease_seconds))
+        except Exception:  # noqa: BLE001
+            logger.warning("leader_election[%s]: renewal failed", self.name, exc_info=True)
+            if time.monotonic() >= self._step_down_at:
+                await self._demote("lease about to expire without renewal")
+            return
+        if renewed:
+            # Redis started the new TTL after the call was sent.
+            self._last_renewed = sent_at
+        else:
+            await self._demote("lease taken over")
+
+    async def _elect(self, acquired_at: float) -> None:
+        self._is_leader = True
+        self._last_renewed = acquired_at
+        logger.info("leader_election[%s]: %s elected", self.name, self.identity)
+        try:
+            await self.on_elected()
+        except Exception:  # noqa: BLE001
+            # Hand the lease back so a healthy process can take over.
+            logger.exception("leader_election[%s]: on_elected failed; stepping down", self.name)
+            await self._demote("on_elected failed")
+            try:
+                await cache_mod.get_cache().eval(cache_mod._RELEASE_LUA, 1, self._key, self._token)
+            except Exception:  # noqa: BLE001
+                logger.warning("leader_election[%s]: release failed", self.name, exc_info=True)
+
+    async def _demote(self, reason: str) -> None:
+        self._is_leader = False
+        logger.warning("leader_election[%s]: %s stepping down (%s)", self.name, self.identity, reason)
+        try:
+            await self.on_demoted()
+        except Exception:  # noqa: BLE001
+            logger.exception("leader_election[%s]: on_demoted failed", self.name)
+
+
+__all__ = ["LeaderElector"]
@@ -7,8 +7,9 @@ database health, and business operations.
 Metrics Categories:
 1. HTTP Metrics - Request count, duration, status codes
 2. Database Metrics - Connection pool, query performance
-3. Business Metrics - Application counts, email statistics, file uploads
-4. Error Metrics - Error rates, authentication failures
+3. Event Loop Metrics - Loop lag, threadpool queues
+4. Business Metrics - Application counts, email statistics, file uploads
+5. Error Metrics - Error rates, authentication failures
 """
 
 from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, Info, generate_latest
@@ -64,6 +65,19 @@ db_pool_overflow = Gauge(
     ["pool_type"],
 )
 
+db_pool_saturation = Gauge(
+    "db_pool_saturation",
+    "Checked-out connections as a fraction of pool_size + max_overflow",
+    ["pool_type"],
+)
+
+db_pool_checkout_wait_seconds = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time waited for a database connection from the pool in seconds",
+    ["pool_type"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
 db_query_duration_seconds = Histogram(
     "db_query_duration_seconds",
     "Database query duration in seconds",
@@ -71,12 +85,61 @@ db_query_duration_seconds = Histogram(
     buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
 )
 
+# Per HTTP request (app.db.query_stats via MetricsMiddleware), by route.
+db_queries_per_request = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed while handling one HTTP request",
+    ["method", "endpoint"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+
+db_time_per_request_seconds = Histogram(
+    "db_time_per_request_seconds",
+    "Total database time spent by one HTTP request in seconds",
+    ["method", "endpoint"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+db_duplicate_queries_per_request = Histogram(
+    "db_duplicate_queries_per_request",
+    "Repeated executions of an already-seen statement shape in one HTTP request (N+1 indicator)",
+    ["method", "endpoint"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 500),
+)
+
 db_connections_total = Counter(
     "db_connections_total",
     "Total number of database connections created",
     ["pool_type"],
 )
 
+# =============================================================================
+# EVENT LOOP / THREADPOOL METRICS (app.core.event_loop_monitor)
+# =============================================================================
+
+event_loop_lag_seconds = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop woke a periodic sleep; time the loop was blocked",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+event_loop_blocked_total = Counter(
+    "event_loop_blocked_total",
+    "Stalls longer than event_loop_block_threshold_seconds seen by the debug watchdog",
+)
+
+threadpool_queue_depth = Gauge(
+    "threadpool_queue_depth",
+    "Jobs waiting for a worker thread",
+    ["pool"],  # anyio (sync endpoints/dependencies), asyncio_default (to_thread), roster
+)
+
+threadpool_busy_workers = Gauge(
+    "threadpool_busy_workers",
+    "Worker threads currently running a job (anyio: borrowed limiter tokens)",
+    ["pool"],
+)
+
 # =============================================================================
 # BUSINESS METRICS
 # =============================================================================
@@ -189,7 +252,7 @@ def update_db_pool_metrics():
     Should be called periodically or on-demand to collect current pool status.
     """
     try:
-        from app.db.session import async_engine, sync_engine
+        from app.db.session import POOL_CAPACITY, async_engine, sync_engine
 
         # Update async pool metrics
         async_pool = async_engine.pool
@@ -205,6 +268,10 @@ def update_db_pool_metrics():
         db_pool_checked_in.labels(pool_type="sync").set(sync_pool.checkedin())
         db_pool_overflow.labels(pool_type="sync").set(sync_pool.overflow())
 
+        for pool_type, pool in (("async", async_pool), ("sync", sync_pool)):
+            if POOL_CAPACITY[pool_type]:
+                db_pool_saturation.labels(pool_type=pool_type).set(pool.checkedout() / POOL_CAPACITY[pool_type])
+
     except Exception:  # pylint: disable=broad-exception-caught
         # Silently fail to avoid breaking metrics collection
         pass
@@ -239,8 +306,18 @@ __all__ = [
     "db_pool_checked_out",
     "db_pool_checked_in",
     "db_pool_overflow",
+    "db_pool_saturation",
+    "db_pool_checkout_wait_seconds",
     "db_query_duration_seconds",
+    "db_queries_per_request",
+    "db_time_per_request_seconds",
+    "db_duplicate_queries_per_request",
     "db_connections_total",
+    # Event Loop / Threadpool Metrics
+    "event_loop_lag_seconds",
+    "event_loop_blocked_total",
+    "threadpool_queue_depth",
+    "threadpool_busy_workers",
     # Business Metrics
     "scholarship_applications_total",
     "scholarship_reviews_total",
@@ -0,0 +1,506 @@
+"""
+Request-scoped principal cache for ``get_current_user``.
+
+Every authenticated request used to run ``select(User)`` plus a
+``selectinload(User.admin_scholarships)`` before any handler logic. Admin
+screens fire dozens of API calls each, so those two queries dominate the
+per-request DB cost of otherwise cheap endpoints.
+
+This module keeps an immutable snapshot of the authenticated user keyed by
+``(user_id, token iat)``:
+
+  • L1 — a small in-process dict with a short TTL (per worker).
+  • L2 — Redis, one hash per user under ``cache.KEY_PREFIX +
+    "principal:{user_id}"`` with a field per token ``iat``, with the same
+    fail-open semantics as ``app.core.cache``.
+
+On a hit the snapshot is materialised into a fresh ``User`` (plus its
+``AdminScholarship`` rows) and attached to the request session with
+``merge(load=False)``: no SQL is emitted, but the object is a normal
+persistent instance, so handlers that mutate and commit ``current_user``
+keep working.
+
+Invalidation:
+  • Any committed ORM change to a ``User`` or ``AdminScholarship`` row
+    invalidates that user (a bulk UPDATE/DELETE invalidates everyone), so
+    role, status and ``raw_data`` changes take effect on the next request.
+    ``invalidate_principals(user_id)`` does the same explicitly and is
+    still called by the user and scholarship-permission endpoints.
+  • Invalidating bumps a per-user (or global) generation in Redis; hash
+    entries written under an older generation are ignored, and a fill that
+    raced an invalidation is refused, so L2 never serves a pre-change
+    snapshot. The bump is published on ``CHANNEL`` and every worker drops
+    the matching L1 entries; L1 is also cleared whenever the subscription
+    (re)connects. Only while Redis is unreachable do other workers' L1
+    entries live out ``principal_cache_local_ttl_seconds``.
+  • A re-login mints a token with a new ``iat`` and therefore a new field.
+
+Tokens without an ``iat`` claim (minted before it was added) bypass the
+cache entirely.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached, selectinload
+
+from app.core import cache as cache_mod
+from app.core.config import settings
+from app.models.user import AdminScholarship, EmployeeStatus, User, UserRole, UserType
+
+logger = logging.getLogger(__name__)
+
+# Columns copied into the snapshot. Every column is included so no attribute
+# access on the materialised user can trigger an (async-unsafe) lazy refresh.
+_USER_COLUMNS = tuple(c.key for c in User.__table__.columns)
+_ENUM_COLUMNS = {"role": UserRole, "user_type": UserType, "status": EmployeeStatus}
+_DATETIME_COLUMNS = {"last_login_at", "created_at", "updated_at"}
+
+# Hard cap on L1 entries so a burst of distinct tokens cannot grow the dict
+# without bound; oldest entries are evicted first.
+_LOCAL_MAX_ENTRIES = 4096
+
+_local: Dict[Tuple[int, int], Tuple[float, "PrincipalSnapshot"]] = {}
+_local_lock = threading.Lock()
+# Bumped on every local invalidation; an L1 fill started before the bump is dropped.
+_local_epoch = 0
+
+CHANNEL = b"principal:invalidate"
+_ALL = "*"
+
+# Seconds between pub/sub reconnect attempts.
+_RETRY_SECONDS = 5.0
+
+# The generation a lookup or fill runs against: "<global>:<user>".
+_GENERATION_LUA = """
+local gen = (redis.call('GET', KEYS[3]) or '0') .. ':' .. (redis.call('GET', KEYS[2]) or '0')
+"""
+
+# KEYS: hash, user generation, global generation. ARGV: iat.
+# Returns {generation, snapshot or nil}; entries from an older generation are ignored.
+_LOOKUP_LUA = _GENERATION_LUA + """
+local blob = false
+if redis.call('HGET', KEYS[1], 'gen') == gen then
+  blob = redis.call('HGET', KEYS[1], ARGV[1])
+end
+return {gen, blob}
+"""
+
+# KEYS as above. ARGV: generation seen by the lookup, iat, snapshot, ttl.
+# Refuses the write if an invalidation happened since the lookup.
+_FILL_LUA = _GENERATION_LUA + """
+if gen ~= ARGV[1] then
+  return 0
+end
+if redis.call('HGET', KEYS[1], 'gen') ~= gen then
+  redis.call('DEL', KEYS[1])
+end
+redis.call('HSET', KEYS[1], 'gen', gen, ARGV[2], ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+# KEYS: generation keys to bump. ARGV: generation ttl, channel, message.
+_INVALIDATE_LUA = """
+for _, key in ipairs(KEYS) do
+  redis.call('INCR', key)
+  redis.call('EXPIRE', key, ARGV[1])
+end
+redis.call('PUBLISH', ARGV[2], ARGV[3])
+return #KEYS
+"""
+
+
+@dataclass(frozen=True)
+class PrincipalSnapshot:
+    """Immutable view of an authenticated user.
+
+    ``role``, ``college_code`` and ``scholarship_ids`` are the fields the
+    authorization helpers need. ``payload`` is the JSON-encoded column set
+    used to rebuild a ``User``; it is decoded on every materialisation so no
+    two requests ever share a mutable object.
+    """
+
+    user_id: int
+    role: str
+    college_code: Optional[str]
+    scholarship_ids: Tuple[int, ...]
+    payload: bytes
+
+    @classmethod
+    def from_user(cls, user: User) -> "PrincipalSnapshot":
+        columns: Dict[str, Any] = {}
+        for key in _USER_COLUMNS:
+            value = getattr(user, key)
+            if key in _ENUM_COLUMNS and value is not None:
+                value = value.value
+            elif key in _DATETIME_COLUMNS and value is not None:
+                value = value.isoformat()
+            columns[key] = value
+        grants = [
+            {"id": a.id, "scholarship_id": a.scholarship_id, "assigned_at": a.assigned_at}
+            for a in user.admin_scholarships
+        ]
+        return cls(
+            user_id=user.id,
+            role=columns["role"],
+            college_code=user.college_code,
+            scholarship_ids=tuple(g["scholarship_id"] for g in grants),
+            payload=cache_mod._dumps({"user": columns, "admin_scholarships": grants}),
+        )
+
+    def to_user(self) -> User:
+        """Build a detached, clean ``User`` ready for ``Session.merge(load=False)``."""
+        data = cache_mod._loads(self.payload)
+        columns = data["user"]
+        for key, enum_cls in _ENUM_COLUMNS.items():
+            if columns.get(key) is not None:
+                columns[key] = enum_cls(columns[key])
+        for key in _DATETIME_COLUMNS:
+            if columns.get(key) is not None:
+                columns[key] = datetime.fromisoformat(columns[key])
+
+        grants = []
+        for row in data["admin_scholarships"]:
+            assigned_at = datetime.fromisoformat(row["assigned_at"]) if row.get("assigned_at") else None
+            grant = AdminScholarship(
+                id=row["id"], admin_id=self.user_id, scholarship_id=row["scholarship_id"], assigned_at=assigned_at
+            )
+            grants.append(grant)
+
+        user = User(**columns)
+        user.admin_scholarships = grants
+        # Only after wiring the collection (whose backref touches each grant)
+        # reset history, so everything merges as clean persistent state.
+        for grant in grants:
+            make_transient_to_detached(grant)
+        make_transient_to_detached(user)
+        return user
+
+    def to_json(self) -> bytes:
+        return json.dumps(
+            {
+                "user_id": self.user_id,
+                "role": self.role,
+                "college_code": self.college_code,
+                "scholarship_ids": list(self.scholarship_ids),
+                "payload": self.payload.decode("utf-8"),
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    @classmethod
+    def from_json(cls, blob: bytes) -> "PrincipalSnapshot":
+        data = json.loads(blob)
+        return cls(
+            user_id=int(data["user_id"]),
+            role=data["role"],
+            college_code=data.get("college_code"),
+            scholarship_ids=tuple(int(i) for i in data.get("scholarship_ids", [])),
+            payload=data["payload"].encode("utf-8"),
+        )
+
+
+def _enabled() -> bool:
+    return settings.principal_cache_ttl_seconds > 0
+
+
+def _hash_key(user_id: int) -> bytes:
+    return f"{cache_mod.KEY_PREFIX}principal:{user_id}".encode("utf-8")
+
+
+def _generation_key(user_id: Optional[int]) -> bytes:
+    scope = "all" if user_id is None else user_id
+    return f"{cache_mod.KEY_PREFIX}principal_gen:{scope}".encode("utf-8")
+
+
+def _lookup_keys(user_id: int) -> Tuple[bytes, bytes, bytes]:
+    return _hash_key(user_id), _generation_key(user_id), _generation_key(None)
+
+
+def _local_get(key: Tuple[int, int]) -> Optional[PrincipalSnapshot]:
+    with _local_lock:
+        entry = _local.get(key)
+        if entry is None:
+            return None
+        expires_at, snapshot = entry
+        if expires_at < time.monotonic():
+            _local.pop(key, None)
+            return None
+        return snapshot
+
+
+def _local_put(key: Tuple[int, int], snapshot: PrincipalSnapshot, epoch: Optional[int] = None) -> None:
+    ttl = min(settings.principal_cache_local_ttl_seconds, settings.principal_cache_ttl_seconds)
+    if ttl <= 0:
+        return
+    with _local_lock:
+        if epoch is not None and epoch != _local_epoch:
+            return  # invalidated while this snapshot was being loaded
+        if len(_local) >= _LOCAL_MAX_ENTRIES:
+            # Dicts preserve insertion order: drop the oldest ~10 %.
+            for stale in list(_local)[: _LOCAL_MAX_ENTRIES // 10]:
+                _local.pop(stale, None)
+        _local[key] = (time.monotonic() + ttl, snapshot)
+
+
+def _drop_local(user_ids: Optional[Iterable[int]]) -> None:
+    """Drop L1 entries for ``user_ids`` (``None``: all of them)."""
+    global _local_epoch
+    with _local_lock:
+        _local_epoch += 1
+        if user_ids is None:
+            _local.clear()
+            return
+        targets = set(user_ids)
+        for key in [k for k in _local if k[0] in targets]:
+            _local.pop(key, None)
+
+
+async def _lookup(user_id: int, issued_at: int) -> Tuple[Optional[PrincipalSnapshot], Optional[str]]:
+    """L1 then L2. Returns the snapshot (or ``None``) and the L2 generation seen."""
+    snapshot = _local_get((user_id, issued_at))
+    if snapshot is not None:
+        return snapshot, None
+    _ensure_listener()
+
+    try:
+        generation, blob = await cache_mod.get_cache().eval(_LOOKUP_LUA, 3, *_lookup_keys(user_id), str(issued_at))
+    except Exception:  # noqa: BLE001
+        logger.warning("principal_cache: lookup failed; falling through", exc_info=True)
+        return None, None
+    generation = generation.decode("utf-8") if isinstance(generation, bytes) else str(generation)
+    if blob is None:
+        return None, generation
+    try:
+        return PrincipalSnapshot.from_json(blob), generation
+    except Exception:  # noqa: BLE001
+        logger.warning("principal_cache: corrupt entry for user_id=%s; ignoring", user_id, exc_info=True)
+        return None, generation
+
+
+async def get_principal(user_id: int, issued_at: int) -> Optional[PrincipalSnapshot]:
+    """Look up a cached snapshot (L1 then L2). Returns ``None`` on miss or Redis error."""
+    if not _enabled():
+        return None
+    epoch = _local_epoch
+    snapshot, generation = await _lookup(user_id, issued_at)
+    if snapshot is not None and generation is not None:
+        _local_put((user_id, issued_at), snapshot, epoch)
+    return snapshot
+
+
+async def store_principal(
+    user: User, issued_at: int, generation: Optional[str] = None, epoch: Optional[int] = None
+) -> Optional[PrincipalSnapshot]:
+    """Snapshot ``user`` into L1 and L2. Never raises on Redis failure.
+
+    ``generation`` / ``epoch`` are what the preceding lookup saw; if the user
+    was invalidated since, the snapshot may predate the change and is not
+    cached. Without a ``generation`` (lookup failed) only L1 is filled.
+    """
+    if not _enabled():
+        return None
+    snapshot = PrincipalSnapshot.from_user(user)
+    _local_put((user.id, issued_at), snapshot, epoch)
+    if generation is None:
+        return snapshot
+    try:
+        await cache_mod.get_cache().eval(
+            _FILL_LUA,
+            3,
+            *_lookup_keys(user.id),
+            generation,
+            str(issued_at),
+            snapshot.to_json(),
+            settings.principal_cache_ttl_seconds,
+        )
+    except Exception:  # noqa: BLE001
+        logger.warning("principal_cache: fill failed; not cached in redis", exc_info=True)
+    return snapshot
+
+
+def _invalidation_command(user_ids: Optional[Iterable[int]]) -> Callable[[Any], Any]:
+    """Redis call that bumps the generations of ``user_ids`` (``None``: everyone) and publishes it."""
+    ids = None if user_ids is None else sorted(set(user_ids))
+    keys = [_generation_key(None)] if ids is None else [_generation_key(user_id) for user_id in ids]
+    message = _ALL if ids is None else ",".join(str(user_id) for user_id in ids)
+    # Outlive every hash entry written under the previous generation.
+    ttl = max(2 * settings.principal_cache_ttl_seconds, 1)
+    return lambda client: client.eval(_INVALIDATE_LUA, len(keys), *keys, ttl, CHANNEL, message)
+
+
+async def invalidate_principals(user_id: Optional[int] = None) -> None:
+    """Drop cached snapshots for one user, or for everyone when ``user_id`` is None."""
+    user_ids = None if user_id is None else [user_id]
+    _drop_local(user_ids)
+    try:
+        await _invalidation_command(user_ids)(cache_mod.get_cache())
+    except Exception:  # noqa: BLE001
+        logger.warning("principal_cache: invalidation failed; other workers expire on TTL", exc_info=True)
+
+
+# ---------------------------------------------------------------------------
+# Cross-worker invalidation (pub/sub)
+# ---------------------------------------------------------------------------
+
+
+def _apply_message(data: bytes) -> None:
+    text = data.decode("utf-8") if isinstance(data, bytes) else str(data)
+    _drop_local(None if text == _ALL else [int(part) for part in text.split(",") if part])
+
+
+class _InvalidationListener:
+    """Per-worker subscription to ``CHANNEL``; started by the first lookup on a loop."""
+
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.connected = False
+
+    def ensure_started(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._task = loop.create_task(self._listen(), name="principal-cache-invalidation")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await task
+        self.connected = False
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = None
+            try:
+                pubsub = cache_mod.get_cache().pubsub()
+                await pubsub.subscribe(CHANNEL)
+                # Invalidations published while we were not subscribed are lost.
+                _drop_local(None)
+                self.connected = True
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        _apply_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # noqa: BLE001
+                logger.warning("principal_cache: pub/sub listener failed; retrying", exc_info=True)
+            finally:
+                self.connected = False
+                if pubsub is not None:
+                    with contextlib.suppress(Exception):
+                        await pubsub.aclose()
+            await asyncio.sleep(_RETRY_SECONDS)
+
+
+_listener = _InvalidationListener()
+
+
+def _ensure_listener() -> None:
+    if _enabled():
+        _listener.ensure_started()
+
+
+# ---------------------------------------------------------------------------
+# Write detection (ORM events)
+# ---------------------------------------------------------------------------
+
+_DIRTY_KEY = "principal_dirty"
+
+
+def _mark(session: Session, user_id: Any) -> None:
+    dirty: Set[Any] = session.info.setdefault(_DIRTY_KEY, set())
+    dirty.add(_ALL if user_id is None else user_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_principal_flush(session: Session, flush_context: Any) -> None:  # noqa: ARG001
+    if not _enabled():
+        return
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            _mark(session, obj.id)
+        elif isinstance(obj, AdminScholarship) and obj.admin_id is not None:
+            _mark(session, obj.admin_id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_principal_bulk(orm_execute_state: Any) -> None:
+    if not _enabled() or orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in (User, AdminScholarship):
+        _mark(orm_execute_state.session, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    dirty = session.info.pop(_DIRTY_KEY, None)
+    if not dirty:
+        return
+    user_ids = None if _ALL in dirty else dirty
+    _drop_local(user_ids)
+    cache_mod.fire_signal("principal_cache: invalidation", _invalidation_command(user_ids))
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session: Session) -> None:
+    session.info.pop(_DIRTY_KEY, None)
+
+
+def clear_local_for_tests() -> None:
+    """Empty the in-process tier. Used by tests."""
+    with _local_lock:
+        _local.clear()
+
+
+async def load_current_user(db: AsyncSession, user_id: int, issued_at: Optional[int]) -> Optional[User]:
+    """Resolve the authenticated user, serving from the principal cache when possible.
+
+    Returns a session-attached ``User`` with ``admin_scholarships`` loaded,
+    exactly like the uncached ``select(User).options(selectinload(...))``.
+    """
+    generation = epoch = None
+    if issued_at is not None and _enabled():
+        epoch = _local_epoch
+        snapshot, generation = await _lookup(user_id, issued_at)
+        if snapshot is not None:
+            if generation is not None:
+                _local_put((user_id, issued_at), snapshot, epoch)
+            return await db.merge(snapshot.to_user(), load=False)
+
+    stmt = select(User).options(selectinload(User.admin_scholarships)).where(User.id == user_id)
+    result = await db.execute(stmt)
+    user = result.scalar_one_or_none()
+    if user is not None and issued_at is not None:
+        await store_principal(user, issued_at, generation, epoch)
+    return user
+
+
+__all__ = [
+    "CHANNEL",
+    "PrincipalSnapshot",
+    "get_principal",
+    "store_principal",
+    "invalidate_principals",
+    "load_current_user",
+    "clear_local_for_tests",
+]
@@ -1,9 +1,21 @@
 """
 Rate limiting implementation for API endpoints
+
+Limits use GCRA (generic cell rate algorithm): ``limit`` requests per
+``window_seconds`` with bursts of up to ``limit``. Each key is one Redis
+string holding its theoretical arrival time (TAT), updated by a single Lua
+script per check, so memory per key is constant and the check is one round
+trip. Rejected requests are not charged.
+
+With ``local_share`` > 0 a worker admits up to that fraction of a key's
+last-known remaining quota on its own and charges those requests to Redis
+on the next check for the key. The local budget shrinks with the remaining
+quota, so close to the limit every request goes to Redis.
 """
 
 import logging
 import time
+from collections import OrderedDict
 from functools import wraps
 from typing import Callable, Optional
 
@@ -12,49 +24,108 @@ from fastapi import HTTPException, status
 
 logger = logging.getLogger(__name__)
 
+# Redis key namespace; the old sliding-window ZSETs used the bare key.
+_KEY_PREFIX = "gcra:"
+
+# KEYS[1] = TAT key; ARGV = limit, window (s), requests admitted locally since
+# the last check. Times are microseconds from the Redis clock, so workers with
+# drifting clocks agree. Locally admitted requests were already served and
+# are charged unconditionally; the current one only if it conforms.
+# Returns {limited (0/1), remaining}.
+_GCRA_LUA = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2]) * 1000000
+local debt = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local interval = period / limit
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+  tat = now
+end
+tat = tat + debt * interval
+local limited = 0
+if tat + interval - period > now then
+  limited = 1
+else
+  tat = tat + interval
+end
+if limited == 0 or debt > 0 then
+  redis.call('SET', KEYS[1], string.format('%d', tat), 'PX', math.ceil((tat - now) / 1000))
+end
+local remaining = math.floor((now + period - tat) / interval)
+if remaining < 0 then
+  remaining = 0
+end
+return {limited, remaining}
+"""
+
+# Keys tracked by the local prefilter. An evicted key loses at most its
+# uncharged local admissions.
+_LOCAL_MAX_KEYS = 10000
+# A local allowance older than this is re-checked against Redis.
+_LOCAL_MAX_AGE_SECONDS = 1.0
+
+
+class _LocalAllowance:
+    __slots__ = ("remaining", "pending", "synced_at")
+
+    def __init__(self, remaining: int, synced_at: float):
+        self.remaining = remaining
+        self.pending = 0
+        self.synced_at = synced_at
+
 
 class RateLimiter:
-    """Redis-based rate limiter"""
+    """Redis-based GCRA rate limiter with an optional per-worker prefilter"""
 
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
+    def __init__(self, redis_url: str = "redis://localhost:6379", local_share: float = 0.0):
         self.redis = redis.from_url(redis_url, decode_responses=True)
+        self.local_share = local_share
+        self._local: "OrderedDict[str, _LocalAllowance]" = OrderedDict()
 
     async def is_rate_limited(self, key: str, limit: int, window_seconds: int) -> tuple[bool, int]:
         """
-        Check if a key is rate limited using sliding window
+        Check if a key is rate limited and count this request if it is not
 
         Returns:
             (is_limited: bool, remaining_requests: int)
         """
-        try:
-            now = time.time()
-            window_start = now - window_seconds
-
-            # Use Redis pipeline for atomic operations
-            async with self.redis.pipeline() as pipe:
-                # Remove expired entries
-                await pipe.zremrangebyscore(key, 0, window_start)
-                # Count current requests
-                await pipe.zcard(key)
-                # Add current request
-                await pipe.zadd(key, {str(now): now})
-                # Set expiration
-                await pipe.expire(key, window_seconds)
-
-                results = await pipe.execute()
-
-            current_requests = results[1]  # zcard result
-            remaining = max(0, limit - current_requests - 1)  # -1 for current request
-
-            is_limited = current_requests >= limit
-
-            return is_limited, remaining
+        allowance = self._local.get(key) if self.local_share > 0 else None
+        if allowance is not None and time.monotonic() - allowance.synced_at < _LOCAL_MAX_AGE_SECONDS:
+            if allowance.pending + 1 <= int(allowance.remaining * self.local_share):
+                allowance.pending += 1
+                return False, allowance.remaining - allowance.pending
+
+        # Take the uncharged admissions before awaiting so concurrent checks
+        # for the same key don't charge them twice.
+        debt = 0
+        if allowance is not None:
+            debt, allowance.pending = allowance.pending, 0
 
+        try:
+            limited, remaining = await self.redis.eval(_GCRA_LUA, 1, _KEY_PREFIX + key, limit, window_seconds, debt)
         except Exception:
             logger.exception("Rate limiting check failed")
             # Fail open - don't block requests if Redis is down
             return False, limit
 
+        is_limited, remaining = bool(int(limited)), int(remaining)
+        if self.local_share > 0:
+            self._remember(key, remaining)
+        return is_limited, remaining
+
+    def _remember(self, key: str, remaining: int) -> None:
+        allowance = self._local.get(key)
+        if allowance is None:
+            self._local[key] = _LocalAllowance(remaining, time.monotonic())
+            if len(self._local) > _LOCAL_MAX_KEYS:
+                self._local.popitem(last=False)
+            return
+        self._local.move_to_end(key)
+        allowance.remaining = remaining
+        allowance.synced_at = time.monotonic()
+
     async def close(self):
         """Close Redis connection"""
         await self.redis.close()
@@ -72,7 +143,7 @@ def get_rate_limiter() -> RateLimiter:
             from app.core.config import settings
 
             redis_url = settings.redis_url
-            _rate_limiter = RateLimiter(redis_url)
+            _rate_limiter = RateLimiter(redis_url, local_share=settings.rate_limit_local_share)
         except Exception:
             logger.warning("Could not initialize rate limiter", exc_info=True)
             # Create with default URL as fallback
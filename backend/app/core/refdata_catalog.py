@@ -0,0 +1,448 @@
+"""
+Versioned in-process catalog of scholarship reference data.
+
+``ScholarshipType``, ``ScholarshipConfiguration``, ``ScholarshipSubTypeConfig``
+and ``ScholarshipRule`` change a few times per semester but are re-queried on
+nearly every distribution / review request (``_load_config``,
+``_resolve_linked_configs`` once per sub-type, sub-type display names, ...).
+This module keeps one immutable snapshot of all four tables per worker, with
+indexed lookups, and rebuilds it atomically when the ``refdata:`` generation
+changes.
+
+Generation protocol:
+
+  • Any ORM flush or bulk UPDATE/DELETE touching one of the four models marks
+    the session; on commit the worker drops its own snapshot immediately and
+    ``INCR``s ``cache.KEY_PREFIX + "refdata:generation"`` in Redis (off the
+    request path, via ``cache.fire_signal``).
+  • Other workers compare their snapshot's generation with Redis at most once
+    every ``refdata_catalog_check_interval_seconds`` and rebuild on mismatch.
+  • A Redis outage degrades to "rebuild on local writes, and whenever the
+    snapshot is older than ``refdata_catalog_max_age_seconds``"; it never
+    breaks a request.
+
+Usage:
+
+    catalog = await get_refdata_catalog(db)
+    if catalog is not None:            # None when disabled (tests, kill switch)
+        cfg = catalog.configuration_by_code("phd_114")
+
+Records are read-only attribute views (``ConfigurationRecord`` etc.) that
+duck-type the read side of the ORM models, including the model helper
+methods such as ``is_effective`` and ``get_matrix_quota``. They are NOT
+session-attached: write paths must keep loading ORM rows. Changes made
+earlier in the caller's still-open transaction are not visible either, and
+a snapshot may lag other workers' commits by one check interval, so quota
+writes (``ManualDistributionService.allocate`` and friends) read their
+configurations from the DB inside the write transaction.
+
+Manual ``psql`` edits do not bump the generation; run
+``redis-cli incr cache:v1:refdata:generation`` (or restart) afterwards.
+"""
+
+from __future__ import annotations
+
+import enum
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core import cache as cache_mod
+from app.core.config import settings
+from app.models.scholarship import ScholarshipConfiguration, ScholarshipRule, ScholarshipSubTypeConfig, ScholarshipType
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = "refdata:generation"
+
+_REFDATA_MODELS = (ScholarshipType, ScholarshipConfiguration, ScholarshipSubTypeConfig, ScholarshipRule)
+
+
+# ---------------------------------------------------------------------------
+# Immutable containers
+# ---------------------------------------------------------------------------
+
+
+def _readonly(*_args: Any, **_kwargs: Any) -> None:
+    raise TypeError("reference-data catalog values are read-only")
+
+
+class FrozenDict(dict):
+    """``dict`` subclass that rejects mutation.
+
+    Subclassing ``dict`` (rather than ``MappingProxyType``) keeps the
+    ``isinstance(row, dict)`` tolerance checks in the services working.
+    """
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __ior__ = _readonly  # type: ignore[assignment]
+    update = pop = popitem = clear = setdefault = _readonly  # type: ignore[assignment]
+
+
+class FrozenList(list):
+    """``list`` subclass that rejects mutation."""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly  # type: ignore[assignment]
+    append = extend = insert = pop = remove = clear = sort = reverse = _readonly  # type: ignore[assignment]
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenDict((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return FrozenList(_freeze(v) for v in value)
+    return value
+
+
+class _Record:
+    """Read-only attribute view over one reference-data row."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: Dict[str, Any]):
+        object.__setattr__(self, "_data", {k: _freeze(v) for k, v in data.items()})
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(f"{type(self).__name__} has no attribute {name!r}") from None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}(id={self._data.get('id')})>"
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self._data)
+
+
+class ScholarshipTypeRecord(_Record):
+    __slots__ = ()
+
+
+class SubTypeConfigRecord(_Record):
+    __slots__ = ()
+
+
+class RuleRecord(_Record):
+    __slots__ = ()
+
+
+class ConfigurationRecord(_Record):
+    """Mirrors the read-only helpers of ``ScholarshipConfiguration``."""
+
+    __slots__ = ()
+
+    is_effective = property(ScholarshipConfiguration.is_effective.fget)
+    cycle = property(ScholarshipConfiguration.cycle.fget)
+    academic_year_label = property(ScholarshipConfiguration.academic_year_label.fget)
+    requires_professor_review_for = ScholarshipConfiguration.requires_professor_review_for
+    requires_college_review_for = ScholarshipConfiguration.requires_college_review_for
+    get_quota_for_college = ScholarshipConfiguration.get_quota_for_college
+    get_matrix_quota = ScholarshipConfiguration.get_matrix_quota
+    get_sub_type_total_quota = ScholarshipConfiguration.get_sub_type_total_quota
+    get_college_total_quota = ScholarshipConfiguration.get_college_total_quota
+
+
+# ---------------------------------------------------------------------------
+# Catalog snapshot
+# ---------------------------------------------------------------------------
+
+
+def _semester_value(value: Any) -> Optional[str]:
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+class RefdataCatalog:
+    """One immutable snapshot of the reference tables, with prebuilt indexes."""
+
+    def __init__(
+        self,
+        generation: int,
+        types: Iterable[ScholarshipTypeRecord],
+        configurations: Iterable[ConfigurationRecord],
+        sub_type_configs: Iterable[SubTypeConfigRecord],
+        rules: Iterable[RuleRecord],
+    ):
+        self.generation = generation
+        self.built_at = time.monotonic()
+
+        self._types_by_id: Dict[int, ScholarshipTypeRecord] = {}
+        self._types_by_code: Dict[str, ScholarshipTypeRecord] = {}
+        for t in types:
+            self._types_by_id[t.id] = t
+            self._types_by_code[t.code] = t
+
+        self._configs_by_id: Dict[int, ConfigurationRecord] = {}
+        self._configs_by_code: Dict[str, ConfigurationRecord] = {}
+        self._configs_by_cycle: Dict[Tuple[int, int, Optional[str]], List[ConfigurationRecord]] = {}
+        self._configs_by_type: Dict[int, List[ConfigurationRecord]] = {}
+        # Highest id first, matching the ``order_by(id.desc()).first()`` the
+        # services use to break ties.
+        for c in sorted(configurations, key=lambda c: c.id, reverse=True):
+            self._configs_by_id[c.id] = c
+            self._configs_by_code[c.config_code] = c
+            key = (c.scholarship_type_id, c.academic_year, _semester_value(c.semester))
+            self._configs_by_cycle.setdefault(key, []).append(c)
+            self._configs_by_type.setdefault(c.scholarship_type_id, []).append(c)
+
+        self._sub_types_by_type: Dict[int, List[SubTypeConfigRecord]] = {}
+        for s in sorted(sub_type_configs, key=lambda s: (s.display_order or 0, s.id)):
+            self._sub_types_by_type.setdefault(s.scholarship_type_id, []).append(s)
+
+        self._rules_by_type: Dict[int, List[RuleRecord]] = {}
+        for r in sorted(rules, key=lambda r: (-(r.priority or 0), r.id)):
+            self._rules_by_type.setdefault(r.scholarship_type_id, []).append(r)
+
+    # -- scholarship types -------------------------------------------------
+
+    def scholarship_type(self, type_id: int) -> Optional[ScholarshipTypeRecord]:
+        return self._types_by_id.get(type_id)
+
+    def scholarship_type_by_code(self, code: str) -> Optional[ScholarshipTypeRecord]:
+        return self._types_by_code.get(code)
+
+    # -- configurations ----------------------------------------------------
+
+    def configuration(self, config_id: int) -> Optional[ConfigurationRecord]:
+        return self._configs_by_id.get(config_id)
+
+    def configuration_by_code(self, config_code: str) -> Optional[ConfigurationRecord]:
+        return self._configs_by_code.get(config_code)
+
+    def configuration_for(
+        self, scholarship_type_id: int, academic_year: int, semester: str
+    ) -> Optional[ConfigurationRecord]:
+        """Latest config for (type, year, semester).
+
+        ``"yearly"`` also matches rows whose semester is NULL, like
+        ``manual_distribution_service._config_semester_condition``.
+        """
+        candidates = list(self._configs_by_cycle.get((scholarship_type_id, academic_year, semester), []))
+        if semester == "yearly":
+            candidates += self._configs_by_cycle.get((scholarship_type_id, academic_year, None), [])
+        return max(candidates, key=lambda c: c.id) if candidates else None
+
+    def active_configuration(self, scholarship_type_id: int, academic_year: int) -> Optional[ConfigurationRecord]:
+        """Latest ``is_active`` config for (type, year), any semester."""
+        for c in self._configs_by_type.get(scholarship_type_id, []):
+            if c.academic_year == academic_year and c.is_active:
+                return c
+        return None
+
+    def active_configurations(self, scholarship_type_id: Optional[int] = None) -> List[ConfigurationRecord]:
+        """Active and currently effective configs (``is_effective`` is evaluated per call)."""
+        if scholarship_type_id:
+            pool: Iterable[ConfigurationRecord] = self._configs_by_type.get(scholarship_type_id, [])
+        else:
+            pool = self._configs_by_id.values()
+        return sorted((c for c in pool if c.is_effective), key=lambda c: c.id)
+
+    def linked_configurations(self, config: Any, sub_type: str) -> List[ConfigurationRecord]:
+        """Source configs reachable from ``config.shared_quota_sources`` for ``sub_type``.
+
+        Same contract as ``ManualDistributionService._resolve_linked_configs``:
+        malformed entries and dangling codes are dropped. ``config`` may be an
+        ORM row or a record.
+        """
+        linked: List[ConfigurationRecord] = []
+        for entry in config.shared_quota_sources or []:
+            if not isinstance(entry, dict):
+                continue
+            code = entry.get("source_config_code")
+            if code and sub_type in (entry.get("sub_types") or []):
+                target = self._configs_by_code.get(code)
+                if target is not None:
+                    linked.append(target)
+        return linked
+
+    def previous_chain(self, config_id: int) -> List[ConfigurationRecord]:
+        """Follow ``previous_config_id`` links, newest first. Cycle-safe."""
+        chain: List[ConfigurationRecord] = []
+        seen = set()
+        current = self._configs_by_id.get(config_id)
+        while current is not None and current.previous_config_id and current.previous_config_id not in seen:
+            seen.add(current.previous_config_id)
+            current = self._configs_by_id.get(current.previous_config_id)
+            if current is not None:
+                chain.append(current)
+        return chain
+
+    # -- sub-types and rules -------------------------------------------------
+
+    def sub_type_configs(self, scholarship_type_id: int, active_only: bool = True) -> List[SubTypeConfigRecord]:
+        """Sub-type configs ordered by ``display_order``."""
+        rows = self._sub_types_by_type.get(scholarship_type_id, [])
+        return [s for s in rows if s.is_active] if active_only else list(rows)
+
+    def rules(
+        self,
+        scholarship_type_id: int,
+        academic_year: Optional[int] = None,
+        semester: Optional[str] = None,
+        include_templates: bool = False,
+    ) -> List[RuleRecord]:
+        """Active rules for a type (optionally one cycle), priority descending."""
+        result = []
+        for r in self._rules_by_type.get(scholarship_type_id, []):
+            if not r.is_active or (r.is_template and not include_templates):
+                continue
+            if academic_year is not None and r.academic_year != academic_year:
+                continue
+            if semester is not None and _semester_value(r.semester) != semester:
+                continue
+            result.append(r)
+        return result
+
+
+# ---------------------------------------------------------------------------
+# Build / swap
+# ---------------------------------------------------------------------------
+
+_current: Optional[RefdataCatalog] = None
+_last_generation_check = 0.0
+
+
+def _enabled() -> bool:
+    return settings.refdata_catalog_enabled
+
+
+async def _load_rows(db: AsyncSession, model: Any) -> List[Dict[str, Any]]:
+    """Column-only select so the caller's identity map is left untouched."""
+    attrs = model.__mapper__.column_attrs
+    stmt = select(*[attr.columns[0].label(attr.key) for attr in attrs])
+    result = await db.execute(stmt)
+    return [dict(row) for row in result.mappings().all()]
+
+
+async def build_catalog(db: AsyncSession, generation: int) -> RefdataCatalog:
+    """Read all four tables and build a fresh snapshot (no global side effects)."""
+    return RefdataCatalog(
+        generation=generation,
+        types=[ScholarshipTypeRecord(r) for r in await _load_rows(db, ScholarshipType)],
+        configurations=[ConfigurationRecord(r) for r in await _load_rows(db, ScholarshipConfiguration)],
+        sub_type_configs=[SubTypeConfigRecord(r) for r in await _load_rows(db, ScholarshipSubTypeConfig)],
+        rules=[RuleRecord(r) for r in await _load_rows(db, ScholarshipRule)],
+    )
+
+
+async def _remote_generation() -> Optional[int]:
+    try:
+        raw = await cache_mod.get_cache().get((cache_mod.KEY_PREFIX + GENERATION_KEY).encode("utf-8"))
+    except Exception:  # noqa: BLE001
+        logger.warning("refdata_catalog: generation GET failed", exc_info=True)
+        return None
+    return int(raw) if raw is not None else 0
+
+
+async def get_refdata_catalog(db: AsyncSession) -> Optional[RefdataCatalog]:
+    """Return the current snapshot, rebuilding it if the generation moved.
+
+    Returns ``None`` when the catalog is disabled; callers then fall back to
+    their own queries. Concurrent rebuilds are harmless: each builds a
+    complete snapshot and the reference swap is atomic.
+    """
+    global _current, _last_generation_check
+    if not _enabled():
+        return None
+
+    catalog = _current
+    now = time.monotonic()
+    if catalog is not None and now - _last_generation_check < settings.refdata_catalog_check_interval_seconds:
+        return catalog
+
+    remote = await _remote_generation()
+    _last_generation_check = now
+    if catalog is not None and remote == catalog.generation:
+        return catalog
+    # Without Redis other workers' commits are invisible; bound the staleness.
+    if catalog is not None and remote is None and now - catalog.built_at < settings.refdata_catalog_max_age_seconds:
+        return catalog
+
+    generation = remote if remote is not None else (catalog.generation if catalog is not None else 0)
+    fresh = await build_catalog(db, generation)
+    _current = fresh
+    logger.debug("refdata_catalog: rebuilt snapshot at generation %s", generation)
+    return fresh
+
+
+def invalidate_local() -> None:
+    """Drop this worker's snapshot; the next ``get_refdata_catalog`` rebuilds."""
+    global _current
+    _current = None
+
+
+def bump_generation() -> None:
+    """Invalidate the snapshot here and, via Redis, on every other worker."""
+    invalidate_local()
+    key = (cache_mod.KEY_PREFIX + GENERATION_KEY).encode("utf-8")
+    cache_mod.fire_signal("refdata_catalog: generation INCR", lambda client: client.incr(key))
+
+
+# ---------------------------------------------------------------------------
+# Write detection (ORM events)
+# ---------------------------------------------------------------------------
+
+_DIRTY_FLAG = "refdata_dirty"
+
+
+def _touches_refdata(instances: Iterable[Any]) -> bool:
+    return any(isinstance(obj, _REFDATA_MODELS) for obj in instances)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_refdata_flush(session: Session, flush_context: Any) -> None:  # noqa: ARG001
+    if _enabled() and _touches_refdata((*session.new, *session.dirty, *session.deleted)):
+        session.info[_DIRTY_FLAG] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_refdata_bulk(orm_execute_state: Any) -> None:
+    if not _enabled() or orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in _REFDATA_MODELS:
+        orm_execute_state.session.info[_DIRTY_FLAG] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session: Session) -> None:
+    if session.info.pop(_DIRTY_FLAG, False):
+        bump_generation()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session: Session) -> None:
+    session.info.pop(_DIRTY_FLAG, None)
+
+
+def reset_for_tests() -> None:
+    """Drop the snapshot and the check timestamp. Used by tests."""
+    global _current, _last_generation_check
+    _current = None
+    _last_generation_check = 0.0
+
+
+__all__ = [
+    "RefdataCatalog",
+    "ConfigurationRecord",
+    "ScholarshipTypeRecord",
+    "SubTypeConfigRecord",
+    "RuleRecord",
+    "FrozenDict",
+    "FrozenList",
+    "build_catalog",
+    "get_refdata_catalog",
+    "bump_generation",
+    "invalidate_local",
+    "reset_for_tests",
+]
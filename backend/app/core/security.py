@@ -10,10 +10,10 @@ from fastapi import Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.core.config import settings
 from app.core.exceptions import AuthenticationError, AuthorizationError
+from app.core.principal_cache import load_current_user
 from app.db.deps import get_db
 from app.models.user import User, UserRole
 
@@ -27,12 +27,15 @@ security = HTTPBearer(auto_error=False)
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
+    now = datetime.now(timezone.utc)
     if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expire_minutes)
+        expire = now + timedelta(minutes=settings.access_token_expire_minutes)
 
-    to_encode.update({"exp": expire})
+    # iat keys the principal cache (app.core.principal_cache): a fresh login
+    # mints a new iat and therefore never reuses a stale snapshot.
+    to_encode.update({"exp": expire, "iat": now})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
@@ -72,15 +75,14 @@ async def get_current_user(
         if user_id_str is None:
             raise AuthenticationError("Invalid token")
         user_id = int(user_id_str)  # Convert string back to int
+        issued_at = payload.get("iat")
     except AuthenticationError:
         raise  # Re-raise authentication errors as-is
     except Exception as exc:
         raise AuthenticationError("Could not validate credentials") from exc
 
-    # Get user from database with relationships that will be used in-request
-    stmt = select(User).options(selectinload(User.admin_scholarships)).where(User.id == user_id)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    # Get user (with admin_scholarships) from the principal cache or the database
+    user = await load_current_user(db, user_id, int(issued_at) if issued_at is not None else None)
     if user is None:
         raise AuthenticationError("User not found")
 
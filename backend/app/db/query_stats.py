@@ -0,0 +1,82 @@
+"""
+Per-request SQL query statistics
+每個請求的 SQL 查詢統計
+
+The cursor-execute hooks in ``app.db.session`` time every statement on both
+engines; while a ``track_queries()`` block is active in the current context
+each statement is also added to its ``QueryStats``: count, total DB time and
+how often each statement *shape* ran.
+
+A shape is the SQL text with whitespace collapsed and expanded ``IN (...)``
+parameter lists folded, so ``WHERE id = ?`` issued once per row — the N+1
+pattern of per-row lookups in roster, enrichment or review listings — is
+one shape repeated N times. ``duplicates`` counts those repeats.
+
+``MetricsMiddleware`` tracks each HTTP request and exports the totals as
+histograms by route; tests use the ``query_budget`` fixture (conftest) to
+fail when an endpoint exceeds a declared number of queries.
+
+The context variable is copied into threadpool workers and SQLAlchemy's
+greenlets, so sync endpoints and sync-engine work done for the request are
+counted too.
+"""
+
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Tuple
+
+# Every active tracker in this context; nested blocks all see the query.
+_active: ContextVar[Tuple["QueryStats", ...]] = ContextVar("query_stats", default=())
+
+_WHITESPACE = re.compile(r"\s+")
+# An expanded parameter list: (?, ?), ($1, $2), (%(id_1)s, %(id_2)s), (:p1, :p2)
+_PARAMETER_LIST = re.compile(r"\(\s*(?:\?|\$\d+|%\(\w+\)s|%s|:\w+)(?:\s*,\s*(?:\?|\$\d+|%\(\w+\)s|%s|:\w+))+\s*\)")
+
+
+def statement_shape(statement: str) -> str:
+    """SQL text normalized so executions of the same query compare equal."""
+    shape = _WHITESPACE.sub(" ", statement or "").strip()
+    return _PARAMETER_LIST.sub("(...)", shape)
+
+
+@dataclass
+class QueryStats:
+    """Queries seen while a ``track_queries()`` block was active."""
+
+    count: int = 0
+    duration: float = 0.0  # seconds
+    shapes: Counter = field(default_factory=Counter)
+
+    @property
+    def duplicates(self) -> int:
+        """Executions beyond the first of each shape."""
+        return self.count - len(self.shapes)
+
+    def repeated(self, limit: int = 5) -> List[Tuple[str, int]]:
+        """The most repeated shapes, for failure messages and debugging."""
+        return [(shape, times) for shape, times in self.shapes.most_common(limit) if times > 1]
+
+    def add(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.duration += elapsed
+        self.shapes[statement_shape(statement)] += 1
+
+
+def record_query(statement: str, elapsed: float) -> None:
+    """Called from the after-cursor-execute hook; a no-op outside ``track_queries()``."""
+    for stats in _active.get():
+        stats.add(statement, elapsed)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect the statements executed in this context until the block exits."""
+    stats = QueryStats()
+    token = _active.set(_active.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
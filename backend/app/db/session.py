@@ -3,6 +3,7 @@ Database session management
 """
 
 from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional, Tuple
 
 from sqlalchemy import create_engine, event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
@@ -11,13 +12,48 @@ from sqlalchemy.pool import QueuePool
 
 from app.core.config import settings
 
+# Per-engine (pool_size, max_overflow) when no connection budget is configured.
+_DEFAULT_POOL = (10, 20)
+
+
+def compute_pool_sizes(budget: int, processes: int) -> Dict[str, Tuple[int, int]]:
+    """Split a container's Postgres connection budget into per-process pools.
+
+    Each of ``processes`` workers gets ``budget // processes`` connections;
+    two thirds go to the async engine (every API request) and the rest to the
+    sync engine (roster generation, exports, scheduler jobs). Within each
+    engine half is kept open and half is overflow. A budget of 0 keeps the
+    historical fixed sizing.
+    """
+    if budget <= 0:
+        return {"async": _DEFAULT_POOL, "sync": _DEFAULT_POOL}
+    per_process = max(budget // max(processes, 1), 2)
+    async_share = max(per_process * 2 // 3, 1)
+    sync_share = max(per_process - async_share, 1)
+
+    def _split(share: int) -> Tuple[int, int]:
+        pool_size = max(share // 2, 1)
+        return pool_size, share - pool_size
+
+    return {"async": _split(async_share), "sync": _split(sync_share)}
+
+
+_pool_sizes = compute_pool_sizes(settings.db_connection_budget, settings.web_concurrency)
+
 # Pool tuning kwargs are PostgreSQL-only — SQLite/StaticPool (used by tests)
 # rejects them with TypeError under SQLAlchemy 2.0+.
 _async_pool_kwargs = (
-    {"pool_size": 10, "max_overflow": 20, "pool_timeout": 60} if "postgresql" in settings.database_url else {}
+    {"pool_size": _pool_sizes["async"][0], "max_overflow": _pool_sizes["async"][1], "pool_timeout": 60}
+    if "postgresql" in settings.database_url
+    else {}
 )
 _sync_pool_kwargs = (
-    {"pool_size": 10, "max_overflow": 20, "pool_timeout": 60, "poolclass": QueuePool}
+    {
+        "pool_size": _pool_sizes["sync"][0],
+        "max_overflow": _pool_sizes["sync"][1],
+        "pool_timeout": 60,
+        "poolclass": QueuePool,
+    }
     if "postgresql" in settings.database_url_sync
     else {}
 )
@@ -245,7 +281,8 @@ def set_postgresql_connection_options(dbapi_connection, connection_record):
 # read vs write latency without high-cardinality statement labels.
 
 # Imported here so a metrics-init failure cannot break engine creation above.
-from app.core.metrics import db_query_duration_seconds  # noqa: E402
+from app.core.metrics import db_pool_checkout_wait_seconds, db_query_duration_seconds  # noqa: E402
+from app.db.query_stats import record_query  # noqa: E402
 
 
 def _classify_operation(statement: str) -> str:
@@ -261,9 +298,10 @@ def _classify_operation(statement: str) -> str:
 def _install_query_timing_listeners(engine) -> None:
     """
     Wire before/after cursor-execute hooks so query latency lands in the
-    db_query_duration_seconds histogram. Idempotent — re-installing on the
-    same engine is harmless because SQLAlchemy's event subsystem dedupes by
-    (target, identifier, listener) tuple.
+    db_query_duration_seconds histogram and the active per-request
+    QueryStats. Idempotent — re-installing on the same engine is harmless
+    because SQLAlchemy's event subsystem dedupes by (target, identifier,
+    listener) tuple.
     """
     import time
 
@@ -278,6 +316,8 @@ def _install_query_timing_listeners(engine) -> None:
             return
         elapsed = time.perf_counter() - start
         db_query_duration_seconds.labels(operation=_classify_operation(statement)).observe(elapsed)
+        # Per-request totals (app.db.query_stats); no-op outside a tracked request.
+        record_query(statement, elapsed)
 
 
 # Async engines expose their sync core via `.sync_engine`; the connect-level
@@ -285,3 +325,50 @@ def _install_query_timing_listeners(engine) -> None:
 # went through.
 _install_query_timing_listeners(async_engine)
 _install_query_timing_listeners(sync_engine)
+
+
+# =============================================================================
+# Pool checkout wait
+# =============================================================================
+# Time from asking the pool for a connection to getting one — waiting for a
+# free slot once pool_size + max_overflow are checked out, or opening a new
+# connection — observed per engine in db_pool_checkout_wait_seconds. The
+# pool has no before-checkout event, so the instance's _do_get is wrapped;
+# engine.dispose() builds a new pool, hence the engine_disposed hook.
+
+# (pool_size + max_overflow) per engine; None for pools without a limit (SQLite).
+POOL_CAPACITY: Dict[str, Optional[int]] = {
+    "async": sum(_pool_sizes["async"]) if _async_pool_kwargs else None,
+    "sync": sum(_pool_sizes["sync"]) if _sync_pool_kwargs else None,
+}
+
+
+def _time_pool_checkouts(pool, pool_type: str) -> None:
+    import time
+
+    if getattr(pool, "_checkout_timed", False):
+        return
+    do_get = pool._do_get
+
+    def _timed_do_get():
+        start = time.perf_counter()
+        try:
+            return do_get()
+        finally:
+            db_pool_checkout_wait_seconds.labels(pool_type=pool_type).observe(time.perf_counter() - start)
+
+    pool._do_get = _timed_do_get
+    pool._checkout_timed = True
+
+
+def _install_pool_checkout_timer(engine, pool_type: str) -> None:
+    core = engine.sync_engine if hasattr(engine, "sync_engine") else engine
+    _time_pool_checkouts(core.pool, pool_type)
+
+    @event.listens_for(core, "engine_disposed")
+    def _retime(disposed_engine):
+        _time_pool_checkouts(disposed_engine.pool, pool_type)
+
+
+_install_pool_checkout_timer(async_engine, "async")
+_install_pool_checkout_timer(sync_engine, "sync")
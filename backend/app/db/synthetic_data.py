@@ -0,0 +1,317 @@
+"""
+Deterministic synthetic data for benchmarks
+效能測試用的合成資料
+
+``build_synthetic_dataset`` fills an EMPTY database with one matrix-quota
+PhD scholarship cycle shaped like production:
+
+  • ``students`` student users, each with one application spread over the
+    colleges and sub-types, the SIS snapshot keys listings read
+    (std_stdcode / std_academyno / std_degree / std_cname / std_pid ...)
+    and created / submitted timestamps across one academic year;
+  • a professor review on most submitted applications;
+  • one finalized, distributed ``CollegeRanking`` per (college, sub-type)
+    whose top ``quota`` items are allocated — those applications are
+    approved and consume the config's quota matrix;
+  • an admin, and one college reviewer per college.
+
+The same ``seed`` and ``students`` always produce the same rows (ids
+included, on an empty database), so timings from different runs compare.
+Used by ``scripts/bench_hot_paths.py`` and its tests; not a dev seed.
+"""
+
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.application import Application
+from app.models.college_review import CollegeRanking, CollegeRankingItem
+from app.models.enums import QuotaManagementMode, ReviewStage
+from app.models.review import ApplicationReview, ApplicationReviewItem
+from app.models.scholarship import (
+    ScholarshipConfiguration,
+    ScholarshipSubTypeConfig,
+    ScholarshipType,
+    SubTypeSelectionMode,
+)
+from app.models.user import User, UserRole, UserType
+
+# Weighted like the phd_114 quota matrix in seed_scholarship_configs.
+COLLEGES: Tuple[Tuple[str, int], ...] = (
+    ("E", 15),
+    ("C", 12),
+    ("I", 10),
+    ("S", 8),
+    ("B", 6),
+    ("O", 5),
+    ("M", 5),
+    ("D", 4),
+    ("A", 4),
+    ("1", 3),
+    ("6", 3),
+    ("7", 3),
+    ("K", 2),
+)
+SUB_TYPES: Tuple[Tuple[str, str], ...] = (("nstc", "國科會"), ("moe_1w", "教育部(一萬)"))
+ACADEMIC_YEAR = 114
+# Quota per college and sub-type as a share of that college's applicants.
+QUOTA_SHARE = 0.3
+_STATUS_WEIGHTS = (("submitted", 45), ("under_review", 30), ("rejected", 15), ("draft", 10))
+_CYCLE_START = datetime(2025, 8, 1, tzinfo=timezone.utc)
+_BATCH = 1000
+
+
+@dataclass
+class SyntheticDataset:
+    """Ids and parameters the benchmark cases need."""
+
+    students: int
+    seed: int
+    academic_year: int
+    admin_id: int
+    scholarship_type_id: int
+    configuration_id: int
+    college_user_ids: Dict[str, int] = field(default_factory=dict)
+    ranking_ids: List[int] = field(default_factory=list)
+    application_count: int = 0
+    allocated_count: int = 0
+    period_start: datetime = _CYCLE_START
+    period_end: datetime = _CYCLE_START + timedelta(days=365)
+
+
+def _student_data(rng: random.Random, index: int, college: str) -> dict:
+    stdcode = f"3{ACADEMIC_YEAR % 100:02d}{index:06d}"
+    data = {
+        "std_stdcode": stdcode,
+        "std_pid": f"{rng.choice('ABEFHKLMNPQ')}{rng.choice('12')}{rng.randrange(10**8):08d}",
+        "std_cname": f"測試生{index:06d}",
+        "std_ename": f"Student {index}",
+        "std_academyno": college,
+        "std_depno": f"{college}{rng.randrange(1, 9)}",
+        "std_degree": "1",
+        "std_studingstatus": "1",
+        "std_sex": rng.choice("12"),
+        "std_enrollyear": str(ACADEMIC_YEAR - rng.randrange(0, 5)),
+        "trm_academyno": college,
+        "trm_academyname": f"學院{college}",
+        "trm_depname": f"系所{college}{rng.randrange(1, 9)}",
+        "trm_year": ACADEMIC_YEAR,
+        "trm_term": 1,
+        "com_email": f"student{index}@synthetic.nycu.edu.tw",
+        "com_cellphone": f"09{rng.randrange(10**8):08d}",
+    }
+    # The rest of a real SIS snapshot: keys nothing filters on.
+    data.update({f"trm_field_{k}": f"value {k}" for k in range(16)})
+    return data
+
+
+def _weighted(rng: random.Random, choices) -> str:
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights)[0]
+
+
+def build_synthetic_dataset(db: Session, students: int = 1000, seed: int = 20261019) -> SyntheticDataset:
+    """Insert the dataset through ``db`` (a sync Session) and commit it."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+
+    admin = User(
+        nycu_id="synthetic_admin",
+        name="合成資料管理員",
+        email="synthetic_admin@synthetic.nycu.edu.tw",
+        user_type=UserType.employee,
+        role=UserRole.admin,
+    )
+    professor = User(
+        nycu_id="synthetic_professor",
+        name="合成資料教授",
+        email="synthetic_professor@synthetic.nycu.edu.tw",
+        user_type=UserType.employee,
+        role=UserRole.professor,
+    )
+    college_users = {
+        code: User(
+            nycu_id=f"synthetic_college_{code}",
+            name=f"學院{code}承辦",
+            email=f"synthetic_college_{code}@synthetic.nycu.edu.tw",
+            user_type=UserType.employee,
+            role=UserRole.college,
+            college_code=code,
+        )
+        for code, _ in COLLEGES
+    }
+    scholarship = ScholarshipType(code="synthetic_phd", name="合成博士生獎學金", description="benchmark data")
+    db.add_all([admin, professor, *college_users.values(), scholarship])
+    db.flush()
+
+    for order, (code, name) in enumerate(SUB_TYPES, 1):
+        db.add(
+            ScholarshipSubTypeConfig(
+                scholarship_type_id=scholarship.id,
+                sub_type_code=code,
+                name=name,
+                display_order=order,
+                is_active=True,
+            )
+        )
+
+    # Assign every student a college and sub-type first: the quota matrix
+    # is sized from the resulting head counts.
+    assignments = [
+        (_weighted(rng, COLLEGES), rng.choice(SUB_TYPES)[0], _weighted(rng, _STATUS_WEIGHTS)) for _ in range(students)
+    ]
+    applicants: Dict[Tuple[str, str], int] = {}
+    for college, sub_type, status in assignments:
+        if status != "draft":
+            applicants[(college, sub_type)] = applicants.get((college, sub_type), 0) + 1
+    quotas = {
+        sub_type: {
+            college: max(1, int(applicants.get((college, sub_type), 0) * QUOTA_SHARE)) for college, _ in COLLEGES
+        }
+        for sub_type, _ in SUB_TYPES
+    }
+    config = ScholarshipConfiguration(
+        scholarship_type_id=scholarship.id,
+        config_code=f"synthetic_phd_{ACADEMIC_YEAR}",
+        config_name=f"合成博士生獎學金 {ACADEMIC_YEAR}學年",
+        academic_year=ACADEMIC_YEAR,
+        semester=None,
+        has_quota_limit=True,
+        has_college_quota=True,
+        quota_management_mode=QuotaManagementMode.matrix_based,
+        quotas=quotas,
+        amount=40000,
+        currency="TWD",
+        is_active=True,
+        requires_professor_recommendation=True,
+        requires_college_review=True,
+        effective_start_date=now - timedelta(days=120),
+        effective_end_date=now + timedelta(days=365),
+    )
+    db.add(config)
+    db.flush()
+
+    dataset = SyntheticDataset(
+        students=students,
+        seed=seed,
+        academic_year=ACADEMIC_YEAR,
+        admin_id=admin.id,
+        scholarship_type_id=scholarship.id,
+        configuration_id=config.id,
+        college_user_ids={code: user.id for code, user in college_users.items()},
+    )
+
+    # Students and applications, in batches.
+    ranked: Dict[Tuple[str, str], List[Tuple[float, Application]]] = {}
+    for start in range(0, students, _BATCH):
+        batch = range(start, min(start + _BATCH, students))
+        users = [
+            User(
+                nycu_id=f"3{ACADEMIC_YEAR % 100:02d}{index:06d}",
+                name=f"測試生{index:06d}",
+                email=f"student{index}@synthetic.nycu.edu.tw",
+                user_type=UserType.student,
+                role=UserRole.student,
+            )
+            for index in batch
+        ]
+        db.add_all(users)
+        db.flush()
+
+        applications = []
+        for index, user in zip(batch, users):
+            college, sub_type, status = assignments[index]
+            created_at = _CYCLE_START + timedelta(minutes=rng.randrange(365 * 24 * 60))
+            application = Application(
+                app_id=f"APP-{ACADEMIC_YEAR}-0-{index + 1:05d}",
+                user_id=user.id,
+                scholarship_type_id=scholarship.id,
+                scholarship_configuration_id=config.id,
+                scholarship_subtype_list=[sub_type],
+                sub_type_selection_mode=SubTypeSelectionMode.single,
+                sub_scholarship_type=sub_type,
+                academic_year=ACADEMIC_YEAR,
+                semester=None,
+                status=status,
+                review_stage=ReviewStage.student_draft if status == "draft" else ReviewStage.professor_reviewed,
+                is_renewal=False,
+                student_data=_student_data(rng, index, college),
+                submitted_form_data={"fields": {"postal_account": {"value": f"{rng.randrange(10**10):010d}"}}},
+                agree_terms=True,
+                amount=Decimal("40000"),
+                created_at=created_at,
+                submitted_at=None if status == "draft" else created_at + timedelta(hours=rng.randrange(1, 72)),
+            )
+            applications.append(application)
+            if status != "draft":
+                ranked.setdefault((college, sub_type), []).append((rng.random(), application))
+        db.add_all(applications)
+        db.flush()
+
+        reviews = []
+        for application in applications:
+            if application.status != "draft" and rng.random() < 0.8:
+                review = ApplicationReview(
+                    application_id=application.id,
+                    reviewer_id=professor.id,
+                    recommendation="approve",
+                    comments="推薦",
+                    reviewed_at=application.submitted_at + timedelta(days=rng.randrange(1, 14)),
+                )
+                review.items = [
+                    ApplicationReviewItem(
+                        sub_type_code=application.sub_scholarship_type, recommendation="approve", comments="推薦"
+                    )
+                ]
+                reviews.append(review)
+        db.add_all(reviews)
+        db.flush()
+        dataset.application_count += len(applications)
+
+    # One distributed ranking per (college, sub-type); the top quota win.
+    for (college, sub_type), entries in sorted(ranked.items()):
+        ranking = CollegeRanking(
+            scholarship_type_id=scholarship.id,
+            sub_type_code=sub_type,
+            academic_year=ACADEMIC_YEAR,
+            semester=None,
+            college_code=college,
+            ranking_name=f"{ACADEMIC_YEAR} {college} {sub_type}",
+            created_by=dataset.college_user_ids[college],
+            is_finalized=True,
+            ranking_status="finalized",
+            distribution_executed=True,
+            finalized_at=_CYCLE_START + timedelta(days=300),
+        )
+        db.add(ranking)
+        db.flush()
+        quota = quotas[sub_type][college]
+        entries.sort(key=lambda entry: entry[0])
+        for position, (_, application) in enumerate(entries, 1):
+            allocated = position <= quota and application.status != "rejected"
+            if allocated:
+                application.status = "approved"
+                application.review_stage = ReviewStage.quota_distributed
+                application.allocation_config_id = config.id
+                dataset.allocated_count += 1
+            application.final_ranking_position = position
+            db.add(
+                CollegeRankingItem(
+                    ranking_id=ranking.id,
+                    application_id=application.id,
+                    rank_position=position,
+                    is_allocated=allocated,
+                    allocated_sub_type=sub_type if allocated else None,
+                    allocation_config_id=config.id if allocated else None,
+                    status="allocated" if allocated else "ranked",
+                )
+            )
+        ranking.total_applications = len(entries)
+        ranking.allocated_count = sum(1 for _, app in entries if app.allocation_config_id == config.id)
+        dataset.ranking_ids.append(ranking.id)
+    db.commit()
+    return dataset
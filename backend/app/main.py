@@ -5,7 +5,6 @@ Configures middleware, exception handlers, and API routes.
 
 import json
 import logging
-import uuid
 from contextlib import asynccontextmanager
 
 from fastapi import Depends, FastAPI, Request
@@ -26,13 +25,15 @@ from app.core.security import require_admin
 from app.models.user import User
 
 # Import Prometheus metrics
+from app.core.event_loop_monitor import EventLoopMonitor
 from app.core.metrics import CONTENT_TYPE_LATEST, generate_latest, set_app_info, update_db_pool_metrics
 from app.db.session import async_engine, sync_engine
 from app.middleware.metrics_middleware import MetricsMiddleware
+from app.middleware.request_id_middleware import RequestIdMiddleware
 from app.middleware.security_headers_middleware import SecurityHeadersMiddleware
 
 # Import scheduler
-from app.services.roster_scheduler_service import init_scheduler, shutdown_scheduler
+from app.services.roster_scheduler_service import init_scheduler, shutdown_scheduler, start_scheduler_election
 
 # Configure logging
 logging.basicConfig(
@@ -94,6 +95,8 @@ async def lifespan(_app: FastAPI):
     """Manage application lifespan events"""  # pylint: disable=unused-argument
     # Startup
     scheduler_started = False
+    scheduler_elector = None
+    loop_monitor = None
     try:
         LOGGER.info("Starting application...")
 
@@ -106,11 +109,25 @@ async def lifespan(_app: FastAPI):
             )
             LOGGER.info("Prometheus metrics initialized")
 
+            if settings.event_loop_monitor_enabled:
+                loop_monitor = EventLoopMonitor(
+                    interval=settings.event_loop_monitor_interval_seconds,
+                    block_threshold=(
+                        settings.event_loop_block_threshold_seconds if settings.event_loop_block_debug else None
+                    ),
+                )
+                loop_monitor.start()
+
         # Conditionally initialize the roster scheduler
         if settings.should_start_scheduler:
-            await init_scheduler()
+            if settings.scheduler_leader_election:
+                # 多 worker / 多副本：只有取得 Redis 租約者執行排程
+                scheduler_elector = await start_scheduler_election()
+                LOGGER.info("Roster scheduler standing for leader election as %s", scheduler_elector.identity)
+            else:
+                await init_scheduler()
+                LOGGER.info("Roster scheduler initialized")
             scheduler_started = True
-            LOGGER.info("Roster scheduler initialized")
         else:
             LOGGER.info("Roster scheduler disabled (test/CLI mode or explicitly disabled)")
 
@@ -124,10 +141,14 @@ async def lifespan(_app: FastAPI):
         LOGGER.info("Shutting down application...")
         if scheduler_started:
             try:
+                if scheduler_elector is not None:
+                    await scheduler_elector.stop()
                 await shutdown_scheduler()
                 LOGGER.info("Roster scheduler shut down")
             except Exception as exc:  # pylint: disable=broad-exception-caught
                 LOGGER.exception("Error during scheduler shutdown: %s", exc)
+        if loop_monitor is not None:
+            await loop_monitor.stop()
 
 
 # Interactive API docs and the OpenAPI schema enumerate every route, parameter
@@ -174,16 +195,10 @@ app.add_middleware(SecurityHeadersMiddleware)
 #     app.add_middleware(SchemaValidationMiddleware)
 
 
-# Request tracing middleware
-@app.middleware("http")
-async def add_trace_id_middleware(request: Request, call_next):
-    """Add trace ID to request for logging and debugging"""
-    trace_id = str(uuid.uuid4())
-    request.state.trace_id = trace_id
-
-    response = await call_next(request)
-    response.headers["X-Trace-ID"] = trace_id
-    return response
+# Request tracing middleware (outermost, so every handled response carries X-Trace-ID).
+# All middleware here is pure ASGI: BaseHTTPMiddleware / @app.middleware("http")
+# add a task and a wrapped body stream per request and per layer.
+app.add_middleware(RequestIdMiddleware)
 
 
 # Exception handlers
@@ -475,7 +490,8 @@ async def metrics():
 
     Returns application metrics in Prometheus text format including:
     - HTTP request count, duration, and status codes
-    - Database connection pool status
+    - Database connection pool status, checkout wait and saturation
+    - Event-loop lag and threadpool queue depth
     - Business metrics (applications, emails, uploads)
     - Error rates
 
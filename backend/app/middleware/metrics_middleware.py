@@ -6,6 +6,8 @@ This middleware automatically collects HTTP request metrics including:
 - Request duration/latency
 - Requests in progress
 - HTTP error rates
+- SQL statements, DB time and repeated statement shapes per request
+  (app.db.query_stats), optionally echoed as response headers in development
 
 The middleware is exception-safe and will not affect application behavior
 even if metrics collection fails.
@@ -13,20 +15,24 @@ even if metrics collection fails.
 
 import time
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.config import settings
 from app.core.metrics import (
+    db_duplicate_queries_per_request,
+    db_queries_per_request,
+    db_time_per_request_seconds,
     http_errors_total,
     http_request_duration_seconds,
     http_requests_in_progress,
     http_requests_total,
     normalize_endpoint,
 )
+from app.db.query_stats import track_queries
 
 
-class MetricsMiddleware(BaseHTTPMiddleware):
+class MetricsMiddleware:
     """
     Middleware to collect Prometheus metrics for HTTP requests.
 
@@ -36,6 +42,13 @@ class MetricsMiddleware(BaseHTTPMiddleware):
     3. Records HTTP errors
     4. Normalizes endpoints to reduce cardinality
     5. Excludes monitoring endpoints to avoid recursion
+    6. Counts the request's SQL statements (queries issued after the
+       response headers, e.g. while streaming, are not included)
+
+    Pure ASGI (no BaseHTTPMiddleware): the response is passed through
+    untouched and the metrics are taken from ``http.response.start``, so
+    streamed bodies (file proxy, exports, SSE) are neither wrapped nor
+    buffered. Duration is measured up to the response headers, as before.
 
     Usage:
         app.add_middleware(MetricsMiddleware)
@@ -44,67 +57,43 @@ class MetricsMiddleware(BaseHTTPMiddleware):
     # Endpoints to exclude from metrics (to avoid infinite loops and noise)
     EXCLUDED_PATHS = {"/metrics", "/health", "/openapi.json", "/docs", "/redoc"}
 
-    async def dispatch(self, request: Request, call_next):
-        """
-        Process each HTTP request and collect metrics.
-
-        Args:
-            request: FastAPI request object
-            call_next: Next middleware or route handler
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
-        Returns:
-            Response from the application
-        """
-        # Skip metrics collection for excluded paths
-        if request.url.path in self.EXCLUDED_PATHS:
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Skip metrics collection for non-HTTP traffic and excluded paths
+        if scope["type"] != "http" or scope["path"] in self.EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
 
-        # Extract request metadata
-        method = request.method
-        path = request.url.path
+        method = scope["method"]
 
         # Normalize endpoint to reduce label cardinality
         # Example: /api/v1/applications/123 -> /api/v1/applications/:id
-        endpoint = normalize_endpoint(path)
+        endpoint = normalize_endpoint(scope["path"])
 
         # Track in-progress requests
         http_requests_in_progress.labels(method=method).inc()
 
-        # Record start time
         start_time = time.perf_counter()
-
-        try:
-            # Process request
-            response: Response = await call_next(request)
-            status_code = response.status_code
-
-        except Exception as exc:  # pylint: disable=broad-exception-caught
-            # Record error metric
-            try:
-                http_errors_total.labels(
-                    status_code="500",
-                    endpoint=endpoint,
-                ).inc()
-            except Exception:  # pylint: disable=broad-exception-caught
-                pass  # Silently fail to avoid breaking the application
-
-            # Re-raise the exception to let FastAPI handle it
-            raise exc from exc
-
-        finally:
-            # Calculate request duration
+        recorded = False
+        query_headers = settings.db_query_stats_header and settings.environment != "production"
+
+        def record(status_code: int) -> None:
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
             duration = time.perf_counter() - start_time
 
             # Update metrics (wrapped in try-except to be exception-safe)
             try:
-                # Record request count
                 http_requests_total.labels(
                     method=method,
                     endpoint=endpoint,
                     status=str(status_code),
                 ).inc()
 
-                # Record request duration
                 http_request_duration_seconds.labels(
                     method=method,
                     endpoint=endpoint,
@@ -117,11 +106,30 @@ class MetricsMiddleware(BaseHTTPMiddleware):
                         endpoint=endpoint,
                     ).inc()
 
-                # Decrement in-progress counter
+                db_queries_per_request.labels(method=method, endpoint=endpoint).observe(queries.count)
+                db_time_per_request_seconds.labels(method=method, endpoint=endpoint).observe(queries.duration)
+                db_duplicate_queries_per_request.labels(method=method, endpoint=endpoint).observe(queries.duplicates)
+
                 http_requests_in_progress.labels(method=method).dec()
 
             except Exception:  # pylint: disable=broad-exception-caught
                 # Silently fail to avoid breaking the application
                 pass
 
-        return response
+        async def send_with_metrics(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                record(message["status"])
+                if query_headers:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Query-Count"] = str(queries.count)
+                    headers["X-DB-Query-Time-Ms"] = f"{queries.duration * 1000:.1f}"
+                    headers["X-DB-Duplicate-Queries"] = str(queries.duplicates)
+            await send(message)
+
+        try:
+            with track_queries() as queries:
+                await self.app(scope, receive, send_with_metrics)
+        finally:
+            # No response was started: the exception propagates to
+            # ServerErrorMiddleware, which answers 500.
+            record(500)
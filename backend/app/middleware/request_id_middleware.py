@@ -0,0 +1,35 @@
+"""
+Per-request trace ID.
+
+Every HTTP request gets a fresh UUID in ``request.state.trace_id`` (the
+exception handlers in ``app.main`` put it into error bodies and logs) and
+the same value in the ``X-Trace-ID`` response header.
+"""
+
+import uuid
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class RequestIdMiddleware:
+    """Add a trace ID to the request state and the response headers (pure ASGI)."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace_id = str(uuid.uuid4())
+        # request.state is a view over scope["state"]
+        scope.setdefault("state", {})["trace_id"] = trace_id
+
+        async def send_with_trace_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Trace-ID"] = trace_id
+            await send(message)
+
+        await self.app(scope, receive, send_with_trace_id)
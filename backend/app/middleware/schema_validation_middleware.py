@@ -8,46 +8,61 @@ errors immediately when endpoints are accessed.
 import json
 import logging
 import time
-from typing import Any, Callable, Dict
+from typing import Any, Dict
 
-from fastapi import Request, Response
 from pydantic import ValidationError
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
-class SchemaValidationMiddleware(BaseHTTPMiddleware):
-    """Middleware to validate API responses against declared schemas"""
+class SchemaValidationMiddleware:
+    """Middleware to validate API responses against declared schemas
 
-    def __init__(self, app, enabled: bool = None):
-        super().__init__(app)
+    Pure ASGI: response messages are forwarded as they arrive. A copy of a
+    JSON body is kept and validated once its last chunk has been sent, so
+    validation never delays or alters what the client receives.
+    """
+
+    def __init__(self, app: ASGIApp, enabled: bool = None):
+        self.app = app
         # Only enable in development mode by default
         self.enabled = enabled if enabled is not None else settings.debug
         self.validation_errors = []
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process request and validate response"""
 
-        if not self.enabled:
-            return await call_next(request)
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
 
         # Skip validation for certain paths
-        if self._should_skip_validation(request.url.path):
-            return await call_next(request)
+        if self._should_skip_validation(scope["path"]):
+            await self.app(scope, receive, send)
+            return
 
         start_time = time.time()
+        is_json = False
+        body = bytearray()
 
-        try:
-            response = await call_next(request)
+        async def send_and_capture(message: Message) -> None:
+            nonlocal is_json
+            await send(message)
 
             # Only validate JSON responses
-            if response.headers.get("content-type", "").startswith("application/json") and hasattr(response, "body"):
-                await self._validate_response(request, response)
+            if message["type"] == "http.response.start":
+                is_json = Headers(raw=message.get("headers", [])).get("content-type", "").startswith("application/json")
+            elif message["type"] == "http.response.body" and is_json:
+                body.extend(message.get("body", b""))
+                if not message.get("more_body", False):
+                    await self._validate_response(scope, bytes(body))
 
-            return response
+        try:
+            await self.app(scope, receive, send_and_capture)
 
         except Exception as e:
             # Enhanced error handling for database-related issues
@@ -76,12 +91,13 @@ class SchemaValidationMiddleware(BaseHTTPMiddleware):
                 print(f"Schema validation middleware error (logger failed): {e}")
                 print(f"Logger error: {log_error}")
 
-            # Always continue with the request, don't break the application
-            return await call_next(request)
+            # The request body has been consumed, so the request cannot be
+            # replayed; let the exception handlers answer.
+            raise
 
         finally:
             process_time = time.time() - start_time
-            logger.debug(f"Schema validation took {process_time:.4f}s for {request.url.path}")
+            logger.debug(f"Schema validation took {process_time:.4f}s for {scope['path']}")
 
     def _should_skip_validation(self, path: str) -> bool:
         """Check if we should skip validation for this path"""
@@ -96,14 +112,9 @@ class SchemaValidationMiddleware(BaseHTTPMiddleware):
 
         return any(path.startswith(skip_path) for skip_path in skip_paths)
 
-    async def _validate_response(self, request: Request, response: Response):
+    async def _validate_response(self, scope: Scope, body: bytes):
         """Validate response against expected schema"""
         try:
-            # Get response body
-            body = b""
-            async for chunk in response.body_iterator:
-                body += chunk
-
             # Parse JSON
             if body:
                 try:
@@ -114,23 +125,22 @@ class SchemaValidationMiddleware(BaseHTTPMiddleware):
                 response_data = None
 
             # Find the route and expected response model
-            route_info = self._get_route_info(request)
+            route_info = self._get_route_info(scope)
             if not route_info or not route_info.get("response_model"):
                 return
 
             # Validate against schema
             response_model = route_info["response_model"]
-            self._perform_validation(response_data, response_model, request.url.path, request.method)
+            self._perform_validation(response_data, response_model, scope["path"], scope["method"])
 
         except Exception:
             logger.exception("Response validation error")
 
-    def _get_route_info(self, request: Request) -> Dict[str, Any]:
+    def _get_route_info(self, scope: Scope) -> Dict[str, Any]:
         """Get route information including response model"""
         try:
-            # This is a simplified version - in practice, you'd need to
-            # extract this from FastAPI's route information
-            route = request.scope.get("route")
+            # The router records the matched route in the (shared) scope
+            route = scope.get("route")
             if route and hasattr(route, "response_model"):
                 return {
                     "response_model": route.response_model,
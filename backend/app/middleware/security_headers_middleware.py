@@ -22,9 +22,8 @@ value, and a server-level CSP would stack a second, conflicting policy onto
 the nonce-based CSP the frontend middleware emits for pages.
 """
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 # Strict no-execution policy for machine-readable responses. frame-ancestors
 # 'none' also makes framing a raw API response impossible regardless of the
@@ -34,20 +33,35 @@ API_CONTENT_SECURITY_POLICY = "default-src 'none'; frame-ancestors 'none'"
 NO_STORE_CACHE_CONTROL = "no-store, no-cache, must-revalidate"
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Default every response to non-cacheable and give JSON a strict CSP."""
+class SecurityHeadersMiddleware:
+    """Default every response to non-cacheable and give JSON a strict CSP.
 
-    async def dispatch(self, request: Request, call_next) -> Response:
-        response = await call_next(request)
+    Pure ASGI: only the ``http.response.start`` message is edited, the body
+    streams through unchanged.
+    """
 
-        # Endpoint-declared caching wins (e.g. photo/file endpoints that set
-        # their own private max-age); everything else must not be stored.
-        if "cache-control" not in response.headers:
-            response.headers["Cache-Control"] = NO_STORE_CACHE_CONTROL
-            response.headers["Pragma"] = "no-cache"
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
-        content_type = response.headers.get("content-type", "")
-        if content_type.startswith("application/json") and "content-security-policy" not in response.headers:
-            response.headers["Content-Security-Policy"] = API_CONTENT_SECURITY_POLICY
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        return response
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+
+                # Endpoint-declared caching wins (e.g. photo/file endpoints that set
+                # their own private max-age); everything else must not be stored.
+                if "cache-control" not in headers:
+                    headers["Cache-Control"] = NO_STORE_CACHE_CONTROL
+                    headers["Pragma"] = "no-cache"
+
+                content_type = headers.get("content-type", "")
+                if content_type.startswith("application/json") and "content-security-policy" not in headers:
+                    headers["Content-Security-Policy"] = API_CONTENT_SECURITY_POLICY
+
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
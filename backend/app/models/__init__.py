@@ -23,11 +23,12 @@ from app.models.payment_roster import (
     StudentVerificationStatus,
 )
 from app.models.professor_student import ProfessorStudentRelationship
-from app.models.received_months import ReceivedMonthImport, StudentReceivedMonthRecord
+from app.models.received_months import ReceivedMonthImport, ReceivedMonthsSystemLedger, StudentReceivedMonthRecord
 from app.models.review import ApplicationReview, ApplicationReviewItem
 from app.models.roster_audit import RosterAuditAction, RosterAuditLevel, RosterAuditLog
 from app.models.roster_schedule import RosterSchedule, RosterScheduleStatus
 from app.models.scholarship import ScholarshipConfiguration, ScholarshipRule, ScholarshipType
+from app.models.storage_blob import StorageBlob
 from app.models.student import (  # 查詢表模型 (Reference data only); Helper functions
     Academy,
     Degree,
@@ -65,6 +66,7 @@ __all__ = [
     "ReviewStatus",
     "FileType",
     "ApplicationSequence",
+    "StorageBlob",
     # Shared enums
     "Semester",
     "SubTypeSelectionMode",
@@ -129,5 +131,6 @@ __all__ = [
     "FooterLinkType",
     # Imported received-months ledger
     "ReceivedMonthImport",
+    "ReceivedMonthsSystemLedger",
     "StudentReceivedMonthRecord",
 ]
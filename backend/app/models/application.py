@@ -25,6 +25,7 @@ from sqlalchemy.sql import func
 
 from app.core.encrypted_json import StudentDataJSON
 from app.db.base_class import Base
+from app.models.college_review import get_json_type
 from app.models.enums import ApplicationStatus, ReviewStage, Semester
 from app.models.scholarship import SubTypeSelectionMode
 
@@ -64,6 +65,21 @@ class FileType(enum.Enum):
     OTHER = "other"  # 其他
 
 
+# student_data keys with an expression index (PostgreSQL, see Application.__table_args__).
+SNAPSHOT_INDEXED_KEYS = ("std_stdcode", "std_academyno", "std_degree", "trm_academyno")
+
+# college_scope.resolved_college_code_expr() as index SQL, keys in
+# COLLEGE_CODE_KEYS order (test_jsonb_snapshot_indexes keeps them together).
+COLLEGE_CODE_INDEX_SQL = (
+    "(COALESCE("
+    + ", ".join(
+        f"NULLIF(TRIM(student_data ->> '{key}'), '')"
+        for key in ("std_academyno", "academy_code", "college_code", "std_college")
+    )
+    + "))"
+)
+
+
 class Application(Base):
     """Scholarship application model"""
 
@@ -134,9 +150,12 @@ class Application(Base):
 
     # 申請資料 (申請當時)
     # std_pid (身分證字號) inside this JSON is transparently AES-256-GCM
-    # encrypted at rest by StudentDataJSON; the column is read as plaintext.
+    # encrypted at rest by StudentDataJSON; the column is read as plaintext
+    # (std_pid is decrypted on first access, see encrypted_json.LazyStudentData).
+    # Both are JSONB on PostgreSQL; filter them through app.utils.json_fields
+    # so the snapshot expression indexes below apply.
     student_data = Column(StudentDataJSON)  # Student 資料
-    submitted_form_data = Column(JSON)  # Field, Document 資料
+    submitted_form_data = Column(get_json_type())  # Field, Document 資料
 
     # 同意條款
     agree_terms = Column(Boolean, default=False)
@@ -271,6 +290,19 @@ class Application(Base):
             "ix_applications_user_id",
             "user_id",
         ),
+        # SIS snapshot keys filtered in review / admin listings (PostgreSQL
+        # JSONB only). The expressions must match what app.utils.json_fields
+        # and college_scope.resolved_college_code_expr() render, character
+        # for character, or the planner ignores them.
+        *(
+            Index(f"ix_applications_student_data_{key}", sa.text(f"(student_data ->> '{key}')")).ddl_if(
+                dialect="postgresql"
+            )
+            for key in SNAPSHOT_INDEXED_KEYS
+        ),
+        Index("ix_applications_student_data_college_code", sa.text(COLLEGE_CODE_INDEX_SQL)).ddl_if(
+            dialect="postgresql"
+        ),
     )
 
     def __repr__(self):
@@ -361,6 +393,8 @@ class ApplicationFile(Base):
         # selectinload(Application.files) filters on application_id — Postgres
         # does not auto-index FK columns.
         Index("ix_application_files_app_type", "application_id", "file_type"),
+        # Blob GC counts the rows referencing each content-addressed object.
+        Index("ix_application_files_object_name", "object_name"),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -380,6 +414,11 @@ class ApplicationFile(Base):
     ocr_text = Column(Text)
     ocr_confidence = Column(Numeric(5, 2))
 
+    # 上傳後產生的衍生檔（app.services.file_derivative_service）
+    content_sha256 = Column(String(64))
+    normalized_object_name = Column(String(500))  # 正規化 PDF 頁面
+    thumbnail_object_name = Column(String(500))  # 圖片縮圖 (JPEG)
+
     # 檔案狀態
     is_verified = Column(Boolean, default=False)
     verification_notes = Column(Text)
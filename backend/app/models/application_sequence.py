@@ -14,6 +14,10 @@ class ApplicationSequence(Base):
     Each academic year and semester combination has its own sequence counter.
     Format: APP-{academic_year}-{semester_code}-{sequence:05d}
 
+    On PostgreSQL workers reserve blocks of numbers from this counter
+    (application_builder.AppIdAllocator), so last_sequence is the highest
+    number reserved, not the last one issued; app_ids may have gaps.
+
     Example:
         - APP-113-1-00001 (Academic Year 113, Semester 1, Sequence 1)
         - APP-113-2-00125 (Academic Year 113, Semester 2, Sequence 125)
@@ -63,5 +67,14 @@ class ApplicationSequence(Base):
         Returns:
             str: Formatted app_id (e.g., 'APP-113-1-00001')
         """
+        return f"{ApplicationSequence.app_id_prefix(academic_year, semester)}{sequence:05d}"
+
+    @staticmethod
+    def app_id_prefix(academic_year: int, semester: str) -> str:
+        """
+        The part of the app_id before the sequence number (e.g. 'APP-113-1-')
+
+        Set-based inserts build the rest of the app_id in SQL.
+        """
         semester_code = ApplicationSequence.get_semester_code(semester)
-        return f"APP-{academic_year}-{semester_code}-{sequence:05d}"
+        return f"APP-{academic_year}-{semester_code}-"
@@ -98,8 +98,11 @@ class AuditLog(Base):
     error_message = Column(Text)
     response_time_ms = Column(Integer)  # 回應時間(毫秒)
 
-    # 時間戳記
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # 時間戳記 — the partition key on PostgreSQL: audit_logs is range-partitioned
+    # by month on created_at with PRIMARY KEY (id, created_at), and has pg_trgm
+    # indexes for the admin search (alembic partition_log_tables_001,
+    # app.services.log_partitions).
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # 追蹤ID
     trace_id = Column(String(100))  # 用於追蹤同一次請求的多個操作
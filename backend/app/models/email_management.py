@@ -92,6 +92,8 @@ class EmailHistory(Base):
         index=True,
     )
     error_message = Column(Text)
+    # Partition key on PostgreSQL: email_history is range-partitioned by month
+    # on sent_at with PRIMARY KEY (id, sent_at) (alembic partition_log_tables_001).
     sent_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
 
     # Additional metadata
@@ -297,6 +297,23 @@ class NotificationRead(Base):
         return f"<NotificationRead(notification_id={self.notification_id}, user_id={self.user_id}, read_at={self.read_at})>"
 
 
+class NotificationReadWatermark(Base):
+    """Per-user "read up to" mark for system announcements
+
+    「全部標為已讀」只記錄使用者讀到的最大公告 ID：ID 不大於此值的系統公告
+    一律視為已讀，不再為每則公告各寫一筆 NotificationRead。
+    """
+
+    __tablename__ = "notification_read_watermarks"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    last_announcement_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<NotificationReadWatermark(user_id={self.user_id}, last_announcement_id={self.last_announcement_id})>"
+
+
 class NotificationPreference(Base):
     """
     User notification preferences - Facebook-style granular control
@@ -13,6 +13,7 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
@@ -247,6 +248,11 @@ class PaymentRosterItem(Base):
     student_number = Column(String(20), nullable=True, index=True)
     student_name = Column(String(100), nullable=False)  # 姓名
     student_email = Column(String(255))  # Email
+    # 學院/系所顯示欄位（造冊當時自 application.student_data 快照），名單列表
+    # 直接讀取，不必為了這三個欄位載入並解密整份 student_data。
+    college_code = Column(String(20))  # 學院代碼 (std_academyno / trm_academyno)
+    college_name = Column(String(100))  # 學院名稱 (trm_academyname)
+    department_name = Column(String(100))  # 系所名稱 (trm_depname)
 
     # 郵局帳號資訊
     bank_account = Column(String(20))  # 郵局帳號
@@ -320,6 +326,9 @@ class PaymentRosterItem(Base):
     roster = relationship("PaymentRoster", back_populates="items")
     application = relationship("Application")
 
+    # 名單列表以 (created_at, id) keyset 分頁
+    __table_args__ = (Index("ix_payment_roster_items_roster_created_id", "roster_id", "created_at", "id"),)
+
     def __repr__(self):
         return f"<PaymentRosterItem(id={self.id}, student={self.student_name}, amount={self.scholarship_amount})>"
 
@@ -1,7 +1,7 @@
 """
-Imported received-months ledger (匯入已領月份數).
+Received-months ledgers (匯入已領月份數 / 系統月份數).
 
-Two tables:
+Three tables:
 
 ``received_month_imports``
     One row per upload run. Created in ``pending`` state by the preview
@@ -14,6 +14,12 @@ Two tables:
     lifetime 匯入月份數 plus the verbatim source row so an admin can always see
     what the original file said.
 
+``received_months_system_ledger``
+    The materialized 系統月份數: one row per (學號, scholarship_configuration)
+    summarising this system's own roster items. Derived data — maintained by
+    the write hooks in app.services.received_months_service and rebuildable
+    from payment_roster_items at any time.
+
 ``student_number`` is a plain string with NO foreign key on purpose — the file
 comes from 國科會 and may list students this system has never seen. The record
 simply waits until they appear.
@@ -120,3 +126,41 @@ class StudentReceivedMonthRecord(Base):
             f"<StudentReceivedMonthRecord(student={self.student_number}, "
             f"type={self.scholarship_type_id}, months={self.months})>"
         )
+
+
+class ReceivedMonthsSystemLedger(Base):
+    """Materialized 系統月份數 for one student under one scholarship configuration.
+
+    ``system_months`` counts every included roster item regardless of roster
+    status (what the distribution panel and the PhD 36-month check read).
+    ``paid_months`` only counts rosters that are COMPLETED or LOCKED and whose
+    application is not soft-deleted (the student history page). A missing row
+    means zero for both.
+    """
+
+    __tablename__ = "received_months_system_ledger"
+    __table_args__ = (
+        UniqueConstraint(
+            "student_number", "scholarship_configuration_id", name="uq_received_months_ledger_student_config"
+        ),
+        Index("ix_received_months_ledger_config_student", "scholarship_configuration_id", "student_number"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # 學號 / std_stdcode — same key as PaymentRosterItem.student_number.
+    student_number = Column(String(20), nullable=False)
+    scholarship_configuration_id = Column(Integer, ForeignKey("scholarship_configurations.id"), nullable=False)
+    # Denormalised from the configuration so per-type totals need no join.
+    scholarship_type_id = Column(Integer, ForeignKey("scholarship_types.id"), nullable=True, index=True)
+
+    system_months = Column(Integer, nullable=False, default=0)
+    paid_months = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self) -> str:
+        return (
+            f"<ReceivedMonthsSystemLedger(student={self.student_number}, "
+            f"config={self.scholarship_configuration_id}, system={self.system_months}, paid={self.paid_months})>"
+        )
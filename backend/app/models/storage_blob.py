@@ -0,0 +1,38 @@
+"""
+Content-addressed storage blob model
+內容定址儲存：每份相同內容只存一次
+"""
+
+from sqlalchemy import Column, DateTime, Index, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+
+class StorageBlob(Base):
+    """
+    One MinIO object under ``blobs/``, keyed by the SHA-256 of its bytes.
+
+    ApplicationFile rows reference a blob through ``object_name``; identical
+    uploads and cloned profile documents share one object. ``ref_count`` is
+    maintained by app.services.blob_store (acquire / release) and reconciled
+    against the referencing rows by the daily GC, which deletes blobs that
+    stayed unreferenced longer than ``blob_gc_grace_hours``.
+    """
+
+    __tablename__ = "storage_blobs"
+    __table_args__ = (
+        # GC scan: unreferenced blobs ordered by when they were released.
+        Index("ix_storage_blobs_unreferenced", "ref_count", "released_at"),
+    )
+
+    content_sha256 = Column(String(64), primary_key=True)
+    object_name = Column(String(500), nullable=False, unique=True)
+    size = Column(Integer)
+    content_type = Column(String(100))
+    ref_count = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    released_at = Column(DateTime(timezone=True))  # ref_count 歸零的時間；GC 依此判斷寬限期
+
+    def __repr__(self):
+        return f"<StorageBlob(sha256={self.content_sha256[:12]}, ref_count={self.ref_count})>"
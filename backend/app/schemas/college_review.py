@@ -79,6 +79,21 @@ class RankingOrderUpdate(BaseModel):
     position: int
 
 
+class RankingMove(BaseModel):
+    """Move one ranking item directly before or after another"""
+
+    item_id: int
+    before_item_id: Optional[int] = None
+    after_item_id: Optional[int] = None
+
+
+class RankingReorderRequest(BaseModel):
+    """Delta reorder: a full permutation of item ids, or a list of moves"""
+
+    order: Optional[List[int]] = Field(None, description="Every CollegeRankingItem.id in the new order")
+    moves: Optional[List[RankingMove]] = Field(None, description="Moves applied in sequence to the current order")
+
+
 class RankingUpdate(BaseModel):
     """Schema for updating ranking metadata"""
 
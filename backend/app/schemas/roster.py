@@ -37,8 +37,8 @@ class RosterExportRequest(BaseModel):
     include_excluded: bool = Field(False, description="是否包含排除項目")
 
 
-class RosterItemResponse(BaseModel):
-    """造冊項目回應"""
+class RosterItemSummary(BaseModel):
+    """造冊項目列表列（不含大型 JSON 快照）"""
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -46,7 +46,7 @@ class RosterItemResponse(BaseModel):
     roster_id: int
     application_id: int
     student_id_number: str  # 身分證字號 (national ID / std_pid)
-    student_id: Optional[str] = None  # 學號 (std_stdcode), enriched from student_data
+    student_id: Optional[str] = None  # 學號 (std_stdcode), from the student_number snapshot
     student_name: str
     student_email: Optional[str] = None
     scholarship_name: Optional[str] = None
@@ -56,16 +56,15 @@ class RosterItemResponse(BaseModel):
     bank_account: Optional[str] = None
     verification_status: StudentVerificationStatus
     verification_message: Optional[str] = None
-    verification_snapshot: Optional[Dict[str, Any]] = None
     is_included: bool
     exclusion_reason: Optional[str] = None
-    # 資格驗證快照（造冊產生當下；failed_rules/warning_rules/details 都在快照內）
-    rule_validation_result: Optional[Dict[str, Any]] = None
     # PaymentRosterItem.is_eligible model property; None = 無快照（較舊造冊）
     is_eligible: Optional[bool] = None
+    failed_rules: Optional[List[Any]] = None
+    warning_rules: Optional[List[Any]] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
-    # 學生學院/系所資訊（從 application.student_data 取得，非 ORM 欄位）
+    # 學生學院/系所資訊（造冊當時自 application.student_data 快照）
     college_code: Optional[str] = None
     college_name: Optional[str] = None
     department_name: Optional[str] = None
@@ -74,6 +73,36 @@ class RosterItemResponse(BaseModel):
     allocated_sub_type: Optional[str] = None  # 分發到的子類型 e.g. "nstc"
 
 
+class RosterItemResponse(RosterItemSummary):
+    """造冊項目回應"""
+
+    verification_snapshot: Optional[Dict[str, Any]] = None
+    # 資格驗證快照（造冊產生當下；failed_rules/warning_rules/details 都在快照內）
+    rule_validation_result: Optional[Dict[str, Any]] = None
+
+
+class RosterItemDetailResponse(RosterItemResponse):
+    """單一造冊項目完整內容（含 Excel 列與郵局帳號驗證快照）"""
+
+    allocation_config_id: Optional[int] = None
+    verification_at: Optional[datetime] = None
+    bank_account_number_status: Optional[str] = None
+    bank_account_holder_status: Optional[str] = None
+    bank_verification_details: Optional[Dict[str, Any]] = None
+    bank_manual_review_notes: Optional[str] = None
+    excel_row_data: Optional[Dict[str, Any]] = None
+    excel_remarks: Optional[str] = None
+    backup_info: Optional[Any] = None
+
+
+class RosterItemPage(BaseModel):
+    """造冊項目 keyset 分頁回應"""
+
+    items: List[RosterItemSummary]
+    next_cursor: Optional[str] = Field(None, description="下一頁游標；None 表示已無資料")
+    limit: int
+
+
 class RosterAuditLogResponse(BaseModel):
     """造冊稽核記錄回應"""
 
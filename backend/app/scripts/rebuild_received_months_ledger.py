@@ -0,0 +1,86 @@
+"""
+Rebuild or verify the materialized 系統月份數 ledger.
+
+Background
+----------
+``received_months_system_ledger`` is derived from ``payment_roster_items``:
+the ORM write hooks in ``app.services.received_months_service`` recompute
+the affected (學號, scholarship_configuration) rows inside every transaction
+that creates, excludes, restores or deletes a roster item, or moves a roster
+through its statuses (incl. lock/unlock). Anything that bypasses the ORM —
+hand-written SQL, a restored dump, a hotfix in psql — can leave it stale.
+
+What this script does
+---------------------
+* ``--verify`` recomputes the aggregate and lists every ledger row that
+  disagrees (missing, extra or wrong counts). Read-only. Exits 1 on drift.
+* Without flags it replaces the whole ledger with a fresh aggregate in one
+  transaction, so concurrent readers see either the old or the new ledger.
+
+Usage
+-----
+    # from the backend/ directory (or inside the backend container)
+    python -m app.scripts.rebuild_received_months_ledger --verify
+    python -m app.scripts.rebuild_received_months_ledger          # rebuild
+"""
+
+import argparse
+import logging
+import sys
+
+from app.db.session import SessionLocal
+from app.services.received_months_service import rebuild_ledger, verify_ledger
+
+logger = logging.getLogger("rebuild_received_months_ledger")
+
+# Drift rows printed in full; the rest are only counted.
+_MAX_REPORTED = 50
+
+
+def verify() -> int:
+    with SessionLocal() as db:
+        drifts = verify_ledger(db)
+    if not drifts:
+        logger.info("received_months_system_ledger is in sync")
+        return 0
+    for drift in drifts[:_MAX_REPORTED]:
+        logger.warning(
+            "drift student=%s config=%s system %s->%s paid %s->%s",
+            drift.student_number,
+            drift.scholarship_configuration_id,
+            drift.actual_system,
+            drift.expected_system,
+            drift.actual_paid,
+            drift.expected_paid,
+        )
+    logger.warning("%d ledger row(s) out of sync; run without --verify to rebuild", len(drifts))
+    return 1
+
+
+def rebuild() -> int:
+    with SessionLocal() as db:
+        written = rebuild_ledger(db)
+        db.commit()
+    logger.info("received_months_system_ledger rebuilt: %d row(s)", written)
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild or verify the received-months (系統月份數) ledger.")
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Compare the ledger with payment_roster_items without writing; exit 1 on drift.",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+    return verify() if args.verify else rebuild()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,7 +9,9 @@ from typing import Any, Dict, List, Optional
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
+from app.core.encrypted_json import skip_pii_decryption
 from app.models.application import Application, ApplicationStatus
 
 # Student model removed - student data now fetched from external API
@@ -39,14 +41,21 @@ class ScholarshipAnalyticsService:
             if not start_date:
                 start_date = end_date - timedelta(days=365)  # Last year
 
-            # Base query
-            stmt = select(Application).where(Application.created_at >= start_date, Application.created_at <= end_date)
+            # Base query; type_analysis reads app.scholarship, which cannot
+            # lazy-load on an AsyncSession.
+            stmt = (
+                select(Application)
+                .options(selectinload(Application.scholarship))
+                .where(Application.created_at >= start_date, Application.created_at <= end_date)
+            )
 
             if semester:
                 stmt = stmt.where(Application.semester == semester)
 
-            result = await self.db.execute(stmt)
-            applications = result.scalars().all()
+            # Aggregates only; no row's national ID is ever read.
+            with skip_pii_decryption():
+                result = await self.db.execute(stmt)
+                applications = result.scalars().all()
 
             analytics = {
                 "date_range": {
@@ -462,8 +471,9 @@ class ScholarshipAnalyticsService:
             start_date = end_date - timedelta(days=365)
 
             stmt = select(Application).where(Application.created_at >= start_date, Application.created_at <= end_date)
-            result = await self.db.execute(stmt)
-            historical_apps = result.scalars().all()
+            with skip_pii_decryption():
+                result = await self.db.execute(stmt)
+                historical_apps = result.scalars().all()
 
             # Calculate monthly averages
             monthly_data = {}
@@ -7,13 +7,19 @@ two paths belongs here — that is the module's only admission criterion.
 """
 
 import logging
+import threading
+from collections import deque
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncContextManager, Callable, Deque, Dict, List, Optional, Tuple
 
 from sqlalchemy import and_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.exceptions import ValidationError
+from app.db.session import get_db_session
 from app.models.application_sequence import ApplicationSequence
 from app.models.enums import ApplicationStatus, ReviewStage
 from app.models.user import User, UserRole
@@ -78,6 +84,15 @@ def build_submitted_application_values(scholarship, config) -> Dict[str, Any]:
     }
 
 
+def _sequence_semester(semester) -> str:
+    """Normalize a Semester / string / None to the application_sequences key."""
+    if semester is None:
+        return "yearly"
+    if hasattr(semester, "value"):
+        return semester.value
+    return semester
+
+
 async def generate_app_id(
     db: AsyncSession,
     academic_year: int,
@@ -86,48 +101,148 @@ async def generate_app_id(
     suffix: str = "",
     commit: bool = True,
 ) -> str:
-    """Generate a sequential application ID with database row locking.
+    """Generate an application ID.
 
     Format: APP-{academic_year}-{semester_code}-{sequence:05d}{suffix}
 
-    commit=True releases the sequence row lock immediately (student path).
-    commit=False keeps the lock until the caller's transaction ends — the
-    batch import path relies on this to stay atomic, at the cost of
-    blocking online submissions for the duration of the import.
+    On PostgreSQL the number comes from this worker's cached block
+    (app_id_allocator), so the caller's transaction never touches — let
+    alone locks — the application_sequences row, and a long-running import
+    cannot hold up online submissions. Numbers are unique but not gap-free:
+    a rolled-back application or an unused tail of a block is skipped.
+
+    Other dialects (SQLite in tests and local dev) lock and increment the
+    row inside the caller's transaction; commit=True commits right away.
     """
-    if semester is None:
-        semester = "yearly"
-    if hasattr(semester, "value"):
-        semester = semester.value
+    semester = _sequence_semester(semester)
 
-    stmt = (
-        select(ApplicationSequence)
-        .where(
-            and_(
-                ApplicationSequence.academic_year == academic_year,
-                ApplicationSequence.semester == semester,
+    if _allocates_autonomously(db):
+        sequence_num = await app_id_allocator.next(academic_year, semester)
+    else:
+        stmt = (
+            select(ApplicationSequence)
+            .where(
+                and_(
+                    ApplicationSequence.academic_year == academic_year,
+                    ApplicationSequence.semester == semester,
+                )
             )
+            .with_for_update()
+            # reserve_app_id_block advances the counter with a Core UPDATE;
+            # never trust a copy of the row already in the identity map.
+            .execution_options(populate_existing=True)
         )
-        .with_for_update()
-    )
-    result = await db.execute(stmt)
-    seq_record = result.scalar_one_or_none()
+        result = await db.execute(stmt)
+        seq_record = result.scalar_one_or_none()
 
-    if not seq_record:
-        seq_record = ApplicationSequence(academic_year=academic_year, semester=semester, last_sequence=0)
-        db.add(seq_record)
-        await db.flush()
+        if not seq_record:
+            seq_record = ApplicationSequence(academic_year=academic_year, semester=semester, last_sequence=0)
+            db.add(seq_record)
+            await db.flush()
 
-    seq_record.last_sequence += 1
-    sequence_num = seq_record.last_sequence
+        seq_record.last_sequence += 1
+        sequence_num = seq_record.last_sequence
 
-    if commit:
-        await db.commit()
+        if commit:
+            await db.commit()
 
     app_id = ApplicationSequence.format_app_id(academic_year, semester, sequence_num)
     return f"{app_id}{suffix}"
 
 
+async def reserve_app_id_block(db: AsyncSession, academic_year: int, semester, count: int) -> int:
+    """Advance the (academic_year, semester) counter by `count` in one
+    statement and return the first number of the reserved range.
+
+    The row stays locked until `db`'s transaction ends; callers that must
+    not hold it go through allocate_app_id_block.
+    """
+    semester = _sequence_semester(semester)
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = (
+        insert(ApplicationSequence)
+        .values(academic_year=academic_year, semester=semester, last_sequence=count)
+        .on_conflict_do_update(
+            index_elements=[ApplicationSequence.academic_year, ApplicationSequence.semester],
+            set_={"last_sequence": ApplicationSequence.last_sequence + count},
+        )
+        .returning(ApplicationSequence.last_sequence)
+    )
+    last_sequence = (await db.execute(stmt)).scalar_one()
+    return last_sequence - count + 1
+
+
+async def allocate_app_id_block(db: AsyncSession, academic_year: int, semester, count: int) -> int:
+    """Reserve `count` consecutive sequence numbers for a set-based insert
+    and return the first. Same dialect split as generate_app_id: its own
+    short transaction on PostgreSQL, the caller's elsewhere.
+    """
+    if _allocates_autonomously(db):
+        return await app_id_allocator.reserve(academic_year, _sequence_semester(semester), count)
+    return await reserve_app_id_block(db, academic_year, semester, count)
+
+
+def _allocates_autonomously(db: AsyncSession) -> bool:
+    # SQLite has no row locks to avoid, and a second connection could not
+    # write while the caller's transaction holds the database write lock.
+    return db.get_bind().dialect.name == "postgresql"
+
+
+class AppIdAllocator:
+    """
+    Hi/lo application sequence numbers
+
+    Each worker process reserves blocks of ``settings.app_id_block_size``
+    numbers per (academic_year, semester) and hands them out from memory.
+    A block is reserved by one upsert on application_sequences committed in
+    its own session, so the row lock lasts a single statement and never
+    spans a caller's transaction. last_sequence is therefore a high-water
+    mark, not a count of issued IDs.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncContextManager[AsyncSession]] = get_db_session):
+        self._session_factory = session_factory
+        self._ranges: Dict[Tuple[int, str], Deque[List[int]]] = {}
+        # Plain lock: the cache is shared by every event loop in the process
+        # (request loop, scheduler threads) and is only held for dict work.
+        self._mutex = threading.Lock()
+
+    async def next(self, academic_year: int, semester: str) -> int:
+        key = (academic_year, semester)
+        while (sequence := self._take(key)) is None:
+            block_size = max(1, settings.app_id_block_size)
+            first = await self.reserve(academic_year, semester, block_size)
+            with self._mutex:
+                self._ranges.setdefault(key, deque()).append([first, first + block_size - 1])
+        return sequence
+
+    async def reserve(self, academic_year: int, semester: str, count: int) -> int:
+        """Reserve `count` numbers in a separate, immediately committed transaction."""
+        async with self._session_factory() as session:
+            first = await reserve_app_id_block(session, academic_year, semester, count)
+            await session.commit()
+        return first
+
+    def reset(self) -> None:
+        """Forget cached blocks (their unused numbers become gaps)."""
+        with self._mutex:
+            self._ranges.clear()
+
+    def _take(self, key: Tuple[int, str]) -> Optional[int]:
+        with self._mutex:
+            ranges = self._ranges.get(key)
+            while ranges:
+                current = ranges[0]
+                if current[0] <= current[1]:
+                    current[0] += 1
+                    return current[0] - 1
+                ranges.popleft()
+        return None
+
+
+app_id_allocator = AppIdAllocator()
+
+
 async def assign_professor_from_profile(
     db: AsyncSession, application, user_id: int, profile: Optional[UserProfile] = None
 ) -> Optional[User]:
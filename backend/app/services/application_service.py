@@ -15,6 +15,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.cache import invalidate as cache_invalidate
+from app.core.config import settings
 from app.core.exceptions import AuthorizationError, BusinessLogicError, NotFoundError, ValidationError
 from app.core.metrics import scholarship_applications_total
 from app.core.schema_validation import serialize_value
@@ -34,10 +35,12 @@ from app.schemas.application import (
     ApplicationUpdate,
     StudentDataSchema,
 )
+from app.services.blob_store import acquire_blob, release_blob
 from app.services.eligibility_service import EligibilityService
 from app.services.email_automation_service import email_automation_service
 from app.services.email_service import EmailService
-from app.services.minio_service import minio_service
+from app.services.file_derivative_service import process_application_file_derivatives
+from app.services.minio_service import MinIOService, minio_service
 from app.services.student_service import StudentService
 from app.utils.college_scope import (
     college_scope_for_user,
@@ -45,6 +48,7 @@ from app.utils.college_scope import (
     get_application_college_code,
     get_user_college_code,
 )
+from app.utils.json_fields import form_field, student_field
 from app.utils.phone_validation import (
     TAIWAN_MOBILE_MESSAGE,
     extract_contact_phone,
@@ -1756,9 +1760,14 @@ class ApplicationService:
         return result.scalars().first()
 
     async def upload_application_file_minio(
-        self, application_id: int, user: User, file, file_type: str
+        self, application_id: int, user: User, file, file_type: str, background_tasks=None
     ) -> Dict[str, Any]:
-        """Upload application file using MinIO"""
+        """Upload application file using MinIO
+
+        With ``background_tasks`` (FastAPI BackgroundTasks), the upload's
+        derivatives — content hash, normalized PDF page, thumbnail, OCR text —
+        are produced after the response (see file_derivative_service).
+        """
         # Verify application exists and user has access. FOR UPDATE serializes
         # concurrent uploads to the same application (double-click, second tab,
         # the admin dialog's parallel uploads): the replace-stale-rows logic
@@ -1805,8 +1814,15 @@ class ApplicationService:
             # Other roles are not allowed to upload
             raise AuthorizationError("Upload access denied")
 
-        # Upload file to MinIO
-        object_name, file_size = await minio_service.upload_file(file, application_id, file_type)
+        # Upload file to MinIO. The blob reference is taken before the upload
+        # checks whether the content is already stored, so blob_store's GC
+        # cannot remove an object this upload is about to reuse.
+        object_name, file_size = await minio_service.upload_file(
+            file,
+            application_id,
+            file_type,
+            reserve=lambda blob_object_name, size: acquire_blob(self.db, blob_object_name, size, file.content_type),
+        )
 
         # Import ApplicationFile here to avoid circular imports
         from app.models.application import ApplicationFile
@@ -1833,10 +1849,15 @@ class ApplicationService:
                 stale_stmt = stale_stmt.where(ApplicationFile.original_filename == file.filename)
             stale_result = await self.db.execute(stale_stmt)
             for stale_file in stale_result.scalars().all():
-                if stale_file.object_name and stale_file.object_name != object_name:
-                    # Deleted from MinIO only AFTER the commit below succeeds — a
-                    # failed commit must not leave surviving DB rows pointing at
-                    # already-deleted objects.
+                # Content-addressed blobs are shared between rows: drop this
+                # row's reference and leave the object and its derivatives to
+                # blob_store's GC.
+                if await release_blob(self.db, stale_file.object_name):
+                    pass
+                elif stale_file.object_name and stale_file.object_name != object_name:
+                    # Legacy per-application object: deleted from MinIO only
+                    # AFTER the commit below succeeds — a failed commit must not
+                    # leave surviving DB rows pointing at already-deleted objects.
                     stale_object_names.append(stale_file.object_name)
                 await self.db.delete(stale_file)
 
@@ -1847,7 +1868,8 @@ class ApplicationService:
             original_filename=file.filename,  # Store original filename
             file_type=file_type,
             file_size=file_size,
-            object_name=object_name,  # This is now UUID-based path
+            object_name=object_name,  # Content-addressed blob (blobs/{sha[:2]}/{sha})
+            content_sha256=MinIOService.blob_sha256(object_name),
             uploaded_at=datetime.now(timezone.utc),
             content_type=file.content_type or "application/octet-stream",
             mime_type=file.content_type or "application/octet-stream",
@@ -1857,11 +1879,16 @@ class ApplicationService:
         await self.db.commit()
         await self.db.refresh(file_record)
 
-        # Replaced rows are durably gone; now drop their objects. to_thread
-        # because the MinIO client is synchronous network I/O; delete_file
-        # logs and returns False on failure (an orphaned object is harmless).
+        # Replaced rows are durably gone; now drop their objects and the
+        # thumbnail / normalized page derived from them. to_thread because the
+        # MinIO client is synchronous network I/O; both calls log and carry on
+        # on failure (an orphaned object is harmless).
         for stale_object_name in stale_object_names:
             await asyncio.to_thread(minio_service.delete_file, stale_object_name)
+            await asyncio.to_thread(minio_service.delete_derivatives, stale_object_name)
+
+        if background_tasks is not None and settings.file_derivatives_enabled:
+            background_tasks.add_task(process_application_file_derivatives, file_record.id)
 
         return {
             "success": True,
@@ -1884,11 +1911,11 @@ class ApplicationService:
             if field.startswith("student."):
                 # 搜尋學生資料
                 json_path = field.replace("student.", "")
-                query = query.filter(Application.student_data[json_path].astext == str(value))
+                query = query.filter(student_field(json_path) == str(value))
             elif field.startswith("form."):
                 # 搜尋表單資料
                 json_path = field.replace("form.", "")
-                query = query.filter(Application.submitted_form_data[json_path].astext == str(value))
+                query = query.filter(form_field(json_path) == str(value))
             else:
                 # 一般欄位搜尋
                 query = query.filter(getattr(Application, field) == value)
@@ -2086,7 +2113,12 @@ class ApplicationService:
             orphaned_objects = []
             if application.files:
                 for app_file in application.files:
+                    if await release_blob(self.db, app_file.object_name):
+                        # Shared content-addressed blob: GC removes it (and its
+                        # derivatives) once unreferenced.
+                        continue
                     if app_file.object_name:
+                        minio_service.delete_derivatives(app_file.object_name)
                         if minio_service.delete_file(app_file.object_name):
                             deleted_files_count += 1
                             logger.info(f"Deleted file from MinIO: {app_file.object_name}")
@@ -2329,13 +2361,20 @@ class ApplicationService:
                     filename = doc_url.split("/")[-1].split("?")[0]
                     source_object_name = f"user-profiles/{user.id}/bank-documents/{filename}"
 
-                # 使用 MinIO 服務複製文件到申請路徑
-                new_object_name = minio_service.clone_file_to_application(
-                    source_object_name=source_object_name,
-                    application_id=application.app_id,
-                )
-
-                logger.debug(f"File cloned from {source_object_name} to {new_object_name}")
+                # 以內容定址參照個人資料文件：相同內容只存一份 blob，
+                # 之後每份申請的「複製」只是新增一筆參照（同步 SDK 呼叫，移至 thread）。
+                # 參照須在 adopt_blob 檢查 blob 是否存在之前取得，避免被 GC 回收。
+                try:
+                    content_sha256, file_size = await asyncio.to_thread(minio_service.source_digest, source_object_name)
+                    new_object_name = MinIOService.blob_object_name(content_sha256)
+                    await acquire_blob(self.db, new_object_name, file_size)
+                    await asyncio.to_thread(minio_service.adopt_blob, source_object_name, content_sha256)
+                except Exception as e:
+                    # 失敗必須直接 raise，嚴禁寫入 placeholder 假檔（同 clone_file_to_application）
+                    logger.exception(f"Failed to adopt profile document {source_object_name}")
+                    raise BusinessLogicError(f"無法複製{doc_config['document_name']}") from e
+
+                logger.debug(f"Profile document {source_object_name} referenced as {new_object_name}")
 
                 # 創建 ApplicationFile 記錄 - 與動態上傳文件相同處理
                 application_file = ApplicationFile(
@@ -2343,9 +2382,10 @@ class ApplicationService:
                     file_type=doc_config["file_type"],
                     filename=filename,
                     original_filename=filename,
-                    file_size=0,  # 大小會在實際使用時獲取
+                    file_size=file_size,
                     content_type="application/octet-stream",  # 會在實際使用時更新
                     object_name=new_object_name,
+                    content_sha256=content_sha256,
                     is_verified=True,  # 固定文件預設已驗證
                     uploaded_at=datetime.now(timezone.utc),
                 )
@@ -2359,6 +2399,7 @@ class ApplicationService:
                         "document_name": doc_config["document_name"],
                         "file_id": application_file.id,
                         "object_name": new_object_name,
+                        "filename": filename,
                     }
                 )
 
@@ -2385,8 +2426,8 @@ class ApplicationService:
                         "document_type": cloned_doc["file_type"],
                         "document_name": cloned_doc["document_name"],
                         "file_id": cloned_doc["file_id"],
-                        "filename": cloned_doc["object_name"].split("/")[-1],
-                        "original_filename": cloned_doc["object_name"].split("/")[-1],
+                        "filename": cloned_doc["filename"],
+                        "original_filename": cloned_doc["filename"],
                         "file_path": f"{base_url}/files/applications/{application.id}/files/{cloned_doc['file_id']}?token={access_token}",
                         "download_url": f"{base_url}/files/applications/{application.id}/files/{cloned_doc['file_id']}/download?token={access_token}",
                         "object_name": cloned_doc["object_name"],
@@ -6,7 +6,9 @@ for college staff importing offline collected student data.
 """
 
 import asyncio
+import hashlib
 import io
+import json
 import logging
 from datetime import datetime, timezone
 from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
@@ -16,6 +18,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.cache import cached
 from app.core.exceptions import NotFoundError, ServiceUnavailableError
 from app.models.application import Application
 from app.models.batch_import import BatchImport
@@ -33,6 +36,7 @@ from app.services.application_builder import (
     generate_app_id,
     order_sub_type_preferences,
 )
+from app.services import bulk_import_writer
 from app.services.eligibility_service import EligibilityService
 from app.services.student_service import StudentService
 
@@ -168,6 +172,20 @@ SUB_TYPE_CODE_BY_LABEL = {
 SIS_LOOKUP_CONCURRENCY = 10
 
 
+# Import row key → UserProfile column
+_PROFILE_FIELD_MAP = {
+    "postal_account": "account_number",
+    "advisor_name": "advisor_name",
+    "advisor_email": "advisor_email",
+    "advisor_nycu_id": "advisor_nycu_id",
+}
+
+
+def _profile_values(row_data: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """The UserProfile values an import row carries (blank → None)."""
+    return {profile_attr: row_data.get(row_key) or None for row_key, profile_attr in _PROFILE_FIELD_MAP.items()}
+
+
 async def _fetch_per_student(
     student_ids: List[str],
     fetch: Callable[[str], Awaitable[Any]],
@@ -210,6 +228,254 @@ def _make_warning(
     }
 
 
+# ─── Sheet parsing (worker thread) ───────────────────────────────────
+# pd.read_excel (openpyxl) and per-row validation are pure CPU and take
+# seconds for a few thousand rows, so they never run on the event loop. The
+# result is a pure function of (file bytes, parse context) and is cached in
+# Redis under both, so re-uploading the same sheet — a retry after a proxy
+# timeout, or previewing again before confirming — skips the parse entirely.
+# Bump _PARSE_CACHE_VERSION whenever the parsing rules below change.
+IMPORT_PARSE_CACHE_TTL = 3600
+_PARSE_CACHE_VERSION = 1
+
+# Row field → column header, per supported header language.
+_CHINESE_COLUMNS = {
+    "student_id": "學號",
+    "student_name": "學生姓名",
+    "postal_account": "郵局帳號",
+    "advisor_name": "指導教授姓名",
+    "advisor_email": "指導教授Email",
+    "advisor_nycu_id": "指導教授本校人事編號",
+    "renewal_year": "續領年份",
+}
+_ENGLISH_COLUMNS = {field: field for field in _CHINESE_COLUMNS}
+_OPTIONAL_FIELDS = ("postal_account", "advisor_name", "advisor_email", "advisor_nycu_id")
+
+
+def _file_sha256(file_content: bytes) -> str:
+    return hashlib.sha256(file_content).hexdigest()
+
+
+def _parse_cache_key(kind: str, file_sha256: str, context: Dict[str, Any]) -> str:
+    fingerprint = hashlib.sha256(
+        json.dumps(context, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    ).hexdigest()[:16]
+    return f"import-parse:v{_PARSE_CACHE_VERSION}:{kind}:{file_sha256}:{fingerprint}"
+
+
+def read_import_sheet(file_content: bytes, dtype: Any = None) -> pd.DataFrame:
+    """Read an uploaded Excel sheet, falling back to CSV. Blocking: use a thread.
+
+    pandas opens .xlsx with openpyxl in read-only, values-only mode, so the
+    workbook is streamed row by row rather than loaded as an object tree.
+    """
+    try:
+        return pd.read_excel(io.BytesIO(file_content), dtype=dtype)
+    except Exception:
+        return pd.read_csv(io.BytesIO(file_content), dtype=dtype)
+
+
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    """A sheet column, or an all-blank one when the sheet lacks it."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series([None] * len(df), index=df.index, dtype=object)
+
+
+def _identifier_column(series: pd.Series) -> List[str]:
+    return [_normalize_identifier(value) for value in series.tolist()]
+
+
+def _optional_column(series: pd.Series) -> List[Optional[str]]:
+    return [_normalize_optional(value) for value in series.tolist()]
+
+
+def _marked_columns(columns: List[Tuple[str, pd.Series]]) -> List[List[str]]:
+    """Per row, the sub-type codes marked in ``(code, column)`` order, deduped."""
+    if not columns:
+        return []
+    marks = pd.DataFrame({i: series.map(_is_sub_type_marked).astype(bool) for i, (_, series) in enumerate(columns)})
+    codes = [code for code, _ in columns]
+    selected_rows = []
+    for row in marks.itertuples(index=False, name=None):
+        selected: List[str] = []
+        for code, marked in zip(codes, row):
+            if marked and code not in selected:
+                selected.append(code)
+        selected_rows.append(selected)
+    return selected_rows
+
+
+def _parse_error(
+    row_number: int, student_id: Optional[str], field: str, error_type: str, message: str
+) -> Dict[str, Any]:
+    return {
+        "row_number": row_number,
+        "student_id": student_id,
+        "field": field,
+        "error_type": error_type,
+        "message": message,
+    }
+
+
+def _parse_batch_content(file_content: bytes, context: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Read and validate one batch-import sheet (worker thread, no DB access).
+
+    Normalization is column-wise: each column is converted once into a list
+    and rows are assembled by zipping them, instead of building a pandas
+    Series per row with ``iterrows`` and looking every cell up by label.
+    """
+    try:
+        # dtype=object keeps each cell's own type (text cells stay text)
+        # instead of coercing whole columns — column-level int64 inference
+        # ate leading zeros in text cells like 聯絡電話 "09xxxxxxxxx" (#1140).
+        df = read_import_sheet(file_content, dtype=object)
+    except Exception as e:
+        return {"data": [], "errors": [_parse_error(0, None, "file", "parse_error", f"無法解析檔案: {str(e)}")]}
+
+    df_columns = set(df.columns)
+
+    # Validate required columns (check both Chinese and English names)
+    required_columns_chinese = ["學號", "學生姓名"]
+    required_columns_english = ["student_id", "student_name"]
+    has_chinese = all(col in df_columns for col in required_columns_chinese)
+    has_english = all(col in df_columns for col in required_columns_english)
+    if not has_chinese and not has_english:
+        message = f"缺少必要欄位: {', '.join(required_columns_chinese)} (或 {', '.join(required_columns_english)})"
+        return {"data": [], "errors": [_parse_error(0, None, "columns", "missing_columns", message)]}
+
+    custom_field_types = context["custom_field_types"]
+    if has_chinese:
+        names = _CHINESE_COLUMNS
+        # Any positive number or checkmark = applied; ordering is forced by
+        # shared rule (moe_1w first), NOT by cell numbers. Dedupe: a sheet may
+        # carry both the label column (國科會) and the raw-code column (nstc).
+        sub_type_columns = [
+            (code, df[label]) for label, code in context["sub_type_labels"].items() if label in df_columns
+        ]
+        custom_columns = [
+            (field_name, df[label])
+            for label, field_name in context["custom_field_mapping"].items()
+            if label in df_columns
+        ]
+    else:
+        # English column format (backward compatibility). Iterate df.columns
+        # (ordered), NOT the df_columns set — set order would make non-moe
+        # preference order random. Codes are lowercased (sub_type_MOE_1W must
+        # still hit the forced moe_1w rule).
+        names = _ENGLISH_COLUMNS
+        sub_type_columns = [
+            (col.replace("sub_type_", "").lower(), df[col])
+            for col in df.columns
+            if isinstance(col, str) and col.startswith("sub_type_")
+        ]
+        custom_columns = [
+            (col.replace("custom_", ""), df[col])
+            for col in df.columns
+            if isinstance(col, str) and col.startswith("custom_")
+        ]
+
+    row_numbers = [idx + 2 for idx in df.index]  # Excel row number (header is 1)
+    student_ids = _identifier_column(_column(df, names["student_id"]))
+    student_names = _identifier_column(_column(df, names["student_name"]))
+    optional_values = {field: _optional_column(_column(df, names[field])) for field in _OPTIONAL_FIELDS}
+    renewals = [_parse_renewal_year(value) for value in _column(df, names["renewal_year"]).tolist()]
+    selected_sub_types = _marked_columns(sub_type_columns) or [[] for _ in row_numbers]
+    custom_values = [
+        (field_name, custom_field_types.get(field_name), series.tolist(), series.notna().tolist())
+        for field_name, series in custom_columns
+    ]
+
+    errors: List[Dict[str, Any]] = []
+    parsed_data: List[Dict[str, Any]] = []
+    seen_student_ids: set = set()
+    real_sub_types = context["real_sub_types"]
+    for i, row_number in enumerate(row_numbers):
+        student_id = student_ids[i]
+        if not student_id:
+            errors.append(_parse_error(row_number, None, "student_id", "missing_required", "學號不可為空"))
+            continue
+
+        # Check for duplicate student_id within the file
+        if student_id in seen_student_ids:
+            errors.append(
+                _parse_error(
+                    row_number,
+                    student_id,
+                    "student_id",
+                    "duplicate_in_file",
+                    f"學號 {student_id} 在檔案中重複出現，每位學生在同一批次中只能有一筆申請 請檢查後重新上傳",
+                )
+            )
+            continue
+        seen_student_ids.add(student_id)
+
+        try:
+            is_renewal, renewal_year = renewals[i]
+            data_row = {
+                "student_id": student_id,
+                "student_name": student_names[i],
+                **{field: values[i] for field, values in optional_values.items()},
+                "is_renewal": is_renewal,
+                "renewal_year": renewal_year,
+                "sub_types": order_sub_type_preferences(selected_sub_types[i]),
+                "custom_fields": {
+                    field_name: _normalize_custom_field_value(values[i], field_type)
+                    for field_name, field_type, values, present in custom_values
+                    if present[i]
+                },
+            }
+
+            # Validate using Pydantic schema and capture normalized values
+            normalized_row = ApplicationDataRow(**data_row).model_dump()
+            normalized_row["row_number"] = row_number
+
+            # Sub-type is mandatory when the scholarship defines real
+            # sub-types — a row with none marked cannot be imported
+            # (it would fall into the synthetic "general" bucket which
+            # matches no distribution quota slot).
+            if real_sub_types and not normalized_row.get("sub_types"):
+                errors.append(
+                    _parse_error(
+                        row_number,
+                        student_id,
+                        "sub_types",
+                        "missing_sub_type",
+                        "未勾選任何申請類別（國科會/教育部），請於 Excel 中標記後重新上傳",
+                    )
+                )
+                continue
+
+            parsed_data.append(normalized_row)
+
+        except PydanticValidationError as e:
+            errors.append(
+                _parse_error(
+                    row_number,
+                    student_id,
+                    "row_data",
+                    "validation_error",
+                    f"資料驗證失敗：{_format_row_validation_error(e)}",
+                )
+            )
+        except Exception as e:
+            errors.append(
+                _parse_error(row_number, student_id, "row_data", "validation_error", f"資料驗證失敗：{str(e)}")
+            )
+
+    return {"data": parsed_data, "errors": errors}
+
+
+@cached(
+    key_fn=lambda file_sha256, context, file_content: _parse_cache_key("batch", file_sha256, context),
+    ttl=IMPORT_PARSE_CACHE_TTL,
+)
+async def _parse_batch_sheet(
+    file_sha256: str, context: Dict[str, Any], file_content: bytes
+) -> Dict[str, List[Dict[str, Any]]]:
+    return await asyncio.to_thread(_parse_batch_content, file_content, context)
+
+
 class BatchImportService:
     """Service for handling batch import operations"""
 
@@ -368,6 +634,10 @@ class BatchImportService:
         """
         Parse Excel/CSV file and validate data
 
+        The workbook read and row validation run in a worker thread and are
+        cached by file hash + parse context (see _parse_batch_sheet); only
+        the scholarship / field-definition lookups run on the event loop.
+
         Args:
             file_content: File bytes
             scholarship_type_id: Scholarship type ID
@@ -377,35 +647,10 @@ class BatchImportService:
         Returns:
             Tuple of (parsed_data, validation_errors)
         """
-        errors = []
-        parsed_data = []
-
-        try:
-            # Try reading as Excel first. dtype=object keeps each cell's own
-            # type (text cells stay text) instead of coercing whole columns —
-            # column-level int64 inference ate leading zeros in text cells
-            # like 聯絡電話 "09xxxxxxxxx" (#1140).
-            df = pd.read_excel(io.BytesIO(file_content), dtype=object)
-        except Exception:
-            try:
-                # Fallback to CSV
-                df = pd.read_csv(io.BytesIO(file_content), dtype=object)
-            except Exception as e:
-                errors.append(
-                    BatchImportValidationError(
-                        row_number=0,
-                        student_id=None,
-                        field="file",
-                        error_type="parse_error",
-                        message=f"無法解析檔案: {str(e)}",
-                    )
-                )
-                return [], errors
-
         # Get scholarship type for sub_type_list
         scholarship = await self.db.get(ScholarshipType, scholarship_type_id)
         if not scholarship:
-            errors.append(
+            return [], [
                 BatchImportValidationError(
                     row_number=0,
                     student_id=None,
@@ -413,8 +658,7 @@ class BatchImportService:
                     error_type="not_found",
                     message=f"獎學金類型 ID {scholarship_type_id} 不存在",
                 )
-            )
-            return [], errors
+            ]
 
         # Real sub-types are the ones that constrain distribution quota slots.
         # The synthetic "general" placeholder (the model default) is NOT a real
@@ -445,200 +689,14 @@ class BatchImportService:
             sub_type_labels.setdefault(raw_code, code)
             sub_type_labels.setdefault(code, code)
 
-        # Pre-compute column set for O(1) membership tests
-        df_columns = set(df.columns)
-
-        # Validate required columns (check both Chinese and English names)
-        required_columns_chinese = ["學號", "學生姓名"]
-        required_columns_english = ["student_id", "student_name"]
-
-        has_chinese = all(col in df_columns for col in required_columns_chinese)
-        has_english = all(col in df_columns for col in required_columns_english)
-
-        if not has_chinese and not has_english:
-            errors.append(
-                BatchImportValidationError(
-                    row_number=0,
-                    student_id=None,
-                    field="columns",
-                    error_type="missing_columns",
-                    message=f"缺少必要欄位: {', '.join(required_columns_chinese)} (或 {', '.join(required_columns_english)})",
-                )
-            )
-            return [], errors
-
-        # Determine which format is used
-        use_chinese_columns = has_chinese
-
-        # Track seen student IDs to detect duplicates within the file
-        seen_student_ids: set = set()
-
-        # Process each row
-        for idx, row in df.iterrows():
-            row_number = idx + 2  # Excel row number (header is 1)
-
-            # Get student_id based on column format
-            if use_chinese_columns:
-                student_id = _normalize_identifier(row.get("學號", ""))
-            else:
-                student_id = _normalize_identifier(row.get("student_id", ""))
-
-            if not student_id:
-                errors.append(
-                    BatchImportValidationError(
-                        row_number=row_number,
-                        student_id=None,
-                        field="student_id",
-                        error_type="missing_required",
-                        message="學號不可為空",
-                    )
-                )
-                continue
-
-            # Check for duplicate student_id within the file
-            if student_id in seen_student_ids:
-                errors.append(
-                    BatchImportValidationError(
-                        row_number=row_number,
-                        student_id=student_id,
-                        field="student_id",
-                        error_type="duplicate_in_file",
-                        message=f"學號 {student_id} 在檔案中重複出現，每位學生在同一批次中只能有一筆申請 請檢查後重新上傳",
-                    )
-                )
-                continue
-
-            # Mark this student_id as seen
-            seen_student_ids.add(student_id)
-
-            # Build application data row
-            try:
-                # Get values based on column format
-                if use_chinese_columns:
-                    is_renewal, renewal_year = _parse_renewal_year(
-                        row.get("續領年份") if "續領年份" in df_columns else None
-                    )
-
-                    data_row = {
-                        "student_id": student_id,
-                        "student_name": _normalize_identifier(row.get("學生姓名", "")),
-                        "postal_account": _normalize_optional(row.get("郵局帳號")),
-                        "advisor_name": _normalize_optional(row.get("指導教授姓名")),
-                        "advisor_email": _normalize_optional(row.get("指導教授Email")),
-                        "advisor_nycu_id": _normalize_optional(row.get("指導教授本校人事編號")),
-                        "is_renewal": is_renewal,
-                        "renewal_year": renewal_year,
-                        "sub_types": [],
-                        "custom_fields": {},
-                    }
-
-                    # Parse sub_types from Chinese column names.
-                    # Any positive number or checkmark = applied; ordering is
-                    # forced by shared rule (moe_1w first), NOT by cell numbers.
-                    # Dedupe: a sheet may carry both the label column (國科會)
-                    # and the raw-code column (nstc) for the same sub-type.
-                    selected_sub_types = []
-                    for chinese_label, sub_type_code in sub_type_labels.items():
-                        if (
-                            chinese_label in df_columns
-                            and _is_sub_type_marked(row.get(chinese_label))
-                            and sub_type_code not in selected_sub_types
-                        ):
-                            selected_sub_types.append(sub_type_code)
-                    data_row["sub_types"] = order_sub_type_preferences(selected_sub_types)
-
-                    # Parse custom fields from Chinese column names
-                    for chinese_label, field_name in custom_field_mapping.items():
-                        if chinese_label in df_columns and pd.notna(row.get(chinese_label)):
-                            data_row["custom_fields"][field_name] = _normalize_custom_field_value(
-                                row.get(chinese_label), custom_field_types.get(field_name)
-                            )
-                else:
-                    # English column format (backward compatibility)
-                    is_renewal, renewal_year = _parse_renewal_year(
-                        row.get("renewal_year") if "renewal_year" in df_columns else None
-                    )
-
-                    data_row = {
-                        "student_id": student_id,
-                        "student_name": _normalize_identifier(row.get("student_name", "")),
-                        "postal_account": _normalize_optional(row.get("postal_account")),
-                        "advisor_name": _normalize_optional(row.get("advisor_name")),
-                        "advisor_email": _normalize_optional(row.get("advisor_email")),
-                        "advisor_nycu_id": _normalize_optional(row.get("advisor_nycu_id")),
-                        "is_renewal": is_renewal,
-                        "renewal_year": renewal_year,
-                        "sub_types": [],
-                        "custom_fields": {},
-                    }
-
-                    # Parse sub_types from English column names (sub_type_*).
-                    # Iterate df.columns (ordered), NOT the df_columns set —
-                    # set order would make non-moe preference order random.
-                    # Codes are lowercased (sub_type_MOE_1W must still hit the
-                    # forced moe_1w rule) and deduped.
-                    selected_sub_types = []
-                    for col in df.columns:
-                        if col.startswith("sub_type_") and _is_sub_type_marked(row.get(col)):
-                            code = col.replace("sub_type_", "").lower()
-                            if code not in selected_sub_types:
-                                selected_sub_types.append(code)
-                    data_row["sub_types"] = order_sub_type_preferences(selected_sub_types)
-
-                    # Parse custom fields from English column names (custom_*)
-                    for col in df_columns:
-                        if col.startswith("custom_"):
-                            field_name = col.replace("custom_", "")
-                            if pd.notna(row.get(col)):
-                                data_row["custom_fields"][field_name] = _normalize_custom_field_value(
-                                    row.get(col), custom_field_types.get(field_name)
-                                )
-
-                # Validate using Pydantic schema and capture normalized values
-                validated_row = ApplicationDataRow(**data_row)
-                normalized_row = validated_row.model_dump()
-                normalized_row["row_number"] = row_number
-
-                # Sub-type is mandatory when the scholarship defines real
-                # sub-types — a row with none marked cannot be imported
-                # (it would fall into the synthetic "general" bucket which
-                # matches no distribution quota slot).
-                if real_sub_types and not normalized_row.get("sub_types"):
-                    errors.append(
-                        BatchImportValidationError(
-                            row_number=row_number,
-                            student_id=student_id,
-                            field="sub_types",
-                            error_type="missing_sub_type",
-                            message="未勾選任何申請類別（國科會/教育部），請於 Excel 中標記後重新上傳",
-                        )
-                    )
-                    continue
-
-                parsed_data.append(normalized_row)
-
-            except PydanticValidationError as e:
-                errors.append(
-                    BatchImportValidationError(
-                        row_number=row_number,
-                        student_id=student_id,
-                        field="row_data",
-                        error_type="validation_error",
-                        message=f"資料驗證失敗：{_format_row_validation_error(e)}",
-                    )
-                )
-            except Exception as e:
-                errors.append(
-                    BatchImportValidationError(
-                        row_number=row_number,
-                        student_id=student_id,
-                        field="row_data",
-                        error_type="validation_error",
-                        message=f"資料驗證失敗：{str(e)}",
-                    )
-                )
-
-        return parsed_data, errors
+        context = {
+            "real_sub_types": real_sub_types,
+            "sub_type_labels": sub_type_labels,
+            "custom_field_mapping": custom_field_mapping,
+            "custom_field_types": custom_field_types,
+        }
+        result = await _parse_batch_sheet(_file_sha256(file_content), context, file_content)
+        return result["data"], [BatchImportValidationError(**error) for error in result["errors"]]
 
     async def check_duplicate_application(
         self, student_id: str, scholarship_type_id: int, academic_year: int, semester: Optional[str]
@@ -944,7 +1002,7 @@ class BatchImportService:
                 self.student_service.get_student_basic_info,
             )
 
-            new_users = []
+            new_user_values = []
             for row in parsed_data:
                 student_id = row["student_id"]
                 if student_id in missing_student_ids:
@@ -962,24 +1020,32 @@ class BatchImportService:
                         )
                         sis_data = None
 
-                    new_user = User(
-                        nycu_id=student_id,
-                        name=sis_data.get("std_cname") if sis_data else row["student_name"],
-                        email=sis_data.get("com_email") if sis_data and sis_data.get("com_email") else None,
-                        user_type="student",
-                        role="student",
-                        dept_code=sis_data.get("std_depno") if sis_data else None,
-                        raw_data={
-                            "imported_from_batch": True,
-                            "batch_import_data": row,
-                            "raw_sis_data": sis_data if sis_data else None,
-                        },
+                    new_user_values.append(
+                        {
+                            "nycu_id": student_id,
+                            "name": sis_data.get("std_cname") if sis_data else row["student_name"],
+                            "email": sis_data.get("com_email") if sis_data and sis_data.get("com_email") else None,
+                            "dept_code": sis_data.get("std_depno") if sis_data else None,
+                            "raw_data": {
+                                "imported_from_batch": True,
+                                "batch_import_data": row,
+                                "raw_sis_data": sis_data if sis_data else None,
+                            },
+                        }
                     )
-                    new_users.append(new_user)
-                    self.db.add(new_user)
 
-            # Flush to get IDs
-            await self.db.flush()
+            if bulk_import_writer.use_bulk_write(len(new_user_values)):
+                # COPY-staged merge; ON CONFLICT also absorbs a user created
+                # concurrently (e.g. first SSO login) since the SELECT above.
+                await bulk_import_writer.merge_users(self.db, new_user_values)
+                created = await self.db.execute(select(User).where(User.nycu_id.in_(missing_student_ids)))
+                new_users = list(created.scalars().all())
+            else:
+                new_users = [User(user_type="student", role="student", **values) for values in new_user_values]
+                for user in new_users:
+                    self.db.add(user)
+                # Flush to get IDs
+                await self.db.flush()
 
             # Update user_map with new users
             for user in new_users:
@@ -1006,14 +1072,7 @@ class BatchImportService:
             profile = UserProfile(user_id=user.id)
             self.db.add(profile)
 
-        field_map = {
-            "postal_account": "account_number",
-            "advisor_name": "advisor_name",
-            "advisor_email": "advisor_email",
-            "advisor_nycu_id": "advisor_nycu_id",
-        }
-        for row_key, profile_attr in field_map.items():
-            value = row_data.get(row_key)
+        for profile_attr, value in _profile_values(row_data).items():
             if value:
                 setattr(profile, profile_attr, value)
 
@@ -1147,19 +1206,35 @@ class BatchImportService:
                 ),
             )
 
-            # Step 2: Bulk create applications
+            # Step 2: Bulk create applications. Large imports are written
+            # set-based (bulk_import_writer); small ones through the ORM.
+            bulk_write = bulk_import_writer.use_bulk_write(len(parsed_data))
+            shared_values = {
+                "scholarship_type_id": scholarship_type_id,
+                "scholarship_configuration_id": scholarship_config.id,
+                "scholarship_name": submitted_values["scholarship_name"],
+                "amount": submitted_values["amount"],
+                "sub_type_selection_mode": scholarship.sub_type_selection_mode,
+                "academic_year": academic_year,
+                "semester": semester,
+                "status": submitted_values["status"],
+                "status_name": submitted_values["status_name"],
+                "review_stage": submitted_values["review_stage"],
+                "imported_by_id": batch_import.importer_id,
+                "batch_import_id": batch_import.id,
+                "import_source": "batch_import",
+                "document_status": "pending_documents",
+                "submitted_at": submitted_values["submitted_at"],
+            }
             applications = []
+            bulk_rows = []
+            profile_rows = []
             for idx, row_data in enumerate(parsed_data):
                 student_id = row_data["student_id"]
                 current_row = idx + 2  # Track current row for error reporting
 
                 user = user_map[student_id]
 
-                # Shared sequence logic; commit=False holds the row lock for
-                # the whole batch transaction (atomicity over concurrency —
-                # online submissions block during the import, intentionally).
-                app_id = await generate_app_id(self.db, academic_year, semester, suffix="U", commit=False)
-
                 # Prefetched SIS snapshot (includes both basic info and term data)
                 student_data = None
                 snapshot = snapshot_map.get(student_id)
@@ -1182,32 +1257,27 @@ class BatchImportService:
                     field_definitions, row_data.get("custom_fields", {})
                 )
 
-                application = Application(
-                    app_id=app_id,
-                    user_id=user.id,
-                    scholarship_type_id=scholarship_type_id,
-                    scholarship_configuration_id=scholarship_config.id,
-                    scholarship_name=submitted_values["scholarship_name"],
-                    amount=submitted_values["amount"],
-                    sub_scholarship_type=derive_sub_scholarship_type(row_data.get("sub_types")),
-                    scholarship_subtype_list=row_data.get("sub_types", []),
-                    sub_type_preferences=row_data.get("sub_types", []) or None,
-                    sub_type_selection_mode=scholarship.sub_type_selection_mode,
-                    academic_year=academic_year,
-                    semester=semester,
-                    is_renewal=row_data.get("is_renewal", False),
-                    renewal_year=row_data.get("renewal_year"),
-                    status=submitted_values["status"],
-                    status_name=submitted_values["status_name"],
-                    review_stage=submitted_values["review_stage"],
-                    imported_by_id=batch_import.importer_id,
-                    batch_import_id=batch_import.id,
-                    import_source="batch_import",
-                    document_status="pending_documents",
-                    submitted_at=submitted_values["submitted_at"],
-                    student_data=student_data,
-                    submitted_form_data=submitted_form_data,
-                )
+                row_values = {
+                    "user_id": user.id,
+                    "sub_scholarship_type": derive_sub_scholarship_type(row_data.get("sub_types")),
+                    "scholarship_subtype_list": row_data.get("sub_types", []),
+                    "sub_type_preferences": row_data.get("sub_types", []) or None,
+                    "is_renewal": row_data.get("is_renewal", False),
+                    "renewal_year": row_data.get("renewal_year"),
+                    "student_data": student_data,
+                    "submitted_form_data": submitted_form_data,
+                }
+                if bulk_write:
+                    bulk_rows.append(row_values)
+                    profile_rows.append((user.id, _profile_values(row_data)))
+                    continue
+
+                # Shared sequence logic. The number is allocated outside this
+                # transaction, so a rolled-back import leaves a gap but never
+                # holds up online submissions.
+                app_id = await generate_app_id(self.db, academic_year, semester, suffix="U", commit=False)
+
+                application = Application(app_id=app_id, **shared_values, **row_values)
                 applications.append(application)
                 self.db.add(application)
 
@@ -1217,11 +1287,26 @@ class BatchImportService:
                 profile = await self.upsert_user_profile(user, row_data)
                 await assign_professor_from_profile(self.db, application, user.id, profile=profile)
 
-            # Flush all applications at once
-            await self.db.flush()
+            if bulk_write:
+                # Same three steps, one statement each: profiles, then
+                # applications (app_ids from one reserved sequence block),
+                # then professor auto-assign from the merged profiles.
+                await bulk_import_writer.merge_user_profiles(self.db, profile_rows)
+                created_ids = await bulk_import_writer.insert_applications(
+                    self.db,
+                    bulk_rows,
+                    shared_values,
+                    academic_year=academic_year,
+                    sequence_semester=semester,
+                    suffix="U",
+                )
+                await bulk_import_writer.assign_professors(self.db, created_ids)
+            else:
+                # Flush all applications at once
+                await self.db.flush()
 
-            # Collect created IDs
-            created_ids = [app.id for app in applications]
+                # Collect created IDs
+                created_ids = [app.id for app in applications]
 
         except Exception as e:
             # Rollback all changes on any error
@@ -0,0 +1,181 @@
+"""
+Reference counting and garbage collection for content-addressed blobs
+內容定址檔案的參照計數與回收
+
+Application files are stored once per distinct content under
+``MinIOService.BLOB_PREFIX`` (see ``MinIOService.put_blob`` / ``adopt_blob``)
+and ApplicationFile rows point at the shared object. One ``storage_blobs``
+row per blob tracks how many rows reference it:
+
+  • ``acquire_blob`` when a row starts referencing a blob (upload, clone),
+    before the upload checks whether the object already exists.
+  • ``release_blob`` when a row stops referencing it (replaced, deleted).
+    Legacy per-application objects are not blobs; release returns False and
+    the caller deletes those objects directly, as before.
+  • ``collect_garbage`` (daily scheduler job) first reconciles every
+    ``ref_count`` against the actual ApplicationFile rows — cascades and
+    scripts that bypass release only ever leave counts too high, never too
+    low — then deletes blobs that have stayed unreferenced for
+    ``blob_gc_grace_hours``, together with their ``derivatives/``.
+
+Deduplicated uploads skip the upload when the object exists, so the GC must
+never remove an object an upload has decided to reuse. Both sides go through
+the ``storage_blobs`` row: the upload revives it (``acquire_blob``) before
+its existence check, and the GC deletes each object while holding the row
+lock, after re-checking that the row is still unreferenced and past its
+grace period. An upload that gets there first keeps the blob; one that
+waits on the lock finds the object gone and stores it again.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import and_, case, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import get_db_session
+from app.models.application import ApplicationFile
+from app.models.storage_blob import StorageBlob
+from app.services.minio_service import MinIOService, minio_service
+
+logger = logging.getLogger(__name__)
+
+
+async def acquire_blob(
+    db: AsyncSession, object_name: Optional[str], size: Optional[int] = None, content_type: Optional[str] = None
+) -> bool:
+    """新增一個參照；非 blob 物件回傳 False（不處理）"""
+    content_sha256 = MinIOService.blob_sha256(object_name)
+    if content_sha256 is None:
+        return False
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(StorageBlob).values(
+        content_sha256=content_sha256,
+        object_name=object_name,
+        size=size,
+        content_type=content_type,
+        ref_count=1,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[StorageBlob.content_sha256],
+        set_={"ref_count": StorageBlob.ref_count + 1, "released_at": None},
+    )
+    await db.execute(stmt)
+    return True
+
+
+async def release_blob(db: AsyncSession, object_name: Optional[str]) -> bool:
+    """
+    移除一個參照；非 blob 物件回傳 False，呼叫端應自行刪除該物件
+
+    The object itself is left for ``collect_garbage``; other rows may still
+    reference it, and a concurrent deduplicated upload may be about to.
+    """
+    content_sha256 = MinIOService.blob_sha256(object_name)
+    if content_sha256 is None:
+        return False
+    await db.execute(
+        update(StorageBlob)
+        .where(StorageBlob.content_sha256 == content_sha256)
+        .values(
+            ref_count=case((StorageBlob.ref_count > 0, StorageBlob.ref_count - 1), else_=0),
+            released_at=case((StorageBlob.ref_count <= 1, datetime.now(timezone.utc)), else_=StorageBlob.released_at),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return True
+
+
+async def reconcile_ref_counts(db: AsyncSession) -> None:
+    """Recount references from ApplicationFile rows for every blob."""
+    actual = (
+        select(func.count(ApplicationFile.id))
+        .where(ApplicationFile.object_name == StorageBlob.object_name)
+        .correlate(StorageBlob)
+        .scalar_subquery()
+    )
+    await db.execute(update(StorageBlob).values(ref_count=actual).execution_options(synchronize_session=False))
+    await db.execute(
+        update(StorageBlob)
+        .where(StorageBlob.ref_count == 0, StorageBlob.released_at.is_(None))
+        .values(released_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        update(StorageBlob)
+        .where(StorageBlob.ref_count > 0, StorageBlob.released_at.is_not(None))
+        .values(released_at=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _collectable(cutoff: datetime):
+    return and_(StorageBlob.ref_count <= 0, StorageBlob.released_at < cutoff)
+
+
+async def collect_blob(content_sha256: str, cutoff: datetime) -> bool:
+    """
+    回收單一 blob：鎖定列並重新確認仍未被參照後，才刪除物件與衍生檔
+
+    The object is removed before the row, inside the row's transaction: a
+    failed removal keeps the row for the next run, and an unreferenced row
+    whose object is already gone is harmless (uploads check existence after
+    reviving the row).
+    """
+    async with get_db_session() as db:
+        object_name = (
+            await db.execute(
+                select(StorageBlob.object_name)
+                .where(StorageBlob.content_sha256 == content_sha256, _collectable(cutoff))
+                .with_for_update()
+            )
+        ).scalar_one_or_none()
+        if object_name is None:
+            return False  # re-acquired (or already collected) since it was listed
+        if not await asyncio.to_thread(minio_service.delete_file, object_name):
+            return False
+        await asyncio.to_thread(minio_service.delete_derivatives, object_name)
+        await db.execute(
+            delete(StorageBlob)
+            .where(StorageBlob.content_sha256 == content_sha256)
+            .execution_options(synchronize_session=False)
+        )
+    return True
+
+
+async def collect_garbage(grace_hours: Optional[int] = None) -> int:
+    """
+    回收未被參照的 blob（排程作業）
+
+    Returns the number of blobs deleted. Each candidate is collected in its
+    own short transaction (``collect_blob``), so the row lock that keeps
+    concurrent uploads out is held for one object at a time.
+    """
+    hours = settings.blob_gc_grace_hours if grace_hours is None else grace_hours
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+    try:
+        async with get_db_session() as db:
+            await reconcile_ref_counts(db)
+            await db.commit()
+            candidates = list(
+                (await db.execute(select(StorageBlob.content_sha256).where(_collectable(cutoff)))).scalars().all()
+            )
+    except Exception:
+        logger.exception("blob-gc: failed to collect unreferenced blobs")
+        return 0
+
+    deleted = 0
+    for content_sha256 in candidates:
+        try:
+            if await collect_blob(content_sha256, cutoff):
+                deleted += 1
+        except Exception:
+            logger.exception("blob-gc: failed to collect blob %s", content_sha256)
+    if candidates:
+        logger.info("blob-gc: deleted %s of %s unreferenced blobs", deleted, len(candidates))
+    return deleted
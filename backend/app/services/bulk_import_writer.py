@@ -0,0 +1,372 @@
+"""
+Set-based writes for batch, supplementary and renewal imports
+匯入作業的整批寫入
+
+The import services create Users, UserProfiles and Applications row by row
+through ORM ``add``, with a flush and an app_id allocation per row in some
+paths. For imports of a few thousand rows that is a few thousand round trips. This module writes the
+same rows in a fixed number of statements:
+
+  • ``stage_rows`` loads the rows into a temporary table — ``COPY``
+    (asyncpg ``copy_records_to_table``) on PostgreSQL, one executemany INSERT
+    elsewhere (SQLite in tests).
+  • ``merge_users`` / ``merge_user_profiles`` merge the staged rows with
+    ``INSERT ... SELECT ... ON CONFLICT``.
+  • ``insert_applications`` reserves one block of sequence numbers and
+    inserts every application with a single ``INSERT ... SELECT ...
+    RETURNING``; the app_id is built in SQL from the staged row ordinal.
+  • ``assign_professors`` links every new application to the advisor in its
+    student's profile with one correlated UPDATE.
+
+Everything except the app_id block (``allocate_app_id_block``) runs inside the
+caller's transaction, so the callers' all-or-nothing rollback and per-row error
+reporting are unchanged. Imports smaller than
+``settings.import_bulk_write_min_rows`` keep the ORM path (``use_bulk_write``).
+"""
+
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    any_,
+    bindparam,
+    cast,
+    func,
+    inspect,
+    literal,
+    select,
+    text,
+    true,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.types import TypeDecorator, TypeEngine
+
+from app.core.config import settings
+from app.models.application import Application
+from app.models.application_sequence import ApplicationSequence
+from app.models.user import EmployeeStatus, User, UserRole, UserType
+from app.models.user_profile import UserProfile
+from app.services.application_builder import _sequence_semester, allocate_app_id_block
+
+logger = logging.getLogger(__name__)
+
+# UserProfile columns an import may write; a blank value keeps the stored one.
+PROFILE_COLUMNS = ("account_number", "advisor_name", "advisor_email", "advisor_nycu_id")
+
+_USER_COLUMNS: Sequence[Tuple[str, TypeEngine]] = (
+    ("nycu_id", Text()),
+    ("name", Text()),
+    ("email", Text()),
+    ("dept_code", Text()),
+    ("raw_data", Text()),
+)
+
+# Per-row application values; everything else is constant for one import.
+APPLICATION_ROW_COLUMNS: Sequence[Tuple[str, TypeEngine]] = (
+    ("user_id", Integer()),
+    ("sub_scholarship_type", Text()),
+    ("scholarship_subtype_list", Text()),
+    ("sub_type_preferences", Text()),
+    ("is_renewal", Boolean()),
+    ("renewal_year", Integer()),
+    ("student_data", Text()),
+    ("submitted_form_data", Text()),
+)
+_JSON_ROW_COLUMNS = {"scholarship_subtype_list", "sub_type_preferences", "student_data", "submitted_form_data"}
+
+
+def use_bulk_write(row_count: int) -> bool:
+    """大量匯入才走整批寫入；少量資料的 temp table / COPY 成本不划算"""
+    return row_count >= settings.import_bulk_write_min_rows
+
+
+def _is_postgresql(db: AsyncSession) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _insert(db: AsyncSession):
+    return pg_insert if _is_postgresql(db) else sqlite_insert
+
+
+def _constant(db: AsyncSession, value: Any, column: Column):
+    """A bound constant typed like the target column (explicit CAST on
+    PostgreSQL, where INSERT ... SELECT never casts text to enum / json)."""
+    bound = literal(value, column.type)
+    return cast(bound, column.type) if _is_postgresql(db) else bound
+
+
+def _from_staged(db: AsyncSession, staged: Column, column: Column):
+    """A staged text column converted to the target column's type."""
+    return cast(staged, column.type) if _is_postgresql(db) else staged
+
+
+def _dump_json(value: Any, column: Column, dialect) -> Optional[str]:
+    """Serialize a value for a JSON column, applying the column type's own
+    bind processing first (StudentDataJSON encrypts std_pid there). None
+    stays SQL NULL."""
+    if value is None:
+        return None
+    if isinstance(column.type, TypeDecorator):
+        value = column.type.process_bind_param(value, dialect)
+    return json.dumps(value)
+
+
+def _id_filter(db: AsyncSession, column: Column, ids: List[int]):
+    # One array parameter instead of len(ids) parameters (asyncpg caps a
+    # statement at 32767).
+    if _is_postgresql(db):
+        return column == any_(bindparam("ids", ids, type_=ARRAY(Integer)))
+    return column.in_(ids)
+
+
+async def stage_rows(
+    db: AsyncSession,
+    name: str,
+    columns: Sequence[Tuple[str, TypeEngine]],
+    rows: Iterable[Tuple[Any, ...]],
+) -> Table:
+    """
+    將資料列載入暫存表並回傳該表
+
+    Adds a 1-based ``ord`` column holding each row's position, so merges can
+    keep the caller's row order. On PostgreSQL the table is dropped at commit.
+    """
+    names = ["ord", *(column_name for column_name, _ in columns)]
+    table = Table(
+        name,
+        MetaData(),
+        Column("ord", Integer, nullable=False),
+        *(Column(column_name, column_type) for column_name, column_type in columns),
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP",
+    )
+    records = [(ordinal, *values) for ordinal, values in enumerate(rows, start=1)]
+
+    conn = await db.connection()
+    # A failed earlier import on the same pooled connection may have left it.
+    await conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+    await conn.run_sync(table.create)
+    if not records:
+        return table
+    if _is_postgresql(db):
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(name, records=records, columns=names)
+    else:
+        await conn.execute(table.insert(), [dict(zip(names, record)) for record in records])
+    return table
+
+
+def _insert_select(db: AsyncSession, target: Table, staged: Table, values: Dict[str, Any]):
+    """INSERT INTO target (...) SELECT ... FROM staged ORDER BY ord"""
+    selected = (
+        select(*(value.label(column_name) for column_name, value in values.items()))
+        .select_from(staged)
+        # SQLite needs a WHERE clause to parse INSERT ... SELECT ... ON CONFLICT
+        .where(true())
+        .order_by(staged.c.ord)
+    )
+    return _insert(db)(target).from_select(list(values), selected)
+
+
+async def merge_users(db: AsyncSession, users: List[Dict[str, Any]]) -> None:
+    """
+    以 nycu_id 合併學生帳號；既有帳號保持不變
+
+    Each dict carries nycu_id, name, email, dept_code and raw_data. Callers
+    re-select the User rows they need afterwards.
+    """
+    if not users:
+        return
+    target = User.__table__
+    dialect = db.get_bind().dialect
+    staged = await stage_rows(
+        db,
+        "import_stage_users",
+        _USER_COLUMNS,
+        (
+            (
+                user["nycu_id"],
+                user.get("name"),
+                user.get("email"),
+                user.get("dept_code"),
+                _dump_json(user.get("raw_data"), target.c.raw_data, dialect),
+            )
+            for user in users
+        ),
+    )
+    values = {
+        "nycu_id": staged.c.nycu_id,
+        "name": staged.c.name,
+        "email": staged.c.email,
+        "dept_code": staged.c.dept_code,
+        "raw_data": _from_staged(db, staged.c.raw_data, target.c.raw_data),
+        "user_type": _constant(db, UserType.student, target.c.user_type),
+        "role": _constant(db, UserRole.student, target.c.role),
+        "status": _constant(db, EmployeeStatus.student, target.c.status),
+    }
+    stmt = _insert_select(db, target, staged, values)
+    await db.execute(stmt.on_conflict_do_nothing(index_elements=[target.c.nycu_id]))
+
+
+async def merge_user_profiles(db: AsyncSession, profiles: List[Tuple[int, Dict[str, Optional[str]]]]) -> None:
+    """
+    以 user_id 合併學生個人資料 (郵局帳號、指導教授)
+
+    ``profiles`` is (user_id, {PROFILE_COLUMNS: value}) in row order. A blank
+    value keeps the stored one; a later row for the same student wins, as if
+    the rows had been applied one by one.
+    """
+    merged: Dict[int, Dict[str, Optional[str]]] = {}
+    for user_id, values in profiles:
+        current = merged.setdefault(user_id, dict.fromkeys(PROFILE_COLUMNS))
+        for column_name in PROFILE_COLUMNS:
+            if values.get(column_name):
+                current[column_name] = values[column_name]
+    if not merged:
+        return
+
+    target = UserProfile.__table__
+    staged = await stage_rows(
+        db,
+        "import_stage_profiles",
+        (("user_id", Integer()), *((column_name, Text()) for column_name in PROFILE_COLUMNS)),
+        ((user_id, *(values[column_name] for column_name in PROFILE_COLUMNS)) for user_id, values in merged.items()),
+    )
+    values = {"user_id": staged.c.user_id, **{column_name: staged.c[column_name] for column_name in PROFILE_COLUMNS}}
+    stmt = _insert_select(db, target, staged, values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[target.c.user_id],
+        set_={
+            **{
+                column_name: func.coalesce(stmt.excluded[column_name], target.c[column_name])
+                for column_name in PROFILE_COLUMNS
+            },
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+
+    # The upsert bypassed the identity map; drop any copies loaded earlier.
+    for obj in list(db.identity_map.values()):
+        if isinstance(obj, UserProfile) and inspect(obj).dict.get("user_id") in merged:
+            db.expire(obj)
+
+
+def _app_id_expression(db: AsyncSession, staged: Table, academic_year: int, semester: str, first: int, suffix: str):
+    """prefix || zero-padded (first - 1 + ord) || suffix — the same string
+    ApplicationSequence.format_app_id produces."""
+    sequence = literal(first - 1, Integer) + staged.c.ord
+    if _is_postgresql(db):
+        digits = cast(sequence, Text)
+        number = func.lpad(digits, func.greatest(5, func.length(digits)), "0")
+    else:
+        number = func.printf("%05d", sequence)
+    prefix = ApplicationSequence.app_id_prefix(academic_year, semester)
+    return literal(prefix, String).concat(number).concat(literal(suffix, String))
+
+
+async def insert_applications(
+    db: AsyncSession,
+    rows: List[Dict[str, Any]],
+    constants: Dict[str, Any],
+    *,
+    academic_year: int,
+    sequence_semester,
+    suffix: str = "",
+) -> List[int]:
+    """
+    一次寫入整批申請案並回傳其 id (與 rows 順序相同)
+
+    ``rows`` carry the APPLICATION_ROW_COLUMNS values (one application per
+    user_id); ``constants`` are Application column values shared by every
+    row. App IDs come from one reserved block on the
+    (academic_year, sequence_semester) sequence, in row order.
+    """
+    if not rows:
+        return []
+    user_ids = [row["user_id"] for row in rows]
+    if len(set(user_ids)) != len(user_ids):
+        raise ValueError("insert_applications expects one row per user_id")
+
+    target = Application.__table__
+    dialect = db.get_bind().dialect
+    staged = await stage_rows(
+        db,
+        "import_stage_applications",
+        APPLICATION_ROW_COLUMNS,
+        (
+            tuple(
+                (
+                    _dump_json(row.get(column_name), target.c[column_name], dialect)
+                    if column_name in _JSON_ROW_COLUMNS
+                    else row.get(column_name)
+                )
+                for column_name, _ in APPLICATION_ROW_COLUMNS
+            )
+            for row in rows
+        ),
+    )
+
+    semester = _sequence_semester(sequence_semester)
+    first = await allocate_app_id_block(db, academic_year, semester, len(rows))
+
+    values: Dict[str, Any] = {
+        "app_id": _app_id_expression(db, staged, academic_year, semester, first, suffix),
+        **{
+            column_name: (
+                _from_staged(db, staged.c[column_name], target.c[column_name])
+                if column_name in _JSON_ROW_COLUMNS
+                else staged.c[column_name]
+            )
+            for column_name, _ in APPLICATION_ROW_COLUMNS
+        },
+        **{column_name: _constant(db, value, target.c[column_name]) for column_name, value in constants.items()},
+    }
+    stmt = _insert_select(db, target, staged, values)
+    result = await db.execute(stmt.returning(target.c.id, target.c.user_id))
+    id_by_user = {user_id: application_id for application_id, user_id in result.all()}
+    logger.info("Bulk-inserted %d applications (sequence %d-%d)", len(rows), first, first + len(rows) - 1)
+    return [id_by_user[user_id] for user_id in user_ids]
+
+
+async def assign_professors(db: AsyncSession, application_ids: List[int]) -> Dict[int, Optional[int]]:
+    """
+    依學生個人資料的 advisor_nycu_id 一次指派指導教授
+
+    Same rule as application_builder.assign_professor_from_profile: match a
+    User with role=professor, never overwrite an assigned professor_id.
+    Returns application id → professor_id (None when unresolved).
+    """
+    if not application_ids:
+        return {}
+    applications = Application.__table__
+    users = User.__table__
+    profiles = UserProfile.__table__
+    professor = (
+        select(users.c.id)
+        .select_from(profiles.join(users, users.c.nycu_id == profiles.c.advisor_nycu_id))
+        .where(profiles.c.user_id == applications.c.user_id, users.c.role == UserRole.professor)
+        .limit(1)
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(applications)
+        .where(_id_filter(db, applications.c.id, application_ids), applications.c.professor_id.is_(None))
+        .values(professor_id=professor)
+    )
+    result = await db.execute(
+        select(applications.c.id, applications.c.professor_id).where(_id_filter(db, applications.c.id, application_ids))
+    )
+    return dict(result.all())
@@ -10,11 +10,13 @@ This service handles college-level review operations including:
 
 import logging
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy import and_, asc, case
+from sqlalchemy import Integer, and_, asc, case
+from sqlalchemy import column as sa_column
 from sqlalchemy import func as sa_func
-from sqlalchemy import or_, select
+from sqlalchemy import or_, select, update
+from sqlalchemy import values as sa_values
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -27,6 +29,7 @@ from app.models.review import ApplicationReview  # Unified review system
 from app.models.scholarship import ScholarshipConfiguration, ScholarshipType
 from app.models.user import User, UserRole
 from app.services.email_automation_service import email_automation_service
+from app.utils.json_fields import student_field
 
 func: Any = sa_func
 
@@ -360,7 +363,7 @@ class CollegeReviewService:
         if college_code:
             logger.info(f"Filtering applications by college_code={college_code}")
             # Use std_academyno which is the actual field name in student_data JSON from API
-            stmt = stmt.where(sa_func.json_extract_path_text(Application.student_data, "std_academyno") == college_code)
+            stmt = stmt.where(student_field("std_academyno") == college_code)
 
         # Order by submission date (FIFO)
         stmt = stmt.order_by(asc(Application.submitted_at))
@@ -551,9 +554,7 @@ class CollegeReviewService:
             if creator_college:
                 logger.debug(f"Adding college filter for college_code={creator_college}")
                 # Use std_academyno which is the actual field name in student_data JSON from API
-                college_condition = (
-                    sa_func.json_extract_path_text(Application.student_data, "std_academyno") == creator_college
-                )
+                college_condition = student_field("std_academyno") == creator_college
                 conditions.append(college_condition)
                 logger.debug("College condition added successfully")
 
@@ -583,9 +584,7 @@ class CollegeReviewService:
             if creator_college:
                 logger.debug(f"Adding college filter for college_code={creator_college}")
                 # Use std_academyno which is the actual field name in student_data JSON from API
-                college_condition = (
-                    sa_func.json_extract_path_text(Application.student_data, "std_academyno") == creator_college
-                )
+                college_condition = student_field("std_academyno") == creator_college
                 conditions.append(college_condition)
                 logger.debug("College condition added successfully")
 
@@ -698,24 +697,13 @@ class CollegeReviewService:
         return result.scalar_one_or_none()
 
     async def update_ranking_order(self, ranking_id: int, new_order: List[Dict[str, Any]]) -> CollegeRanking:
-        """Update the ranking order of applications with transaction safety"""
-
-        # Get ranking with pessimistic locking
-        ranking_stmt = (
-            select(CollegeRanking)
-            .options(selectinload(CollegeRanking.items).selectinload(CollegeRankingItem.application))
-            .where(CollegeRanking.id == ranking_id)
-            .with_for_update()
-        )
-
-        ranking_result = await self.db.execute(ranking_stmt)
-        ranking = ranking_result.scalar_one_or_none()
+        """Update the ranking order of applications with transaction safety
 
-        if not ranking:
-            raise RankingNotFoundError(f"Ranking with ID {ranking_id} not found")
+        ``new_order`` is a list of ``{"item_id", "position"}``; only the items
+        whose position actually changes are written (see ``_apply_rank_positions``).
+        """
 
-        if ranking.is_finalized:
-            raise RankingModificationError(f"Cannot modify finalized ranking {ranking_id}")
+        ranking = await self._lock_modifiable_ranking(ranking_id)
 
         # Validate input
         if not new_order:
@@ -733,43 +721,165 @@ class CollegeReviewService:
             if item_id and new_position is not None:
                 order_lookup[item_id] = new_position
 
-        # Validate: renewal students must rank before all new applications
-        item_lookup = {item.id: item for item in ranking.items}
-        renewal_positions = []
-        new_positions = []
-        for item_id, pos in order_lookup.items():
-            item = item_lookup.get(item_id)
-            if item and item.application:
-                if item.application.is_renewal:
-                    renewal_positions.append(pos)
-                else:
-                    new_positions.append(pos)
-
-        if renewal_positions and new_positions:
-            max_renewal_pos = max(renewal_positions)
-            min_new_pos = min(new_positions)
-            if max_renewal_pos > min_new_pos:
-                raise InvalidRankingDataError("續領學生的排名必須在所有新申請學生之前")
-
-        # Update rank positions
-        updated_count = 0
-        for item_id, new_position in order_lookup.items():
-            ranking_item = item_lookup.get(item_id)
-            if ranking_item and ranking_item.rank_position != new_position:
-                ranking_item.rank_position = new_position
-                if ranking_item.application:
-                    ranking_item.application.final_ranking_position = new_position
-                updated_count += 1
-
-        if updated_count == 0:
+        current = await self._load_rank_positions(ranking_id)
+        targets = {
+            item_id: position
+            for item_id, position in order_lookup.items()
+            if item_id in current and current[item_id][1] != position
+        }
+        if not targets:
             raise InvalidRankingDataError("No valid position updates found in ranking data")
 
+        await self._apply_rank_positions(ranking, current, targets)
+        return ranking
+
+    async def reorder_ranking(
+        self,
+        ranking_id: int,
+        *,
+        order: Optional[List[int]] = None,
+        moves: Optional[List[Dict[str, Optional[int]]]] = None,
+    ) -> Tuple[CollegeRanking, Dict[int, Tuple[int, int, int]]]:
+        """Reorder a ranking from a permutation or from drag-and-drop moves
+
+        Exactly one of:
+          • ``order`` — every item_id of the ranking in its new order;
+          • ``moves`` — ``{"item_id", "before_item_id" | "after_item_id"}``
+            applied in sequence to the current order.
+
+        Positions are renumbered 1..n and only changed rows are written.
+        Returns the ranking and ``{item_id: (application_id, old_position,
+        new_position)}`` for the changed items (empty when the order is unchanged).
+        """
+        if (order is None) == (moves is None):
+            raise InvalidRankingDataError("Provide either order or moves")
+
+        ranking = await self._lock_modifiable_ranking(ranking_id)
+        current = await self._load_rank_positions(ranking_id)
+        sequence = sorted(current, key=lambda item_id: (current[item_id][1], item_id))
+
+        if order is not None:
+            if len(order) != len(set(order)) or set(order) != set(current):
+                raise InvalidRankingDataError("Order must list every item of the ranking exactly once")
+            sequence = list(order)
+        else:
+            if not moves:
+                raise InvalidRankingDataError("Moves cannot be empty")
+            for move in moves:
+                sequence = self._apply_rank_move(sequence, move)
+
+        targets = {item_id: index for index, item_id in enumerate(sequence, start=1) if current[item_id][1] != index}
+        if targets:
+            await self._apply_rank_positions(ranking, current, targets)
+        return ranking, {item_id: (*current[item_id], position) for item_id, position in targets.items()}
+
+    @staticmethod
+    def _apply_rank_move(sequence: List[int], move: Dict[str, Optional[int]]) -> List[int]:
+        item_id = move.get("item_id")
+        before_id = move.get("before_item_id")
+        after_id = move.get("after_item_id")
+        if (before_id is None) == (after_id is None):
+            raise InvalidRankingDataError("Each move needs exactly one of before_item_id / after_item_id")
+        anchor = before_id if before_id is not None else after_id
+        if item_id not in sequence or anchor not in sequence:
+            raise InvalidRankingDataError(f"Unknown ranking item in move: {move}")
+        if item_id == anchor:
+            raise InvalidRankingDataError("An item cannot be moved relative to itself")
+
+        remaining = [i for i in sequence if i != item_id]
+        index = remaining.index(anchor) + (0 if before_id is not None else 1)
+        remaining.insert(index, item_id)
+        return remaining
+
+    async def _lock_modifiable_ranking(self, ranking_id: int) -> CollegeRanking:
+        """Row-lock the ranking (serialises concurrent reorders) without loading its items"""
+        ranking_stmt = select(CollegeRanking).where(CollegeRanking.id == ranking_id).with_for_update()
+        ranking = (await self.db.execute(ranking_stmt)).scalar_one_or_none()
+
+        if not ranking:
+            raise RankingNotFoundError(f"Ranking with ID {ranking_id} not found")
+
+        if ranking.is_finalized:
+            raise RankingModificationError(f"Cannot modify finalized ranking {ranking_id}")
+
+        return ranking
+
+    async def _load_rank_positions(self, ranking_id: int) -> Dict[int, Tuple[int, int]]:
+        """item_id -> (application_id, rank_position), as a bare column projection"""
+        rows = await self.db.execute(
+            select(
+                CollegeRankingItem.id,
+                CollegeRankingItem.application_id,
+                CollegeRankingItem.rank_position,
+            ).where(CollegeRankingItem.ranking_id == ranking_id)
+        )
+        return {item_id: (application_id, position) for item_id, application_id, position in rows.all()}
+
+    async def _apply_rank_positions(
+        self,
+        ranking: CollegeRanking,
+        current: Dict[int, Tuple[int, int]],
+        targets: Dict[int, int],
+    ) -> None:
+        """Validate and write ``targets`` (item_id -> new position) in bulk
+
+        The renewal-before-new rule is checked over the whole ranking as it
+        will look after the change, with one aggregate. Each table then gets
+        one UPDATE: ``UPDATE ... FROM (VALUES ...)`` on PostgreSQL, a CASE
+        expression elsewhere (SQLite in tests).
+        """
+        new_position = case(targets, value=CollegeRankingItem.id, else_=CollegeRankingItem.rank_position)
+        bounds = await self.db.execute(
+            select(
+                sa_func.max(case((Application.is_renewal.is_(True), new_position))),
+                sa_func.min(case((Application.is_renewal.is_(False), new_position))),
+            )
+            .select_from(CollegeRankingItem)
+            .join(Application, Application.id == CollegeRankingItem.application_id)
+            .where(CollegeRankingItem.ranking_id == ranking.id)
+        )
+        max_renewal_pos, min_new_pos = bounds.one()
+        if max_renewal_pos is not None and min_new_pos is not None and max_renewal_pos > min_new_pos:
+            raise InvalidRankingDataError("續領學生的排名必須在所有新申請學生之前")
+
+        rows = [(item_id, current[item_id][0], position) for item_id, position in targets.items()]
+        no_sync = {"synchronize_session": False}
+        if self.db.get_bind().dialect.name == "postgresql":
+            delta = sa_values(
+                sa_column("item_id", Integer),
+                sa_column("application_id", Integer),
+                sa_column("position", Integer),
+                name="rank_delta",
+            ).data(rows)
+            item_stmt = (
+                update(CollegeRankingItem)
+                .where(CollegeRankingItem.id == delta.c.item_id)
+                .values(rank_position=delta.c.position)
+            )
+            application_stmt = (
+                update(Application)
+                .where(Application.id == delta.c.application_id)
+                .values(final_ranking_position=delta.c.position)
+            )
+        else:
+            item_stmt = (
+                update(CollegeRankingItem)
+                .where(CollegeRankingItem.id.in_(targets))
+                .values(rank_position=case(targets, value=CollegeRankingItem.id))
+            )
+            by_application = {application_id: position for _item_id, application_id, position in rows}
+            application_stmt = (
+                update(Application)
+                .where(Application.id.in_(by_application))
+                .values(final_ranking_position=case(by_application, value=Application.id))
+            )
+        await self.db.execute(item_stmt, execution_options=no_sync)
+        await self.db.execute(application_stmt, execution_options=no_sync)
+
         ranking.updated_at = datetime.now(timezone.utc)
         await self.db.flush()
         await self.db.refresh(ranking)
 
-        return ranking
-
     async def finalize_ranking(self, ranking_id: int, finalizer_id: int) -> CollegeRanking:
         """Finalize a ranking (makes it read-only) with concurrent access protection"""
 
@@ -6,13 +6,14 @@ import logging
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
 
-from sqlalchemy import and_, asc, desc, or_, select
+from sqlalchemy import and_, asc, desc, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.email_management import EmailCategory, EmailHistory, EmailStatus, ScheduledEmail, ScheduleStatus
 from app.models.user import AdminScholarship, User
 from app.services.email_service import EmailService
+from app.services.log_partitions import count_rows
 
 logger = logging.getLogger(__name__)
 
@@ -94,6 +95,7 @@ class EmailManagementService:
             conditions.append(EmailHistory.scholarship_type_id == scholarship_type_id)
 
         if recipient_email:
+            # Served by the pg_trgm GIN index (alembic partition_log_tables_001).
             conditions.append(EmailHistory.recipient_email.ilike(f"%{recipient_email}%"))
 
         if date_from:
@@ -106,7 +108,7 @@ class EmailManagementService:
             query = query.where(and_(*conditions))
 
         # Get total count
-        count_query = select(EmailHistory.id)
+        count_query = select(func.count()).select_from(EmailHistory)
         if not user.is_super_admin():
             if admin_scholarship_ids:
                 count_query = count_query.where(
@@ -121,7 +123,10 @@ class EmailManagementService:
         if conditions:
             count_query = count_query.where(and_(*conditions))
 
-        total_count = len((await db.execute(count_query)).scalars().all())
+        if user.is_super_admin() and not conditions:
+            total_count = await count_rows(db, EmailHistory.__tablename__, count_query)
+        else:
+            total_count = (await db.execute(count_query)).scalar() or 0
 
         # Apply pagination and ordering
         query = query.order_by(desc(EmailHistory.sent_at)).offset(skip).limit(limit)
@@ -13,7 +13,9 @@ from typing import Any, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.styles.borders import DEFAULT_BORDER
 from openpyxl.utils import get_column_letter
 
 from app.core.config import settings
@@ -41,6 +43,35 @@ SUB_TYPE_SHORT_LABELS = {
 }
 
 
+# 模板只讀一次：{path: ((mtime_ns, size), (表頭欄位, 第一個工作表名稱))}。
+# 每次匯出都會 new 一個 ExcelExportService，過去每次都重新 load_workbook。
+_TEMPLATE_CACHE: Dict[str, Tuple[Tuple[int, int], Tuple[List[str], str]]] = {}
+
+
+def _read_template(path: str) -> Tuple[List[str], str]:
+    """回傳模板的表頭欄位（最多 32 欄）與第一個工作表名稱；檔案未變更時走快取。"""
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _TEMPLATE_CACHE.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    wb = load_workbook(path, read_only=True)
+    try:
+        ws = wb.active
+        columns: List[str] = []
+        for row in ws.iter_rows(min_row=1, max_row=1, max_col=32, values_only=True):
+            for cell_value in row:
+                if not cell_value:
+                    break
+                columns.append(str(cell_value))
+        info = (columns, ws.title)
+    finally:
+        wb.close()
+    _TEMPLATE_CACHE[path] = (signature, info)
+    return info
+
+
 class ExcelExportService:
     """Excel匯出服務"""
 
@@ -73,6 +104,17 @@ class ExcelExportService:
     # 需千分位數字格式的欄位（皆為金額欄）
     NUMERIC_FORMAT_COLUMNS = frozenset({"單價", "免稅給付"})
 
+    # 無模板時主表名稱
+    DEFAULT_SHEET_TITLE = "印領清冊"
+
+    HEADER_FILL = PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")
+    THIN_BORDER = Border(
+        left=Side(style="thin"),
+        right=Side(style="thin"),
+        top=Side(style="thin"),
+        bottom=Side(style="thin"),
+    )
+
     def __init__(self):
         self.export_base_path = getattr(settings, "roster_export_dir", "./exports")
         self.template_dir = getattr(settings, "roster_template_dir", "./app/templates")
@@ -94,20 +136,9 @@ class ExcelExportService:
         """Load template structure from STD_UP_MIXLISTA.xlsx"""
         try:
             if os.path.exists(self.template_path):
-                wb = load_workbook(self.template_path)
-                ws = wb.active
-
-                # Extract headers from template
-                self.template_columns = []
-                for col in range(1, 33):  # 32 columns max
-                    cell_value = ws.cell(row=1, column=col).value
-                    if cell_value:
-                        self.template_columns.append(str(cell_value))
-                    else:
-                        break
-
+                columns, _ = _read_template(self.template_path)
+                self.template_columns = list(columns)
                 logger.info(f"Loaded {len(self.template_columns)} columns from template")
-                wb.close()
             else:
                 logger.warning(f"Template not found at {self.template_path}, using default columns")
                 self._set_default_columns()
@@ -344,13 +375,9 @@ class ExcelExportService:
 
                     minio_service = MinIOService()
 
-                    # Read the Excel file
-                    with open(file_path, "rb") as f:
-                        file_content = f.read()
-
-                    # Upload to MinIO
-                    minio_result = minio_service.upload_roster_file(
-                        file_content=file_content,
+                    # Stream the Excel file to MinIO (no full read into memory)
+                    minio_result = minio_service.upload_roster_file_from_path(
+                        file_path,
                         filename=file_name,
                         roster_id=roster.id,
                         metadata={"export_type": "excel", "template": resolved_template_name},
@@ -804,7 +831,23 @@ class ExcelExportService:
         scholarship_labels 為與 excel_data 平行的每列獎學金標籤；提供時，
         主表（全名單）之後會為每個獎學金各建一個分頁（e.g.「114年 國科會」、
         「113年 國科會」、「114年 教育部(5000)」），內容為該獎學金的名單。
+
+        settings.roster_excel_streaming 開啟時改走 _create_excel_file_streaming
+        （write-only、常數記憶體，欄寬與上色相同，但不保留模板的其餘工作表與
+        版面設定，故預設關閉）。
         """
+        if getattr(settings, "roster_excel_streaming", False):
+            return self._create_excel_file_streaming(
+                excel_data,
+                cell_fills,
+                file_path,
+                roster,
+                template_path=template_path,
+                columns=columns,
+                include_header=include_header,
+                include_statistics=include_statistics,
+                scholarship_labels=scholarship_labels,
+            )
         try:
             use_template = include_header and os.path.exists(template_path)
 
@@ -815,7 +858,7 @@ class ExcelExportService:
             else:
                 wb = Workbook()
                 ws = wb.active
-                ws.title = "印領清冊"
+                ws.title = self.DEFAULT_SHEET_TITLE
                 logger.info("Created new Excel file using default structure (include_header=%s)", include_header)
 
             # 清掉既有列，統一依 columns 重寫表頭與資料
@@ -848,6 +891,164 @@ class ExcelExportService:
                 file_name=os.path.basename(file_path),
             ) from e
 
+    def _create_excel_file_streaming(
+        self,
+        excel_data: List[Dict],
+        cell_fills: List[Dict[str, str]],
+        file_path: str,
+        roster: PaymentRoster,
+        *,
+        template_path: str,
+        columns: List[str],
+        include_header: bool,
+        include_statistics: bool,
+        scholarship_labels: Optional[List[str]] = None,
+    ):
+        """_create_excel_file 的 write-only 版本。
+
+        - 所有工作表（主表、各獎學金分頁、統計頁）先依原本順序建立，資料只走
+          一趟：每列同時 append 到主表與其獎學金分頁，不再為分頁重寫一次。
+        - 樣式用預先註冊的 NamedStyle（表頭 / 一般 / 千分位 × 紅、琥珀底），
+          框線隨 cell 一併寫出，不再事後逐格 _set_borders。
+        - 模板只取第一個工作表名稱（經 _read_template 快取）；模板中其餘
+          工作表與版面設定不會帶入。
+        """
+        try:
+            if include_header and os.path.exists(template_path):
+                _, main_title = _read_template(template_path)
+            else:
+                main_title = self.DEFAULT_SHEET_TITLE
+
+            wb = Workbook(write_only=True)
+            for style in self._roster_named_styles():
+                wb.add_named_style(style)
+
+            main_ws = self._create_streaming_sheet(wb, main_title, columns, include_header)
+            sheets = [main_ws]
+            sheet_for_label: Dict[str, Any] = {}
+            if scholarship_labels is not None:
+                # 與 _add_scholarship_sheets 的 strict zip 相同：長度不一致是上游 bug
+                if len(scholarship_labels) != len(excel_data):
+                    raise ValueError(
+                        f"scholarship_labels ({len(scholarship_labels)}) 與 excel_data ({len(excel_data)}) 長度不一致"
+                    )
+                # 命名/排序/統計頁保留字規則同 _add_scholarship_sheets
+                used_titles = {main_title}
+                if include_statistics:
+                    used_titles.add(self.STATISTICS_SHEET_TITLE)
+                for label in sorted(set(scholarship_labels), key=self._scholarship_sheet_order):
+                    title = self._safe_sheet_title(label, used_titles)
+                    sheet_for_label[label] = self._create_streaming_sheet(wb, title, columns, include_header)
+                sheets.extend(sheet_for_label.values())
+
+            info_ws = wb.create_sheet(self.STATISTICS_SHEET_TITLE) if include_statistics else None
+
+            if include_header:
+                for ws in sheets:
+                    ws.append([self._styled_cell(ws, name, "roster_header") for name in columns])
+            elif not excel_data:
+                # 與 _set_borders 一致：無表頭的空表仍有一列帶框線的空白格
+                main_ws.append([self._styled_cell(main_ws, None, "roster_cell") for _ in columns])
+
+            # 每列只建一次 cell：同一批 WriteOnlyCell 先寫主表、再寫獎學金分頁
+            # （append 當下即序列化，列/欄座標由各工作表重設）。
+            styles = self._streaming_style_arrays(main_ws)
+            numeric_columns = [name in self.NUMERIC_FORMAT_COLUMNS for name in columns]
+            for row_idx, (row_data, fills) in enumerate(zip(excel_data, cell_fills, strict=True)):
+                row = self._streaming_row(main_ws, row_data, fills, columns, numeric_columns, styles)
+                main_ws.append(row)
+                if sheet_for_label:
+                    sheet_for_label[scholarship_labels[row_idx]].append(row)
+
+            if info_ws is not None:
+                self._write_worksheet_info_streaming(info_ws, roster)
+
+            wb.save(file_path)
+            logger.info("Excel file created (streaming): %s", file_path)
+
+        except Exception as e:
+            logger.exception("Failed to create Excel file")
+            raise FileStorageError(
+                f"Failed to create Excel file: {e}",
+                file_name=os.path.basename(file_path),
+            ) from e
+
+    @classmethod
+    def _roster_named_styles(cls) -> List[NamedStyle]:
+        """串流匯出共用的具名樣式；每本活頁簿註冊一次，所有儲存格共用。"""
+        styles = [
+            NamedStyle(
+                name="roster_header",
+                font=Font(bold=True),
+                alignment=Alignment(horizontal="center", vertical="center"),
+                fill=cls.HEADER_FILL,
+                border=cls.THIN_BORDER,
+            ),
+            NamedStyle(name="roster_label", font=Font(bold=True), border=DEFAULT_BORDER),
+        ]
+        for suffix, fill in (("", None), ("_red", cls.RED_FILL), ("_amber", cls.AMBER_FILL)):
+            for base, number_format in (("roster_cell", "General"), ("roster_number", "#,##0")):
+                style = NamedStyle(name=f"{base}{suffix}", border=cls.THIN_BORDER, number_format=number_format)
+                if fill is not None:
+                    style.fill = fill
+                styles.append(style)
+        return styles
+
+    def _create_streaming_sheet(self, wb: Workbook, title: str, columns: List[str], include_header: bool):
+        """建立 write-only 工作表；欄寬與凍結窗格必須在第一列寫入前設定。"""
+        ws = wb.create_sheet(title)
+        self._set_column_widths(ws, columns)
+        if include_header:
+            ws.freeze_panes = "A2"
+        return ws
+
+    @staticmethod
+    def _styled_cell(ws, value: Any, style: str) -> WriteOnlyCell:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+
+    @staticmethod
+    def _streaming_style_arrays(ws) -> Dict[str, Any]:
+        """每個具名樣式解析一次成 StyleArray，資料格直接共用（省去逐格查表）。"""
+        arrays = {}
+        for base in ("roster_cell", "roster_number"):
+            for suffix in ("", "_red", "_amber"):
+                probe = WriteOnlyCell(ws)
+                probe.style = base + suffix
+                arrays[base + suffix] = probe._style
+        return arrays
+
+    def _streaming_row(
+        self,
+        ws,
+        row_data: Dict,
+        fills: Dict[str, str],
+        columns: List[str],
+        numeric_columns: List[bool],
+        styles: Dict[str, Any],
+    ) -> List[WriteOnlyCell]:
+        row = []
+        for column_name, numeric in zip(columns, numeric_columns):
+            value = row_data.get(column_name, "")
+            base = "roster_number" if numeric and isinstance(value, (int, float)) else "roster_cell"
+            kind = fills.get(column_name)
+            suffix = "_red" if kind == "red" else "_amber" if kind == "amber" else ""
+            # SECURITY (#1081 G): 與 _write_sheet 相同的公式注入防護
+            cell = WriteOnlyCell(ws, value=sanitize_excel_cell(value))
+            cell._style = styles[base + suffix]
+            row.append(cell)
+        return row
+
+    def _write_worksheet_info_streaming(self, info_ws, roster: PaymentRoster):
+        """_add_worksheet_info 的 write-only 版本（內容相同）。"""
+        info_ws.column_dimensions["A"].width = 15
+        info_ws.column_dimensions["B"].width = 20
+        for label, value in self._worksheet_info_rows(roster):
+            info_ws.append(
+                [self._styled_cell(info_ws, label, "roster_label"), sanitize_excel_cell(value)]  # SECURITY (#1081 G)
+            )
+
     def _write_sheet(
         self,
         ws,
@@ -862,7 +1063,7 @@ class ExcelExportService:
                 cell = ws.cell(row=1, column=col_idx, value=column_name)
                 cell.font = Font(bold=True)
                 cell.alignment = Alignment(horizontal="center", vertical="center")
-                cell.fill = PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")
+                cell.fill = self.HEADER_FILL
             start_row = 2
         else:
             start_row = 1
@@ -1010,22 +1211,25 @@ class ExcelExportService:
 
     def _set_borders(self, ws, max_row: int, columns: List[str]):
         """設定邊框"""
-        thin_border = Border(
-            left=Side(style="thin"),
-            right=Side(style="thin"),
-            top=Side(style="thin"),
-            bottom=Side(style="thin"),
-        )
-
         for row in range(1, max_row + 1):
             for col in range(1, len(columns) + 1):
-                ws.cell(row=row, column=col).border = thin_border
+                ws.cell(row=row, column=col).border = self.THIN_BORDER
 
     def _add_worksheet_info(self, wb: Workbook, roster: PaymentRoster):
         """加入工作表資訊"""
         info_ws = wb.create_sheet(self.STATISTICS_SHEET_TITLE)
 
-        info_data = [
+        for row_idx, (label, value) in enumerate(self._worksheet_info_rows(roster), start=1):
+            info_ws.cell(row=row_idx, column=1, value=label).font = Font(bold=True)
+            info_ws.cell(row=row_idx, column=2, value=sanitize_excel_cell(value))  # SECURITY (#1081 G)
+
+        info_ws.column_dimensions["A"].width = 15
+        info_ws.column_dimensions["B"].width = 20
+
+    @staticmethod
+    def _worksheet_info_rows(roster: PaymentRoster) -> List[List[Any]]:
+        """統計資訊頁內容（一般與串流兩條路徑共用）。"""
+        return [
             ["造冊代碼", roster.roster_code],
             ["期間標記", roster.period_label],
             ["學年度", roster.academic_year],
@@ -1047,13 +1251,6 @@ class ExcelExportService:
             ["API失敗次數", roster.verification_api_failures or 0],
         ]
 
-        for row_idx, (label, value) in enumerate(info_data, start=1):
-            info_ws.cell(row=row_idx, column=1, value=label).font = Font(bold=True)
-            info_ws.cell(row=row_idx, column=2, value=sanitize_excel_cell(value))  # SECURITY (#1081 G)
-
-        info_ws.column_dimensions["A"].width = 15
-        info_ws.column_dimensions["B"].width = 20
-
     def _extract_postal_code(self, address: Optional[str]) -> str:
         """從地址中提取郵遞區號"""
         if not address:
@@ -1268,13 +1465,9 @@ class ExcelExportService:
                     async_mode=False,
                 )
 
-                # 上傳到MinIO
-                with open(export_result["file_path"], "rb") as f:
-                    file_content = f.read()
-
-                minio_result = minio_service.upload_roster_file(
-                    file_content=file_content,
-                    filename=os.path.basename(export_result["file_path"]),
+                # 上傳到MinIO（串流上傳，不整檔讀入記憶體）
+                minio_result = minio_service.upload_roster_file_from_path(
+                    export_result["file_path"],
                     roster_id=roster_id,
                     metadata={"task_id": task_id, "user_id": str(user_id)},
                 )
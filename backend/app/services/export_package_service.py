@@ -30,6 +30,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.config import settings
 from app.models.application import Application
 from app.models.scholarship import ScholarshipType
 from app.services.export_summary_tables import build_embedded_summary_tables
@@ -142,27 +143,29 @@ async def _fetch_and_write(
     zip_path: str,
     error_path: str,
     error_label: str,
-) -> Tuple[Optional[bytes], Optional[str]]:
+) -> Tuple[Optional[bytes], Optional[str], Optional[str]]:
     """Stream one MinIO object into the ZIP at `zip_path`.
 
-    Returns (file_bytes, None) on success. On any failure, writes a
-    `_錯誤_…txt` placeholder at `error_path` instead so a single bad object
-    never aborts the whole ZIP build, and returns (None, error message) so
-    the merged PDF's placeholder page can show the same concrete reason.
+    Returns (file_bytes, None, etag) on success; the ETag keys the merged-PDF
+    derivative cache. On any failure, writes a `_錯誤_…txt` placeholder at
+    `error_path` instead so a single bad object never aborts the whole ZIP
+    build, and returns (None, error message, None) so the merged PDF's
+    placeholder page can show the same concrete reason.
     """
     try:
         response = await asyncio.to_thread(minio.get_file_stream, object_name)
         try:
             file_bytes = await asyncio.to_thread(response.read)
+            etag = getattr(response, "headers", {}).get("ETag")
         finally:
             response.close()
             response.release_conn()
         zf.writestr(_unique_zip_path(zf, zip_path), file_bytes)
-        return file_bytes, None
+        return file_bytes, None, etag.strip('"') if isinstance(etag, str) and etag else None
     except Exception as e:
         logger.exception(f"Failed to fetch file {object_name}")
         zf.writestr(_unique_zip_path(zf, error_path), f"檔案下載失敗：{error_label}\n錯誤：{str(e)}")
-        return None, str(e) or "無法自檔案儲存服務下載"
+        return None, str(e) or "無法自檔案儲存服務下載", None
 
 
 class ExportPackageService:
@@ -378,7 +381,7 @@ class ExportPackageService:
             else:
                 filename = f"{student_prefix}_{label}{ext}"
 
-            file_bytes, fetch_error = await _fetch_and_write(
+            file_bytes, fetch_error, etag = await _fetch_and_write(
                 zf,
                 self.minio,
                 object_name=af.object_name,
@@ -395,6 +398,7 @@ class ExportPackageService:
                         filename=af.original_filename or af.object_name or "",
                         content=file_bytes,
                         error=f"檔案下載失敗：{fetch_error}" if fetch_error else None,
+                        source_key=f"{af.object_name}@{etag}" if etag else None,
                     )
                 )
 
@@ -417,6 +421,7 @@ class ExportPackageService:
                     f"{student.get('std_stdcode', 'unknown')} {student.get('std_cname', '未知')}",
                 ],
                 items=[summary_item] + dynamic_items,
+                derivative_cache=self.minio if settings.merged_pdf_derivative_cache else None,
             )
             zf.writestr(_unique_zip_path(zf, f"{base_path}/{student_prefix}_{MERGED_PDF_LABEL}.pdf"), merged_bytes)
         except Exception as e:
@@ -0,0 +1,171 @@
+"""
+Upload-time derivatives for application files
+申請文件上傳後的衍生檔處理
+
+Review screens and the college export used to re-read and re-render every
+original on each view: the merged PDF decoded phone photos again, the file
+list had no thumbnail to show, and OCR never ran for application documents.
+After ``ApplicationService.upload_application_file_minio`` commits a new
+ApplicationFile, it schedules ``process_application_file_derivatives`` as a
+background task, which stores next to the original (MinIO ``derivatives/``):
+
+  • ``content_sha256``: SHA-256 of the stored bytes.
+  • normalized PDF page: exactly what ``pdf_merge`` appends for the file,
+    stored under ``pdf_merge.derivative_key(object_name@etag)`` so exports
+    hit the derivative cache instead of rendering.
+  • thumbnail: ``file_thumbnail_size`` px JPEG, images only (no PDF
+    rasterizer is installed).
+  • OCR text (images, when the OCR service is enabled) into ``ocr_text``.
+
+Every step fails open: a missing derivative only means the reader falls back
+to the original, exactly as before this pass existed.
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+from app.db.session import get_db_session
+from app.models.application import ApplicationFile
+from app.services import pdf_merge
+from app.services.minio_service import minio_service
+from app.services.ocr_service import get_ocr_service
+
+logger = logging.getLogger(__name__)
+
+# Bump when _thumbnail's output changes, so old thumbnails are not reused.
+_THUMBNAIL_VERSION = 1
+
+
+@dataclass
+class FileDerivatives:
+    """CPU-side results for one upload; None means "not derivable"."""
+
+    content_sha256: str
+    normalized_pdf: Optional[bytes] = None
+    thumbnail: Optional[bytes] = None
+
+
+def thumbnail_key(object_name: str) -> str:
+    """Derivative key for an upload's thumbnail (relative to DERIVATIVE_PREFIX)."""
+    return f"{object_name}/thumb/v{_THUMBNAIL_VERSION}/{settings.file_thumbnail_size}px.jpg"
+
+
+def build_derivatives(content: bytes) -> FileDerivatives:
+    """Hash, render and thumbnail one upload. CPU-bound: call via to_thread."""
+    derivatives = FileDerivatives(content_sha256=hashlib.sha256(content).hexdigest())
+    try:
+        derivatives.normalized_pdf = pdf_merge.render_document(content)
+    except Exception:
+        # Word files, password-protected or oversized uploads: the merged PDF
+        # keeps showing its placeholder page for these.
+        logger.info("file-derivatives: no normalized page for this upload", exc_info=True)
+        return derivatives
+    # Only after render_document succeeded: its image path already enforced
+    # the decompression-bomb budget on these bytes.
+    derivatives.thumbnail = _thumbnail(content)
+    return derivatives
+
+
+def _thumbnail(content: bytes) -> Optional[bytes]:
+    """JPEG thumbnail for image uploads; None for PDFs and anything else."""
+    try:
+        img = Image.open(io.BytesIO(content))
+    except Exception:
+        return None
+    size = settings.file_thumbnail_size
+    img.draft("RGB", (size, size))
+    img = ImageOps.exif_transpose(img)
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        rgba = img.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        img = background
+    elif img.mode != "RGB":
+        img = img.convert("RGB")
+    img.thumbnail((size, size), Image.Resampling.LANCZOS)
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=settings.merged_pdf_jpeg_quality)
+    return buf.getvalue()
+
+
+def _download(object_name: str) -> Tuple[bytes, Optional[str]]:
+    """Read an original and its ETag (the merged-PDF cache key component)."""
+    response = minio_service.get_file_stream(object_name)
+    try:
+        content = response.read()
+        etag = getattr(response, "headers", {}).get("ETag")
+    finally:
+        response.close()
+        response.release_conn()
+    return content, etag.strip('"') if isinstance(etag, str) and etag else None
+
+
+async def _store(key: str, content: bytes, content_type: str) -> Optional[str]:
+    """put_derivative, returning the full object name or None on failure."""
+    try:
+        await asyncio.to_thread(minio_service.put_derivative, key, content, content_type)
+    except Exception:
+        logger.warning("file-derivatives: failed to store %s", key, exc_info=True)
+        return None
+    return f"{minio_service.DERIVATIVE_PREFIX}{key}"
+
+
+async def process_application_file_derivatives(file_id: int) -> None:
+    """
+    產生並儲存單一申請文件的衍生檔（背景任務）
+
+    The DB session is only held while reading the row and writing the
+    results — never across the download, render or OCR call.
+    """
+    try:
+        async with get_db_session() as db:
+            file_record = await db.get(ApplicationFile, file_id)
+            if file_record is None or not file_record.object_name:
+                return  # replaced or deleted before the task ran
+            object_name = file_record.object_name
+            ocr_service = get_ocr_service(db)
+            ocr_enabled = await ocr_service.is_enabled(db)
+
+        content, etag = await asyncio.to_thread(_download, object_name)
+        derivatives = await asyncio.to_thread(build_derivatives, content)
+
+        normalized_object_name = None
+        if derivatives.normalized_pdf is not None and etag:
+            normalized_object_name = await _store(
+                pdf_merge.derivative_key(f"{object_name}@{etag}"), derivatives.normalized_pdf, "application/pdf"
+            )
+        thumbnail_object_name = None
+        if derivatives.thumbnail is not None:
+            thumbnail_object_name = await _store(thumbnail_key(object_name), derivatives.thumbnail, "image/jpeg")
+
+        ocr_result = None
+        if ocr_enabled and derivatives.thumbnail is not None:
+            try:
+                ocr_result = await ocr_service.extract_general_text_from_image(content)
+            except Exception:
+                logger.warning("file-derivatives: OCR failed for file %s", file_id, exc_info=True)
+
+        async with get_db_session() as db:
+            file_record = await db.get(ApplicationFile, file_id)
+            if file_record is None or file_record.object_name != object_name:
+                return
+            file_record.content_sha256 = derivatives.content_sha256
+            file_record.normalized_object_name = normalized_object_name
+            file_record.thumbnail_object_name = thumbnail_object_name
+            if ocr_result and ocr_result.get("success"):
+                file_record.ocr_text = ocr_result.get("extracted_text")
+                file_record.ocr_confidence = Decimal(str(ocr_result.get("confidence") or 0)).quantize(Decimal("0.01"))
+                file_record.ocr_processed = True
+            file_record.processed_at = datetime.now(timezone.utc)
+        logger.info("file-derivatives: processed file %s", file_id)
+    except Exception:
+        logger.exception("file-derivatives: processing failed for file %s", file_id)
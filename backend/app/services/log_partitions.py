@@ -0,0 +1,199 @@
+"""
+Monthly partitions of the append-only log tables
+稽核日誌與寄信紀錄的每月分割
+
+``audit_logs`` (by ``created_at``) and ``email_history`` (by ``sent_at``)
+are range-partitioned by calendar month in UTC on PostgreSQL (alembic
+partition_log_tables_001). Partition ``<table>_pYYYYMM`` holds that month;
+``<table>_default`` catches rows no monthly partition covers, so a missed
+maintenance run never makes an insert fail.
+
+  • ``ensure_partitions`` creates the current month and the next
+    ``log_partition_premake_months``. Rows that already landed in the
+    default partition for such a month are moved into it.
+  • ``drop_expired_partitions`` drops whole months older than the retention
+    — a metadata operation instead of a DELETE over the table. Retention is
+    off (``None``) unless configured; for audit_logs this IS the sanctioned
+    destruction workflow (see audit_logs_immutability_001), so only set
+    ``audit_log_retention_months`` per the approved 銷毀 schedule.
+  • ``count_rows`` answers unfiltered listings from the planner statistics
+    once a table is large enough that ``count(*)`` matters.
+
+On other dialects (the SQLite test database) the tables are ordinary tables
+and every function here is a no-op / exact count.
+"""
+
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import get_db_session
+
+logger = logging.getLogger(__name__)
+
+# table -> partition key column
+PARTITIONED_TABLES: Dict[str, str] = {"audit_logs": "created_at", "email_history": "sent_at"}
+
+_PARTITION_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def _bound(month: date) -> str:
+    return f"'{month:%Y-%m-%d} 00:00:00+00'"
+
+
+def _is_postgresql(db: AsyncSession) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+async def _partitions(db: AsyncSession, table: str) -> Optional[List[str]]:
+    """Child partition names, or None when ``table`` is not partitioned (migration not applied)."""
+    partitioned = await db.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.oid = to_regclass(:table)"
+        ),
+        {"table": table},
+    )
+    if partitioned.scalar() is None:
+        return None
+    result = await db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": table},
+    )
+    return list(result.scalars().all())
+
+
+async def ensure_partitions(db: AsyncSession, table: str, months_ahead: int, today: Optional[date] = None) -> List[str]:
+    """Create the missing monthly partitions from this month to ``months_ahead`` on; returns their names."""
+    if not _is_postgresql(db):
+        return []
+    existing = await _partitions(db, table)
+    if existing is None:
+        return []
+    column = PARTITIONED_TABLES[table]
+    default = f"{table}_default"
+    first = month_start(today or datetime.now(timezone.utc).date())
+
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(first, offset)
+        name = partition_name(table, month)
+        if name in existing:
+            continue
+        lower, upper = _bound(month), _bound(add_months(month, 1))
+        stray = await db.execute(
+            text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {column} >= {lower} AND {column} < {upper})")
+        )
+        if not stray.scalar():
+            await db.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM ({lower}) TO ({upper})"))
+        else:
+            # A month the job did not premake in time: attaching it would fail
+            # while the default partition holds its rows, so move them first.
+            await db.execute(text("SET LOCAL app.audit_purge = 'allowed'"))
+            await db.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+            await db.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {default} WHERE {column} >= {lower} AND {column} < {upper} "
+                    f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+                )
+            )
+            await db.execute(
+                text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ({lower}) TO ({upper})")
+            )
+        created.append(name)
+    return created
+
+
+async def drop_expired_partitions(
+    db: AsyncSession, table: str, retention_months: Optional[int], today: Optional[date] = None
+) -> List[str]:
+    """Drop monthly partitions that ended more than ``retention_months`` ago; returns their names."""
+    if retention_months is None or not _is_postgresql(db):
+        return []
+    existing = await _partitions(db, table)
+    if existing is None:
+        return []
+    cutoff = add_months(month_start(today or datetime.now(timezone.utc).date()), -retention_months)
+
+    dropped = []
+    for name in sorted(existing):
+        match = _PARTITION_SUFFIX.search(name)
+        if not match or not name.startswith(f"{table}_p"):
+            continue  # the default partition, or something attached by hand
+        if date(int(match.group(1)), int(match.group(2)), 1) < cutoff:
+            await db.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    return dropped
+
+
+async def maintain_log_partitions() -> Dict[str, Dict[str, List[str]]]:
+    """每日排程：預建未來月份分割並依保留期刪除過期分割"""
+    retention = {
+        "audit_logs": settings.audit_log_retention_months,
+        "email_history": settings.email_history_retention_months,
+    }
+    summary: Dict[str, Dict[str, List[str]]] = {}
+    for table in PARTITIONED_TABLES:
+        try:
+            async with get_db_session() as db:
+                created = await ensure_partitions(db, table, settings.log_partition_premake_months)
+                dropped = await drop_expired_partitions(db, table, retention[table])
+                await db.commit()
+        except Exception:
+            logger.exception("log-partitions: maintenance of %s failed", table)
+            continue
+        summary[table] = {"created": created, "dropped": dropped}
+        if created or dropped:
+            logger.info("log-partitions: %s created=%s dropped=%s", table, created, dropped)
+    return summary
+
+
+async def estimated_row_count(db: AsyncSession, table: str) -> Optional[int]:
+    """Planner row estimate for ``table`` and its partitions (None off PostgreSQL)."""
+    if not _is_postgresql(db):
+        return None
+    result = await db.execute(
+        text(
+            "SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::bigint FROM pg_class c "
+            "WHERE c.oid = to_regclass(:table) "
+            "OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(:table))"
+        ),
+        {"table": table},
+    )
+    return int(result.scalar() or 0)
+
+
+async def count_rows(db: AsyncSession, table: str, exact_count_stmt: Any) -> int:
+    """Row count for an UNFILTERED listing of ``table``.
+
+    Above ``estimated_count_min_rows`` the planner estimate (kept current by
+    autovacuum's ANALYZE) is returned instead of running ``exact_count_stmt``;
+    small tables, and a never-analyzed table (estimate 0), are counted
+    exactly. Filtered listings must count exactly — the estimate is for the
+    whole table.
+    """
+    estimate = await estimated_row_count(db, table)
+    if estimate is not None and estimate >= settings.estimated_count_min_rows:
+        return estimate
+    return (await db.execute(exact_count_stmt)).scalar() or 0
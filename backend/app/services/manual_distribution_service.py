@@ -15,6 +15,7 @@ from sqlalchemy import and_, case as sa_case, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload
 
+from app.core.refdata_catalog import get_refdata_catalog
 from app.models.application import Application
 from app.models.audit_log import AuditAction, AuditLog
 from app.models.college_review import CollegeRanking, CollegeRankingItem, ManualDistributionHistory
@@ -535,14 +536,28 @@ class ManualDistributionService:
         return self.pool_total(config, sub_type) - await self.consumers_count(config.id, sub_type)
 
     async def _resolve_linked_configs(
-        self, requesting_config: ScholarshipConfiguration, sub_type: str
+        self, requesting_config: ScholarshipConfiguration, sub_type: str, from_db: bool = False
     ) -> list[ScholarshipConfiguration]:
         """Load the linked source configs of `requesting_config` whose
         shared_quota_sources entry lists `sub_type` (spec §6.3).
 
         Missing target configs (the source_config_code resolves to nothing) are
         silently dropped — consistent with §10/§11.5 dangling-link handling.
+
+        Served from the reference-data catalog when it is enabled: this runs
+        once per sub-type (and again inside distributable_pool), so the query
+        fallback used to dominate the quota-status and preview paths. Catalog
+        entries are read-only records; callers only read ids / codes / quotas.
+
+        Write paths (allocate, the §10 oversubscription gate, general
+        distribution) pass ``from_db=True``: the snapshot may lag a config
+        edit by the catalog check interval, and a quota decision must see the
+        rows as of the caller's transaction.
         """
+        catalog = None if from_db else await get_refdata_catalog(self.db)
+        if catalog is not None:
+            return catalog.linked_configurations(requesting_config, sub_type)
+
         sources = requesting_config.shared_quota_sources or []
         codes: list[str] = []
         for entry in sources:
@@ -562,14 +577,16 @@ class ManualDistributionService:
 
         = {own config id} ∪ {linked source config ids whose link lists sub_type}.
         Used server-side to validate that an inbound allocation_config_id is
-        permitted before recomputing remaining (spec §7).
+        permitted before recomputing remaining (spec §7); read from the DB.
         """
         allowed = {requesting_config.id}
-        for linked in await self._resolve_linked_configs(requesting_config, sub_type):
+        for linked in await self._resolve_linked_configs(requesting_config, sub_type, from_db=True):
             allowed.add(linked.id)
         return allowed
 
-    async def distributable_pool(self, requesting_config: ScholarshipConfiguration, sub_type: str) -> list[dict]:
+    async def distributable_pool(
+        self, requesting_config: ScholarshipConfiguration, sub_type: str, from_db: bool = False
+    ) -> list[dict]:
         """The pool of consumable configs for (requesting_config, sub_type), §6.3.
 
         Returns the own config first, then each linked source config in
@@ -586,7 +603,7 @@ class ManualDistributionService:
                 "remaining": await self.remaining(requesting_config, sub_type),
             }
         ]
-        linked = await self._resolve_linked_configs(requesting_config, sub_type)
+        linked = await self._resolve_linked_configs(requesting_config, sub_type, from_db=from_db)
         for cfg in sorted(linked, key=lambda c: c.academic_year, reverse=True):
             pool.append(
                 {
@@ -888,22 +905,31 @@ class ManualDistributionService:
         remaining is the LIVE global value (pool_total − every consumer of that
         config anywhere, INCLUDING approved renewals — see §17.1 behavior change).
         """
-        current_config = await self._load_config(scholarship_type_id, academic_year, semester)
+        # Read-only path: config, linked sources and sub-type names all come
+        # from the reference-data catalog when it is enabled.
+        catalog = await get_refdata_catalog(self.db)
+        if catalog is not None:
+            current_config = catalog.configuration_for(scholarship_type_id, academic_year, semester)
+        else:
+            current_config = await self._load_config(scholarship_type_id, academic_year, semester)
         if current_config is None:
             return {}
 
         # Sub-type display names.
-        sub_type_query = (
-            select(ScholarshipSubTypeConfig)
-            .where(
-                and_(
-                    ScholarshipSubTypeConfig.scholarship_type_id == scholarship_type_id,
-                    ScholarshipSubTypeConfig.is_active.is_(True),
+        if catalog is not None:
+            sub_type_configs = catalog.sub_type_configs(scholarship_type_id)
+        else:
+            sub_type_query = (
+                select(ScholarshipSubTypeConfig)
+                .where(
+                    and_(
+                        ScholarshipSubTypeConfig.scholarship_type_id == scholarship_type_id,
+                        ScholarshipSubTypeConfig.is_active.is_(True),
+                    )
                 )
+                .order_by(ScholarshipSubTypeConfig.display_order)
             )
-            .order_by(ScholarshipSubTypeConfig.display_order)
-        )
-        sub_type_configs = (await self.db.execute(sub_type_query)).scalars().all()
+            sub_type_configs = (await self.db.execute(sub_type_query)).scalars().all()
         sub_type_names = {stc.sub_type_code: stc.name for stc in sub_type_configs}
 
         # Drive columns off the requesting config's own quota sub_types.
@@ -2376,6 +2402,7 @@ class ManualDistributionService:
         requesting_config: ScholarshipConfiguration,
         sub_type: str,
         working_remaining: dict[int, int],
+        from_db: bool = False,
     ) -> Optional[int]:
         """Pick the next config id with positive working remaining for sub_type.
 
@@ -2387,7 +2414,7 @@ class ManualDistributionService:
         """
         if working_remaining.get(requesting_config.id, 0) > 0:
             return requesting_config.id
-        linked = await self._resolve_linked_configs(requesting_config, sub_type)
+        linked = await self._resolve_linked_configs(requesting_config, sub_type, from_db=from_db)
         for cfg in sorted(linked, key=lambda c: c.academic_year, reverse=True):
             if working_remaining.get(cfg.id, 0) > 0:
                 return cfg.id
@@ -2430,7 +2457,7 @@ class ManualDistributionService:
 
         consumed_ids = {requesting_config.id}
         for sub_type in (requesting_config.quotas or {}).keys():
-            for cfg in await self._resolve_linked_configs(requesting_config, sub_type):
+            for cfg in await self._resolve_linked_configs(requesting_config, sub_type, from_db=True):
                 consumed_ids.add(cfg.id)
 
         locked_rows = (
@@ -2527,7 +2554,7 @@ class ManualDistributionService:
         # 1+2. First-round distribution per sub_type.
         approved_challenges: list[Application] = []
         for sub_type in sub_types:
-            pool = await self.distributable_pool(config, sub_type)
+            pool = await self.distributable_pool(config, sub_type, from_db=True)
             working_remaining: dict[int, int] = {c["config_id"]: c["remaining"] for c in pool}
             candidates = await self._get_general_candidates(scholarship_type_id, academic_year, sub_type)
             rejected_map = await self._batch_load_rejected_map(
@@ -2540,7 +2567,7 @@ class ManualDistributionService:
                 # Reviewer reject (不同意) on this sub_type — never distribute.
                 if _norm_sub_type(sub_type) in rejected_map.get(app.id, set()):
                     continue
-                picked = await self._pick_config(config, sub_type, working_remaining)
+                picked = await self._pick_config(config, sub_type, working_remaining, from_db=True)
                 if picked is None:
                     break
                 app.status = ApplicationStatus.approved
@@ -2600,7 +2627,7 @@ class ManualDistributionService:
         filled_app_ids: set[int] = set()
         all_configs = {config.id: config}
         for st in sub_types:
-            for c in await self._resolve_linked_configs(config, st):
+            for c in await self._resolve_linked_configs(config, st, from_db=True):
                 all_configs[c.id] = c
         for (sub_type, freed_config_id), _count in released.items():
             freed_config = all_configs.get(freed_config_id)
@@ -3,13 +3,15 @@ MinIO storage service for roster file management
 MinIO文件儲存服務
 """
 
+import asyncio
 import hashlib
 import io
 import logging
 import os
+import tempfile
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Tuple
+from typing import IO, Any, Awaitable, Callable, Dict, Optional, Tuple
 
 from fastapi import HTTPException
 from minio import Minio
@@ -23,6 +25,19 @@ from app.core.path_security import secure_filename
 
 logger = logging.getLogger(__name__)
 
+# Uploads are read in chunks of this size; the spool holding them stays in
+# memory up to _SPOOL_MAX_MEMORY and then rolls over to a temp file.
+_READ_CHUNK = 1024 * 1024
+_SPOOL_MAX_MEMORY = 1024 * 1024
+
+
+def _file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_READ_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 
 class MinIOService:
     """MinIO storage service for managing roster files"""
@@ -121,15 +136,62 @@ class MinIOService:
         Returns:
             Dict[str, str]: 包含object_name, file_path, file_hash, file_size等資訊
         """
+        return self._put_roster_object(
+            io.BytesIO(file_content),
+            len(file_content),
+            hashlib.sha256(file_content).hexdigest(),
+            filename,
+            roster_id,
+            content_type,
+            metadata,
+        )
+
+    def upload_roster_file_from_path(
+        self,
+        file_path: str,
+        roster_id: int,
+        filename: Optional[str] = None,
+        content_type: str = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        metadata: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, str]:
+        """
+        從本機檔案串流上傳造冊檔案（不整檔載入記憶體）
+
+        Same result as upload_roster_file; the file is hashed in one chunked
+        pass and then streamed to MinIO (multipart above the part size).
+        """
+        try:
+            file_hash = _file_sha256(file_path)
+            file_size = os.path.getsize(file_path)
+        except OSError as e:
+            logger.exception(f"Failed to read roster file {file_path}")
+            raise FileStorageError(f"檔案上傳失敗: {str(e)}") from e
+        with open(file_path, "rb") as f:
+            return self._put_roster_object(
+                f,
+                file_size,
+                file_hash,
+                filename or os.path.basename(file_path),
+                roster_id,
+                content_type,
+                metadata,
+            )
+
+    def _put_roster_object(
+        self,
+        data: IO[bytes],
+        file_size: int,
+        file_hash: str,
+        filename: str,
+        roster_id: int,
+        content_type: str,
+        metadata: Optional[Dict[str, str]],
+    ) -> Dict[str, str]:
         try:
             # 產生檔案路徑: rosters/{year}/{month}/{roster_id}/{filename}
             now = datetime.now()
             object_name = f"rosters/{now.year}/{now.month:02d}/{roster_id}/{filename}"
 
-            # 計算檔案hash
-            file_hash = hashlib.sha256(file_content).hexdigest()
-            file_size = len(file_content)
-
             # 準備metadata
             upload_metadata = {
                 "Content-Type": content_type,
@@ -143,15 +205,14 @@ class MinIOService:
                 upload_metadata.update(metadata)
 
             # 上傳檔案
-            file_stream = io.BytesIO(file_content)
-
             self.client.put_object(
                 bucket_name=self.roster_bucket,
                 object_name=object_name,
-                data=file_stream,
+                data=data,
                 length=file_size,
                 content_type=content_type,
                 metadata=upload_metadata,
+                part_size=settings.minio_upload_part_size,
             )
 
             logger.info(f"Uploaded roster file: {object_name} (size: {file_size}, hash: {file_hash[:8]}...)")
@@ -169,7 +230,13 @@ class MinIOService:
             logger.exception(f"Failed to upload roster file {filename}")
             raise FileStorageError(f"檔案上傳失敗: {str(e)}") from e
 
-    async def upload_file(self, file, application_id: int, file_type: str) -> Tuple[str, int]:
+    async def upload_file(
+        self,
+        file,
+        application_id: int,
+        file_type: str,
+        reserve: Optional[Callable[[str, int], Awaitable[Any]]] = None,
+    ) -> Tuple[str, int]:
         """
         通用檔案上傳方法 (for application files)
 
@@ -177,20 +244,16 @@ class MinIOService:
             file: UploadFile對象
             application_id: 申請ID
             file_type: 檔案類型 (doc, transcript, etc.)
+            reserve: awaited with (blob object_name, size) once the content
+                is hashed and before the deduplication check; callers take
+                their blob reference here (blob_store.acquire_blob) so the
+                GC cannot remove an object this upload decides to reuse
 
         Returns:
             Tuple[str, int]: (object_name, file_size)
         """
         try:
-            # 讀取檔案內容
-            content = await file.read()
-            file_size = len(content)
-
-            # 檢查檔案大小
-            if file_size > settings.max_file_size:
-                raise HTTPException(status_code=413, detail="File too large")
-
-            # 檢查檔案類型
+            # 檢查檔案類型（先於讀取內容：不合法的檔案不必讀完）
             if not file.filename:
                 raise HTTPException(status_code=400, detail="No filename provided")
 
@@ -208,30 +271,26 @@ class MinIOService:
             # "unnamed_file") and re-attach the validated extension.
             safe_filename = f"{secure_filename(stem)}.{file_extension}"
 
-            # 生成object名稱 — the uuid suffix keeps same-second uploads of
-            # identically-sanitized names (e.g. two Chinese filenames that
-            # both collapse to "unnamed_file") from overwriting each other.
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            unique_suffix = uuid.uuid4().hex[:8]
-            # 標準化 file_type 為複數形式
-            if file_type == "doc":
-                folder_name = "documents"
-            else:
-                folder_name = f"{file_type}s"
-            object_name = f"applications/{application_id}/{folder_name}/{timestamp}_{unique_suffix}_{safe_filename}"
-
-            # 上傳到MinIO
-            self.client.put_object(
-                bucket_name=self.default_bucket,
-                object_name=object_name,
-                data=io.BytesIO(content),
-                length=file_size,
-                content_type=file.content_type,
-            )
+            # 分塊讀入暫存檔（超過 max_file_size 立即 413），同時計算雜湊
+            spool, file_size, file_hash = await self._spool_upload(file)
+
+            # Content-addressed: the object is keyed by its SHA-256, so a
+            # re-upload of identical bytes (or the same passbook across
+            # applications) is stored once. The SDK calls are blocking network
+            # I/O: run them in a thread so one slow upload does not stall every
+            # other request on this worker.
+            try:
+                if reserve is not None:
+                    await reserve(self.blob_object_name(file_hash), file_size)
+                object_name, stored = await asyncio.to_thread(
+                    self.put_blob, spool, file_size, file_hash, file.content_type
+                )
+            finally:
+                spool.close()
 
             # Log the sanitized filename (object_name is already safe) to avoid
             # log injection from control characters in the client-supplied name.
-            logger.info(f"Uploaded file {safe_filename} as {object_name}")
+            logger.info(f"Uploaded file {safe_filename} as {object_name}" + ("" if stored else " (deduplicated)"))
 
             # Business metric: count successful application-file uploads.
             # file_type already discriminates document categories (doc,
@@ -257,6 +316,35 @@ class MinIOService:
 
             raise HTTPException(status_code=500, detail="File upload failed") from e
 
+    @staticmethod
+    async def _spool_upload(file) -> Tuple[IO[bytes], int, str]:
+        """
+        分塊讀取 UploadFile 至暫存檔
+
+        Returns (spool positioned at 0, size, sha256 hex). ``max_file_size``
+        is enforced as chunks arrive, so an oversized upload is rejected
+        without reading the rest of it.
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_MEMORY)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            while chunk := await file.read(_READ_CHUNK):
+                size += len(chunk)
+                if size > settings.max_file_size:
+                    raise HTTPException(status_code=413, detail="File too large")
+                digest.update(chunk)
+                if size > _SPOOL_MAX_MEMORY:
+                    # Rolled over to disk: keep the write off the event loop.
+                    await asyncio.to_thread(spool.write, chunk)
+                else:
+                    spool.write(chunk)
+            spool.seek(0)
+        except BaseException:
+            spool.close()
+            raise
+        return spool, size, digest.hexdigest()
+
     def get_file_stream(self, object_name: str):
         """
         取得檔案串流
@@ -275,6 +363,183 @@ class MinIOService:
 
             raise HTTPException(status_code=404, detail="File not found") from e
 
+    def stat_file(self, object_name: str):
+        """
+        取得檔案中繼資料（大小、ETag、最後修改時間）
+
+        Raises HTTPException(404) like get_file_stream when the object is missing.
+        """
+        try:
+            return self.client.stat_object(self.default_bucket, object_name)
+        except Exception as e:
+            logger.exception(f"Failed to stat {object_name}")
+            raise HTTPException(status_code=404, detail="File not found") from e
+
+    def get_file_range(self, object_name: str, offset: int, length: int):
+        """取得檔案指定位元組範圍的串流（MinIO ranged GET）"""
+        try:
+            return self.client.get_object(self.default_bucket, object_name, offset=offset, length=length)
+        except Exception as e:
+            logger.exception(f"Failed to get range {offset}+{length} of {object_name}")
+            raise HTTPException(status_code=404, detail="File not found") from e
+
+    def get_file_download_url(
+        self, object_name: str, expires: timedelta, response_headers: Optional[Dict[str, str]] = None
+    ) -> str:
+        """
+        產生申請文件的短效預簽名下載連結
+
+        ``response_headers`` (response-content-type, response-content-disposition,
+        ...) are signed into the URL, so the storage server answers with the
+        same safe headers the file proxy would have sent.
+        """
+        try:
+            return self.client.get_presigned_url(
+                "GET", self.default_bucket, object_name, expires=expires, response_headers=response_headers
+            )
+        except Exception as e:
+            logger.exception(f"Failed to generate presigned URL for {object_name}")
+            raise FileStorageError(f"下載連結產生失敗: {str(e)}") from e
+
+    # Content-addressed application files: blobs/{sha[:2]}/{sha}. Reference
+    # counts and garbage collection live in app.services.blob_store.
+    BLOB_PREFIX = "blobs/"
+
+    @classmethod
+    def blob_object_name(cls, content_sha256: str) -> str:
+        return f"{cls.BLOB_PREFIX}{content_sha256[:2]}/{content_sha256}"
+
+    @classmethod
+    def blob_sha256(cls, object_name: Optional[str]) -> Optional[str]:
+        """SHA-256 of a blob object name; None for legacy per-application objects"""
+        if not object_name or not object_name.startswith(cls.BLOB_PREFIX):
+            return None
+        return object_name.rsplit("/", 1)[-1]
+
+    def _object_exists(self, object_name: str) -> bool:
+        try:
+            self.client.stat_object(self.default_bucket, object_name)
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject"):
+                return False
+            raise
+        return True
+
+    def put_blob(
+        self, data: IO[bytes], length: int, content_sha256: str, content_type: Optional[str]
+    ) -> Tuple[str, bool]:
+        """
+        以內容雜湊存放檔案；相同內容已存在時不重複上傳
+
+        Returns (object_name, stored) — ``stored`` is False when the blob
+        already existed and the upload was skipped. Reusing an existing
+        object is only safe once the caller holds a reference to its
+        ``storage_blobs`` row (see ``upload_file``'s ``reserve``).
+        """
+        object_name = self.blob_object_name(content_sha256)
+        if self._object_exists(object_name):
+            return object_name, False
+        self.client.put_object(
+            bucket_name=self.default_bucket,
+            object_name=object_name,
+            data=data,
+            length=length,
+            content_type=content_type or "application/octet-stream",
+            metadata={"file-hash": content_sha256},
+            part_size=settings.minio_upload_part_size,
+        )
+        return object_name, True
+
+    def source_digest(self, source_object_name: str) -> Tuple[str, int]:
+        """
+        取得既有物件的內容雜湊與大小（供 adopt_blob 使用）
+
+        The hash comes from the object's ``file-hash`` metadata when present,
+        otherwise from one streamed read. Returns (sha256, size).
+        """
+        stat = self.client.stat_object(self.default_bucket, source_object_name)
+        content_sha256 = (stat.metadata or {}).get("x-amz-meta-file-hash")
+        if not content_sha256:
+            digest = hashlib.sha256()
+            response = self.client.get_object(self.default_bucket, source_object_name)
+            try:
+                for chunk in response.stream(_READ_CHUNK):
+                    digest.update(chunk)
+            finally:
+                response.close()
+                response.release_conn()
+            content_sha256 = digest.hexdigest()
+        return content_sha256, stat.size
+
+    def adopt_blob(self, source_object_name: str, content_sha256: str) -> str:
+        """
+        將既有物件（例如個人資料的存摺封面）納入內容定址儲存
+
+        The blob is created with a server-side copy only if that content is
+        not stored yet. As with ``put_blob``, take the blob reference before
+        calling this. Returns the blob object_name.
+        """
+        object_name = self.blob_object_name(content_sha256)
+        if not self._object_exists(object_name):
+            self.client.copy_object(
+                bucket_name=self.default_bucket,
+                object_name=object_name,
+                source=CopySource(self.default_bucket, source_object_name),
+            )
+        return object_name
+
+    # Rendered derivatives of uploaded files (e.g. merged-PDF pages) live in
+    # the default bucket under this prefix, then the source object name. Their
+    # keys embed the source ETag, so a changed source never hits a stale entry;
+    # delete_derivatives removes them once the source itself is removed.
+    DERIVATIVE_PREFIX = "derivatives/"
+
+    def get_derivative(self, key: str) -> Optional[bytes]:
+        """讀取衍生檔；不存在或讀取失敗時回傳 None（呼叫端重新產生）"""
+        try:
+            response = self.client.get_object(self.default_bucket, f"{self.DERIVATIVE_PREFIX}{key}")
+        except S3Error as e:
+            if e.code != "NoSuchKey":
+                logger.warning("Failed to read derivative %s: %s", key, e.code)
+            return None
+        except Exception:
+            logger.warning("Failed to read derivative %s", key, exc_info=True)
+            return None
+        try:
+            content = response.read()
+        finally:
+            response.close()
+            response.release_conn()
+        return content if isinstance(content, bytes) else None
+
+    def put_derivative(self, key: str, content: bytes, content_type: str) -> None:
+        """寫入衍生檔"""
+        self.client.put_object(
+            self.default_bucket,
+            f"{self.DERIVATIVE_PREFIX}{key}",
+            io.BytesIO(content),
+            length=len(content),
+            content_type=content_type,
+        )
+
+    def delete_derivatives(self, source_object_name: str) -> int:
+        """
+        刪除某個原始物件的所有衍生檔
+
+        Covers every render version and setting ever stored for the source.
+        Returns the number of objects removed; failures are logged and leave
+        the remaining derivatives as orphans, never raise.
+        """
+        prefix = f"{self.DERIVATIVE_PREFIX}{source_object_name}/"
+        removed = 0
+        try:
+            for obj in self.client.list_objects(self.default_bucket, prefix=prefix, recursive=True):
+                self.client.remove_object(self.default_bucket, obj.object_name)
+                removed += 1
+        except Exception:
+            logger.warning("Failed to delete derivatives of %s", source_object_name, exc_info=True)
+        return removed
+
     def delete_file(self, object_name: str) -> bool:
         """
         刪除檔案
@@ -295,7 +560,11 @@ class MinIOService:
 
     def clone_file_to_application(self, source_object_name: str, application_id: str) -> str:
         """
-        複製檔案到指定的申請
+        複製檔案到指定的申請（獨立一份物件）
+
+        Applications now reference profile documents as content-addressed
+        blobs (adopt_blob); this per-application copy remains for repair
+        scripts that re-create legacy objects.
 
         Args:
             source_object_name: 來源檔案object名稱
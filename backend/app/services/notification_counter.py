@@ -0,0 +1,352 @@
+"""
+Per-user unread-notification counters and their push channel.
+
+``GET /notifications/unread-count`` used to run two COUNT queries on every
+call (one of them a NOT IN over notification_reads), and every logged-in
+browser polled it every 30 seconds. The count now lives in Redis:
+
+  • ``cache.KEY_PREFIX + "notifications:unread:{user_id}"`` holds the total
+    (personal + system announcements) as a plain integer, so a lookup is a
+    single GET.
+  • Writes adjust the integer in place (``adjust``), but only while the key
+    exists. A missing key is recomputed from the database on the next read
+    and stored with ``store``; its TTL is capped by the earliest expiry among
+    the counted notifications so expired rows drop out on time.
+  • Announcement changes affect every user. ``announcements_changed`` drops
+    all counters (SCAN + DEL via ``cache.invalidate``) instead of touching
+    each user's key.
+  • A recount can race a write: the reader counts, a write commits and its
+    ``adjust`` finds no key, then the reader stores its now-stale count.
+    Every write therefore bumps a generation — per user, or a global one for
+    announcements — and ``store`` only writes (SET NX) if the generation
+    the reader saw in ``get``, before counting, is still current.
+
+Every change is published on ``CHANNEL``; ``broker`` fans the messages out
+to this worker's SSE streams (``unread_count_stream``). Redis errors never
+fail the caller: reads fall through to the database, and a failed publish
+is delivered to this worker's subscribers only.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import random
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, Sequence, Set, Tuple
+
+from app.core import cache as cache_mod
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = b"notifications:unread"
+_KEY_PREFIX = "notifications:unread:"
+# Not under _KEY_PREFIX: announcements_changed must not drop the generations.
+_GEN_PREFIX = "notifications:unread_gen:"
+
+# Seconds between pub/sub reconnect attempts.
+_RETRY_SECONDS = 5.0
+# After an announcement change every open stream re-reads its count; spread
+# those reads so they don't all hit the database in the same instant.
+_RESYNC_SPREAD_SECONDS = 5.0
+
+# KEYS: the counters, then each counter's generation key. Bump every
+# generation, INCRBY every counter that exists and report -1 for the ones
+# that don't (they are recomputed on read). A negative result means the
+# counter drifted from the database, so it is dropped rather than clamped.
+_ADJUST_LUA = """
+local n = #KEYS / 2
+local out = {}
+for i = 1, n do
+  redis.call('INCR', KEYS[n + i])
+  redis.call('EXPIRE', KEYS[n + i], ARGV[2])
+  local count = -1
+  if redis.call('EXISTS', KEYS[i]) == 1 then
+    count = redis.call('INCRBY', KEYS[i], ARGV[1])
+    if count < 0 then
+      redis.call('DEL', KEYS[i])
+      count = -1
+    end
+  end
+  out[i] = count
+end
+return out
+"""
+
+# KEYS: counters to drop, then generation keys to bump (ARGV[1] of them).
+_DROP_LUA = """
+local n = #KEYS - tonumber(ARGV[1])
+for i = 1, n do
+  redis.call('DEL', KEYS[i])
+end
+for i = n + 1, #KEYS do
+  redis.call('INCR', KEYS[i])
+  redis.call('EXPIRE', KEYS[i], ARGV[2])
+end
+return n
+"""
+
+# KEYS: counter, user generation, global generation. Store the recount only
+# if no write happened since the reader's GET, and never over a newer value.
+_STORE_LUA = """
+local seen = (redis.call('GET', KEYS[2]) or '') .. ':' .. (redis.call('GET', KEYS[3]) or '')
+if seen ~= ARGV[3] then
+  return 0
+end
+if redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2], 'NX') then
+  return 1
+end
+return 0
+"""
+
+# Queue item telling a stream to re-read after an announcement change.
+_RESYNC = object()
+
+
+def _key(user_id: int) -> bytes:
+    return f"{cache_mod.KEY_PREFIX}{_KEY_PREFIX}{user_id}".encode("utf-8")
+
+
+def _gen_key(user_id: Optional[int]) -> bytes:
+    """Generation key of one user, or the global one (announcements) for None."""
+    return f"{cache_mod.KEY_PREFIX}{_GEN_PREFIX}{'all' if user_id is None else user_id}".encode("utf-8")
+
+
+def _generation_ttl() -> int:
+    # Only has to outlive a reader's GET -> recount -> store window.
+    return 2 * settings.notification_unread_counter_ttl_seconds
+
+
+def _generation(user_gen: Optional[bytes], all_gen: Optional[bytes]) -> str:
+    return f"{(user_gen or b'').decode()}:{(all_gen or b'').decode()}"
+
+
+def counter_ttl(expiries: Iterable[Optional[datetime]]) -> int:
+    """Counter TTL: the configured maximum, or less if a counted row expires sooner."""
+    ttl = settings.notification_unread_counter_ttl_seconds
+    now = datetime.now(timezone.utc)
+    for expires_at in expiries:
+        if expires_at is None:
+            continue
+        if expires_at.tzinfo is None:  # SQLite hands back naive UTC
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        ttl = min(ttl, max(1, math.ceil((expires_at - now).total_seconds())))
+    return ttl
+
+
+async def get(user_id: int) -> Tuple[Optional[int], Optional[str]]:
+    """Cached unread count (``None`` on a miss or Redis error) and the
+    generation to hand back to ``store`` after recounting."""
+    try:
+        value, user_gen, all_gen = await cache_mod.get_cache().mget(_key(user_id), _gen_key(user_id), _gen_key(None))
+    except Exception:  # noqa: BLE001
+        logger.warning("notification_counter: GET failed; counting in the database", exc_info=True)
+        return None, None
+    return (int(value) if value is not None else None), _generation(user_gen, all_gen)
+
+
+async def store(
+    user_id: int, count: int, generation: Optional[str], expiries: Iterable[Optional[datetime]] = ()
+) -> None:
+    """Cache a freshly computed count unless a write happened since ``get``
+    returned ``generation``. Never raises on Redis failure."""
+    if generation is None:
+        return  # Redis was unreachable at get(): nothing to compare against
+    try:
+        await cache_mod.get_cache().eval(
+            _STORE_LUA, 3, _key(user_id), _gen_key(user_id), _gen_key(None), count, counter_ttl(expiries), generation
+        )
+    except Exception:  # noqa: BLE001
+        logger.warning("notification_counter: SET failed; not cached", exc_info=True)
+
+
+async def adjust(user_ids: Sequence[int], delta: int) -> None:
+    """Add ``delta`` to the counters of ``user_ids`` and push the new values."""
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return
+    counts: Sequence[Optional[int]] = [None] * len(user_ids)
+    try:
+        keys = [_key(user_id) for user_id in user_ids] + [_gen_key(user_id) for user_id in user_ids]
+        result = await cache_mod.get_cache().eval(_ADJUST_LUA, len(keys), *keys, delta, _generation_ttl())
+        counts = [int(n) if int(n) >= 0 else None for n in result]
+    except Exception:  # noqa: BLE001
+        logger.warning("notification_counter: adjust failed; counters recompute on read", exc_info=True)
+        await _drop(user_ids)
+    await publish(dict(zip(user_ids, counts)))
+
+
+async def reset(user_id: int) -> None:
+    """After "mark all as read": drop the counter and push a zero."""
+    await _drop([user_id])
+    await publish({user_id: 0})
+
+
+async def announcements_changed() -> None:
+    """A system announcement was created, edited or removed: every count is stale."""
+    await _drop([], bump_global=True)
+    await cache_mod.invalidate(_KEY_PREFIX)
+    await publish(None)
+
+
+async def _drop(user_ids: Sequence[int], bump_global: bool = False) -> None:
+    """Delete the counters and bump their generations (or the global one)."""
+    generations = [_gen_key(None)] if bump_global else [_gen_key(user_id) for user_id in user_ids]
+    keys = [_key(user_id) for user_id in user_ids] + generations
+    try:
+        await cache_mod.get_cache().eval(_DROP_LUA, len(keys), *keys, len(generations), _generation_ttl())
+    except Exception:  # noqa: BLE001
+        logger.warning("notification_counter: DEL failed", exc_info=True)
+
+
+def _encode(counts: Optional[Dict[int, Optional[int]]]) -> bytes:
+    payload = None if counts is None else {str(user_id): count for user_id, count in counts.items()}
+    return json.dumps({"counts": payload}, separators=(",", ":")).encode("utf-8")
+
+
+def _decode(blob: bytes) -> Optional[Dict[int, Optional[int]]]:
+    counts = json.loads(blob)["counts"]
+    return None if counts is None else {int(user_id): count for user_id, count in counts.items()}
+
+
+async def publish(counts: Optional[Dict[int, Optional[int]]]) -> None:
+    """Push count changes to every worker's streams.
+
+    ``counts`` maps user id to the new count (``None``: unknown, re-read);
+    ``None`` itself means every user's count may have changed.
+    """
+    try:
+        await cache_mod.get_cache().publish(CHANNEL, _encode(counts))
+    except Exception:  # noqa: BLE001
+        logger.warning("notification_counter: PUBLISH failed; notifying local streams only", exc_info=True)
+        broker.dispatch(counts)
+
+
+class UnreadCountBroker:
+    """Per-worker fan-out from ``CHANNEL`` to the open SSE streams.
+
+    One pub/sub connection is held while at least one stream is open. Each
+    stream gets a one-slot queue: only the latest value matters, so a newer
+    message replaces an unconsumed one.
+    """
+
+    def __init__(self) -> None:
+        self._queues: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._listener: Optional[asyncio.Task] = None
+        self.connected = False
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._queues[user_id].add(queue)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        queues = self._queues.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._queues[user_id]
+        if not self._queues and self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+            self.connected = False
+
+    def dispatch(self, counts: Optional[Dict[int, Optional[int]]]) -> None:
+        if counts is None:
+            for queues in self._queues.values():
+                for queue in queues:
+                    _offer(queue, _RESYNC)
+            return
+        for user_id, count in counts.items():
+            for queue in self._queues.get(user_id, ()):
+                _offer(queue, count)
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = None
+            try:
+                pubsub = cache_mod.get_cache().pubsub()
+                await pubsub.subscribe(CHANNEL)
+                self.connected = True
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.dispatch(_decode(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # noqa: BLE001
+                logger.warning("notification_counter: pub/sub listener failed; retrying", exc_info=True)
+            finally:
+                self.connected = False
+                if pubsub is not None:
+                    with contextlib.suppress(Exception):
+                        await pubsub.aclose()
+            await asyncio.sleep(_RETRY_SECONDS)
+
+
+def _offer(queue: asyncio.Queue, item) -> None:
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(item)
+
+
+broker = UnreadCountBroker()
+
+
+def _event(count: int) -> bytes:
+    return f"event: unread_count\ndata: {json.dumps({'count': count})}\n\n".encode("utf-8")
+
+
+async def unread_count_stream(user_id: int, read_count: Callable[[], Awaitable[int]]) -> AsyncIterator[bytes]:
+    """Server-Sent Events body: the current count, then every change.
+
+    While pub/sub is connected the stream only sends keepalive comments
+    between pushes. Without it (Redis down) each keepalive tick re-reads the
+    count instead, which degrades to the old polling at the keepalive
+    interval.
+    """
+    keepalive = settings.notification_stream_keepalive_seconds
+    queue = broker.subscribe(user_id)
+    try:
+        last = await read_count()
+        yield f"retry: {int(keepalive * 1000)}\n".encode("utf-8") + _event(last)
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                if broker.connected:
+                    yield b": keepalive\n\n"
+                    continue
+                item = None  # no pub/sub: poll
+            if item is _RESYNC:
+                await asyncio.sleep(random.uniform(0, min(keepalive, _RESYNC_SPREAD_SECONDS)))
+
+            count = item if isinstance(item, int) else await read_count()
+            if count != last:
+                last = count
+                yield _event(count)
+            elif not broker.connected:
+                yield b": keepalive\n\n"
+    finally:
+        broker.unsubscribe(user_id, queue)
+
+
+__all__ = [
+    "CHANNEL",
+    "UnreadCountBroker",
+    "adjust",
+    "announcements_changed",
+    "broker",
+    "counter_ttl",
+    "get",
+    "publish",
+    "reset",
+    "store",
+    "unread_count_stream",
+]
@@ -12,6 +12,8 @@ from typing import Any, Dict, List, Optional, Union
 from sqlalchemy import and_, desc
 from sqlalchemy import func as sa_func
 from sqlalchemy import or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.notification import (
@@ -21,15 +23,53 @@ from app.models.notification import (
     NotificationPriority,
     NotificationQueue,
     NotificationRead,
+    NotificationReadWatermark,
     NotificationTemplate,
     NotificationType,
 )
+from app.services import notification_counter
 
 func: Any = sa_func
 
 logger = logging.getLogger(__name__)
 
 
+def _not_expired(now: datetime):
+    return or_(Notification.expires_at.is_(None), Notification.expires_at > now)
+
+
+def _read_watermark(user_id: int):
+    """用戶「讀到」的最大系統公告 ID（scalar subquery，沒有水位時為 0）"""
+    return func.coalesce(
+        select(NotificationReadWatermark.last_announcement_id)
+        .where(NotificationReadWatermark.user_id == user_id)
+        .scalar_subquery(),
+        0,
+    )
+
+
+def _unread_announcement(user_id: int):
+    """系統公告對此用戶未讀：ID 高於讀取水位，且沒有逐則的 NotificationRead 記錄"""
+    read = (
+        select(NotificationRead.id)
+        .where(NotificationRead.notification_id == Notification.id, NotificationRead.user_id == user_id)
+        .exists()
+    )
+    return and_(Notification.user_id.is_(None), Notification.id > _read_watermark(user_id), ~read)
+
+
+def _is_live(notification: Notification) -> bool:
+    """未關閉且未過期，也就是未讀時會計入未讀數量"""
+    if notification.is_dismissed:
+        return False
+    expires_at = notification.expires_at
+    if expires_at is None:
+        return True
+    if expires_at.tzinfo is None:  # SQLite 取回的是 naive UTC
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at > datetime.now(timezone.utc)
+
+
 class NotificationService:
     """Facebook-style notification service with real-time delivery, batching, and preferences"""
 
@@ -101,6 +141,10 @@ class NotificationService:
         self.db.add(notification)
         await self.db.commit()
         await self.db.refresh(notification)
+        if user_id is None:
+            await notification_counter.announcements_changed()
+        else:
+            await notification_counter.adjust([user_id], 1)
 
         # Handle real-time delivery if not scheduled
         if not scheduled_for:
@@ -541,6 +585,7 @@ class NotificationService:
         self.db.add(notification)
         await self.db.commit()
         await self.db.refresh(notification)
+        await notification_counter.adjust([user_id], 1)
 
         return notification
 
@@ -590,6 +635,7 @@ class NotificationService:
         self.db.add(notification)
         await self.db.commit()
         await self.db.refresh(notification)
+        await notification_counter.announcements_changed()
 
         return notification
 
@@ -803,6 +849,7 @@ class NotificationService:
         # 刷新所有對象
         for notification in notifications:
             await self.db.refresh(notification)
+        await notification_counter.adjust(user_ids, 1)
 
         return notifications
 
@@ -853,22 +900,14 @@ class NotificationService:
 
         # 如果只要未讀通知，需要複雜的查詢
         if unread_only:
-            # 子查詢：獲取已讀的通知ID
-            read_subquery = select(NotificationRead.notification_id).where(NotificationRead.user_id == user_id)
-
             base_query = base_query.where(
-                and_(
-                    # 個人通知未讀 OR 系統公告未讀
-                    or_(
-                        and_(
-                            Notification.user_id == user_id,
-                            Notification.is_read.is_(False),
-                        ),
-                        and_(
-                            Notification.user_id.is_(None),
-                            ~Notification.id.in_(read_subquery),
-                        ),
-                    )
+                # 個人通知未讀 OR 系統公告未讀
+                or_(
+                    and_(
+                        Notification.user_id == user_id,
+                        Notification.is_read.is_(False),
+                    ),
+                    _unread_announcement(user_id),
                 )
             )
 
@@ -887,6 +926,9 @@ class NotificationService:
         )
         read_result = await self.db.execute(read_query)
         read_records = {r.notification_id: r for r in read_result.scalars().all()}
+        watermark = 0
+        if any(n.user_id is None for n in notifications):
+            watermark = await self._get_read_watermark(user_id)
 
         # 組合結果
         result_list = []
@@ -897,9 +939,9 @@ class NotificationService:
                 is_read = notification.is_read
                 read_at = notification.read_at
             else:
-                # 系統公告使用NotificationRead記錄
+                # 系統公告使用讀取水位與NotificationRead記錄
                 read_record = read_records.get(notification.id)
-                is_read = read_record is not None
+                is_read = read_record is not None or notification.id <= watermark
                 read_at = read_record.read_at if read_record else None
 
             result_list.append(
@@ -938,47 +980,48 @@ class NotificationService:
         """
         獲取用戶未讀通知數量
 
+        優先讀取 Redis 中維護的計數（notification_counter），未命中時才以
+        資料庫計算並寫回。已關閉、已過期的通知不計入。
+
         Args:
             user_id: 用戶ID
 
         Returns:
             int: 未讀通知數量
         """
-        from sqlalchemy import and_
+        cached, generation = await notification_counter.get(user_id)
+        if cached is not None:
+            return cached
+
+        now = datetime.now(timezone.utc)
 
         # 個人通知未讀數量
-        personal_query = select(func.count(Notification.id)).where(
-            and_(
-                Notification.user_id == user_id,
-                Notification.is_read.is_(False),
-                or_(
-                    Notification.expires_at.is_(None),
-                    Notification.expires_at > datetime.now(timezone.utc),
-                ),
-            )
+        personal_query = select(func.count(Notification.id), func.min(Notification.expires_at)).where(
+            Notification.user_id == user_id,
+            Notification.is_read.is_(False),
+            Notification.is_dismissed.is_(False),
+            _not_expired(now),
         )
 
-        # 系統公告未讀數量（未在NotificationRead中的）
-        read_subquery = select(NotificationRead.notification_id).where(NotificationRead.user_id == user_id)
-
-        system_query = select(func.count(Notification.id)).where(
-            and_(
-                Notification.user_id.is_(None),
-                ~Notification.id.in_(read_subquery),
-                or_(
-                    Notification.expires_at.is_(None),
-                    Notification.expires_at > datetime.now(timezone.utc),
-                ),
-            )
+        # 系統公告未讀數量（讀取水位之上、且未在NotificationRead中的）
+        system_query = select(func.count(Notification.id), func.min(Notification.expires_at)).where(
+            _unread_announcement(user_id),
+            Notification.is_dismissed.is_(False),
+            _not_expired(now),
         )
 
-        personal_result = await self.db.execute(personal_query)
-        system_result = await self.db.execute(system_query)
+        personal_count, personal_expiry = (await self.db.execute(personal_query)).one()
+        system_count, system_expiry = (await self.db.execute(system_query)).one()
 
-        personal_count = personal_result.scalar() or 0
-        system_count = system_result.scalar() or 0
+        count = (personal_count or 0) + (system_count or 0)
+        await notification_counter.store(user_id, count, generation, [personal_expiry, system_expiry])
+        return count
 
-        return personal_count + system_count
+    async def _get_read_watermark(self, user_id: int) -> int:
+        result = await self.db.execute(
+            select(NotificationReadWatermark.last_announcement_id).where(NotificationReadWatermark.user_id == user_id)
+        )
+        return result.scalar() or 0
 
     async def markNotificationAsRead(self, notification_id: int, user_id: int) -> bool:
         """
@@ -1001,8 +1044,11 @@ class NotificationService:
 
         if notification.user_id == user_id:
             # 個人通知直接更新
+            was_counted = notification.is_read is False and _is_live(notification)
             notification.mark_as_read()
             await self.db.commit()
+            if was_counted:
+                await notification_counter.adjust([user_id], -1)
         elif notification.user_id is None:
             # 系統公告創建或更新NotificationRead記錄
             read_query = select(NotificationRead).where(
@@ -1014,11 +1060,14 @@ class NotificationService:
             read_result = await self.db.execute(read_query)
             read_record = read_result.scalar_one_or_none()
 
-            if not read_record:
+            # 讀取水位以下的公告已視為已讀，不需再記錄
+            if not read_record and notification.id > await self._get_read_watermark(user_id):
                 # 創建新的已讀記錄
                 read_record = NotificationRead(notification_id=notification_id, user_id=user_id)
                 self.db.add(read_record)
                 await self.db.commit()
+                if _is_live(notification):
+                    await notification_counter.adjust([user_id], -1)
 
         return True
 
@@ -1026,50 +1075,88 @@ class NotificationService:
         """
         標記用戶的所有通知為已讀
 
+        系統公告不再逐則寫入 NotificationRead，而是把用戶的讀取水位推進到
+        目前最大的公告 ID。
+
         Args:
             user_id: 用戶ID
 
         Returns:
             int: 標記為已讀的通知數量
         """
-        from sqlalchemy import and_
+        now = datetime.now(timezone.utc)
 
         # 標記個人通知為已讀
         personal_update = (
             update(Notification)
             .where(and_(Notification.user_id == user_id, Notification.is_read.is_(False)))
-            .values(is_read=True, read_at=datetime.now(timezone.utc))
+            .values(is_read=True, read_at=now)
         )
 
         personal_result = await self.db.execute(personal_update)
         personal_updated = personal_result.rowcount
 
-        # 獲取用戶未讀的系統公告
-        read_subquery = select(NotificationRead.notification_id).where(NotificationRead.user_id == user_id)
+        # 用戶未讀的系統公告數量，以及目前最大的公告 ID
+        system_query = select(
+            func.count(Notification.id).filter(and_(_unread_announcement(user_id), _not_expired(now))),
+            func.max(Notification.id),
+        ).where(Notification.user_id.is_(None))
+        system_updated, last_announcement_id = (await self.db.execute(system_query)).one()
+
+        if last_announcement_id is not None:
+            dialect = self.db.get_bind().dialect.name
+            insert = pg_insert if dialect == "postgresql" else sqlite_insert
+            greatest = func.greatest if dialect == "postgresql" else func.max
+            stmt = insert(NotificationReadWatermark).values(user_id=user_id, last_announcement_id=last_announcement_id)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[NotificationReadWatermark.user_id],
+                # 公告被刪除後最大 ID 可能變小，水位只進不退
+                set_={
+                    "last_announcement_id": greatest(
+                        NotificationReadWatermark.last_announcement_id, stmt.excluded.last_announcement_id
+                    ),
+                    "updated_at": func.now(),
+                },
+            )
+            await self.db.execute(stmt)
+
+        await self.db.commit()
+        await notification_counter.reset(user_id)
+        return personal_updated + (system_updated or 0)
+
+    async def dismissNotification(self, notification_id: int, user_id: int) -> bool:
+        """
+        關閉通知（個人通知或系統公告）
 
-        system_query = select(Notification.id).where(
+        Args:
+            notification_id: 通知ID
+            user_id: 用戶ID
+
+        Returns:
+            bool: 找不到通知時為 False
+        """
+        query = select(Notification).where(
             and_(
-                Notification.user_id.is_(None),
-                ~Notification.id.in_(read_subquery),
-                or_(
-                    Notification.expires_at.is_(None),
-                    Notification.expires_at > datetime.now(timezone.utc),
-                ),
+                Notification.id == notification_id,
+                or_(Notification.user_id == user_id, Notification.user_id.is_(None)),
             )
         )
+        result = await self.db.execute(query)
+        notification = result.scalar_one_or_none()
 
-        system_result = await self.db.execute(system_query)
-        system_notification_ids = [row[0] for row in system_result.fetchall()]
-
-        # 為系統公告創建已讀記錄
-        system_updated = 0
-        if system_notification_ids:
-            read_records = [NotificationRead(notification_id=nid, user_id=user_id) for nid in system_notification_ids]
-            self.db.add_all(read_records)
-            system_updated = len(read_records)
+        if not notification:
+            return False
 
+        was_counted = notification.is_read is False and _is_live(notification)
+        notification.dismiss()
         await self.db.commit()
-        return personal_updated + system_updated
+
+        if notification.user_id is None:
+            # 系統公告的關閉狀態是全站共用的
+            await notification_counter.announcements_changed()
+        elif was_counted:
+            await notification_counter.adjust([user_id], -1)
+        return True
 
     # === Facebook-style Scholarship-Specific Methods === #
 
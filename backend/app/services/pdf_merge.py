@@ -7,11 +7,18 @@ together so they can be read in a single pass.
 
 Only PDF and JPG/PNG content is rendered inline: PDF pages are appended
 (owner-password-only encryption is unlocked with the empty user password,
-and page-level JavaScript actions are stripped); images are placed on an A4
-page scaled to fit. Anything else — Word files, oversized images, unreadable
+and page-level JavaScript actions are stripped); images are downsampled to
+``merged_pdf_image_dpi`` at their fit size on an A4 page and embedded as
+JPEG. Anything else — Word files, oversized images, unreadable
 or user-password-encrypted PDFs, failed downloads — yields a placeholder
 page pointing the reviewer at the original file shipped alongside the
 merged PDF.
+
+Rendering a document is the expensive part (decode, EXIF transpose and
+re-encode a phone photo; re-parse a PDF), and the same uploads are exported
+again and again. When the caller passes a ``derivative_cache`` and an item
+carries a ``source_key`` (MinIO object name + ETag), the rendered pages are
+stored under that key and later exports append them as-is.
 """
 
 import io
@@ -21,7 +28,7 @@ from dataclasses import dataclass
 # Pure string-escaping helper for reportlab Paragraph markup (see the
 # matching nosec in export_package_service) — no XML parsing happens here.
 from xml.sax.saxutils import escape as xml_escape  # nosec B406
-from typing import List, Optional
+from typing import List, Optional, Protocol, Tuple
 
 from PIL import Image, ImageOps
 from pypdf import PdfReader, PdfWriter
@@ -34,6 +41,7 @@ from reportlab.lib.utils import ImageReader
 from reportlab.pdfgen import canvas as pdf_canvas
 from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
 
+from app.core.config import settings
 from app.services.pdf_fonts import CJK_FONT_NAME, ensure_cjk_font
 
 logger = logging.getLogger(__name__)
@@ -46,6 +54,20 @@ _PAGE_MARGIN = 15 * mm
 # own warning threshold so we fail deterministically, not via warnings.
 _MAX_IMAGE_PIXELS = 50_000_000
 
+# Bump when the rendered output of _render_item changes, so cached
+# derivatives from the previous renderer are not reused.
+_RENDER_VERSION = 1
+
+
+class DerivativeCache(Protocol):
+    """Byte store for rendered documents (MinIOService implements it)."""
+
+    def get_derivative(self, key: str) -> Optional[bytes]:
+        """Stored bytes for ``key``, or None on a miss."""
+
+    def put_derivative(self, key: str, content: bytes, content_type: str) -> None:
+        """Store ``content`` under ``key``."""
+
 
 class ImageTooLargeError(Exception):
     """Image declares more pixels than the merge is willing to decode."""
@@ -60,15 +82,24 @@ class MergeItem:
     carries the ready-to-render zh-TW reason (the caller knows which case it
     is); the merged PDF shows it on a placeholder page so the document list
     stays complete.
+
+    ``source_key`` identifies the exact stored bytes (object name + ETag) and
+    enables the derivative cache; leave it None for generated content.
     """
 
     label: str
     filename: str
     content: Optional[bytes]
     error: Optional[str] = None
+    source_key: Optional[str] = None
 
 
-def build_merged_pdf(title: str, subtitle_lines: List[str], items: List[MergeItem]) -> bytes:
+def build_merged_pdf(
+    title: str,
+    subtitle_lines: List[str],
+    items: List[MergeItem],
+    derivative_cache: Optional[DerivativeCache] = None,
+) -> bytes:
     """Build one PDF: a cover page listing every document, then per document
     a separator page followed by its pages (or a placeholder page)."""
     if not items:
@@ -81,40 +112,91 @@ def build_merged_pdf(title: str, subtitle_lines: List[str], items: List[MergeIte
     for index, item in enumerate(items, start=1):
         heading = f"文件 {index}／{len(items)}：{item.label}"
         _append_pdf(writer, _text_page(heading, [f"原始檔名：{item.filename}"]))
-        _append_pdf(writer, _render_item(item, heading))
+        _append_pdf(writer, _render_cached(item, heading, derivative_cache))
 
     buf = io.BytesIO()
     writer.write(buf)
     return buf.getvalue()
 
 
-def _render_item(item: MergeItem, heading: str) -> bytes:
+def derivative_key(source_key: str) -> str:
+    """Cache key for one rendered document; render settings are part of it.
+
+    Keys start with the source object name, so every derivative of an
+    object is removed together with it (``MinIOService.delete_derivatives``).
+    """
+    object_name, _, etag = source_key.rpartition("@")
+    return (
+        f"{object_name}/merge-page/v{_RENDER_VERSION}/"
+        f"{settings.merged_pdf_image_dpi}dpi-q{settings.merged_pdf_jpeg_quality}/{etag}.pdf"
+    )
+
+
+def render_document(content: bytes) -> bytes:
+    """Render one upload to the pages the merge would append, without any
+    placeholder fallback: raises on unreadable or unsupported content.
+
+    The upload-time derivative pass stores the result under
+    ``derivative_key`` so exports find it already rendered.
+    """
+    if _looks_like_pdf(content):
+        return _normalize_pdf(content)
+    return _image_page(content)
+
+
+def _render_cached(item: MergeItem, heading: str, cache: Optional[DerivativeCache]) -> bytes:
+    """_render_item through the derivative cache. Placeholders are never
+    stored, and cache failures only cost a re-render."""
+    if cache is None or item.source_key is None or item.content is None:
+        return _render_item(item, heading)[0]
+
+    key = derivative_key(item.source_key)
+    try:
+        cached = cache.get_derivative(key)
+    except Exception:
+        logger.warning("merged-pdf: derivative lookup failed for %s", key, exc_info=True)
+        cached = None
+    if cached is not None:
+        return cached
+
+    rendered, ok = _render_item(item, heading)
+    if ok:
+        try:
+            cache.put_derivative(key, rendered, "application/pdf")
+        except Exception:
+            logger.warning("merged-pdf: derivative store failed for %s", key, exc_info=True)
+    return rendered
+
+
+def _render_item(item: MergeItem, heading: str) -> Tuple[bytes, bool]:
     """Render one document's own pages as PDF bytes, degrading to a
-    placeholder page on any unreadable/unsupported content.
+    placeholder page on any unreadable/unsupported content. Returns
+    (pdf_bytes, rendered) — ``rendered`` is False for placeholder pages.
 
     Content detection is magic-bytes-first: upload validation only checks the
     filename extension, so an image saved under a .pdf name must still land in
     the image path instead of a misleading unreadable-PDF placeholder.
     """
     if item.content is None:
-        return _placeholder_page(heading, item.error or "此文件無法納入合併檔（未知錯誤）")
+        return _placeholder_page(heading, item.error or "此文件無法納入合併檔（未知錯誤）"), False
 
     if _looks_like_pdf(item.content):
         try:
-            return _normalize_pdf(item.content)
+            return _normalize_pdf(item.content), True
         except Exception:
             logger.warning("merged-pdf: unreadable PDF %s", item.filename, exc_info=True)
-            return _placeholder_page(heading, "PDF 檔案無法讀取（可能已加密或損毀），請開啟資料夾內的原始檔案。")
+            return _placeholder_page(heading, "PDF 檔案無法讀取（可能已加密或損毀），請開啟資料夾內的原始檔案。"), False
 
     try:
-        return _image_page(item.content)
+        return _image_page(item.content), True
     except ImageTooLargeError:
         logger.warning("merged-pdf: image too large to merge %s", item.filename)
-        return _placeholder_page(heading, "圖片尺寸過大，無法合併，請開啟資料夾內的原始檔案。")
+        return _placeholder_page(heading, "圖片尺寸過大，無法合併，請開啟資料夾內的原始檔案。"), False
     except Exception:
         logger.warning("merged-pdf: unsupported or unreadable file %s", item.filename, exc_info=True)
-        return _placeholder_page(
-            heading, "此檔案格式無法合併（僅支援 PDF 與 JPG/PNG 圖片），請開啟資料夾內的原始檔案。"
+        return (
+            _placeholder_page(heading, "此檔案格式無法合併（僅支援 PDF 與 JPG/PNG 圖片），請開啟資料夾內的原始檔案。"),
+            False,
         )
 
 
@@ -187,12 +269,29 @@ def _strip_active_content(writer: PdfWriter) -> None:
 
 
 def _image_page(content: bytes) -> bytes:
-    """Place a JPEG/PNG on a single A4 page, scaled to fit, aspect kept."""
+    """Place a JPEG/PNG on a single A4 page, scaled to fit, aspect kept.
+
+    The bitmap is downsampled to ``merged_pdf_image_dpi`` at its drawn size
+    and embedded as JPEG (reportlab passes JPEG data through untouched);
+    a 12-megapixel phone photo otherwise lands in the PDF as raw pixels.
+    """
     img = Image.open(io.BytesIO(content))
     if img.width * img.height > _MAX_IMAGE_PIXELS:
         # Header-declared dimensions; checked BEFORE load() so a small file
         # declaring enormous dimensions never allocates the decoded buffer.
         raise ImageTooLargeError(f"{img.width}x{img.height} exceeds {_MAX_IMAGE_PIXELS} pixels")
+
+    page_width, page_height = A4
+    avail_width = page_width - 2 * _PAGE_MARGIN
+    avail_height = page_height - 2 * _PAGE_MARGIN
+    dpi = settings.merged_pdf_image_dpi
+    max_px_width = max(int(avail_width / 72 * dpi), 1)
+    max_px_height = max(int(avail_height / 72 * dpi), 1)
+
+    # JPEG can decode straight at 1/2, 1/4 or 1/8 scale. The orientation is
+    # not known yet, so ask for a box that fits either way round.
+    longest = max(max_px_width, max_px_height)
+    img.draft("RGB", (longest, longest))
     img.load()  # force full decode so corrupt files fail here
     img = ImageOps.exif_transpose(img)  # honor phone-camera Orientation tags
 
@@ -205,17 +304,20 @@ def _image_page(content: bytes) -> bytes:
     elif img.mode not in ("RGB", "L"):
         img = img.convert("RGB")
 
-    page_width, page_height = A4
-    avail_width = page_width - 2 * _PAGE_MARGIN
-    avail_height = page_height - 2 * _PAGE_MARGIN
     scale = min(avail_width / img.width, avail_height / img.height)
     draw_width = img.width * scale
     draw_height = img.height * scale
 
+    # Never upsample: a small image just keeps its pixels.
+    img.thumbnail((max_px_width, max_px_height), Image.Resampling.LANCZOS)
+    encoded = io.BytesIO()
+    img.save(encoded, "JPEG", quality=settings.merged_pdf_jpeg_quality)
+    encoded.seek(0)
+
     buf = io.BytesIO()
     canvas = pdf_canvas.Canvas(buf, pagesize=A4)
     canvas.drawImage(
-        ImageReader(img),
+        ImageReader(encoded),
         (page_width - draw_width) / 2,
         (page_height - draw_height) / 2,
         width=draw_width,
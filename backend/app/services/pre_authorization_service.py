@@ -9,6 +9,7 @@ from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import NotFoundError, ValidationError
+from app.core.principal_cache import invalidate_principals
 from app.models.scholarship import ScholarshipType
 from app.models.user import AdminScholarship, EmployeeStatus, User, UserRole, UserType
 
@@ -88,6 +89,7 @@ class PreAuthorizationService:
         self.db.add(assignment)
         await self.db.commit()
         await self.db.refresh(assignment)
+        await invalidate_principals(admin.id)
 
         return assignment
 
@@ -269,5 +271,6 @@ class PreAuthorizationService:
 
         await self.db.delete(assignment)
         await self.db.commit()
+        await invalidate_principals(admin.id)
 
         return True
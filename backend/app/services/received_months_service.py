@@ -36,16 +36,27 @@ national ID (身分證字號 / std_pid) for the Excel payment column and is unsu
 for identity matching (e.g. foreign students may lack a national ID).
 
 See docs/received-months-calculation.md for full specification.
+
+系統月份數 is materialized in received_months_system_ledger (see the "ledger"
+section at the bottom of this module). With
+``settings.received_months_ledger_enabled`` the calculate_* functions read
+that table by key; otherwise they aggregate the rosters directly.
 """
 
-from typing import Iterable
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Iterable, Optional
 
-from sqlalchemy import Select, and_, func, select
+from sqlalchemy import Select, and_, case, delete, event, func, insert, inspect, or_, select
+from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.models.payment_roster import PaymentRoster, PaymentRosterItem, RosterCycle
-from app.models.received_months import StudentReceivedMonthRecord
+from app.core.config import settings
+from app.models.application import Application
+from app.models.payment_roster import PaymentRoster, PaymentRosterItem, RosterCycle, RosterStatus
+from app.models.received_months import ReceivedMonthsSystemLedger, StudentReceivedMonthRecord
+from app.models.scholarship import ScholarshipConfiguration
 
 _CYCLE_MONTHS: dict[RosterCycle, int] = {
     RosterCycle.MONTHLY: 1,
@@ -110,6 +121,8 @@ def calculate_received_months(db: Session, student_nycu_id: str, scholarship_con
 
     Returns 0 when the student has no included roster items under this config.
     """
+    if settings.received_months_ledger_enabled:
+        return get_ledger_months_bulk(db, [student_nycu_id], scholarship_config_id)[student_nycu_id]
     total = 0
     for cycle, count in db.execute(_single_stmt(student_nycu_id, scholarship_config_id)).all():
         total += _months_for_cycle(cycle) * count
@@ -129,6 +142,8 @@ def calculate_received_months_bulk(
     result: dict[str, int] = {sid: 0 for sid in ids}
     if not ids:
         return result
+    if settings.received_months_ledger_enabled:
+        return get_ledger_months_bulk(db, ids, scholarship_config_id)
 
     for student_id, cycle, count in db.execute(_bulk_stmt(ids, scholarship_config_id)).all():
         result[student_id] = result.get(student_id, 0) + _months_for_cycle(cycle) * count
@@ -143,6 +158,8 @@ async def calculate_received_months_bulk_async(
     result: dict[str, int] = {sid: 0 for sid in ids}
     if not ids:
         return result
+    if settings.received_months_ledger_enabled:
+        return await get_ledger_months_bulk_async(db, ids, scholarship_config_id)
 
     rows = (await db.execute(_bulk_stmt(ids, scholarship_config_id))).all()
     for student_id, cycle, count in rows:
@@ -207,3 +224,391 @@ def calculate_total_received_months(
     return get_imported_months(db, student_nycu_id, scholarship_type_id) + calculate_received_months(
         db, student_nycu_id, scholarship_config_id
     )
+
+
+# --------------------------------------------------------------------------
+# 系統月份數 ledger — received_months_system_ledger.
+#
+# One row per (學號, scholarship_configuration_id). Rows are never adjusted by
+# +/- deltas: every write that can move a count marks the affected keys, and
+# those keys are recomputed exactly from payment_roster_items inside the same
+# transaction. A rolled-back transaction therefore rolls the ledger back too,
+# and a hook that fires twice is harmless.
+#
+# Write paths covered:
+#   • ORM flushes of PaymentRosterItem (create / exclude / restore / delete),
+#     PaymentRoster (status incl. lock/unlock, cycle, config, delete) and
+#     Application.deleted_at (soft delete/restore changes paid_months);
+#   • bulk ORM UPDATE / DELETE statements against items, rosters or
+#     applications (an UPDATE only if it assigns one of the tracked columns).
+# Raw SQL against those tables bypasses the hooks; run
+# ``python -m app.scripts.rebuild_received_months_ledger`` afterwards.
+# --------------------------------------------------------------------------
+
+# Roster states the student history page treats as paid out.
+PAID_ROSTER_STATUSES = (RosterStatus.COMPLETED, RosterStatus.LOCKED)
+
+_ITEM_TRACKED_FIELDS = ("is_included", "student_number", "roster_id", "application_id")
+_ROSTER_TRACKED_FIELDS = ("status", "roster_cycle", "scholarship_configuration_id")
+_APPLICATION_TRACKED_FIELDS = ("deleted_at",)
+_TRACKED_FIELDS = {
+    PaymentRosterItem: _ITEM_TRACKED_FIELDS,
+    PaymentRoster: _ROSTER_TRACKED_FIELDS,
+    Application: _APPLICATION_TRACKED_FIELDS,
+}
+
+_PENDING_KEYS = "received_months_ledger_keys"
+
+# Bound on the number of 學號 bound into a single IN (...) clause.
+_KEY_CHUNK = 500
+
+LedgerKey = tuple[str, int]
+
+
+@dataclass(frozen=True)
+class LedgerDrift:
+    """One ledger row that disagrees with the roster items (see verify_ledger)."""
+
+    student_number: str
+    scholarship_configuration_id: int
+    expected_system: int
+    actual_system: int
+    expected_paid: int
+    actual_paid: int
+
+
+def _ledger_read_stmt(student_nycu_ids: list[str], scholarship_config_id: int) -> Select:
+    return select(ReceivedMonthsSystemLedger.student_number, ReceivedMonthsSystemLedger.system_months).where(
+        ReceivedMonthsSystemLedger.scholarship_configuration_id == scholarship_config_id,
+        ReceivedMonthsSystemLedger.student_number.in_(student_nycu_ids),
+    )
+
+
+def get_ledger_months_bulk(db: Session, student_nycu_ids: Iterable[str], scholarship_config_id: int) -> dict[str, int]:
+    """系統月份數 for many students straight from the ledger. Missing students map to 0."""
+    ids = list(student_nycu_ids)
+    result: dict[str, int] = {sid: 0 for sid in ids}
+    for start in range(0, len(ids), _KEY_CHUNK):
+        for student_id, months in db.execute(_ledger_read_stmt(ids[start : start + _KEY_CHUNK], scholarship_config_id)):
+            result[student_id] = int(months)
+    return result
+
+
+async def get_ledger_months_bulk_async(
+    db: AsyncSession, student_nycu_ids: Iterable[str], scholarship_config_id: int
+) -> dict[str, int]:
+    """Async variant of :func:`get_ledger_months_bulk`."""
+    ids = list(student_nycu_ids)
+    result: dict[str, int] = {sid: 0 for sid in ids}
+    for start in range(0, len(ids), _KEY_CHUNK):
+        rows = await db.execute(_ledger_read_stmt(ids[start : start + _KEY_CHUNK], scholarship_config_id))
+        for student_id, months in rows:
+            result[student_id] = int(months)
+    return result
+
+
+async def get_paid_months_by_type_async(db: AsyncSession, student_nycu_id: str) -> dict[Optional[int], int]:
+    """Paid 系統月份數 per scholarship_type_id for one student, summed over configs."""
+    stmt = (
+        select(ReceivedMonthsSystemLedger.scholarship_type_id, func.sum(ReceivedMonthsSystemLedger.paid_months))
+        .where(ReceivedMonthsSystemLedger.student_number == student_nycu_id)
+        .group_by(ReceivedMonthsSystemLedger.scholarship_type_id)
+    )
+    return {type_id: int(months or 0) for type_id, months in (await db.execute(stmt)).all()}
+
+
+def _aggregate_stmt(scholarship_config_id: Optional[int], student_nycu_ids: Optional[list[str]]) -> Select:
+    """Source-of-truth aggregate the ledger materializes.
+
+    Groups included items by (學號, config, cycle); the paid column only counts
+    items whose roster is paid out and whose application is not soft-deleted
+    (legacy items without an application still count, matching the student
+    history query).
+    """
+    paid = and_(
+        PaymentRoster.status.in_(PAID_ROSTER_STATUSES),
+        or_(Application.id.is_(None), Application.deleted_at.is_(None)),
+    )
+    stmt = (
+        select(
+            PaymentRosterItem.student_number,
+            PaymentRoster.scholarship_configuration_id,
+            PaymentRoster.roster_cycle,
+            func.count(PaymentRosterItem.id),
+            func.sum(case((paid, 1), else_=0)),
+        )
+        .join(PaymentRoster, PaymentRoster.id == PaymentRosterItem.roster_id)
+        .outerjoin(Application, Application.id == PaymentRosterItem.application_id)
+        .where(PaymentRosterItem.is_included.is_(True), PaymentRosterItem.student_number.is_not(None))
+        .group_by(
+            PaymentRosterItem.student_number,
+            PaymentRoster.scholarship_configuration_id,
+            PaymentRoster.roster_cycle,
+        )
+    )
+    if scholarship_config_id is not None:
+        stmt = stmt.where(PaymentRoster.scholarship_configuration_id == scholarship_config_id)
+    if student_nycu_ids is not None:
+        stmt = stmt.where(PaymentRosterItem.student_number.in_(student_nycu_ids))
+    return stmt
+
+
+def _aggregate(conn: Connection, stmt: Select) -> dict[LedgerKey, tuple[int, int]]:
+    totals: dict[LedgerKey, list[int]] = defaultdict(lambda: [0, 0])
+    for student_number, config_id, cycle, count, paid_count in conn.execute(stmt):
+        months = _months_for_cycle(cycle)
+        entry = totals[(student_number, config_id)]
+        entry[0] += months * count
+        entry[1] += months * int(paid_count or 0)
+    return {key: (system, paid) for key, (system, paid) in totals.items()}
+
+
+def _type_ids(conn: Connection, config_ids: Iterable[int]) -> dict[int, Optional[int]]:
+    ids = list(set(config_ids))
+    if not ids:
+        return {}
+    rows = conn.execute(
+        select(ScholarshipConfiguration.id, ScholarshipConfiguration.scholarship_type_id).where(
+            ScholarshipConfiguration.id.in_(ids)
+        )
+    )
+    return dict(rows.all())
+
+
+def _ledger_rows(conn: Connection, totals: dict[LedgerKey, tuple[int, int]]) -> list[dict]:
+    type_ids = _type_ids(conn, (config_id for _, config_id in totals))
+    return [
+        {
+            "student_number": student_number,
+            "scholarship_configuration_id": config_id,
+            "scholarship_type_id": type_ids.get(config_id),
+            "system_months": system,
+            "paid_months": paid,
+        }
+        for (student_number, config_id), (system, paid) in totals.items()
+        if system or paid
+    ]
+
+
+def refresh_ledger_keys(conn: Connection, keys: Iterable[LedgerKey]) -> int:
+    """Recompute the given (學號, config) ledger rows from the roster items.
+
+    Runs on the caller's connection so it joins the caller's transaction.
+    Returns the number of keys refreshed.
+    """
+    by_config: dict[int, set[str]] = defaultdict(set)
+    for student_number, config_id in keys:
+        if student_number and config_id is not None:
+            by_config[config_id].add(student_number)
+
+    refreshed = 0
+    for config_id, students in by_config.items():
+        ordered = sorted(students)
+        for start in range(0, len(ordered), _KEY_CHUNK):
+            chunk = ordered[start : start + _KEY_CHUNK]
+            totals = _aggregate(conn, _aggregate_stmt(config_id, chunk))
+            conn.execute(
+                delete(ReceivedMonthsSystemLedger).where(
+                    ReceivedMonthsSystemLedger.scholarship_configuration_id == config_id,
+                    ReceivedMonthsSystemLedger.student_number.in_(chunk),
+                )
+            )
+            rows = _ledger_rows(conn, totals)
+            if rows:
+                conn.execute(insert(ReceivedMonthsSystemLedger), rows)
+            refreshed += len(chunk)
+    return refreshed
+
+
+def rebuild_ledger(db: Session) -> int:
+    """Replace the whole ledger with a fresh aggregate. Caller commits.
+
+    Returns the number of ledger rows written.
+    """
+    conn = db.connection()
+    totals = _aggregate(conn, _aggregate_stmt(None, None))
+    conn.execute(delete(ReceivedMonthsSystemLedger))
+    rows = _ledger_rows(conn, totals)
+    for start in range(0, len(rows), _KEY_CHUNK):
+        conn.execute(insert(ReceivedMonthsSystemLedger), rows[start : start + _KEY_CHUNK])
+    return len(rows)
+
+
+def verify_ledger(db: Session) -> list[LedgerDrift]:
+    """Compare every ledger row with a fresh aggregate; empty list means in sync."""
+    conn = db.connection()
+    expected = _aggregate(conn, _aggregate_stmt(None, None))
+    actual = {
+        (row.student_number, row.scholarship_configuration_id): (row.system_months, row.paid_months)
+        for row in conn.execute(
+            select(
+                ReceivedMonthsSystemLedger.student_number,
+                ReceivedMonthsSystemLedger.scholarship_configuration_id,
+                ReceivedMonthsSystemLedger.system_months,
+                ReceivedMonthsSystemLedger.paid_months,
+            )
+        )
+    }
+    drifts = []
+    for key in sorted(set(expected) | set(actual)):
+        exp, act = expected.get(key, (0, 0)), actual.get(key, (0, 0))
+        if exp != act:
+            drifts.append(LedgerDrift(key[0], key[1], exp[0], act[0], exp[1], act[1]))
+    return drifts
+
+
+# -- write hooks -------------------------------------------------------------
+
+
+def _changed(obj, fields: tuple[str, ...]) -> bool:
+    attrs = inspect(obj).attrs
+    return any(attrs[name].history.has_changes() for name in fields)
+
+
+def _old_and_new(obj, name: str) -> set:
+    history = inspect(obj).attrs[name].history
+    values = set(history.deleted) | set(history.added) | set(history.unchanged)
+    return values or {getattr(obj, name)}
+
+
+def _updated_columns(orm_execute_state) -> Optional[set[str]]:
+    """Column keys a bulk UPDATE assigns, or ``None`` if they can't be told."""
+    statement = orm_execute_state.statement
+    values = statement._values or dict(statement._ordered_values or ())
+    if values:
+        return {getattr(column, "key", column) for column in values}
+    # Bulk UPDATE by primary key: session.execute(update(Model), [{...}, ...])
+    parameters = orm_execute_state.parameters
+    if isinstance(parameters, dict):
+        parameters = [parameters]
+    if parameters:
+        return {key for row in parameters for key in row}
+    return None
+
+
+def _roster_config_id(item: PaymentRosterItem) -> Optional[int]:
+    # Only a roster already attached in memory; never trigger a lazy load mid-flush.
+    roster = item.__dict__.get("roster")
+    return roster.scholarship_configuration_id if roster is not None else None
+
+
+def _keys_for_rosters(conn: Connection, roster_configs: dict[int, set[int]]) -> set[LedgerKey]:
+    if not roster_configs:
+        return set()
+    rows = conn.execute(
+        select(PaymentRosterItem.roster_id, PaymentRosterItem.student_number).where(
+            PaymentRosterItem.roster_id.in_(list(roster_configs))
+        )
+    )
+    return {(student, config_id) for roster_id, student in rows for config_id in roster_configs[roster_id]}
+
+
+def _keys_for_where(conn: Connection, entity, whereclause) -> set[LedgerKey]:
+    stmt = select(PaymentRosterItem.student_number, PaymentRoster.scholarship_configuration_id).join(
+        PaymentRoster, PaymentRoster.id == PaymentRosterItem.roster_id
+    )
+    if entity is Application:
+        stmt = stmt.join(Application, Application.id == PaymentRosterItem.application_id)
+    if whereclause is not None:
+        stmt = stmt.where(whereclause)
+    return set(conn.execute(stmt.distinct()).all())
+
+
+@event.listens_for(Session, "before_flush")
+def _ledger_collect_keys(session, flush_context, instances):  # noqa: ARG001
+    """Capture affected keys against the pre-flush rows (old 學號/roster/config too)."""
+    if not settings.received_months_ledger_enabled:
+        return
+
+    keys: set[LedgerKey] = set()
+    item_rosters: set[tuple[str, int]] = set()
+    roster_configs: dict[int, set[int]] = {}
+    application_ids: set[int] = set()
+
+    def add_item(item: PaymentRosterItem) -> None:
+        config_id = _roster_config_id(item)
+        for student in _old_and_new(item, "student_number"):
+            if not student:
+                continue
+            if config_id is not None:
+                keys.add((student, config_id))
+            for roster_id in _old_and_new(item, "roster_id"):
+                if roster_id is not None:
+                    item_rosters.add((student, roster_id))
+
+    for obj in session.new:
+        if isinstance(obj, PaymentRosterItem):
+            add_item(obj)
+    for obj in session.deleted:
+        if isinstance(obj, PaymentRosterItem):
+            add_item(obj)
+        elif isinstance(obj, PaymentRoster) and obj.id is not None:
+            roster_configs[obj.id] = {obj.scholarship_configuration_id}
+    for obj in session.dirty:
+        if isinstance(obj, PaymentRosterItem) and _changed(obj, _ITEM_TRACKED_FIELDS):
+            add_item(obj)
+        elif isinstance(obj, PaymentRoster) and obj.id is not None and _changed(obj, _ROSTER_TRACKED_FIELDS):
+            roster_configs[obj.id] = _old_and_new(obj, "scholarship_configuration_id")
+        elif isinstance(obj, Application) and obj.id is not None and _changed(obj, _APPLICATION_TRACKED_FIELDS):
+            application_ids.add(obj.id)
+
+    if not (keys or item_rosters or roster_configs or application_ids):
+        return
+
+    conn = session.connection()
+    if item_rosters:
+        rosters = dict(
+            conn.execute(
+                select(PaymentRoster.id, PaymentRoster.scholarship_configuration_id).where(
+                    PaymentRoster.id.in_({roster_id for _, roster_id in item_rosters})
+                )
+            ).all()
+        )
+        keys |= {(student, rosters[roster_id]) for student, roster_id in item_rosters if roster_id in rosters}
+    keys |= _keys_for_rosters(conn, roster_configs)
+    if application_ids:
+        keys |= _keys_for_where(conn, Application, Application.id.in_(application_ids))
+    session.info.setdefault(_PENDING_KEYS, set()).update(keys)
+
+
+@event.listens_for(Session, "after_flush")
+def _ledger_apply_keys(session, flush_context):  # noqa: ARG001
+    keys = session.info.pop(_PENDING_KEYS, None)
+    if keys:
+        refresh_ledger_keys(session.connection(), keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _ledger_discard_keys(session):
+    session.info.pop(_PENDING_KEYS, None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _ledger_bulk_dml(orm_execute_state):
+    """Bulk UPDATE/DELETE on items, rosters or applications: refresh the rows they matched.
+
+    UPDATEs that assign none of the tracked columns are passed through untouched.
+    """
+    if not settings.received_months_ledger_enabled:
+        return None
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    mapper = orm_execute_state.bind_mapper
+    entity = mapper.class_ if mapper is not None else None
+    if entity not in _TRACKED_FIELDS:
+        return None
+    if orm_execute_state.is_update:
+        # e.g. status / review updates on applications never move a ledger row.
+        columns = _updated_columns(orm_execute_state)
+        if columns is not None and columns.isdisjoint(_TRACKED_FIELDS[entity]):
+            return None
+
+    conn = orm_execute_state.session.connection()
+    whereclause = orm_execute_state.statement.whereclause
+    keys = _keys_for_where(conn, entity, whereclause)
+    result = orm_execute_state.invoke_statement()
+    if orm_execute_state.is_update:
+        # An UPDATE can move rows to a new 學號 / roster that still match the clause.
+        keys |= _keys_for_where(conn, entity, whereclause)
+    refresh_ledger_keys(conn, keys)
+    return result
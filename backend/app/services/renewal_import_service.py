@@ -1,24 +1,35 @@
 """Renewal-import service: parse a renewal-candidates sheet, keep the
 renewal-passed rows, and create approved renewal applications for 造冊."""
 
-import io
+import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
-import pandas as pd
-from sqlalchemy import and_, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import cached
 from app.core.exceptions import NotFoundError, ServiceUnavailableError
 from app.models.application import Application, ApplicationStatus
-from app.models.application_sequence import ApplicationSequence
 from app.models.batch_import import BatchImport
 from app.models.enums import BatchImportStatus, ReviewStage, Semester
 from app.models.scholarship import ScholarshipConfiguration, ScholarshipType
 from app.models.user import User
 from app.schemas.renewal_import import RenewalDataRow
-from app.services.batch_import_service import _normalize_identifier, _normalize_optional
+from app.services import bulk_import_writer
+from app.services.application_builder import generate_app_id
+from app.services.batch_import_service import (
+    IMPORT_PARSE_CACHE_TTL,
+    _column,
+    _fetch_per_student,
+    _file_sha256,
+    _identifier_column,
+    _optional_column,
+    _parse_cache_key,
+    _parse_error,
+    read_import_sheet,
+)
 from app.services.student_service import StudentService
 
 logger = logging.getLogger(__name__)
@@ -42,6 +53,110 @@ def _to_semester_enum(semester: Optional[str]) -> Optional[Semester]:
         return None
 
 
+def _parse_renewal_content(file_content: bytes, context: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Read and filter one renewal sheet (worker thread, no DB access)."""
+    errors: List[Dict[str, Any]] = []
+    parsed: List[Dict[str, Any]] = []
+    skipped: List[Dict[str, Any]] = []
+
+    try:
+        df = read_import_sheet(file_content)
+    except Exception as e:
+        errors.append(_parse_error(0, None, "file", "parse_error", f"無法解析檔案: {str(e)}"))
+        return {"data": [], "skipped": [], "errors": errors}
+
+    real_sub_types = set(context["real_sub_types"])
+    df_columns = set(df.columns)
+    required = ["學號", "學生姓名", "獎學金類別", "學生是否申請續領", "續領審核結果"]
+    missing = [c for c in required if c not in df_columns]
+    if missing:
+        errors.append(_parse_error(0, None, "columns", "missing_columns", f"缺少必要欄位: {', '.join(missing)}"))
+        return {"data": [], "skipped": [], "errors": errors}
+
+    # Column-wise normalization; rows are then assembled by position.
+    student_ids = _identifier_column(df["學號"])
+    student_names = _identifier_column(df["學生姓名"])
+    applied = _identifier_column(df["學生是否申請續領"])
+    results = _identifier_column(df["續領審核結果"])
+    labels = _identifier_column(df["獎學金類別"])
+    postal_accounts = _optional_column(_column(df, "郵局帳號"))
+    advisor_ids = _optional_column(_column(df, "指導教授本校人事編號"))
+    advisor_names = _optional_column(_column(df, "指導教授姓名"))
+
+    seen: set = set()
+    for i, idx in enumerate(df.index):
+        row_number = idx + 2
+        student_id = student_ids[i]
+        if not student_id:
+            continue
+
+        base = {
+            "row_number": row_number,
+            "student_id": student_id,
+            "student_name": student_names[i],
+            "applied_for_renewal": applied[i],
+            "review_result": results[i],
+        }
+
+        # Filter: only 是 + 通過 rows are imported.
+        if applied[i] != APPLIED_YES or results[i] != PASS_MARK:
+            base["skip_reason"] = f"未通過 (申請續領={applied[i] or '空'}, 審核結果={results[i] or '空'})"
+            skipped.append(base)
+            continue
+
+        if student_id in seen:
+            errors.append(
+                _parse_error(
+                    row_number, student_id, "student_id", "duplicate_in_file", f"學號 {student_id} 在檔案中重複"
+                )
+            )
+            continue
+        seen.add(student_id)
+
+        label = labels[i]
+        sub_type = RENEWAL_SUB_TYPE_LABELS.get(label, label.lower())
+        if sub_type not in real_sub_types:
+            errors.append(
+                _parse_error(
+                    row_number,
+                    student_id,
+                    "獎學金類別",
+                    "invalid_sub_type",
+                    f"獎學金類別「{label}」無法對應到有效子類型（{'、'.join(sorted(real_sub_types))}）",
+                )
+            )
+            continue
+
+        data_row = {
+            "student_id": student_id,
+            "student_name": student_names[i],
+            "sub_type": sub_type,
+            "postal_account": postal_accounts[i],
+            "advisor_nycu_id": advisor_ids[i],
+            "advisor_name": advisor_names[i],
+        }
+        try:
+            normalized = RenewalDataRow(**data_row).model_dump()
+            normalized["row_number"] = row_number
+            parsed.append(normalized)
+        except Exception as e:  # noqa: BLE001 - surface row validation errors
+            errors.append(
+                _parse_error(row_number, student_id, "row_data", "validation_error", f"資料驗證失敗: {str(e)}")
+            )
+
+    return {"data": parsed, "skipped": skipped, "errors": errors}
+
+
+@cached(
+    key_fn=lambda file_sha256, context, file_content: _parse_cache_key("renewal", file_sha256, context),
+    ttl=IMPORT_PARSE_CACHE_TTL,
+)
+async def _parse_renewal_sheet(
+    file_sha256: str, context: Dict[str, Any], file_content: bytes
+) -> Dict[str, List[Dict[str, Any]]]:
+    return await asyncio.to_thread(_parse_renewal_content, file_content, context)
+
+
 class RenewalImportService:
     def __init__(self, db: AsyncSession, student_service: Optional[StudentService] = None):
         self.db = db
@@ -51,131 +166,29 @@ class RenewalImportService:
         self, file_content: bytes, scholarship_type_id: int, academic_year: int, semester: Optional[str]
     ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
         """Return (parsed_rows, skipped_rows, errors). Only rows with
-        學生是否申請續領=是 AND 續領審核結果=通過 land in parsed_rows."""
-        errors: List[Dict[str, Any]] = []
-        parsed: List[Dict[str, Any]] = []
-        skipped: List[Dict[str, Any]] = []
+        學生是否申請續領=是 AND 續領審核結果=通過 land in parsed_rows.
 
-        try:
-            df = pd.read_excel(io.BytesIO(file_content))
-        except Exception:
-            try:
-                df = pd.read_csv(io.BytesIO(file_content))
-            except Exception as e:
-                errors.append(
+        Parsing runs in a worker thread and is cached by file hash, like
+        BatchImportService.parse_excel_file."""
+        scholarship = await self.db.get(ScholarshipType, scholarship_type_id)
+        if not scholarship:
+            return (
+                [],
+                [],
+                [
                     {
                         "row_number": 0,
                         "student_id": None,
-                        "field": "file",
-                        "error_type": "parse_error",
-                        "message": f"無法解析檔案: {str(e)}",
+                        "field": "scholarship_type",
+                        "error_type": "not_found",
+                        "message": f"獎學金類型 ID {scholarship_type_id} 不存在",
                     }
-                )
-                return [], [], errors
-
-        scholarship = await self.db.get(ScholarshipType, scholarship_type_id)
-        if not scholarship:
-            errors.append(
-                {
-                    "row_number": 0,
-                    "student_id": None,
-                    "field": "scholarship_type",
-                    "error_type": "not_found",
-                    "message": f"獎學金類型 ID {scholarship_type_id} 不存在",
-                }
-            )
-            return [], [], errors
-
-        real_sub_types = {st.lower() for st in (scholarship.sub_type_list or []) if st}
-        df_columns = set(df.columns)
-        required = ["學號", "學生姓名", "獎學金類別", "學生是否申請續領", "續領審核結果"]
-        missing = [c for c in required if c not in df_columns]
-        if missing:
-            errors.append(
-                {
-                    "row_number": 0,
-                    "student_id": None,
-                    "field": "columns",
-                    "error_type": "missing_columns",
-                    "message": f"缺少必要欄位: {', '.join(missing)}",
-                }
+                ],
             )
-            return [], [], errors
-
-        seen: set = set()
-        for idx, row in df.iterrows():
-            row_number = idx + 2
-            student_id = _normalize_identifier(row.get("學號", ""))
-            if not student_id:
-                continue
-
-            applied = _normalize_identifier(row.get("學生是否申請續領", ""))
-            result = _normalize_identifier(row.get("續領審核結果", ""))
-            base = {
-                "row_number": row_number,
-                "student_id": student_id,
-                "student_name": _normalize_identifier(row.get("學生姓名", "")),
-                "applied_for_renewal": applied,
-                "review_result": result,
-            }
-
-            # Filter: only 是 + 通過 rows are imported.
-            if applied != APPLIED_YES or result != PASS_MARK:
-                base["skip_reason"] = f"未通過 (申請續領={applied or '空'}, 審核結果={result or '空'})"
-                skipped.append(base)
-                continue
-
-            if student_id in seen:
-                errors.append(
-                    {
-                        "row_number": row_number,
-                        "student_id": student_id,
-                        "field": "student_id",
-                        "error_type": "duplicate_in_file",
-                        "message": f"學號 {student_id} 在檔案中重複",
-                    }
-                )
-                continue
-            seen.add(student_id)
-
-            label = _normalize_identifier(row.get("獎學金類別", ""))
-            sub_type = RENEWAL_SUB_TYPE_LABELS.get(label, label.lower())
-            if sub_type not in real_sub_types:
-                errors.append(
-                    {
-                        "row_number": row_number,
-                        "student_id": student_id,
-                        "field": "獎學金類別",
-                        "error_type": "invalid_sub_type",
-                        "message": f"獎學金類別「{label}」無法對應到有效子類型（{'、'.join(sorted(real_sub_types))}）",
-                    }
-                )
-                continue
-
-            data_row = {
-                "student_id": student_id,
-                "student_name": base["student_name"],
-                "sub_type": sub_type,
-                "postal_account": _normalize_optional(row.get("郵局帳號")),
-                "advisor_nycu_id": _normalize_optional(row.get("指導教授本校人事編號")),
-                "advisor_name": _normalize_optional(row.get("指導教授姓名")),
-            }
-            try:
-                normalized = RenewalDataRow(**data_row).model_dump()
-                normalized["row_number"] = row_number
-                parsed.append(normalized)
-            except Exception as e:  # noqa: BLE001 - surface row validation errors
-                errors.append(
-                    {
-                        "row_number": row_number,
-                        "student_id": student_id,
-                        "field": "row_data",
-                        "error_type": "validation_error",
-                        "message": f"資料驗證失敗: {str(e)}",
-                    }
-                )
 
-        return parsed, skipped, errors
+        context = {"real_sub_types": sorted({st.lower() for st in (scholarship.sub_type_list or []) if st})}
+        result = await _parse_renewal_sheet(_file_sha256(file_content), context, file_content)
+        return result["data"], result["skipped"], result["errors"]
 
     async def validate_and_preview(
         self,
@@ -381,42 +394,49 @@ class RenewalImportService:
         seq_semester = semester if semester is not None else "yearly"
         current_row = 0
         applications: List[Application] = []
+        bulk_write = bulk_import_writer.use_bulk_write(len(parsed_rows))
+        bulk_rows: List[Dict[str, Any]] = []
+        now = datetime.now(timezone.utc)
+        shared_values = {
+            "scholarship_type_id": scholarship_type_id,
+            "scholarship_configuration_id": config.id,
+            "allocation_config_id": config.id,
+            "scholarship_name": scholarship.name,
+            "amount": config.amount,
+            "sub_type_selection_mode": scholarship.sub_type_selection_mode,
+            "academic_year": academic_year,
+            "semester": semester_enum,
+            "status": ApplicationStatus.approved.value,
+            "review_stage": ReviewStage.quota_distributed.value,
+            "quota_allocation_status": "allocated",
+            "approved_at": now,
+            "submitted_at": now,
+            "imported_by_id": batch_import.importer_id,
+            "batch_import_id": batch_import.id,
+            "import_source": "renewal_import",
+            "document_status": "complete",
+        }
         try:
             user_map = await self._get_or_create_users_bulk(
                 [{"student_id": r["student_id"], "student_name": r["student_name"]} for r in parsed_rows]
             )
+            # Concurrent SIS snapshot prefetch, as the batch import does.
+            snapshot_map = await _fetch_per_student(
+                [row["student_id"] for row in parsed_rows],
+                lambda sid: self.student_service.get_student_snapshot(
+                    sid, academic_year=str(academic_year), semester=semester
+                ),
+            )
             for idx, row in enumerate(parsed_rows):
                 current_row = row.get("row_number", idx + 2)
                 user = user_map[row["student_id"]]
 
-                # Inline sequential app_id with 'R' (renewal) suffix — same lock pattern as batch import.
-                seq_stmt = (
-                    select(ApplicationSequence)
-                    .where(
-                        and_(
-                            ApplicationSequence.academic_year == academic_year,
-                            ApplicationSequence.semester == seq_semester,
-                        )
-                    )
-                    .with_for_update()
-                )
-                seq_record = (await self.db.execute(seq_stmt)).scalar_one_or_none()
-                if not seq_record:
-                    seq_record = ApplicationSequence(
-                        academic_year=academic_year, semester=seq_semester, last_sequence=0
-                    )
-                    self.db.add(seq_record)
-                    await self.db.flush()
-                seq_record.last_sequence += 1
-                app_id = f"{ApplicationSequence.format_app_id(academic_year, seq_semester, seq_record.last_sequence)}R"
-
-                student_data = None
-                try:
-                    student_data = await self.student_service.get_student_snapshot(
-                        row["student_id"], academic_year=str(academic_year), semester=semester
-                    )
-                except (NotFoundError, ServiceUnavailableError):
-                    logger.warning("SIS snapshot unavailable for %s", row["student_id"], exc_info=True)
+                student_data = snapshot_map.get(row["student_id"])
+                if isinstance(student_data, (NotFoundError, ServiceUnavailableError)):
+                    logger.warning("SIS snapshot unavailable for %s", row["student_id"], exc_info=student_data)
+                    student_data = None
+                elif isinstance(student_data, BaseException):
+                    raise student_data
 
                 # A row without a snapshot has no std_stdcode, so 造冊 hard-skips it —
                 # creating an approved renewal that silently vanishes from the roster.
@@ -430,44 +450,43 @@ class RenewalImportService:
                         batch_id=batch_import.id,
                     )
 
-                now = datetime.now(timezone.utc)
-                application = Application(
-                    app_id=app_id,
-                    user_id=user.id,
-                    scholarship_type_id=scholarship_type_id,
-                    scholarship_configuration_id=config.id,
-                    allocation_config_id=config.id,
-                    scholarship_name=scholarship.name,
-                    amount=config.amount,
-                    sub_scholarship_type=row["sub_type"],
-                    scholarship_subtype_list=[row["sub_type"]],
-                    sub_type_selection_mode=scholarship.sub_type_selection_mode,
-                    academic_year=academic_year,
-                    semester=semester_enum,
-                    is_renewal=True,
-                    renewal_year=academic_year,
-                    status=ApplicationStatus.approved.value,
-                    review_stage=ReviewStage.quota_distributed.value,
-                    quota_allocation_status="allocated",
-                    approved_at=now,
-                    submitted_at=now,
-                    imported_by_id=batch_import.importer_id,
-                    batch_import_id=batch_import.id,
-                    import_source="renewal_import",
-                    document_status="complete",
-                    student_data=student_data,
-                    submitted_form_data={
+                row_values = {
+                    "user_id": user.id,
+                    "sub_scholarship_type": row["sub_type"],
+                    "scholarship_subtype_list": [row["sub_type"]],
+                    "is_renewal": True,
+                    "renewal_year": academic_year,
+                    "student_data": student_data,
+                    "submitted_form_data": {
                         "postal_account": row.get("postal_account"),
                         "advisor_name": row.get("advisor_name"),
                         "advisor_nycu_id": row.get("advisor_nycu_id"),
                         "custom_fields": {},
                     },
-                )
+                }
+                if bulk_write:
+                    bulk_rows.append(row_values)
+                    continue
+
+                # 'R' (renewal) suffix on the shared application sequence.
+                app_id = await generate_app_id(self.db, academic_year, seq_semester, suffix="R", commit=False)
+
+                application = Application(app_id=app_id, **shared_values, **row_values)
                 self.db.add(application)
                 applications.append(application)
 
-            await self.db.flush()
-            created_ids = [app.id for app in applications]
+            if bulk_write:
+                created_ids = await bulk_import_writer.insert_applications(
+                    self.db,
+                    bulk_rows,
+                    shared_values,
+                    academic_year=academic_year,
+                    sequence_semester=seq_semester,
+                    suffix="R",
+                )
+            else:
+                await self.db.flush()
+                created_ids = [app.id for app in applications]
         except Exception as e:  # noqa: BLE001 - convert to BatchImportError after rollback
             await self.db.rollback()
             batch_import.import_status = BatchImportStatus.failed.value
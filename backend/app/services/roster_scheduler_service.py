@@ -3,7 +3,13 @@ Roster Scheduler Service
 造冊排程服務 - 使用APScheduler進行自動造冊排程
 """
 
+import asyncio
+import contextlib
+import functools
+import json
 import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
@@ -15,7 +21,10 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from croniter import croniter
 from sqlalchemy import select
 
+from app.core import cache as cache_mod
+from app.core.cache import LockBusy, with_lock_sync
 from app.core.config import settings
+from app.core.leader_election import LeaderElector
 from app.db.session import get_db_session
 from app.models.payment_roster import RosterCycle, RosterStatus, RosterTriggerType
 from app.models.roster_schedule import RosterSchedule, RosterScheduleStatus
@@ -23,12 +32,27 @@ from app.services.roster_service import RosterService
 
 logger = logging.getLogger(__name__)
 
+# 待命程序把排程異動（新增/移除/暫停/恢復）發佈到此頻道，由領導者套用
+JOB_CHANNEL = b"roster_scheduler:jobs"
+JOB_ID_PREFIX = "roster_schedule_"
+# pub/sub 斷線後重連間隔（秒）
+_RETRY_SECONDS = 5.0
+
 
 class RosterSchedulerService:
-    """造冊排程服務"""
+    """造冊排程服務
+
+    只有執行排程器的程序（領導者，或未啟用選舉時的唯一程序）會連上 Redis
+    job store。待命程序不啟動排程器：排程異動經 JOB_CHANNEL 轉交領導者，
+    查詢則直接讀取 job store。
+    """
 
     def __init__(self):
         self.scheduler: Optional[AsyncIOScheduler] = None
+        self._roster_executor: Optional[Executor] = None
+        self._jobstore_kwargs: Dict[str, Any] = {}
+        self._readonly_jobstore: Optional[RedisJobStore] = None
+        self._job_listener: Optional[asyncio.Task] = None
         # RosterService will be instantiated with db session when needed
         self._setup_scheduler()
 
@@ -43,14 +67,13 @@ class RosterSchedulerService:
         redis_host = parsed.hostname if parsed.hostname else "redis"
         redis_port = parsed.port if parsed.port else 6379
 
-        jobstores = {
-            "default": RedisJobStore(
-                host=redis_host,
-                port=redis_port,
-                db=1,  # 使用不同的Redis資料庫避免衝突
-                password=redis_password,
-            )
+        self._jobstore_kwargs = {
+            "host": redis_host,
+            "port": redis_port,
+            "db": 1,  # 使用不同的Redis資料庫避免衝突
+            "password": redis_password,
         }
+        jobstores = {"default": RedisJobStore(**self._jobstore_kwargs)}
 
         # 設定Executor
         executors = {"default": AsyncIOExecutor()}
@@ -72,21 +95,117 @@ class RosterSchedulerService:
         self.scheduler.add_listener(self._job_missed_listener, EVENT_JOB_MISSED)
 
     async def start_scheduler(self):
-        """啟動排程器"""
-        if not self.scheduler.running:
-            self.scheduler.start()
-            logger.info("Roster scheduler started")
-
-            # 載入現有的排程
-            await self.load_active_schedules()
-        else:
+        """啟動排程器（當選領導者或未啟用選舉時），並開始接收待命程序轉交的排程異動"""
+        if self.scheduler.running:
             logger.warning("Scheduler is already running")
+            return
+        self.scheduler.start()
+        logger.info("Roster scheduler started")
+        self._job_listener = asyncio.create_task(self._listen_for_job_changes(), name="roster-scheduler-jobs")
+
+        # 載入現有的排程
+        await self.load_active_schedules()
+
+    async def step_down(self):
+        """失去領導權：停止排程器並中斷 job store，進行中的造冊自行跑完
+
+        必須在租約到期前完成，新領導者才不會與本程序同時執行作業。
+        """
+        await self._stop_job_listener()
+        if self.scheduler and self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+            # AsyncIOScheduler.shutdown 以 call_soon 排入事件迴圈，讓它立即生效
+            await asyncio.sleep(0)
+            logger.info("Roster scheduler stepped down")
 
     async def stop_scheduler(self):
         """停止排程器"""
+        await self._stop_job_listener()
         if self.scheduler and self.scheduler.running:
             self.scheduler.shutdown(wait=False)
             logger.info("Roster scheduler stopped")
+        if self._roster_executor is not None:
+            # 不等待進行中的造冊；其事務未提交即隨程序結束回滾
+            self._roster_executor.shutdown(wait=False, cancel_futures=True)
+            self._roster_executor = None
+
+    async def _stop_job_listener(self):
+        task, self._job_listener = self._job_listener, None
+        if task is not None and not task.done():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await task
+
+    def _runs_jobs(self) -> bool:
+        """本程序是否執行排程器（否則為待命程序）"""
+        return bool(self.scheduler and self.scheduler.running)
+
+    async def _forward_job_change(self, op: str, **payload) -> bool:
+        """待命程序：把排程異動發佈給領導者
+
+        沒有領導者在線時訊息會遺失；下一位領導者當選時 load_active_schedules
+        會依資料庫重新對齊 job store。
+        """
+        try:
+            receivers = await cache_mod.get_cache().publish(JOB_CHANNEL, json.dumps({"op": op, **payload}))
+        except Exception:  # noqa: BLE001
+            logger.warning("Failed to forward %s to the scheduler leader", op, exc_info=True)
+            return False
+        if not receivers:
+            logger.info("No scheduler leader listening; %s applies when a leader loads schedules", op)
+        return True
+
+    async def _apply_job_change(self, change: Dict[str, Any]) -> None:
+        """領導者：套用待命程序轉交的排程異動"""
+        op = change.get("op")
+        if op == "add":
+            await self.add_schedule(change["schedule"])
+        elif op == "remove":
+            await self.remove_schedule(change["schedule_id"])
+        elif op == "pause":
+            await self.pause_schedule(change["schedule_id"])
+        elif op == "resume":
+            await self.resume_schedule(change["schedule_id"])
+        else:
+            logger.warning("Ignoring unknown scheduler job change: %r", change)
+
+    async def _listen_for_job_changes(self):
+        while True:
+            pubsub = None
+            try:
+                pubsub = cache_mod.get_cache().pubsub()
+                await pubsub.subscribe(JOB_CHANNEL)
+                if self._runs_jobs():
+                    # 未訂閱期間的異動已遺失，依資料庫重新對齊
+                    await self.load_active_schedules()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        await self._apply_job_change(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # noqa: BLE001
+                logger.warning("Scheduler job-change listener failed; retrying", exc_info=True)
+            finally:
+                if pubsub is not None:
+                    with contextlib.suppress(Exception):
+                        await pubsub.aclose()
+            await asyncio.sleep(_RETRY_SECONDS)
+
+    def _readonly_store(self) -> Optional[RedisJobStore]:
+        """待命程序查詢作業用的 job store 連線（只讀，不掛到排程器上）"""
+        if self._readonly_jobstore is None and self._jobstore_kwargs:
+            store = RedisJobStore(**self._jobstore_kwargs)
+            store.start(self.scheduler, "default")
+            self._readonly_jobstore = store
+        return self._readonly_jobstore
+
+    def _lookup_job(self, job_id: str):
+        store = None if self._runs_jobs() else self._readonly_store()
+        return store.lookup_job(job_id) if store is not None else self.scheduler.get_job(job_id)
+
+    def _all_jobs(self) -> list:
+        store = None if self._runs_jobs() else self._readonly_store()
+        return store.get_all_jobs() if store is not None else self.scheduler.get_jobs()
 
     async def load_active_schedules(self):
         """載入啟用中的排程"""
@@ -102,9 +221,25 @@ class RosterSchedulerService:
 
                 logger.info("Loaded %s active schedules", len(schedules))
 
+                statuses = dict((await db.execute(select(RosterSchedule.id, RosterSchedule.status))).all())
+                self._reconcile_jobs(statuses)
+
         except Exception:
             logger.exception("Failed to load active schedules")
 
+    def _reconcile_jobs(self, statuses: Dict[int, RosterScheduleStatus]):
+        """移除已刪除/停用排程的作業、暫停已暫停排程的作業（補上遺失的異動）"""
+        for job in self.scheduler.get_jobs():
+            if not job.id.startswith(JOB_ID_PREFIX):
+                continue
+            status = statuses.get(int(job.id[len(JOB_ID_PREFIX) :]))
+            if status is None or status == RosterScheduleStatus.DISABLED:
+                self.scheduler.remove_job(job.id)
+                logger.info("Removed stale schedule job: %s", job.id)
+            elif status == RosterScheduleStatus.PAUSED and job.next_run_time is not None:
+                self.scheduler.pause_job(job.id)
+                logger.info("Paused schedule job: %s", job.id)
+
     async def _add_schedule_job(self, schedule_data: Dict):
         """添加排程作業"""
         try:
@@ -121,7 +256,7 @@ class RosterSchedulerService:
                 return
 
             # 添加作業到排程器
-            job_id = f"roster_schedule_{schedule_id}"
+            job_id = f"{JOB_ID_PREFIX}{schedule_id}"
 
             # 移除現有作業（如果存在）
             if self.scheduler.get_job(job_id):
@@ -231,116 +366,32 @@ class RosterSchedulerService:
         await db.commit()
 
     async def _create_roster_from_schedule(self, schedule: Dict, force_regenerate: bool = False) -> Dict:
-        """從排程建立造冊"""
-        try:
-            # 取得當前學年度（這裡需要根據系統邏輯調整）
-            from datetime import datetime
-
-            from app.db.session import get_sync_db_session
-
-            current_year = datetime.now().year
-
-            # 根據月份判斷學年度（假設9月開始新學年）
-            western_academic_year = current_year if datetime.now().month >= 9 else current_year - 1
-            # 轉換為民國年
-            academic_year = western_academic_year - 1911
-
-            # 轉換 roster_cycle 字串為 enum
-            roster_cycle_value = schedule["roster_cycle"]
-            if isinstance(roster_cycle_value, str):
-                roster_cycle = RosterCycle(roster_cycle_value)
-            else:
-                roster_cycle = roster_cycle_value
-
-            # 產生期間標記 - 使用同步的 session
-            with get_sync_db_session() as db:
-                roster_service = RosterService(db)
-
-                # 從排程產生期間標記
-                period_label = roster_service.generate_period_label(
-                    roster_cycle=roster_cycle, target_date=datetime.now()
-                )
-
-                # 階段 1: 呼叫 RosterService 建立造冊（但不提交）
-                roster = roster_service.generate_roster(
-                    scholarship_configuration_id=schedule["scholarship_configuration_id"],
-                    period_label=period_label,
-                    roster_cycle=roster_cycle,
-                    academic_year=academic_year,  # 已經是民國年
-                    created_by_user_id=schedule["created_by_user_id"],
-                    trigger_type=RosterTriggerType.SCHEDULED,
-                    student_verification_enabled=schedule.get("student_verification_enabled", True),
-                    force_regenerate=force_regenerate,
-                )
-
-                logger.info(f"Scheduled roster {roster.roster_code} generated (not yet committed)")
-
-                # 階段 2: Excel 匯出（在同一個事務中）
-                excel_export_result = None
-                from app.services.excel_export_service import ExcelExportService
-
-                export_service = ExcelExportService()
-                excel_export_result = export_service.export_roster_to_excel(
-                    roster=roster,
-                    template_name="STD_UP_MIXLISTA",
-                    include_header=True,
-                    include_statistics=True,
-                    include_excluded=False,
-                )
-                logger.info(
-                    f"Excel file exported for scheduled roster {roster.roster_code}: "
-                    f"{excel_export_result.get('minio_object_name', 'N/A')}"
-                )
-
-                # 階段 3: 記錄稽核日誌，然後設置狀態並提交事務
-                # 先記錄稽核日誌，確保日誌成功後才標記為 COMPLETED
-                from app.models.roster_audit import RosterAuditAction, RosterAuditLevel
-                from app.services.audit_service import audit_service
-
-                audit_service.log_roster_operation(
-                    roster_id=roster.id,
-                    action=RosterAuditAction.STATUS_CHANGE,
-                    title="排程造冊狀態設置為已完成",
-                    user_id=schedule["created_by_user_id"],
-                    user_name="System (Scheduler)",
-                    description="排程自動產生造冊完成，狀態設置為 COMPLETED",
-                    old_values={"status": "processing"},
-                    new_values={"status": "completed"},
-                    level=RosterAuditLevel.INFO,
-                    metadata={
-                        "excel_exported": bool(excel_export_result),
-                        "schedule_id": schedule["id"],
-                    },
-                    tags=["status_change", "scheduled", "completion"],
-                    db=db,
-                )
-
-                # 稽核日誌成功後，才設置狀態為 COMPLETED
-                roster.status = RosterStatus.COMPLETED
-                roster.completed_at = datetime.now(timezone.utc)
+        """從排程建立造冊
+
+        造冊本體（學籍 API 逐筆驗證、Excel 匯出）是同步程式碼；預設交給專用的
+        執行緒 / 程序池執行，事件迴圈在造冊期間仍可服務 API 請求。
+        """
+        mode = settings.roster_scheduler_execution_mode
+        if mode == "inline":
+            return generate_scheduled_roster(schedule, force_regenerate)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_roster_executor(), functools.partial(generate_scheduled_roster, schedule, force_regenerate)
+        )
 
-                db.commit()
-                logger.info(
-                    f"Scheduled roster {roster.roster_code} committed successfully with status={roster.status.value}"
+    def _get_roster_executor(self) -> Executor:
+        """排程造冊專用的 executor（不與 asyncio 預設執行緒池共用）"""
+        if self._roster_executor is None:
+            workers = max(1, settings.roster_scheduler_max_workers)
+            if settings.roster_scheduler_execution_mode == "process":
+                # spawn：子程序自行建立 DB engine / Redis 連線，不繼承父程序的連線池
+                self._roster_executor = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context("spawn")
                 )
-
-                message = f"Successfully created roster {roster.roster_code}"
-                if excel_export_result and "error" not in excel_export_result:
-                    message += " with Excel file"
-
-                return {
-                    "success": True,
-                    "roster_id": roster.id,
-                    "roster_code": roster.roster_code,
-                    "message": message,
-                    "excel_export": excel_export_result,
-                }
-
-        except Exception as e:
-            logger.error(f"Failed to create roster from schedule: {e}", exc_info=True)
-            # 發生異常時回滾事務
-            db.rollback()
-            return {"success": False, "error": str(e), "message": f"Failed to create roster: {e}"}
+            else:
+                self._roster_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="roster-job")
+        return self._roster_executor
 
     async def _get_schedule_by_id(self, db, schedule_id: int) -> Optional[Dict]:
         """根據ID取得排程"""
@@ -356,6 +407,11 @@ class RosterSchedulerService:
             if cron_expr and not croniter.is_valid(cron_expr):
                 raise ValueError(f"Invalid cron expression: {cron_expr}")
 
+            if not self._runs_jobs():
+                return await self._forward_job_change(
+                    "add", schedule={"id": schedule_data["id"], "cron_expression": cron_expr}
+                )
+
             # 添加到排程器
             await self._add_schedule_job(schedule_data)
 
@@ -367,8 +423,10 @@ class RosterSchedulerService:
 
     async def remove_schedule(self, schedule_id: int) -> bool:
         """移除排程"""
+        if not self._runs_jobs():
+            return await self._forward_job_change("remove", schedule_id=schedule_id)
         try:
-            job_id = f"roster_schedule_{schedule_id}"
+            job_id = f"{JOB_ID_PREFIX}{schedule_id}"
 
             if self.scheduler.get_job(job_id):
                 self.scheduler.remove_job(job_id)
@@ -382,8 +440,10 @@ class RosterSchedulerService:
 
     async def pause_schedule(self, schedule_id: int) -> bool:
         """暫停排程"""
+        if not self._runs_jobs():
+            return await self._forward_job_change("pause", schedule_id=schedule_id)
         try:
-            job_id = f"roster_schedule_{schedule_id}"
+            job_id = f"{JOB_ID_PREFIX}{schedule_id}"
 
             if self.scheduler.get_job(job_id):
                 self.scheduler.pause_job(job_id)
@@ -397,8 +457,10 @@ class RosterSchedulerService:
 
     async def resume_schedule(self, schedule_id: int) -> bool:
         """恢復排程"""
+        if not self._runs_jobs():
+            return await self._forward_job_change("resume", schedule_id=schedule_id)
         try:
-            job_id = f"roster_schedule_{schedule_id}"
+            job_id = f"{JOB_ID_PREFIX}{schedule_id}"
 
             if self.scheduler.get_job(job_id):
                 self.scheduler.resume_job(job_id)
@@ -413,8 +475,8 @@ class RosterSchedulerService:
     def get_schedule_status(self, schedule_id: int) -> Optional[Dict]:
         """取得排程狀態"""
         try:
-            job_id = f"roster_schedule_{schedule_id}"
-            job = self.scheduler.get_job(job_id)
+            job_id = f"{JOB_ID_PREFIX}{schedule_id}"
+            job = self._lookup_job(job_id)
 
             if job:
                 return {
@@ -434,7 +496,7 @@ class RosterSchedulerService:
         """列出所有作業"""
         try:
             jobs = []
-            for job in self.scheduler.get_jobs():
+            for job in self._all_jobs():
                 jobs.append(
                     {
                         "id": job.id,
@@ -516,6 +578,40 @@ async def init_scheduler():
     except Exception:
         logger.exception("Failed to add batch import cleanup job")
 
+    # Add content-addressed blob GC job (runs at 3 AM daily)
+    try:
+        from app.services.blob_store import collect_garbage
+
+        roster_scheduler.scheduler.add_job(
+            collect_garbage,
+            "cron",
+            hour=3,
+            minute=0,
+            id="blob_garbage_collection",
+            replace_existing=True,
+            name="Storage Blob Garbage Collection",
+        )
+        logger.info("Added blob garbage collection job (runs daily at 3 AM)")
+    except Exception:
+        logger.exception("Failed to add blob garbage collection job")
+
+    # Add log partition maintenance job (runs at 3:30 AM daily)
+    try:
+        from app.services.log_partitions import maintain_log_partitions
+
+        roster_scheduler.scheduler.add_job(
+            maintain_log_partitions,
+            "cron",
+            hour=3,
+            minute=30,
+            id="log_partition_maintenance",
+            replace_existing=True,
+            name="Audit / Email Log Partition Maintenance",
+        )
+        logger.info("Added log partition maintenance job (runs daily at 3:30 AM)")
+    except Exception:
+        logger.exception("Failed to add log partition maintenance job")
+
     # Add deadline checker job (runs at 9 AM daily)
     try:
         from app.tasks.deadline_checker import run_deadline_check
@@ -573,3 +669,142 @@ async def init_scheduler():
 async def shutdown_scheduler():
     """關閉排程器"""
     await roster_scheduler.stop_scheduler()
+
+
+async def step_down_scheduler():
+    """失去領導權：停止排程器並中斷 job store"""
+    await roster_scheduler.step_down()
+
+
+async def start_scheduler_election() -> LeaderElector:
+    """以 Redis 租約競選排程領導者；只有領導者執行作業
+
+    每個 API worker / `python -m app.worker` 都參選，但只有當選者啟動排程器、
+    連上 job store（init_scheduler()）；失去租約前即停止排程器。待命程序的
+    排程異動經 JOB_CHANNEL 轉交領導者。呼叫端關閉時先 stop() 選舉器
+    （釋放租約、立即交棒），再 shutdown_scheduler()。
+    """
+    elector = LeaderElector("scheduler", on_elected=init_scheduler, on_demoted=step_down_scheduler)
+    await elector.start()
+    return elector
+
+
+def generate_scheduled_roster(schedule: Dict, force_regenerate: bool = False) -> Dict:
+    """同步產生一份排程造冊（在 executor 中執行）
+
+    與手動 POST /payment-rosters/generate 共用 roster:{config_id}:{period_label}
+    鎖，避免排程與手動同時造冊；造冊可能超過鎖的 TTL，因此持鎖期間持續續期。
+    schedule 為 RosterSchedule.to_dict()，可 pickle，程序池模式也適用。
+    """
+    try:
+        # 取得當前學年度（這裡需要根據系統邏輯調整）
+        from datetime import datetime
+
+        from app.db.session import get_sync_db_session
+
+        current_year = datetime.now().year
+
+        # 根據月份判斷學年度（假設9月開始新學年）
+        western_academic_year = current_year if datetime.now().month >= 9 else current_year - 1
+        # 轉換為民國年
+        academic_year = western_academic_year - 1911
+
+        # 轉換 roster_cycle 字串為 enum
+        roster_cycle_value = schedule["roster_cycle"]
+        if isinstance(roster_cycle_value, str):
+            roster_cycle = RosterCycle(roster_cycle_value)
+        else:
+            roster_cycle = roster_cycle_value
+
+        # 產生期間標記 - 使用同步的 session
+        with get_sync_db_session() as db:
+            roster_service = RosterService(db)
+
+            # 從排程產生期間標記
+            period_label = roster_service.generate_period_label(roster_cycle=roster_cycle, target_date=datetime.now())
+
+            # 與手動造冊共用同一把鎖；持鎖期間續期，長時間造冊不會讓鎖過期
+            lock_key = f"roster:{schedule['scholarship_configuration_id']}:{period_label}"
+            with with_lock_sync(lock_key, ttl_seconds=300, renew=True):
+                # 階段 1: 呼叫 RosterService 建立造冊（但不提交）
+                roster = roster_service.generate_roster(
+                    scholarship_configuration_id=schedule["scholarship_configuration_id"],
+                    period_label=period_label,
+                    roster_cycle=roster_cycle,
+                    academic_year=academic_year,  # 已經是民國年
+                    created_by_user_id=schedule["created_by_user_id"],
+                    trigger_type=RosterTriggerType.SCHEDULED,
+                    student_verification_enabled=schedule.get("student_verification_enabled", True),
+                    force_regenerate=force_regenerate,
+                )
+
+                logger.info(f"Scheduled roster {roster.roster_code} generated (not yet committed)")
+
+                # 階段 2: Excel 匯出（在同一個事務中）
+                excel_export_result = None
+                from app.services.excel_export_service import ExcelExportService
+
+                export_service = ExcelExportService()
+                excel_export_result = export_service.export_roster_to_excel(
+                    roster=roster,
+                    template_name="STD_UP_MIXLISTA",
+                    include_header=True,
+                    include_statistics=True,
+                    include_excluded=False,
+                )
+                logger.info(
+                    f"Excel file exported for scheduled roster {roster.roster_code}: "
+                    f"{excel_export_result.get('minio_object_name', 'N/A')}"
+                )
+
+                # 階段 3: 記錄稽核日誌，然後設置狀態並提交事務
+                # 先記錄稽核日誌，確保日誌成功後才標記為 COMPLETED
+                from app.models.roster_audit import RosterAuditAction, RosterAuditLevel
+                from app.services.audit_service import audit_service
+
+                audit_service.log_roster_operation(
+                    roster_id=roster.id,
+                    action=RosterAuditAction.STATUS_CHANGE,
+                    title="排程造冊狀態設置為已完成",
+                    user_id=schedule["created_by_user_id"],
+                    user_name="System (Scheduler)",
+                    description="排程自動產生造冊完成，狀態設置為 COMPLETED",
+                    old_values={"status": "processing"},
+                    new_values={"status": "completed"},
+                    level=RosterAuditLevel.INFO,
+                    metadata={
+                        "excel_exported": bool(excel_export_result),
+                        "schedule_id": schedule["id"],
+                    },
+                    tags=["status_change", "scheduled", "completion"],
+                    db=db,
+                )
+
+                # 稽核日誌成功後，才設置狀態為 COMPLETED
+                roster.status = RosterStatus.COMPLETED
+                roster.completed_at = datetime.now(timezone.utc)
+
+                db.commit()
+                logger.info(
+                    f"Scheduled roster {roster.roster_code} committed successfully with status={roster.status.value}"
+                )
+
+                message = f"Successfully created roster {roster.roster_code}"
+                if excel_export_result and "error" not in excel_export_result:
+                    message += " with Excel file"
+
+                return {
+                    "success": True,
+                    "roster_id": roster.id,
+                    "roster_code": roster.roster_code,
+                    "message": message,
+                    "excel_export": excel_export_result,
+                }
+
+    except LockBusy:
+        logger.warning("Roster generation for schedule %s skipped: lock held by another run", schedule.get("id"))
+        return {"success": False, "error": "造冊產生中，請稍候再試", "message": "Roster generation already in progress"}
+    except Exception as e:
+        # get_sync_db_session 已在例外離開時回滾事務
+        logger.error(f"Failed to create roster from schedule: {e}", exc_info=True)
+        return {"success": False, "error": str(e), "message": f"Failed to create roster: {e}"}
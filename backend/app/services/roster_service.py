@@ -1013,6 +1013,9 @@ class RosterService:
             student_number=student_data.get("std_stdcode", ""),  # 學號 — identity-matching key
             student_name=student_data.get("std_cname", ""),
             student_email=student_data.get("com_email", ""),
+            college_code=student_data.get("std_academyno") or student_data.get("trm_academyno"),
+            college_name=student_data.get("trm_academyname"),
+            department_name=student_data.get("trm_depname"),
             bank_account=bank_account,  # From submitted_form_data, not student_data
             scholarship_name=application.scholarship_configuration.scholarship_type.name,
             scholarship_amount=application.amount or consumed_config.amount,
@@ -8,6 +8,7 @@ from typing import Any, Dict, List, Optional, Tuple
 from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.exceptions import ScholarshipException
 from app.models.application import Application
 from app.models.payment_roster import PaymentRoster, PaymentRosterItem, RosterStatus
@@ -22,7 +23,7 @@ from app.schemas.student_scholarship_history import (
     StudentScholarshipHistoryData,
 )
 from app.services.received_months_import_service import get_student_imported_records
-from app.services.received_months_service import months_for_cycle_value
+from app.services.received_months_service import get_paid_months_by_type_async, months_for_cycle_value
 from app.services.student_service import StudentService
 
 logger = logging.getLogger(__name__)
@@ -238,7 +239,14 @@ class StudentScholarshipHistoryService:
 
         An unknown student simply has no records and totals 0; there is no
         404 concept here (student self-service treats empty history as a
-        valid zero-month state)."""
+        valid zero-month state).
+
+        With the received-months ledger enabled the system half is one indexed
+        read of its paid_months instead of the full payment-history join."""
+        if settings.received_months_ledger_enabled:
+            imported_records = await get_student_imported_records(db, student_number)
+            paid_by_type = await get_paid_months_by_type_async(db, student_number)
+            return sum(r["months"] for r in imported_records) + sum(paid_by_type.values())
         records, _ = await self._fetch_paid_payments(db, student_number)
         imported_records = await get_student_imported_records(db, student_number)
         breakdowns = self._build_received_months(records, imported_records)
@@ -172,6 +172,7 @@ class SupplementaryImportService:
         """Return {student_id: User} — creates User if not found."""
         from sqlalchemy import select
         from app.models.user import User, UserRole, UserType
+        from app.services import bulk_import_writer
 
         student_ids = list(student_data_map.keys())
         if not student_ids:
@@ -181,6 +182,24 @@ class SupplementaryImportService:
         result = await self.db.execute(stmt)
         user_map: Dict[str, "User"] = {u.nycu_id: u for u in result.scalars().all()}
 
+        missing = [student_id for student_id in student_ids if student_id not in user_map]
+        if bulk_import_writer.use_bulk_write(len(missing)):
+            await bulk_import_writer.merge_users(
+                self.db,
+                [
+                    {
+                        "nycu_id": student_id,
+                        "name": student_data_map[student_id].get("std_cname") or student_id,
+                        "email": student_data_map[student_id].get("com_email"),
+                        "dept_code": student_data_map[student_id].get("std_depno"),
+                    }
+                    for student_id in missing
+                ],
+            )
+            created = await self.db.execute(select(User).where(User.nycu_id.in_(missing)))
+            user_map.update({u.nycu_id: u for u in created.scalars().all()})
+            return user_map
+
         for student_id, sis_data in student_data_map.items():
             if student_id in user_map:
                 continue
@@ -213,9 +232,24 @@ class SupplementaryImportService:
         Returns {user_id: UserProfile} so the caller can hand the already-loaded
         profile to assign_professor_from_profile instead of re-SELECTing it.
         """
+        from sqlalchemy import select
+        from app.models.user_profile import UserProfile
+        from app.services import bulk_import_writer
+        from app.services.batch_import_service import _profile_values
+
         row_map = {r["student_id"]: r for r in rows}
         profile_map: Dict[int, object] = {}
 
+        if bulk_import_writer.use_bulk_write(len(row_map)):
+            users = [(user, row_map[student_id]) for student_id, user in user_map.items() if student_id in row_map]
+            await bulk_import_writer.merge_user_profiles(
+                self.db, [(user.id, _profile_values(row)) for user, row in users]
+            )
+            result = await self.db.execute(
+                select(UserProfile).where(UserProfile.user_id.in_([user.id for user, _ in users]))
+            )
+            return {profile.user_id: profile for profile in result.scalars().all()}
+
         for student_id, user in user_map.items():
             row = row_map.get(student_id)
             if not row:
@@ -250,6 +284,7 @@ class SupplementaryImportService:
         from app.core.exceptions import ValidationError
         from app.models.application import Application
         from app.models.enums import Semester
+        from app.services import bulk_import_writer
         from app.services.application_builder import (
             assign_professor_from_profile,
             build_submitted_application_values,
@@ -289,6 +324,29 @@ class SupplementaryImportService:
         # (the batch path does the same) and reuse for every row.
         field_definitions = await self.batch_service.fetch_field_definitions(scholarship.code)
 
+        # Large imports are written set-based (bulk_import_writer): the rows are
+        # validated and shaped here, then inserted and professor-linked in one
+        # statement each. Small ones keep the per-row ORM path below.
+        bulk_write = bulk_import_writer.use_bulk_write(len(rows))
+        shared_values = {
+            "scholarship_type_id": cfg.scholarship_type_id,
+            "scholarship_configuration_id": cfg.id,
+            "scholarship_name": submitted_values["scholarship_name"],
+            "amount": submitted_values["amount"],
+            "academic_year": cfg.academic_year,
+            "semester": semester_value,
+            "status": submitted_values["status"],
+            "status_name": submitted_values["status_name"],
+            "review_stage": submitted_values["review_stage"],
+            "submitted_at": submitted_values["submitted_at"],
+            "sub_type_selection_mode": scholarship.sub_type_selection_mode,
+            "imported_by_id": importer_id,
+            "import_source": "supplementary_import",
+            "document_status": "pending_documents",
+        }
+        bulk_rows: List[Dict[str, Any]] = []
+        bulk_student_ids: List[str] = []
+
         created = 0
         unresolved_professors: List[str] = []
         for row in rows:
@@ -308,14 +366,29 @@ class SupplementaryImportService:
             except ValidationError as exc:
                 raise ValidationError(f"學號 {student_id}：{exc.message}") from exc
 
-            # commit=False keeps the sequence row locked for the whole import so it
-            # stays atomic — same trade-off the batch-import path makes.
-            app_id = await generate_app_id(self.db, cfg.academic_year, sequence_semester, commit=False)
-
             submitted_form_data = self.batch_service.build_submitted_form_data(
                 field_definitions, row.get("custom_fields") or {}
             )
 
+            if bulk_write:
+                bulk_rows.append(
+                    {
+                        "user_id": user.id,
+                        "sub_scholarship_type": sub_scholarship_type,
+                        "scholarship_subtype_list": sub_types,
+                        "sub_type_preferences": sub_types or None,
+                        "is_renewal": False,
+                        "student_data": sis_data,
+                        "submitted_form_data": submitted_form_data,
+                    }
+                )
+                bulk_student_ids.append(student_id)
+                continue
+
+            # commit=False: never commit the import's transaction midway (the
+            # number itself is allocated outside it — see generate_app_id).
+            app_id = await generate_app_id(self.db, cfg.academic_year, sequence_semester, commit=False)
+
             # scholarship_subtype_list is what the manual-distribution panel reads
             # as `applied_sub_types`; sub_type_preferences is the ordered preference
             # list used by allocation logic. Both come from the checkmark columns so
@@ -325,25 +398,12 @@ class SupplementaryImportService:
             app = Application(
                 app_id=app_id,
                 user_id=user.id,
-                scholarship_type_id=cfg.scholarship_type_id,
-                scholarship_configuration_id=cfg.id,
-                scholarship_name=submitted_values["scholarship_name"],
-                amount=submitted_values["amount"],
-                academic_year=cfg.academic_year,
-                semester=semester_value,
-                status=submitted_values["status"],
-                status_name=submitted_values["status_name"],
-                review_stage=submitted_values["review_stage"],
-                submitted_at=submitted_values["submitted_at"],
-                sub_type_selection_mode=scholarship.sub_type_selection_mode,
                 student_data=sis_data,
                 sub_scholarship_type=sub_scholarship_type,
                 scholarship_subtype_list=sub_types,
                 sub_type_preferences=sub_types or None,
                 submitted_form_data=submitted_form_data,
-                imported_by_id=importer_id,
-                import_source="supplementary_import",
-                document_status="pending_documents",
+                **shared_values,
             )
             self.db.add(app)
             await self.db.flush()
@@ -357,5 +417,21 @@ class SupplementaryImportService:
 
             created += 1
 
+        if bulk_write and bulk_rows:
+            application_ids = await bulk_import_writer.insert_applications(
+                self.db,
+                bulk_rows,
+                shared_values,
+                academic_year=cfg.academic_year,
+                sequence_semester=sequence_semester,
+            )
+            professors = await bulk_import_writer.assign_professors(self.db, application_ids)
+            unresolved_professors = [
+                student_id
+                for student_id, application_id in zip(bulk_student_ids, application_ids)
+                if professors.get(application_id) is None
+            ]
+            created = len(application_ids)
+
         await self.db.flush()
         return created, unresolved_professors
@@ -4,7 +4,8 @@ Pytest configuration and fixtures for all tests
 
 import asyncio
 import os
-from typing import AsyncGenerator, Generator
+from contextlib import contextmanager
+from typing import AsyncGenerator, Generator, Optional
 from unittest.mock import AsyncMock
 
 import pytest
@@ -31,18 +32,24 @@ from app.core.config import settings  # noqa: E402
 
 settings.database_url_sync = TEST_DATABASE_URL
 settings.database_url = TEST_DATABASE_URL_ASYNC  # Set async URL early too
+# The per-worker reference-data snapshot stays off: tables are dropped and
+# recreated between tests without going through the ORM write hooks.
+settings.refdata_catalog_enabled = False
 
 # Now import models (they will use SQLite-compatible JSON type)
 # Note: Password functions removed since system uses SSO authentication
 # from app.core.security import get_password_hash
 from app.db.base_class import Base  # Use the correct Base class that models use  # noqa: E402
 from app.db.deps import get_db  # noqa: E402
+from app.db.query_stats import track_queries  # noqa: E402
+from app.db.session import _install_query_timing_listeners  # noqa: E402
 from app.main import app  # noqa: E402
 
 # Import after app.main so dynamic_config module graph is fully initialized before
 # core.deps is imported (importing core.deps first causes a circular import via
 # dynamic_config → services → email_service → dynamic_config).
 from app.core.deps import get_db as core_get_db  # noqa: E402
+from app.core.principal_cache import clear_local_for_tests as clear_principal_cache  # noqa: E402
 from app.models.application import Application, ApplicationStatus  # noqa: E402
 from app.models.scholarship import ScholarshipType, SubTypeSelectionMode  # noqa: E402
 from app.models.user import User, UserRole, UserType  # noqa: E402
@@ -67,6 +74,12 @@ except ImportError:
     test_engine = None
     settings.database_url = TEST_DATABASE_URL
 
+# Same cursor-execute hooks as the application engines, so query_budget and
+# the per-request query metrics see test traffic.
+_install_query_timing_listeners(test_engine_sync)
+if test_engine:
+    _install_query_timing_listeners(test_engine)
+
 # Create session factories
 TestingSessionLocalSync = sessionmaker(test_engine_sync, class_=Session, expire_on_commit=False)
 
@@ -99,6 +112,9 @@ async def db() -> AsyncGenerator[AsyncSession, None]:
 
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+    # drop_all bypasses the ORM hooks that invalidate cached principals, and
+    # the next test recycles the same user ids.
+    clear_principal_cache()
 
 
 @pytest.fixture(scope="function")
@@ -110,6 +126,7 @@ def db_sync() -> Generator[Session, None, None]:
         yield session
 
     Base.metadata.drop_all(bind=test_engine_sync)
+    clear_principal_cache()
 
 
 @pytest_asyncio.fixture(scope="function")
@@ -393,3 +410,31 @@ def performance_monitor():
             assert self.duration < max_duration, f"Operation took {self.duration:.2f}s, expected < {max_duration}s"
 
     return PerformanceMonitor()
+
+
+@pytest.fixture
+def query_budget():
+    """Fail when a block issues more SQL statements than declared.
+
+    Usage:
+        with query_budget(12):
+            response = await admin_client.get("/api/v1/...")
+
+    ``max_duplicates`` additionally caps repeats of one statement shape (the
+    N+1 signature: the same per-row lookup issued for every item).
+    """
+
+    @contextmanager
+    def _budget(max_queries: int, max_duplicates: Optional[int] = None):
+        with track_queries() as stats:
+            yield stats
+        repeated = "; ".join(f"{times}x {shape[:200]}" for shape, times in stats.repeated())
+        assert stats.count <= max_queries, f"{stats.count} SQL statements, budget {max_queries}" + (
+            f"; repeated: {repeated}" if repeated else ""
+        )
+        if max_duplicates is not None:
+            assert (
+                stats.duplicates <= max_duplicates
+            ), f"{stats.duplicates} repeated statements, budget {max_duplicates}; repeated: {repeated}"
+
+    return _budget
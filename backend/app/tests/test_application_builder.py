@@ -5,12 +5,16 @@ drifted between the student self-submission path (ApplicationService)
 and the batch import path (BatchImportService).
 """
 
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from types import SimpleNamespace
 
 import pytest
+from sqlalchemy import select
 
+from app.core.config import settings
 from app.core.exceptions import ValidationError
+from app.services import application_builder
 from app.services.application_builder import (
     FORCED_FIRST_PREFERENCE,
     build_submitted_application_values,
@@ -112,10 +116,7 @@ def test_build_submitted_values_falls_back_to_scholarship_name():
 from app.models.application_sequence import ApplicationSequence  # noqa: E402,F401
 from app.models.user import User  # noqa: E402
 from app.models.user_profile import UserProfile  # noqa: E402
-from app.services.application_builder import (  # noqa: E402
-    assign_professor_from_profile,
-    generate_app_id,
-)
+from app.services.application_builder import assign_professor_from_profile, generate_app_id  # noqa: E402
 
 
 async def test_generate_app_id_creates_sequence_and_formats(db):
@@ -171,3 +172,78 @@ async def test_assign_professor_does_not_overwrite_existing(db):
 
     assert result is None
     assert application.professor_id == 999
+
+
+# --- hi/lo app_id allocation (PostgreSQL path) --------------------------------
+
+
+def _allocator_on(db):
+    """An AppIdAllocator whose 'own' session is the test session (SQLite
+    cannot hold a second writer)."""
+
+    async def commit():
+        pass
+
+    @asynccontextmanager
+    async def session():
+        yield SimpleNamespace(execute=db.execute, get_bind=db.get_bind, commit=commit)
+
+    return application_builder.AppIdAllocator(session_factory=session)
+
+
+async def _last_sequence(db, semester):
+    stmt = select(ApplicationSequence).where(
+        ApplicationSequence.academic_year == 114, ApplicationSequence.semester == semester
+    )
+    return (await db.execute(stmt.execution_options(populate_existing=True))).scalar_one().last_sequence
+
+
+async def test_allocator_hands_out_reserved_blocks(db, monkeypatch):
+    monkeypatch.setattr(settings, "app_id_block_size", 5)
+    allocator = _allocator_on(db)
+
+    assert [await allocator.next(114, "first") for _ in range(7)] == [1, 2, 3, 4, 5, 6, 7]
+    # Two blocks reserved; last_sequence is the high-water mark, not a count.
+    assert await _last_sequence(db, "first") == 10
+
+    # A restarted worker starts after the high-water mark (gap 8-10).
+    allocator.reset()
+    assert await allocator.next(114, "first") == 11
+    assert await allocator.next(114, "second") == 1
+
+
+async def test_allocator_concurrent_callers_get_unique_numbers(db, monkeypatch):
+    import asyncio
+
+    monkeypatch.setattr(settings, "app_id_block_size", 3)
+    allocator = _allocator_on(db)
+
+    numbers = await asyncio.gather(*(allocator.next(114, "yearly") for _ in range(20)))
+
+    assert len(set(numbers)) == 20
+    # Concurrent refills may reserve extra blocks; every number is still unique
+    # and drawn from reserved ranges.
+    assert max(numbers) <= await _last_sequence(db, "yearly")
+
+
+async def test_generate_app_id_on_postgresql_uses_the_allocator(db, monkeypatch):
+    allocator = _allocator_on(db)
+    monkeypatch.setattr(application_builder, "app_id_allocator", allocator)
+    monkeypatch.setattr(application_builder, "_allocates_autonomously", lambda _db: True)
+    monkeypatch.setattr(settings, "app_id_block_size", 10)
+    commits = []
+
+    async def commit():
+        commits.append(1)
+
+    monkeypatch.setattr(db, "commit", commit)
+
+    assert await generate_app_id(db, 114, None, suffix="R") == "APP-114-0-00001R"
+    assert await generate_app_id(db, 114, "yearly") == "APP-114-0-00002"
+    # The block covers both; the caller's transaction is never committed.
+    assert await _last_sequence(db, "yearly") == 10
+    assert commits == []
+
+    # Set-based inserts take an exact block straight from the table.
+    assert await application_builder.allocate_app_id_block(db, 114, None, 4) == 11
+    assert await _last_sequence(db, "yearly") == 14
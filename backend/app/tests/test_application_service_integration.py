@@ -305,6 +305,8 @@ class TestUploadReplacesStaleDuplicates:
             "applications/1/documents/old-1.pdf",
             "applications/1/documents/old-2.pdf",
         ]
+        # ...along with their thumbnails and normalized pages.
+        assert [call.args[0] for call in mock_minio.delete_derivatives.call_args_list] == deleted_objects
         # Exactly one replacement record inserted.
         assert service.db.add.call_count == 1
         new_record = service.db.add.call_args.args[0]
@@ -326,6 +328,20 @@ class TestUploadReplacesStaleDuplicates:
         mock_minio.delete_file.assert_not_called()
         assert service.db.add.call_count == 1
 
+    async def test_upload_schedules_derivative_task(self, service):
+        from app.services import application_service as module
+
+        user = self._upload_mocks(service, stale_files=[])
+        upload_file = Mock(filename="成績單.jpg", content_type="image/jpeg")
+        background_tasks = Mock()
+
+        with patch("app.services.application_service.minio_service") as mock_minio:
+            mock_minio.upload_file = AsyncMock(return_value=("applications/1/documents/new.jpg", 111))
+            await service.upload_application_file_minio(1, user, upload_file, "transcript", background_tasks)
+
+        background_tasks.add_task.assert_called_once()
+        assert background_tasks.add_task.call_args.args[0] is module.process_application_file_derivatives
+
     async def test_staff_upload_appends_without_deleting(self, service):
         """Replacement is applicant-only: professor/college/admin uploads
         attach supplements and must never destroy the student's existing
@@ -0,0 +1,154 @@
+"""Pure-ASGI middleware stack (metrics, security headers, trace ID, schema validation).
+
+The middlewares must keep the labels / headers / validation of their former
+BaseHTTPMiddleware versions while passing response messages straight
+through, so streamed bodies reach the client chunk by chunk.
+"""
+
+import asyncio
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from pydantic import BaseModel
+from starlette.responses import JSONResponse, StreamingResponse
+
+from app.core.metrics import normalize_endpoint
+from app.middleware.metrics_middleware import MetricsMiddleware
+from app.middleware.request_id_middleware import RequestIdMiddleware
+from app.middleware.schema_validation_middleware import SchemaValidationMiddleware
+from app.middleware.security_headers_middleware import NO_STORE_CACHE_CONTROL, SecurityHeadersMiddleware
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels=labels) or 0.0
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(RequestIdMiddleware)
+
+    @app.get("/asgi-mw/ok")
+    async def ok(request: Request):
+        return {"trace_id": request.state.trace_id}
+
+    @app.get("/asgi-mw/missing")
+    async def missing():
+        raise HTTPException(status_code=404, detail="nope")
+
+    @app.get("/asgi-mw/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    return app
+
+
+def test_metrics_keep_their_labels():
+    client = TestClient(_build_app(), raise_server_exceptions=False)
+    ok = normalize_endpoint("/asgi-mw/ok")
+    missing = normalize_endpoint("/asgi-mw/missing")
+    boom = normalize_endpoint("/asgi-mw/boom")
+    before = {
+        "ok": _sample("http_requests_total", method="GET", endpoint=ok, status="200"),
+        "missing": _sample("http_requests_total", method="GET", endpoint=missing, status="404"),
+        "missing_err": _sample("http_errors_total", status_code="404", endpoint=missing),
+        "boom": _sample("http_requests_total", method="GET", endpoint=boom, status="500"),
+        "boom_err": _sample("http_errors_total", status_code="500", endpoint=boom),
+        "duration": _sample("http_request_duration_seconds_count", method="GET", endpoint=ok),
+        "in_progress": _sample("http_requests_in_progress", method="GET"),
+    }
+
+    assert client.get("/asgi-mw/ok").status_code == 200
+    assert client.get("/asgi-mw/missing").status_code == 404
+    assert client.get("/asgi-mw/boom").status_code == 500
+
+    assert _sample("http_requests_total", method="GET", endpoint=ok, status="200") == before["ok"] + 1
+    assert _sample("http_request_duration_seconds_count", method="GET", endpoint=ok) == before["duration"] + 1
+    assert _sample("http_requests_total", method="GET", endpoint=missing, status="404") == before["missing"] + 1
+    assert _sample("http_errors_total", status_code="404", endpoint=missing) == before["missing_err"] + 1
+    # An unhandled exception is still a 500 and no longer leaks an in-progress request.
+    assert _sample("http_requests_total", method="GET", endpoint=boom, status="500") == before["boom"] + 1
+    assert _sample("http_errors_total", status_code="500", endpoint=boom) == before["boom_err"] + 1
+    assert _sample("http_requests_in_progress", method="GET") == before["in_progress"]
+
+
+def test_trace_id_reaches_state_and_header():
+    response = TestClient(_build_app()).get("/asgi-mw/ok")
+
+    assert response.headers["X-Trace-ID"] == response.json()["trace_id"]
+    assert response.headers["Cache-Control"] == NO_STORE_CACHE_CONTROL
+
+
+async def test_streamed_body_is_not_buffered():
+    sent = []
+
+    async def chunks():
+        yield b"first"
+        # Already on the wire before the generator produces the next chunk.
+        assert [m.get("body") for m in sent if m["type"] == "http.response.body"] == [b"first"]
+        yield b"second"
+
+    app = _build_app()
+
+    @app.get("/asgi-mw/stream")
+    async def stream():
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await asyncio.Event().wait()  # the client never disconnects
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/asgi-mw/stream",
+        "raw_path": b"/asgi-mw/stream",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+    await app(scope, receive, send)
+
+    start = sent[0]
+    headers = {k.decode(): v.decode() for k, v in start["headers"]}
+    assert start["status"] == 200
+    assert "x-trace-id" in headers and headers["cache-control"] == NO_STORE_CACHE_CONTROL
+    assert [m.get("body") for m in sent[1:]] == [b"first", b"second", b""]
+
+
+class _Item(BaseModel):
+    id: int
+
+
+def test_schema_validation_records_errors_without_touching_the_body():
+    app = FastAPI()
+    validator = {}
+
+    @app.get("/asgi-mw/item", response_model=_Item)
+    async def item():
+        # JSONResponse bypasses FastAPI's own response_model validation.
+        return JSONResponse({"id": "not-a-number"})
+
+    def factory(inner):
+        validator["mw"] = SchemaValidationMiddleware(inner, enabled=True)
+        return validator["mw"]
+
+    app.add_middleware(factory)
+    response = TestClient(app).get("/asgi-mw/item")
+
+    assert response.json() == {"id": "not-a-number"}
+    errors = validator["mw"].get_validation_errors()
+    assert len(errors) == 1 and errors[0]["path"] == "/asgi-mw/item"
@@ -64,6 +64,7 @@ REQUIRED_WIRING = {
     "api/v1/endpoints/college_review/ranking_management.py": [
         "import_ranking_from_excel",
         "update_ranking_order",
+        "reorder_ranking",
     ],
 }
 
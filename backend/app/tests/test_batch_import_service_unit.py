@@ -1140,3 +1140,54 @@ async def test_parse_english_sub_type_columns_lowercased(db, scholarship_with_su
 
     assert errors == []
     assert parsed[0]["sub_types"] == ["moe_1w", "nstc"]
+
+
+# ─── parse cache + worker thread ──────────────────────────────────────
+
+
+class _DictRedis:
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None, **_):
+        self.store[key] = value
+
+
+@pytest.mark.asyncio
+async def test_parse_runs_in_worker_thread_and_is_cached_by_file_hash(db, scholarship_with_sub_types, monkeypatch):
+    import threading
+
+    from app.core import cache as cache_mod
+    from app.services import batch_import_service as module
+
+    fake = _DictRedis()
+    monkeypatch.setattr(cache_mod, "get_cache", lambda: fake)
+    reads = []
+    real_read = module.read_import_sheet
+
+    def tracking_read(content, dtype=None):
+        reads.append(threading.current_thread() is threading.main_thread())
+        return real_read(content, dtype=dtype)
+
+    monkeypatch.setattr(module, "read_import_sheet", tracking_read)
+    df = pd.DataFrame([{"學號": "313554001", "學生姓名": "王小明", "國科會": "V"}, {"學號": "", "學生姓名": "x"}])
+    buf = io.BytesIO()
+    df.to_excel(buf, index=False)
+
+    service = BatchImportService(db)
+    first = await service.parse_excel_file(buf.getvalue(), scholarship_with_sub_types.id, 114, None)
+    second = await service.parse_excel_file(buf.getvalue(), scholarship_with_sub_types.id, 114, None)
+
+    assert reads == [False]  # read once, off the event-loop thread
+    assert second[0] == first[0] and second[0][0]["sub_types"] == ["nstc"]
+    assert [e.error_type for e in second[1]] == ["missing_required"]
+    assert isinstance(second[1][0], BatchImportValidationError)
+
+    # A different parse context (sub-type list changed) is a different entry.
+    scholarship_with_sub_types.sub_type_list = ["nstc"]
+    await db.commit()
+    await service.parse_excel_file(buf.getvalue(), scholarship_with_sub_types.id, 114, None)
+    assert len(reads) == 2
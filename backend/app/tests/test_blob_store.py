@@ -0,0 +1,156 @@
+"""Content-addressed blob reference counting and GC (app.services.blob_store)."""
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.application import Application, ApplicationFile
+from app.models.enums import ApplicationStatus
+from app.models.scholarship import ScholarshipType, SubTypeSelectionMode
+from app.models.storage_blob import StorageBlob
+from app.models.user import User, UserRole, UserType
+from app.services import blob_store
+from app.services.minio_service import MinIOService
+
+SHARED = MinIOService.blob_object_name("a" * 64)
+ORPHAN = MinIOService.blob_object_name("b" * 64)
+
+
+@pytest_asyncio.fixture
+async def application_id(db: AsyncSession) -> int:
+    user = User(nycu_id="blob_s1", name="S1", email="blob_s1@u.edu", user_type=UserType.student, role=UserRole.student)
+    sch = ScholarshipType(code="blob", name="blob", description="x")
+    db.add_all([user, sch])
+    await db.commit()
+    application = Application(
+        app_id="APP-115-0-BL001",
+        user_id=user.id,
+        scholarship_type_id=sch.id,
+        sub_type_selection_mode=SubTypeSelectionMode.single,
+        academic_year=115,
+        status=ApplicationStatus.draft,
+        agree_terms=True,
+    )
+    db.add(application)
+    await db.commit()
+    return application.id
+
+
+@pytest.fixture
+def gc_env(db, monkeypatch):
+    @asynccontextmanager
+    async def _session():
+        yield db
+        await db.commit()
+
+    minio = MagicMock()
+    minio.delete_file.return_value = True
+    monkeypatch.setattr(blob_store, "get_db_session", _session)
+    monkeypatch.setattr(blob_store, "minio_service", minio)
+    return minio
+
+
+async def _blob(db: AsyncSession, object_name: str) -> StorageBlob:
+    db.expire_all()
+    return (await db.execute(select(StorageBlob).where(StorageBlob.object_name == object_name))).scalar_one_or_none()
+
+
+@pytest.mark.asyncio
+async def test_acquire_and_release_track_references(db):
+    assert await blob_store.acquire_blob(db, SHARED, 10, "application/pdf")
+    assert await blob_store.acquire_blob(db, SHARED, 10, "application/pdf")
+    await db.commit()
+    assert (await _blob(db, SHARED)).ref_count == 2
+
+    assert await blob_store.release_blob(db, SHARED)
+    await db.commit()
+    blob = await _blob(db, SHARED)
+    assert blob.ref_count == 1 and blob.released_at is None
+
+    await blob_store.release_blob(db, SHARED)
+    await db.commit()
+    blob = await _blob(db, SHARED)
+    assert blob.ref_count == 0 and blob.released_at is not None
+
+    # Re-acquiring a released blob (a deduplicated upload) revives it.
+    await blob_store.acquire_blob(db, SHARED)
+    await db.commit()
+    blob = await _blob(db, SHARED)
+    assert blob.ref_count == 1 and blob.released_at is None
+
+
+@pytest.mark.asyncio
+async def test_legacy_objects_are_not_blobs(db):
+    legacy = "applications/1/documents/20250101_abcd_scan.pdf"
+
+    assert not await blob_store.acquire_blob(db, legacy)
+    assert not await blob_store.release_blob(db, legacy)
+    assert not await blob_store.release_blob(db, None)
+    assert (await db.execute(select(StorageBlob))).first() is None
+
+
+@pytest.mark.asyncio
+async def test_gc_deletes_only_long_unreferenced_blobs(db, application_id, gc_env):
+    long_ago = datetime.now(timezone.utc) - timedelta(days=30)
+    recent = MinIOService.blob_object_name("c" * 64)
+    # SHARED is still referenced by a row even though its count drifted to 0
+    # (e.g. a cascade delete elsewhere that never released).
+    db.add_all(
+        [
+            StorageBlob(content_sha256="a" * 64, object_name=SHARED, ref_count=0, released_at=long_ago),
+            StorageBlob(content_sha256="b" * 64, object_name=ORPHAN, ref_count=3),
+            StorageBlob(
+                content_sha256="c" * 64, object_name=recent, ref_count=0, released_at=datetime.now(timezone.utc)
+            ),
+            ApplicationFile(application_id=application_id, filename="a.pdf", object_name=SHARED),
+        ]
+    )
+    await db.commit()
+
+    # ORPHAN has no rows: reconciled to 0 now, so it is still within its grace period.
+    assert await blob_store.collect_garbage() == 0
+    assert (await _blob(db, SHARED)).ref_count == 1
+    orphan = await _blob(db, ORPHAN)
+    assert orphan.ref_count == 0 and orphan.released_at is not None
+
+    assert await blob_store.collect_garbage(grace_hours=0) == 2
+    gc_env.delete_file.assert_any_call(ORPHAN)
+    gc_env.delete_file.assert_any_call(recent)
+    gc_env.delete_derivatives.assert_any_call(ORPHAN)
+    gc_env.delete_derivatives.assert_any_call(recent)
+    assert await _blob(db, ORPHAN) is None
+    assert await _blob(db, SHARED) is not None
+
+
+@pytest.mark.asyncio
+async def test_gc_keeps_a_blob_reacquired_after_it_was_listed(db, gc_env):
+    long_ago = datetime.now(timezone.utc) - timedelta(days=30)
+    db.add(StorageBlob(content_sha256="b" * 64, object_name=ORPHAN, ref_count=0, released_at=long_ago))
+    await db.commit()
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=1)
+
+    # A deduplicated upload takes its reference between the GC's candidate
+    # query and the per-blob collection.
+    await blob_store.acquire_blob(db, ORPHAN)
+    await db.commit()
+
+    assert not await blob_store.collect_blob("b" * 64, cutoff)
+    gc_env.delete_file.assert_not_called()
+    assert (await _blob(db, ORPHAN)).ref_count == 1
+
+
+@pytest.mark.asyncio
+async def test_gc_keeps_the_row_when_the_object_removal_fails(db, gc_env):
+    long_ago = datetime.now(timezone.utc) - timedelta(days=30)
+    db.add(StorageBlob(content_sha256="b" * 64, object_name=ORPHAN, ref_count=0, released_at=long_ago))
+    await db.commit()
+    gc_env.delete_file.return_value = False
+
+    assert await blob_store.collect_garbage(grace_hours=0) == 0
+    gc_env.delete_derivatives.assert_not_called()
+    assert await _blob(db, ORPHAN) is not None
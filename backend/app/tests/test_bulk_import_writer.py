@@ -0,0 +1,231 @@
+"""Set-based import writes (app.services.bulk_import_writer).
+
+The imports switch to these at settings.import_bulk_write_min_rows; the
+threshold is set to 0 here so small SQLite fixtures take the bulk path. On
+SQLite rows are staged with executemany instead of COPY.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import BatchImportError, NotFoundError
+from app.models.application import Application, ApplicationStatus
+from app.models.application_sequence import ApplicationSequence
+from app.models.batch_import import BatchImport
+from app.models.enums import Semester
+from app.models.user import User, UserRole, UserType
+from app.models.user_profile import UserProfile
+from app.services import bulk_import_writer
+from app.services.application_builder import generate_app_id, reserve_app_id_block
+from app.services.batch_import_service import BatchImportService
+from app.services.renewal_import_service import RenewalImportService
+from app.services.supplementary_import_service import SupplementaryImportService
+from app.tests.test_supplementary_import_service import _make_importer, _make_scholarship_and_config, _row
+
+
+@pytest.fixture(autouse=True)
+def bulk_write(monkeypatch):
+    monkeypatch.setattr(settings, "import_bulk_write_min_rows", 0)
+
+
+@pytest.mark.asyncio
+async def test_reserved_block_and_single_ids_share_the_sequence(db: AsyncSession):
+    assert await reserve_app_id_block(db, 114, "first", 3) == 1
+    assert await generate_app_id(db, 114, "first", commit=False) == "APP-114-1-00004"
+    assert await reserve_app_id_block(db, 114, "first", 2) == 5
+    assert await generate_app_id(db, 114, "first", commit=False) == "APP-114-1-00007"
+
+
+@pytest.mark.asyncio
+async def test_supplementary_import_writes_the_same_rows_set_based(db: AsyncSession):
+    _, config = await _make_scholarship_and_config(db, code="bulk_supp")
+    importer = await _make_importer(db, "col_bulk")
+    professor = User(nycu_id="PBULK", name="教授", user_type=UserType.employee, role=UserRole.professor)
+    existing = User(nycu_id="310470001", name="舊生", user_type=UserType.student, role=UserRole.student)
+    db.add_all([professor, existing, ApplicationSequence(academic_year=114, semester="yearly", last_sequence=7)])
+    await db.flush()
+    db.add(UserProfile(user_id=existing.id, account_number="0001", advisor_name="原教授"))
+    await db.flush()
+
+    rows = [
+        _row("310470001", advisor_nycu_id="PBULK"),
+        _row("310470002", sub_types=["moe_1w", "nstc"]),
+        _row("310470003", advisor_nycu_id="NOBODY"),
+    ]
+    rows[0]["postal_account"] = None  # blank cell keeps the stored account
+    rows[1]["postal_account"] = "12345-67890"
+    data_map = {
+        sid: {"std_stdcode": sid, "std_cname": f"生{sid[-1]}", "std_pid": "A123456789"}
+        for sid in ("310470001", "310470002", "310470003")
+    }
+    service = SupplementaryImportService(db, student_service=AsyncMock())
+
+    user_map = await service.find_or_create_users(data_map)
+    assert user_map["310470001"].id == existing.id
+    assert user_map["310470002"].name == "生2"
+    assert user_map["310470002"].role == UserRole.student
+
+    profile_map = await service.upsert_user_profiles(user_map, rows)
+    assert profile_map[existing.id].account_number == "0001"
+    assert profile_map[existing.id].advisor_name == "原教授"
+    assert profile_map[existing.id].advisor_nycu_id == "PBULK"
+    assert profile_map[user_map["310470002"].id].account_number == "12345-67890"
+
+    created, unresolved = await service.create_applications(
+        rows, user_map, data_map, config, importer_id=importer.id, profile_map=profile_map
+    )
+    assert created == 3
+    assert unresolved == ["310470002", "310470003"]
+
+    apps = (await db.execute(select(Application).order_by(Application.id))).scalars().all()
+    assert [a.app_id for a in apps] == ["APP-114-0-00008", "APP-114-0-00009", "APP-114-0-00010"]
+    assert [a.user_id for a in apps] == [user_map[r["student_id"]].id for r in rows]
+    first, second, _ = apps
+    assert first.professor_id == professor.id
+    assert second.status == ApplicationStatus.submitted
+    assert second.sub_scholarship_type == "moe_1w"
+    assert second.scholarship_subtype_list == ["moe_1w", "nstc"]
+    assert second.sub_type_preferences == ["moe_1w", "nstc"]
+    assert second.scholarship_configuration_id == config.id
+    assert second.import_source == "supplementary_import" and second.imported_by_id == importer.id
+    assert second.is_renewal is False and second.agree_terms is False
+    assert second.semester is None and second.amount == 30000
+    assert second.submitted_form_data == {"fields": {}, "documents": []}
+    # std_pid goes through StudentDataJSON: encrypted at rest, plaintext on read
+    assert second.student_data["std_pid"] == "A123456789"
+    raw = (await db.execute(text("SELECT student_data FROM applications WHERE id = :id"), {"id": second.id})).scalar()
+    assert "A123456789" not in raw
+
+
+@pytest.mark.asyncio
+async def test_batch_import_bulk_path(db: AsyncSession):
+    scholarship, config = await _make_scholarship_and_config(db, code="bulk_batch", semester=Semester.first)
+    importer = await _make_importer(db, "col_bulk_batch")
+    professor = User(nycu_id="PBATCH", name="教授", user_type=UserType.employee, role=UserRole.professor)
+    db.add(professor)
+    batch = BatchImport(
+        importer_id=importer.id,
+        college_code="A",
+        scholarship_type_id=scholarship.id,
+        academic_year=114,
+        semester="first",
+        file_name="batch.xlsx",
+    )
+    db.add(batch)
+    await db.flush()
+
+    rows = [_row("312000001", advisor_nycu_id="PBATCH"), _row("312000002", sub_types=["moe_1w"])]
+    rows[1]["postal_account"] = "700-1"
+    student_service = AsyncMock()
+    student_service.get_student_basic_info = AsyncMock(side_effect=lambda sid: {"std_cname": f"SIS{sid[-1]}"})
+    student_service.get_student_snapshot = AsyncMock(side_effect=lambda sid, **kw: {"std_stdcode": sid})
+    service = BatchImportService(db, student_service=student_service)
+
+    created_ids, errors = await service.create_applications_from_batch(batch, rows, scholarship.id, 114, "first")
+
+    assert errors == []
+    apps = {a.id: a for a in (await db.execute(select(Application))).scalars().all()}
+    first, second = (apps[i] for i in created_ids)
+    assert (first.app_id, second.app_id) == ("APP-114-1-00001U", "APP-114-1-00002U")
+    assert first.professor_id == professor.id and second.professor_id is None
+    assert second.semester == Semester.first
+    assert second.batch_import_id == batch.id and second.import_source == "batch_import"
+    assert second.document_status == "pending_documents"
+    assert second.student_data == {"std_stdcode": "312000002"}
+    users = {u.nycu_id: u for u in (await db.execute(select(User))).scalars().all()}
+    assert users["312000002"].name == "SIS2"
+    assert users["312000002"].raw_data["imported_from_batch"] is True
+    profile = (await db.execute(select(UserProfile).where(UserProfile.user_id == users["312000002"].id))).scalar_one()
+    assert profile.account_number == "700-1"
+
+
+@pytest.mark.asyncio
+async def test_renewal_import_bulk_path(db: AsyncSession):
+    scholarship, config = await _make_scholarship_and_config(db, code="bulk_renewal")
+    importer = await _make_importer(db, "col_bulk_renewal")
+    batch = BatchImport(
+        importer_id=importer.id,
+        college_code="A",
+        scholarship_type_id=scholarship.id,
+        academic_year=114,
+        file_name="renewal.xlsx",
+        import_type="renewal",
+    )
+    db.add(batch)
+    await db.flush()
+
+    def _renewal_row(sid, row_number):
+        return {
+            "student_id": sid,
+            "student_name": "續領生",
+            "sub_type": "nstc",
+            "row_number": row_number,
+            "postal_account": "0002",
+            "advisor_name": "教授",
+            "advisor_nycu_id": "P1",
+        }
+
+    student_service = AsyncMock()
+    student_service.get_student_basic_info = AsyncMock(return_value={"std_cname": "續領生"})
+    student_service.get_student_snapshot = AsyncMock(side_effect=lambda sid, **kw: {"std_stdcode": sid})
+    service = RenewalImportService(db, student_service=student_service)
+
+    created_ids, errors = await service.create_renewals_from_batch(
+        batch, [_renewal_row("311000001", 2), _renewal_row("311000002", 3)], scholarship.id, 114, None
+    )
+
+    assert errors == []
+    apps = (await db.execute(select(Application).where(Application.id.in_(created_ids)))).scalars().all()
+    by_id = {a.id: a for a in apps}
+    ordered = [by_id[i] for i in created_ids]
+    assert [a.app_id for a in ordered] == ["APP-114-0-00001R", "APP-114-0-00002R"]
+    for app in ordered:
+        assert app.status == ApplicationStatus.approved
+        assert app.is_renewal is True and app.renewal_year == 114
+        assert app.allocation_config_id == config.id
+        assert app.quota_allocation_status == "allocated"
+        assert app.approved_at is not None
+        assert app.batch_import_id == batch.id
+        assert app.submitted_form_data["postal_account"] == "0002"
+
+    # A missing snapshot still fails the whole batch at that row.
+    async def snapshot(sid, **kwargs):
+        if sid == "311000004":
+            raise NotFoundError("查無此學號")
+        return {"std_stdcode": sid}
+
+    student_service.get_student_snapshot = AsyncMock(side_effect=snapshot)
+    with pytest.raises(BatchImportError, match="第 5 行"):
+        await service.create_renewals_from_batch(
+            batch, [_renewal_row("311000003", 4), _renewal_row("311000004", 5)], scholarship.id, 114, None
+        )
+    assert batch.error_summary["failed_at_row"] == 5
+
+
+@pytest.mark.asyncio
+async def test_insert_applications_rejects_duplicate_users(db: AsyncSession):
+    with pytest.raises(ValueError):
+        await bulk_import_writer.insert_applications(
+            db, [{"user_id": 1}, {"user_id": 1}], {}, academic_year=114, sequence_semester=None
+        )
+
+
+def test_app_id_expression_on_postgresql():
+    pg = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="postgresql")))
+    staged = Table("import_stage_applications", MetaData(), Column("ord", Integer))
+    expression = bulk_import_writer._app_id_expression(pg, staged, 113, "second", 42, "U")
+    sql = str(expression.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert "lpad(CAST(41 + import_stage_applications.ord AS TEXT)" in sql
+    assert sql.startswith("'APP-113-2-' || lpad(") and sql.endswith("|| 'U'")
+
+
+def test_threshold(monkeypatch):
+    monkeypatch.setattr(settings, "import_bulk_write_min_rows", 50)
+    assert not bulk_import_writer.use_bulk_write(49)
+    assert bulk_import_writer.use_bulk_write(50)
@@ -66,15 +66,42 @@ class FakeAsyncRedis:
         return 0, matched
 
     async def eval(self, script: str, numkeys: int, *keys_and_args):
-        # Implement just the release-Lua: check token equals expected, del if so.
-        keys = keys_and_args[:numkeys]
-        args = keys_and_args[numkeys:]
-        key = keys[0] if isinstance(keys[0], bytes) else keys[0].encode("utf-8")
-        expected = args[0] if isinstance(args[0], bytes) else args[0].encode("utf-8")
-        if key in self._store and self._store[key][0] == expected:
-            del self._store[key]
-            return 1
+        return _fake_lock_eval(self._store, script, numkeys, *keys_and_args)
+
+
+def _fake_lock_eval(store, script: str, numkeys: int, *keys_and_args):
+    """The release- and renew-Lua: act only if the token still matches."""
+    keys = keys_and_args[:numkeys]
+    args = keys_and_args[numkeys:]
+    key = keys[0] if isinstance(keys[0], bytes) else keys[0].encode("utf-8")
+    expected = args[0] if isinstance(args[0], bytes) else args[0].encode("utf-8")
+    entry = store.get(key)
+    if entry is None or entry[0] != expected or (entry[1] is not None and entry[1] < time.time()):
         return 0
+    if script == cache_mod._RENEW_LUA:
+        store[key] = (entry[0], time.time() + int(args[1]))
+        return 1
+    del store[key]
+    return 1
+
+
+class FakeSyncRedis:
+    """Sync counterpart for with_lock_sync: NX SET with expiry + eval."""
+
+    def __init__(self) -> None:
+        self._store: dict[bytes, tuple[bytes, Optional[float]]] = {}
+        self.evals: list[str] = []
+
+    def set(self, key: bytes, value: bytes, ex: Optional[int] = None, nx: bool = False, **_):
+        entry = self._store.get(key)
+        if nx and entry is not None and (entry[1] is None or entry[1] >= time.time()):
+            return None
+        self._store[key] = (value, time.time() + ex if ex else None)
+        return True
+
+    def eval(self, script: str, numkeys: int, *keys_and_args):
+        self.evals.append(script)
+        return _fake_lock_eval(self._store, script, numkeys, *keys_and_args)
 
 
 @pytest.fixture
@@ -214,3 +241,46 @@ async def test_with_lock_releases_on_exception(fake_redis):
     # Subsequent acquire succeeds — lock was released on context exit
     async with cache_mod.with_lock("flaky", ttl_seconds=10):
         pass
+
+
+@pytest.fixture
+def fake_redis_sync(monkeypatch):
+    fake = FakeSyncRedis()
+    monkeypatch.setattr(cache_mod, "get_cache_sync", lambda: fake)
+    monkeypatch.setattr(cache_mod, "_renew_interval", lambda ttl: 0.05)
+    return fake
+
+
+def test_with_lock_sync_renews_past_ttl(fake_redis_sync):
+    # TTL 1s, held for 1.5s: without renewal a second caller would get in.
+    with cache_mod.with_lock_sync("roster:7:2026-01", ttl_seconds=1, renew=True):
+        time.sleep(1.5)
+        with pytest.raises(cache_mod.LockBusy):
+            with cache_mod.with_lock_sync("roster:7:2026-01", ttl_seconds=1):
+                pass
+
+    assert cache_mod._RENEW_LUA in fake_redis_sync.evals
+    # Released on exit; renewal thread is gone and does not resurrect it.
+    with cache_mod.with_lock_sync("roster:7:2026-01", ttl_seconds=1):
+        pass
+
+
+def test_with_lock_sync_without_renew_expires(fake_redis_sync):
+    with cache_mod.with_lock_sync("roster:8:2026-01", ttl_seconds=1):
+        time.sleep(1.1)
+        with cache_mod.with_lock_sync("roster:8:2026-01", ttl_seconds=1):
+            pass
+    assert cache_mod._RENEW_LUA not in fake_redis_sync.evals
+
+
+@pytest.mark.asyncio
+async def test_with_lock_renews_past_ttl(fake_redis, monkeypatch):
+    monkeypatch.setattr(cache_mod, "_renew_interval", lambda ttl: 0.05)
+    async with cache_mod.with_lock("roster:9", ttl_seconds=1, renew=True):
+        await asyncio.sleep(1.3)
+        with pytest.raises(cache_mod.LockBusy):
+            async with cache_mod.with_lock("roster:9", ttl_seconds=1):
+                pass
+
+    async with cache_mod.with_lock("roster:9", ttl_seconds=1):
+        pass
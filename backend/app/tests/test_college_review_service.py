@@ -11,7 +11,7 @@ from unittest.mock import AsyncMock, MagicMock, Mock
 
 import pytest
 
-from app.models.college_review import CollegeRanking, CollegeRankingItem
+from app.models.college_review import CollegeRanking
 from app.services.college_review_service import (
     CollegeReviewError,
     CollegeReviewService,
@@ -80,20 +80,24 @@ class TestCollegeReviewService:
 
     async def test_update_ranking_order_validation(self, service, sample_ranking):
         """Test ranking order update with validation"""
-        sample_ranking.items = [
-            CollegeRankingItem(id=1, application_id=101, rank_position=1),
-            CollegeRankingItem(id=2, application_id=102, rank_position=2),
-        ]
-
-        result = MagicMock()
-        result.scalar_one_or_none.return_value = sample_ranking
-        service.db.execute = AsyncMock(return_value=result)
+        ranking_result = MagicMock()
+        ranking_result.scalar_one_or_none.return_value = sample_ranking
+        positions_result = MagicMock()
+        positions_result.all.return_value = [(1, 101, 1), (2, 102, 2)]
+        bounds_result = MagicMock()
+        bounds_result.one.return_value = (None, 2)
+        # lock, position projection, renewal/new aggregate, item UPDATE, application UPDATE
+        service.db.execute = AsyncMock(
+            side_effect=[ranking_result, positions_result, bounds_result, MagicMock(), MagicMock()]
+        )
+        service.db.get_bind = MagicMock(return_value=MagicMock(dialect=MagicMock()))
 
         new_order = [{"item_id": 1, "position": 2}, {"item_id": 2, "position": 1}]
 
         ranking = await service.update_ranking_order(ranking_id=1, new_order=new_order)
 
         assert ranking is not None
+        assert service.db.execute.call_count == 5
         service.db.flush.assert_called_once()
         service.db.refresh.assert_called_once()
 
@@ -116,6 +116,9 @@ async def test_minio_success_leaves_no_failed_row(db, draft_with_file):
         svc = ApplicationService(db)
         await svc.delete_application(app_db_id, draft_with_file["admin"], reason="G20 test")
 
+    # The thumbnail / normalized page derived from the original go with it.
+    mock_minio.delete_derivatives.assert_called_once_with("applications/g20/transcript.pdf")
+
     res = await db.execute(
         select(AuditLog).where(
             AuditLog.resource_id == str(app_db_id),
@@ -16,19 +16,28 @@ Bugs cause:
   reviewer's screen (privacy + UX breakage)
 - Non-dict / None paths broken → INSERT/SELECT crashes for null
   student_data columns
+- Lazy decryption leaking the envelope through a read path that bypasses
+  `LazyStudentData` (dict(), json, pydantic) → ciphertext on screen,
+  including student_data nested in `Any` / `Dict[str, Any]` response fields
 
-2 methods covered (12 cases). Env vars patched for the encrypt path.
+2 methods and the lazy-decryption wrapper covered. Env vars patched for the encrypt path.
 """
 
 import base64
 import json
 import os
+from typing import Any, Dict, List
 from unittest.mock import patch
 
 import pytest
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from httpx import ASGITransport, AsyncClient
+from pydantic import BaseModel, TypeAdapter
 
-from app.core.encrypted_json import StudentDataJSON
+from app.core.encrypted_json import LazyStudentData, StudentDataJSON, skip_pii_decryption
 from app.core.pii_crypto import decrypt_pii, encrypt_pii, is_encrypted, reset_key_cache
+from app.schemas.response import ApiResponse
 
 _TEST_KEY_B64 = base64.urlsafe_b64encode(b"0123456789abcdef0123456789abcdef").decode("ascii").rstrip("=")
 
@@ -169,6 +178,129 @@ def test_result_non_dict_passes_through(td):
     assert td.process_result_value([], None) == []  # type: ignore[arg-type]
 
 
+# ─── Lazy decryption ─────────────────────────────────────────────────
+
+
+def test_result_defers_decryption_until_pid_is_read(td):
+    """Pin: loading decrypts nothing; reading std_pid decrypts exactly once."""
+    with patch.dict(os.environ, _env(), clear=False):
+        reset_key_cache()
+        envelope = encrypt_pii("A123456789")
+        with patch("app.core.encrypted_json.decrypt_pii", side_effect=decrypt_pii) as spy:
+            result = td.process_result_value({"std_pid": envelope, "std_cname": "王小明"}, None)
+            assert isinstance(result, LazyStudentData)
+            assert result["std_cname"] == "王小明"
+            assert "A123456789" not in repr(result)
+            assert spy.call_count == 0
+
+            assert result.get("std_pid") == "A123456789"
+            assert result["std_pid"] == "A123456789"
+            assert spy.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "read",
+    [
+        lambda d: dict(d),
+        lambda d: {**d},
+        lambda d: d.copy(),
+        lambda d: dict(d.items()),
+        lambda d: json.loads(json.dumps(d)),
+        lambda d: {"std_pid": list(d.values())[0]},
+        lambda d: TypeAdapter(Dict[str, Any]).validate_python(d),
+    ],
+    ids=["dict", "unpack", "copy", "items", "json", "values", "pydantic"],
+)
+def test_result_every_read_path_sees_plaintext(td, read):
+    """Pin: copies and serializers never see the envelope."""
+    with patch.dict(os.environ, _env(), clear=False):
+        reset_key_cache()
+        result = td.process_result_value({"std_pid": encrypt_pii("A123456789")}, None)
+        assert read(result) == {"std_pid": "A123456789"}
+        assert result == {"std_pid": "A123456789"}
+
+
+class _NestedStudentData(BaseModel):
+    by_id: Dict[str, Any]
+    rows: List[Dict[str, Any]]
+    raw: Any
+
+
+def _nested_app(load) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api-response")
+    async def api_response():
+        return ApiResponse(success=True, message="ok", data={"items": [{"student_data": load()}]})
+
+    @app.get("/response-model", response_model=_NestedStudentData)
+    async def response_model():
+        return _NestedStudentData(by_id={"1": load()}, rows=[{"student_data": load()}], raw=[load()])
+
+    @app.get("/plain")
+    async def plain():
+        return {"items": [{"student_data": load()}]}
+
+    return app
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/api-response", "/response-model", "/plain"])
+async def test_responses_with_nested_student_data_show_plaintext(td, path):
+    """Pin: student_data inside Any / Dict[str, Any] / List[Dict[str, Any]]
+    fields reaches the client decrypted, however the response is built."""
+    with patch.dict(os.environ, _env(), clear=False):
+        reset_key_cache()
+        envelope = encrypt_pii("A123456789")
+        app = _nested_app(lambda: td.process_result_value({"std_pid": envelope, "std_cname": "王小明"}, None))
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get(path)
+
+    assert response.status_code == 200
+    assert "pii:" not in response.text
+    assert response.text.count("A123456789") >= 1
+
+
+def test_model_dump_of_nested_student_data_is_plaintext(td):
+    """Pin: python-mode dumps and jsonable_encoder, not only JSON responses."""
+    with patch.dict(os.environ, _env(), clear=False):
+        reset_key_cache()
+        loaded = td.process_result_value({"std_pid": encrypt_pii("A123456789")}, None)
+        model = _NestedStudentData(by_id={"1": loaded}, rows=[{"student_data": loaded}], raw=loaded)
+
+        dumped = model.model_dump()
+        assert dumped["by_id"]["1"] == dumped["rows"][0]["student_data"] == {"std_pid": "A123456789"}
+        assert dumped["raw"] == {"std_pid": "A123456789"} and type(dumped["raw"]) is dict
+        assert "pii:" not in json.dumps(jsonable_encoder(model))
+
+
+def test_bind_unread_lazy_value_keeps_stored_envelope(td):
+    """Pin: saving a loaded value whose PID was never read writes the same
+    envelope back — no decrypt, no fresh nonce."""
+    with patch.dict(os.environ, _env(), clear=False):
+        reset_key_cache()
+        envelope = encrypt_pii("A123456789")
+        loaded = td.process_result_value({"std_pid": envelope, "x": 1}, None)
+        with patch("app.core.encrypted_json.decrypt_pii") as spy:
+            stored = td.process_bind_param(loaded, None)
+        assert stored == {"std_pid": envelope, "x": 1} and type(stored) is dict
+        spy.assert_not_called()
+
+        loaded["std_pid"]  # read it: the next save re-encrypts the plaintext
+        assert is_encrypted(td.process_bind_param(loaded, None)["std_pid"])
+
+
+def test_skip_pii_decryption_leaves_envelope(td):
+    """Pin: bulk paths that opt out get a plain dict with the envelope."""
+    with patch.dict(os.environ, _env(), clear=False):
+        reset_key_cache()
+        envelope = encrypt_pii("A123456789")
+        with skip_pii_decryption():
+            result = td.process_result_value({"std_pid": envelope}, None)
+        assert type(result) is dict and result["std_pid"] == envelope
+        assert isinstance(td.process_result_value({"std_pid": envelope}, None), LazyStudentData)
+
+
 # ─── Round-trip through both methods ─────────────────────────────────
 
 
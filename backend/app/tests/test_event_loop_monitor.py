@@ -0,0 +1,105 @@
+"""Event-loop lag, threadpool gauges, the blocking watchdog and pool checkout wait."""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from app.core.event_loop_monitor import EventLoopMonitor, _sample_executor, sample_threadpools
+from app.db.session import _install_pool_checkout_timer
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels=labels) or 0.0
+
+
+def _blocking_call(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_lag_histogram_sees_a_blocked_loop():
+    before = _sample("event_loop_lag_seconds_sum")
+    monitor = EventLoopMonitor(interval=0.01)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.02)
+        _blocking_call(0.15)
+        await asyncio.sleep(0.03)
+    finally:
+        await monitor.stop()
+
+    assert _sample("event_loop_lag_seconds_sum") - before >= 0.1
+
+
+@pytest.mark.asyncio
+async def test_watchdog_logs_the_blocking_stack_once(caplog):
+    before = _sample("event_loop_blocked_total")
+    monitor = EventLoopMonitor(interval=0.01, block_threshold=0.05)
+    monitor.start()
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.core.event_loop_monitor"):
+            await asyncio.sleep(0.02)
+            _blocking_call(0.3)
+            await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    reports = [record for record in caplog.records if "Event loop blocked" in record.getMessage()]
+    assert len(reports) == 1
+    assert "_blocking_call" in reports[0].getMessage()
+    assert _sample("event_loop_blocked_total") - before == 1
+
+
+def test_watchdog_is_quiet_while_the_loop_keeps_up():
+    monitor = EventLoopMonitor(interval=0.5, block_threshold=0.05)
+    assert monitor.check_blocked() is None  # not started
+    monitor._deadline = time.monotonic() + 0.5
+    assert monitor.check_blocked() is None
+
+
+def test_executor_queue_depth_and_busy_workers():
+    release = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        started = threading.Event()
+        executor.submit(lambda: (started.set(), release.wait(5)))
+        started.wait(5)
+        executor.submit(release.wait, 5)
+        executor.submit(release.wait, 5)
+
+        _sample_executor("test_pool", executor)
+
+        assert _sample("threadpool_queue_depth", pool="test_pool") == 2
+        assert _sample("threadpool_busy_workers", pool="test_pool") == 1
+    finally:
+        release.set()
+        executor.shutdown(wait=True)
+
+
+@pytest.mark.asyncio
+async def test_anyio_limiter_is_sampled():
+    sample_threadpools(asyncio.get_running_loop())
+    assert REGISTRY.get_sample_value("threadpool_queue_depth", labels={"pool": "anyio"}) == 0
+    assert REGISTRY.get_sample_value("threadpool_busy_workers", labels={"pool": "anyio"}) is not None
+
+
+def test_pool_checkout_wait_is_timed_across_dispose():
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=1, max_overflow=0)
+    _install_pool_checkout_timer(engine, "test_engine")
+    before = _sample("db_pool_checkout_wait_seconds_count", pool_type="test_engine")
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    engine.dispose()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    assert _sample("db_pool_checkout_wait_seconds_count", pool_type="test_engine") - before == 2
+    engine.dispose()
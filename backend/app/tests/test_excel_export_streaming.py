@@ -0,0 +1,292 @@
+"""
+Write-only (streaming) payment-roster Excel writer.
+
+`_create_excel_file_streaming` must produce the same workbook as the
+in-memory `_create_excel_file` path — sheet names and order, header,
+values, red/amber fills, number formats, borders, column widths and frozen
+panes — while writing every row once and keeping memory flat. The parity
+tests compare the two outputs cell by cell; a `slow` test compares their
+peak heap. Wall time is measured by `scripts/bench_roster_excel.py`.
+
+Stubs follow the SimpleNamespace pattern of `test_excel_export_service_rows.py`.
+"""
+
+from __future__ import annotations
+
+import tracemalloc
+from types import SimpleNamespace
+from typing import Optional
+
+import openpyxl
+import pytest
+
+from app.core.config import settings
+from app.services import excel_export_service as excel_module
+from app.services.excel_export_service import ExcelExportService
+
+
+@pytest.fixture
+def service() -> ExcelExportService:
+    return ExcelExportService()
+
+
+def _make_item(
+    idx: int,
+    *,
+    allocated_sub_type: Optional[str] = "nstc",
+    allocation_year: Optional[int] = 114,
+    bank_account: Optional[str] = "00012345678",
+    is_included: bool = True,
+    rule_validation_result: Optional[dict] = None,
+) -> SimpleNamespace:
+    return SimpleNamespace(
+        student_id_number=f"A{idx:09d}",
+        student_name=f"學生{idx}",
+        student_email=f"s{idx}@nycu.edu.tw",
+        bank_account=bank_account,
+        scholarship_name="博士班獎學金",
+        scholarship_amount=40000 + idx,
+        permanent_address="300新竹市東區大學路1001號",
+        application_identity="114新申請",
+        allocated_sub_type=allocated_sub_type,
+        allocation_year=allocation_year,
+        is_included=is_included,
+        verification_status="verified" if is_included else "withdrawn",
+        is_eligible=is_included,
+        rule_validation_result=rule_validation_result,
+        exclusion_reason=None if is_included else "學籍驗證未通過：已退學",
+        excel_row_data=None,
+        excel_remarks=None,
+    )
+
+
+def _make_roster() -> SimpleNamespace:
+    return SimpleNamespace(
+        id=None,
+        period_label="2025-H1",
+        roster_code="ROSTER-114-2025-H1-PHD001",
+        academic_year=114,
+        roster_cycle=SimpleNamespace(value="monthly"),
+        trigger_type=SimpleNamespace(value="manual"),
+        started_at=None,
+        completed_at=None,
+        total_applications=3,
+        qualified_count=2,
+        disqualified_count=1,
+        total_amount=120000,
+        student_verification_enabled=True,
+        verification_api_failures=0,
+    )
+
+
+def _mixed_items(count: int) -> list:
+    sub_types = [("nstc", 114), ("nstc", 113), ("moe_1w", 114), (None, None)]
+    items = []
+    for idx in range(count):
+        sub_type, year = sub_types[idx % len(sub_types)]
+        rvr = None
+        if idx % 5 == 0:
+            rvr = {
+                "is_eligible": True,
+                "details": {"rule_9": {"passed": False, "rule_name": "在學狀態", "is_warning": True}},
+            }
+        items.append(
+            _make_item(
+                idx,
+                allocated_sub_type=sub_type,
+                allocation_year=year,
+                bank_account=None if idx % 7 == 0 else "00012345678",
+                is_included=idx % 3 != 0,
+                rule_validation_result=rvr,
+            )
+        )
+    return items
+
+
+def _render(service, tmp_path, name, items, *, streaming: bool, include_header=True, include_statistics=True):
+    roster = _make_roster()
+    rule_columns = service._collect_rule_columns(items)
+    columns = service._build_export_columns(rule_columns)
+    rows, fills = service._prepare_excel_data(roster, items, rule_columns)
+    labels = [service._get_scholarship_sheet_label(item, roster.academic_year) for item in items]
+    out = tmp_path / name
+    kwargs = dict(
+        template_path="/nonexistent.xlsx",
+        columns=columns,
+        include_header=include_header,
+        include_statistics=include_statistics,
+        scholarship_labels=labels,
+    )
+    if streaming:
+        service._create_excel_file_streaming(rows, fills, str(out), roster, **kwargs)
+    else:
+        settings_value = settings.roster_excel_streaming
+        settings.roster_excel_streaming = False
+        try:
+            service._create_excel_file(rows, fills, str(out), roster, **kwargs)
+        finally:
+            settings.roster_excel_streaming = settings_value
+    return out
+
+
+def _snapshot(path) -> dict:
+    """Everything a reader of the roster workbook can observe."""
+    wb = openpyxl.load_workbook(path)
+    sheets = {}
+    for ws in wb.worksheets:
+        cells = {}
+        for row in ws.iter_rows():
+            for cell in row:
+                cells[cell.coordinate] = (
+                    cell.value,
+                    bool(cell.font.b),
+                    cell.fill.fill_type,
+                    str(cell.fill.start_color.rgb) if cell.fill.fill_type else None,
+                    cell.number_format,
+                    cell.border.left.style,
+                    cell.border.bottom.style,
+                    cell.alignment.horizontal,
+                )
+        widths = {key: dim.width for key, dim in ws.column_dimensions.items() if dim.width}
+        sheets[ws.title] = {"cells": cells, "widths": widths, "freeze": ws.freeze_panes}
+    return {"order": wb.sheetnames, "sheets": sheets}
+
+
+@pytest.mark.parametrize("include_header", [True, False])
+@pytest.mark.parametrize("include_statistics", [True, False])
+def test_streaming_output_matches_in_memory_workbook(service, tmp_path, include_header, include_statistics):
+    items = _mixed_items(24)
+    legacy = _render(
+        service,
+        tmp_path,
+        "legacy.xlsx",
+        items,
+        streaming=False,
+        include_header=include_header,
+        include_statistics=include_statistics,
+    )
+    streamed = _render(
+        service,
+        tmp_path,
+        "stream.xlsx",
+        items,
+        streaming=True,
+        include_header=include_header,
+        include_statistics=include_statistics,
+    )
+
+    assert _snapshot(streamed) == _snapshot(legacy)
+
+
+def test_streaming_empty_roster_matches(service, tmp_path):
+    for include_header in (True, False):
+        legacy = _render(service, tmp_path, "l.xlsx", [], streaming=False, include_header=include_header)
+        streamed = _render(service, tmp_path, "s.xlsx", [], streaming=True, include_header=include_header)
+        assert _snapshot(streamed) == _snapshot(legacy)
+
+
+def test_streaming_is_opt_in(service, tmp_path, monkeypatch):
+    """Off by default: the streamed workbook drops a template's extra sheets and layout."""
+    called = []
+    original = ExcelExportService._create_excel_file_streaming
+
+    def spy(self, *args, **kwargs):
+        called.append(True)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(ExcelExportService, "_create_excel_file_streaming", spy)
+    roster = _make_roster()
+
+    def export(name):
+        service._create_excel_file(
+            [],
+            [],
+            str(tmp_path / name),
+            roster,
+            template_path="/nonexistent.xlsx",
+            columns=["序號"],
+            include_header=True,
+            include_statistics=False,
+        )
+
+    assert type(settings).model_fields["roster_excel_streaming"].default is False
+    monkeypatch.setattr(settings, "roster_excel_streaming", False)
+    export("legacy.xlsx")
+    assert called == []
+
+    monkeypatch.setattr(settings, "roster_excel_streaming", True)
+    export("streamed.xlsx")
+    assert called == [True]
+
+
+def test_streaming_rejects_misaligned_labels(service, tmp_path):
+    from app.core.exceptions import FileStorageError
+
+    roster = _make_roster()
+    with pytest.raises(FileStorageError):
+        service._create_excel_file_streaming(
+            [{"序號": 1}],
+            [{}],
+            str(tmp_path / "bad.xlsx"),
+            roster,
+            template_path="/nonexistent.xlsx",
+            columns=["序號"],
+            include_header=True,
+            include_statistics=False,
+            scholarship_labels=[],
+        )
+
+
+def test_template_is_read_once_and_title_reused(service, tmp_path, monkeypatch):
+    template = tmp_path / "tpl.xlsx"
+    wb = openpyxl.Workbook()
+    wb.active.title = "模板清冊"
+    wb.active.append(["序號", "姓名"])
+    wb.save(template)
+
+    loads = []
+    real_load = excel_module.load_workbook
+    monkeypatch.setattr(excel_module, "load_workbook", lambda *a, **k: loads.append(a) or real_load(*a, **k))
+    monkeypatch.setattr(excel_module, "_TEMPLATE_CACHE", {})
+
+    roster = _make_roster()
+    for name in ("a.xlsx", "b.xlsx"):
+        service._create_excel_file_streaming(
+            [{"序號": 1, "姓名": "甲"}],
+            [{}],
+            str(tmp_path / name),
+            roster,
+            template_path=str(template),
+            columns=["序號", "姓名"],
+            include_header=True,
+            include_statistics=False,
+        )
+
+    assert len(loads) == 1
+    assert openpyxl.load_workbook(tmp_path / "b.xlsx").sheetnames == ["模板清冊"]
+
+
+@pytest.mark.slow
+def test_streaming_keeps_the_peak_heap_lower(service, tmp_path):
+    """Peak Python heap (tracemalloc) for both writers on 500 rows.
+
+    Locally the streaming writer peaks at about a tenth of the in-memory
+    one. Wall time is not asserted here — it depends on the runner and on
+    coverage tracing; scripts/bench_roster_excel.py measures it.
+    """
+    items = _mixed_items(500)
+    peaks = {}
+    outputs = {}
+    for label, streaming in (("in_memory", False), ("streaming", True)):
+        tracemalloc.start()
+        try:
+            outputs[label] = _render(service, tmp_path, f"{label}.xlsx", items, streaming=streaming)
+            _, peaks[label] = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    assert peaks["streaming"] < peaks["in_memory"]
+    streamed = openpyxl.load_workbook(outputs["streaming"])
+    legacy = openpyxl.load_workbook(outputs["in_memory"])
+    assert streamed.sheetnames == legacy.sheetnames
+    assert [ws.max_row for ws in streamed.worksheets] == [ws.max_row for ws in legacy.worksheets]
@@ -295,6 +295,7 @@ class TestFetchAndWrite:
 
         fake_response = MagicMock()
         fake_response.read.return_value = b"PDF-BYTES"
+        fake_response.headers = {"ETag": '"0cc175b9c0f1b6a831c399e269772661"'}
         minio = MagicMock()
         minio.get_file_stream.return_value = fake_response
 
@@ -311,9 +312,10 @@ class TestFetchAndWrite:
                 )
             )
 
-        # Pin: success returns (bytes, None) — the bytes are reused for the
-        # merged dynamic-documents PDF without a second MinIO round-trip.
-        assert returned == (b"PDF-BYTES", None)
+        # Pin: success returns (bytes, None, etag) — the bytes are reused for
+        # the merged dynamic-documents PDF without a second MinIO round-trip,
+        # and the unquoted ETag keys its cached derivative.
+        assert returned == (b"PDF-BYTES", None, "0cc175b9c0f1b6a831c399e269772661")
         buf.seek(0)
         with zipfile.ZipFile(buf) as zf:
             assert zf.read("dept/stu/stu_申請文件.pdf") == b"PDF-BYTES"
@@ -346,7 +348,7 @@ class TestFetchAndWrite:
         # Pin: failure returns (None, error message) — the caller renders a
         # download-failure placeholder page in the merged PDF carrying the
         # same concrete reason as the per-file error txt.
-        assert returned == (None, "object missing")
+        assert returned == (None, "object missing", None)
         buf.seek(0)
         with zipfile.ZipFile(buf) as zf:
             names = zf.namelist()
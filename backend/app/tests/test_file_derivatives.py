@@ -0,0 +1,202 @@
+"""Upload-time derivatives (file_derivative_service).
+
+The background pass hashes an upload, stores the normalized merged-PDF page
+under the same key build_merged_pdf looks up, thumbnails images and runs OCR
+when enabled. MinIO and the OCR service are mocked; the DB is the test
+SQLite session.
+"""
+
+import hashlib
+import io
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+from PIL import Image
+from pypdf import PdfWriter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.application import Application, ApplicationFile
+from app.models.enums import ApplicationStatus
+from app.models.scholarship import ScholarshipType, SubTypeSelectionMode
+from app.models.user import User, UserRole, UserType
+from app.services import file_derivative_service as module
+from app.services import pdf_merge
+
+OBJECT_NAME = "applications/1/documents/20261019_abcd1234_scan.jpg"
+
+
+def _jpeg(size=(1200, 800)) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buf, "JPEG")
+    return buf.getvalue()
+
+
+def _pdf() -> bytes:
+    writer = PdfWriter()
+    writer.add_blank_page(width=200, height=200)
+    buf = io.BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
+
+
+@pytest_asyncio.fixture
+async def file_id(db: AsyncSession) -> int:
+    user = User(
+        nycu_id="deriv_s1", name="S1", email="deriv_s1@u.edu", user_type=UserType.student, role=UserRole.student
+    )
+    sch = ScholarshipType(code="deriv", name="deriv", description="x")
+    db.add_all([user, sch])
+    await db.commit()
+    application = Application(
+        app_id="APP-115-0-DV001",
+        user_id=user.id,
+        scholarship_type_id=sch.id,
+        sub_type_selection_mode=SubTypeSelectionMode.single,
+        academic_year=115,
+        status=ApplicationStatus.submitted,
+        agree_terms=True,
+    )
+    db.add(application)
+    await db.commit()
+    record = ApplicationFile(
+        application_id=application.id, filename="scan.jpg", file_type="transcript", object_name=OBJECT_NAME
+    )
+    db.add(record)
+    await db.commit()
+    return record.id
+
+
+@pytest.fixture
+def pipeline(db, monkeypatch):
+    """Point the pipeline at the test session, a fake MinIO and a fake OCR."""
+
+    @asynccontextmanager
+    async def _session():
+        yield db
+        await db.commit()
+
+    storage = {}
+    minio = MagicMock()
+    minio.DERIVATIVE_PREFIX = "derivatives/"
+    minio.put_derivative.side_effect = lambda key, content, content_type: storage.__setitem__(key, content)
+    ocr = MagicMock()
+    ocr.is_enabled = AsyncMock(return_value=False)
+    monkeypatch.setattr(module, "get_db_session", _session)
+    monkeypatch.setattr(module, "minio_service", minio)
+    monkeypatch.setattr(module, "get_ocr_service", lambda db=None: ocr)
+
+    def _serve(content: bytes):
+        response = MagicMock()
+        response.read.return_value = content
+        response.headers = {"ETag": '"etag-1"'}
+        minio.get_file_stream.return_value = response
+
+    return storage, ocr, _serve
+
+
+async def _reload(db: AsyncSession, file_id: int) -> ApplicationFile:
+    record = await db.get(ApplicationFile, file_id)
+    await db.refresh(record)
+    return record
+
+
+@pytest.mark.asyncio
+async def test_image_upload_gets_hash_page_and_thumbnail(db, file_id, pipeline):
+    storage, _, serve = pipeline
+    content = _jpeg()
+    serve(content)
+
+    await module.process_application_file_derivatives(file_id)
+
+    record = await _reload(db, file_id)
+    assert record.content_sha256 == hashlib.sha256(content).hexdigest()
+    page_key = pdf_merge.derivative_key(f"{OBJECT_NAME}@etag-1")
+    assert record.normalized_object_name == f"derivatives/{page_key}"
+    assert storage[page_key].startswith(b"%PDF-")
+    assert record.thumbnail_object_name == f"derivatives/{module.thumbnail_key(OBJECT_NAME)}"
+    thumb = Image.open(io.BytesIO(storage[module.thumbnail_key(OBJECT_NAME)]))
+    assert thumb.format == "JPEG" and max(thumb.size) == 320
+    assert record.processed_at is not None
+    assert not record.ocr_processed
+
+
+@pytest.mark.asyncio
+async def test_export_reuses_the_upload_time_page(db, file_id, pipeline):
+    storage, _, serve = pipeline
+    serve(_jpeg())
+    await module.process_application_file_derivatives(file_id)
+
+    cache = MagicMock()
+    cache.get_derivative.side_effect = storage.get
+    item = pdf_merge.MergeItem(
+        label="x", filename="scan.jpg", content=b"not rendered again", source_key=f"{OBJECT_NAME}@etag-1"
+    )
+
+    assert pdf_merge._render_cached(item, "heading", cache) == storage[pdf_merge.derivative_key(item.source_key)]
+
+
+@pytest.mark.asyncio
+async def test_pdf_upload_has_page_but_no_thumbnail(db, file_id, pipeline):
+    storage, ocr, serve = pipeline
+    ocr.is_enabled.return_value = True
+    serve(_pdf())
+
+    await module.process_application_file_derivatives(file_id)
+
+    record = await _reload(db, file_id)
+    assert record.normalized_object_name is not None
+    assert record.thumbnail_object_name is None
+    # No rasterizer for PDFs, so OCR only runs on image uploads.
+    ocr.extract_general_text_from_image.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_ocr_text_is_stored_when_enabled(db, file_id, pipeline):
+    _, ocr, serve = pipeline
+    ocr.is_enabled.return_value = True
+    ocr.extract_general_text_from_image = AsyncMock(
+        return_value={"success": True, "extracted_text": "學期成績 GPA 3.9", "confidence": 0.934}
+    )
+    serve(_jpeg())
+
+    await module.process_application_file_derivatives(file_id)
+
+    record = await _reload(db, file_id)
+    assert record.ocr_processed is True
+    assert record.ocr_text == "學期成績 GPA 3.9"
+    assert float(record.ocr_confidence) == pytest.approx(0.93)
+
+
+@pytest.mark.asyncio
+async def test_unsupported_upload_only_records_hash(db, file_id, pipeline):
+    storage, _, serve = pipeline
+    serve(b"PK\x03\x04 word document")
+
+    await module.process_application_file_derivatives(file_id)
+
+    record = await _reload(db, file_id)
+    assert record.content_sha256 is not None
+    assert record.normalized_object_name is None and record.thumbnail_object_name is None
+    assert storage == {}
+
+
+@pytest.mark.asyncio
+async def test_storage_failure_fails_open(db, file_id, pipeline):
+    _, _, serve = pipeline
+    serve(_jpeg())
+    module.minio_service.put_derivative.side_effect = ConnectionError("minio down")
+
+    await module.process_application_file_derivatives(file_id)
+
+    record = await _reload(db, file_id)
+    assert record.content_sha256 is not None
+    assert record.normalized_object_name is None and record.thumbnail_object_name is None
+
+
+@pytest.mark.asyncio
+async def test_missing_row_is_a_no_op(db, pipeline):
+    await module.process_application_file_derivatives(987654)
+
+    module.minio_service.get_file_stream.assert_not_called()
@@ -0,0 +1,155 @@
+"""HTTP semantics of the application file proxy (endpoints/files.py).
+
+Range / 206, strong ETags, conditional GETs and the presigned / X-Accel
+hand-off modes. MinIO is a fake serving an in-memory object.
+"""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+
+from app.api.v1.endpoints import files as module
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.models.application import ApplicationFile
+from app.services.minio_service import MinIOService
+
+CONTENT = bytes(range(256)) * 40  # 10240 bytes
+SHA = "d" * 64
+BLOB = MinIOService.blob_object_name(SHA)
+MODIFIED = datetime(2026, 10, 1, 8, 30, tzinfo=timezone.utc)
+
+
+class _FakeObject:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.released = False
+
+    def stream(self, amt):
+        for i in range(0, len(self.data), amt):
+            yield self.data[i : i + amt]
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        self.released = True
+
+
+@pytest.fixture
+def minio(monkeypatch):
+    fake = MagicMock()
+    fake.stat_file.return_value = SimpleNamespace(size=len(CONTENT), etag="minio-etag", last_modified=MODIFIED)
+    fake.get_file_stream.side_effect = lambda name: _FakeObject(CONTENT)
+    fake.get_file_range.side_effect = lambda name, offset, length: _FakeObject(CONTENT[offset : offset + length])
+    fake.get_file_download_url.return_value = "http://minio:9000/scholarship-files/blobs/dd/x?X-Amz-Signature=abc"
+    monkeypatch.setattr(module, "minio_service", fake)
+    return fake
+
+
+@pytest_asyncio.fixture
+async def file_url(db, test_admin, test_application):
+    record = ApplicationFile(application_id=test_application.id, filename="成績單.pdf", object_name=BLOB)
+    db.add(record)
+    await db.commit()
+    token = create_access_token({"sub": str(test_admin.id)})
+    return f"/api/v1/files/applications/{test_application.id}/files/{record.id}?token={token}"
+
+
+def test_parse_range_forms():
+    assert module._parse_range("bytes=0-99", 1000) == (0, 99)
+    assert module._parse_range("bytes=900-", 1000) == (900, 999)
+    assert module._parse_range("bytes=-100", 1000) == (900, 999)
+    assert module._parse_range("bytes=990-5000", 1000) == (990, 999)
+    # Ignored: malformed, multi-range, other units -> full 200
+    for header in (None, "bytes=abc", "bytes=5-1", "bytes=0-1,5-9", "items=0-1", "bytes=-", "bytes=+1-2"):
+        assert module._parse_range(header, 1000) is None
+    with pytest.raises(HTTPException) as exc:
+        module._parse_range("bytes=1000-", 1000)
+    assert exc.value.status_code == 416
+    assert exc.value.headers["Content-Range"] == "bytes */1000"
+
+
+@pytest.mark.asyncio
+async def test_full_response_carries_validators(client, file_url, minio):
+    response = await client.get(file_url)
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["etag"] == f'"{SHA}"'
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-length"] == str(len(CONTENT))
+    assert response.headers["last-modified"] == "Thu, 01 Oct 2026 08:30:00 GMT"
+    assert response.headers["content-type"] == "application/pdf"
+    minio.get_file_range.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_range_request_uses_ranged_get(client, file_url, minio):
+    response = await client.get(file_url, headers={"Range": "bytes=100-199"})
+
+    assert response.status_code == 206
+    assert response.content == CONTENT[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(CONTENT)}"
+    minio.get_file_range.assert_called_once_with(BLOB, 100, 100)
+    minio.get_file_stream.assert_not_called()
+
+    response = await client.get(file_url, headers={"Range": f"bytes={len(CONTENT)}-"})
+    assert response.status_code == 416
+
+
+@pytest.mark.asyncio
+async def test_conditional_requests(client, file_url, minio):
+    response = await client.get(file_url, headers={"If-None-Match": f'W/"{SHA}"'})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    response = await client.get(file_url, headers={"If-Modified-Since": "Thu, 01 Oct 2026 09:00:00 GMT"})
+    assert response.status_code == 304
+    # If-None-Match takes precedence over If-Modified-Since.
+    response = await client.get(
+        file_url, headers={"If-None-Match": '"stale"', "If-Modified-Since": "Thu, 01 Oct 2026 09:00:00 GMT"}
+    )
+    assert response.status_code == 200
+    minio.get_file_stream.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_if_range_mismatch_serves_full_object(client, file_url, minio):
+    response = await client.get(file_url, headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert response.status_code == 200 and response.content == CONTENT
+
+    response = await client.get(file_url, headers={"Range": "bytes=0-9", "If-Range": f'"{SHA}"'})
+    assert response.status_code == 206 and response.content == CONTENT[:10]
+
+
+@pytest.mark.asyncio
+async def test_presigned_mode_redirects(client, file_url, minio, monkeypatch):
+    monkeypatch.setattr(settings, "file_proxy_mode", "presigned")
+
+    response = await client.get(file_url)
+
+    assert response.status_code == 307
+    assert response.headers["location"] == minio.get_file_download_url.return_value
+    assert response.headers["cache-control"] == "no-store"
+    _, _, overrides = minio.get_file_download_url.call_args.args
+    assert overrides["response-content-type"] == "application/pdf"
+    assert overrides["response-content-disposition"].startswith("inline; filename*=UTF-8''")
+    minio.stat_file.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_x_accel_mode_hands_off_to_nginx(client, file_url, minio, monkeypatch):
+    monkeypatch.setattr(settings, "file_proxy_mode", "x-accel")
+
+    response = await client.get(file_url.replace("?token", "/download?token"))
+
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["x-accel-redirect"] == "/protected-files/scholarship-files/blobs/dd/x?X-Amz-Signature=abc"
+    assert response.headers["content-disposition"].startswith("attachment;")
+    minio.get_file_stream.assert_not_called()
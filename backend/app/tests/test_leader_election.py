@@ -0,0 +1,191 @@
+"""Scheduler leader election and per-process pool sizing.
+
+Every API worker / `python -m app.worker` runs a LeaderElector against the
+same Redis key; only the lease holder runs APScheduler. The tests drive
+``_tick()`` directly instead of sleeping through lease intervals.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.schedulers.base import STATE_RUNNING, STATE_STOPPED
+
+from app.core import cache as cache_mod
+from app.core.leader_election import LeaderElector
+from app.db.session import compute_pool_sizes
+from app.models.roster_schedule import RosterScheduleStatus
+from app.services.roster_scheduler_service import JOB_CHANNEL, RosterSchedulerService
+from app.tests.test_cache import FakeAsyncRedis
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = FakeAsyncRedis()
+    monkeypatch.setattr(cache_mod, "get_cache", lambda: fake)
+    return fake
+
+
+def _elector() -> LeaderElector:
+    return LeaderElector("scheduler", AsyncMock(), AsyncMock(), lease_seconds=15, poll_seconds=0.1)
+
+
+@pytest.mark.asyncio
+async def test_only_one_process_becomes_leader(fake_redis):
+    a, b = _elector(), _elector()
+
+    for _ in range(3):
+        await a._tick()
+        await b._tick()
+
+    assert a.is_leader and not b.is_leader
+    a.on_elected.assert_awaited_once()
+    b.on_elected.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_stop_hands_over_to_standby(fake_redis):
+    a, b = _elector(), _elector()
+    await a._tick()
+    await b._tick()
+
+    await a.stop()
+    a.on_demoted.assert_awaited_once()
+    await b._tick()
+
+    assert b.is_leader and not a.is_leader
+    b.on_elected.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_leader_steps_down_when_lease_is_taken_over(fake_redis):
+    a = _elector()
+    await a._tick()
+    # Lease expired while the process was stalled and someone else took it.
+    fake_redis._store[a._key] = (b"other-host:1:abcd", time.time() + 15)
+
+    await a._tick()
+
+    assert not a.is_leader
+    a.on_demoted.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_leader_survives_short_redis_outage_but_not_a_full_lease(fake_redis):
+    a = _elector()
+    await a._tick()
+
+    fake_redis.eval = AsyncMock(side_effect=ConnectionError("redis down"))
+    await a._tick()
+    assert a.is_leader
+
+    # Steps down with a third of the lease left, before anyone else can acquire.
+    a._last_renewed -= a.lease_seconds * 2 / 3
+    await a._tick()
+    assert not a.is_leader
+    a.on_demoted.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_failed_election_callback_releases_lease(fake_redis):
+    a, b = _elector(), _elector()
+    a.on_elected.side_effect = RuntimeError("jobstore unreachable")
+
+    await a._tick()
+    await b._tick()
+
+    assert not a.is_leader
+    assert b.is_leader
+
+
+def _scheduler_service() -> RosterSchedulerService:
+    with patch.object(RosterSchedulerService, "_setup_scheduler"):
+        svc = RosterSchedulerService()
+    svc.scheduler = AsyncIOScheduler()  # in-memory job store
+    svc.load_active_schedules = AsyncMock()
+    svc._listen_for_job_changes = AsyncMock()
+    return svc
+
+
+@pytest.mark.asyncio
+async def test_standby_forwards_job_changes_to_the_leader(monkeypatch):
+    published = []
+
+    class Publisher:
+        async def publish(self, channel, message):
+            published.append((channel, message))
+            return 1
+
+    monkeypatch.setattr(cache_mod, "get_cache", lambda: Publisher())
+    standby, leader = _scheduler_service(), _scheduler_service()
+    await leader.start_scheduler()
+
+    # The standby never starts APScheduler, so it never touches the job store.
+    assert await standby.add_schedule({"id": 5, "cron_expression": "0 2 * * *", "schedule_name": "x"})
+    assert await standby.pause_schedule(5)
+    assert not standby.scheduler.running
+    assert standby.scheduler.get_jobs() == []
+    assert [channel for channel, _ in published] == [JOB_CHANNEL, JOB_CHANNEL]
+
+    for _, message in published:
+        await leader._apply_job_change(json.loads(message))
+    job = leader.scheduler.get_job("roster_schedule_5")
+    assert job is not None and job.next_run_time is None  # added, then paused
+
+    await leader.stop_scheduler()
+
+
+@pytest.mark.asyncio
+async def test_step_down_detaches_and_reelection_restarts():
+    svc = _scheduler_service()
+    await svc.start_scheduler()
+    assert svc.scheduler.state == STATE_RUNNING
+    svc.load_active_schedules.assert_awaited_once()
+
+    await svc.step_down()
+    assert svc.scheduler.state == STATE_STOPPED
+    assert svc._job_listener is None
+
+    await svc.start_scheduler()
+    assert svc.scheduler.state == STATE_RUNNING
+    await svc.stop_scheduler()
+
+
+@pytest.mark.asyncio
+async def test_reconcile_drops_jobs_of_deleted_and_paused_schedules():
+    svc = _scheduler_service()
+    await svc.start_scheduler()
+    for schedule_id in (1, 2, 3):
+        await svc._add_schedule_job({"id": schedule_id, "cron_expression": "0 2 * * *"})
+
+    svc._reconcile_jobs({1: RosterScheduleStatus.ACTIVE, 2: RosterScheduleStatus.PAUSED})
+
+    assert svc.scheduler.get_job("roster_schedule_1").next_run_time is not None
+    assert svc.scheduler.get_job("roster_schedule_2").next_run_time is None
+    assert svc.scheduler.get_job("roster_schedule_3") is None
+    await svc.stop_scheduler()
+
+
+@pytest.mark.parametrize(
+    "budget,processes,expected",
+    [
+        (0, 4, {"async": (10, 20), "sync": (10, 20)}),
+        (90, 1, {"async": (30, 30), "sync": (15, 15)}),
+        (90, 3, {"async": (10, 10), "sync": (5, 5)}),
+        (3, 4, {"async": (1, 0), "sync": (1, 0)}),
+    ],
+)
+def test_compute_pool_sizes(budget, processes, expected):
+    assert compute_pool_sizes(budget, processes) == expected
+
+
+def test_pool_sizes_stay_within_budget():
+    for budget in (20, 50, 97, 200):
+        for processes in (1, 2, 4, 8):
+            sizes = compute_pool_sizes(budget, processes)
+            per_process = sum(pool + overflow for pool, overflow in sizes.values())
+            assert per_process * processes <= budget
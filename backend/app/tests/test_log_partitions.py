@@ -0,0 +1,152 @@
+"""Monthly partitions of audit_logs / email_history and estimated listing counts.
+
+The partition DDL only runs on PostgreSQL; these tests drive it through a
+recording session that answers the catalog queries, and check that the
+SQLite path (the tables are plain there) stays a no-op with exact counts.
+"""
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.endpoints.admin.audit_logs import list_audit_logs
+from app.core.config import settings
+from app.models.audit_log import AuditLog
+from app.models.user import User
+from app.services import log_partitions
+from app.services.log_partitions import (
+    add_months,
+    count_rows,
+    drop_expired_partitions,
+    ensure_partitions,
+    partition_name,
+)
+
+
+class _Result:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+    def scalars(self):
+        return SimpleNamespace(all=lambda: list(self.value))
+
+
+class _RecordingSession:
+    """Answers the catalog queries log_partitions issues and records everything else."""
+
+    def __init__(self, partitions=None, stray_months=(), estimate=0, exact=0):
+        self.partitions = partitions
+        self.stray_months = set(stray_months)
+        self.estimate = estimate
+        self.exact = exact
+        self.statements = []
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        if "pg_partitioned_table" in sql:
+            return _Result(None if self.partitions is None else 1)
+        if "SELECT c.relname" in sql:
+            return _Result(self.partitions)
+        if "reltuples" in sql:
+            return _Result(self.estimate)
+        if sql.startswith("SELECT EXISTS"):
+            return _Result(any(f"'{month}-01 00:00:00+00' AND" in sql for month in self.stray_months))
+        if sql.startswith("SELECT count"):
+            self.statements.append("count(*)")
+            return _Result(self.exact)
+        self.statements.append(sql)
+        return _Result(None)
+
+
+def test_month_arithmetic():
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert partition_name("audit_logs", date(2026, 3, 1)) == "audit_logs_p202603"
+
+
+@pytest.mark.asyncio
+async def test_ensure_partitions_premakes_missing_months():
+    db = _RecordingSession(partitions=["audit_logs_p202610", "audit_logs_default"], stray_months=["2026-12"])
+
+    created = await ensure_partitions(db, "audit_logs", months_ahead=2, today=date(2026, 10, 19))
+
+    assert created == ["audit_logs_p202611", "audit_logs_p202612"]
+    assert db.statements[0] == (
+        "CREATE TABLE audit_logs_p202611 PARTITION OF audit_logs "
+        "FOR VALUES FROM ('2026-11-01 00:00:00+00') TO ('2026-12-01 00:00:00+00')"
+    )
+    # December already has rows in the default partition: they move before the attach.
+    moved = db.statements[1:]
+    assert moved[0] == "SET LOCAL app.audit_purge = 'allowed'"
+    assert "DELETE FROM audit_logs_default WHERE created_at >= '2026-12-01 00:00:00+00'" in moved[2]
+    assert moved[3].startswith("ALTER TABLE audit_logs ATTACH PARTITION audit_logs_p202612")
+
+
+@pytest.mark.asyncio
+async def test_drop_expired_partitions_keeps_retention_and_default():
+    db = _RecordingSession(
+        partitions=["email_history_p202603", "email_history_p202604", "email_history_p202601", "email_history_default"]
+    )
+
+    dropped = await drop_expired_partitions(db, "email_history", retention_months=6, today=date(2026, 10, 19))
+
+    assert dropped == ["email_history_p202601", "email_history_p202603"]
+    assert db.statements == ["DROP TABLE email_history_p202601", "DROP TABLE email_history_p202603"]
+
+
+@pytest.mark.asyncio
+async def test_maintenance_is_a_noop_without_partitioning_or_retention():
+    db = _RecordingSession(partitions=None)
+    assert await ensure_partitions(db, "audit_logs", months_ahead=3) == []
+
+    db = _RecordingSession(partitions=["audit_logs_p200001"])
+    assert await drop_expired_partitions(db, "audit_logs", retention_months=None) == []
+    assert db.statements == []
+
+
+@pytest.mark.asyncio
+async def test_count_rows_uses_the_estimate_only_for_large_tables(monkeypatch):
+    monkeypatch.setattr(settings, "estimated_count_min_rows", 1000)
+    exact = select(func.count()).select_from(AuditLog)
+
+    db = _RecordingSession(partitions=[], estimate=250000, exact=250123)
+    assert await count_rows(db, "audit_logs", exact) == 250000
+    assert db.statements == []
+
+    db = _RecordingSession(partitions=[], estimate=12, exact=14)
+    assert await count_rows(db, "audit_logs", exact) == 14
+    assert db.statements == ["count(*)"]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_is_plain_tables(db: AsyncSession, test_admin: User, monkeypatch):
+    monkeypatch.setattr(settings, "estimated_count_min_rows", 0)
+    assert await ensure_partitions(db, "audit_logs", months_ahead=3) == []
+    assert await log_partitions.estimated_row_count(db, "audit_logs") is None
+
+    db.add_all(
+        [
+            AuditLog(user_id=test_admin.id, action="delete", resource_type="application", description="刪除申請 A"),
+            AuditLog(user_id=test_admin.id, action="update", resource_type="application", description="更新申請 B"),
+        ]
+    )
+    await db.commit()
+
+    query = dict(
+        page=1, size=1, resource_type=None, resource_id=None, action=None, user_id=None, date_from=None, date_to=None
+    )
+    unfiltered = await list_audit_logs(search=None, current_user=test_admin, db=db, **query)
+    searched = await list_audit_logs(search="刪除", current_user=test_admin, db=db, **query)
+
+    assert (unfiltered["data"]["total"], unfiltered["data"]["pages"]) == (2, 2)
+    assert searched["data"]["total"] == 1
+    assert searched["data"]["items"][0]["description"] == "刪除申請 A"
@@ -1,3 +1,4 @@
+import hashlib
 from types import SimpleNamespace
 from unittest.mock import MagicMock
 
@@ -17,6 +18,7 @@ BASE_CONFIG = dict(
     minio_secure=False,
     minio_bucket="test-bucket",
     roster_minio_bucket="test-roster-bucket",
+    minio_upload_part_size=5 * 1024 * 1024,
     testing=True,
 )
 
@@ -33,13 +35,27 @@ def _build_upload_file(filename: str, content: bytes, content_type: str = "appli
             self.filename = filename
             self._content = content
             self.content_type = content_type
+            self.reads = 0
 
-        async def read(self):
-            return self._content
+        async def read(self, size: int = -1):
+            self.reads += 1
+            chunk = self._content if size < 0 else self._content[:size]
+            self._content = self._content[len(chunk) :]
+            return chunk
 
     return FakeUploadFile()
 
 
+def _no_such_key() -> S3Error:
+    return S3Error(
+        response=None, code="NoSuchKey", message="msg", resource="resource", request_id="req", host_id="host"
+    )
+
+
+def _raise(exc: Exception):
+    raise exc
+
+
 @pytest.fixture
 def minio_service(monkeypatch):
     # Mock the settings first
@@ -50,6 +66,8 @@ def minio_service(monkeypatch):
 
     # Since client is now a property, we need to mock it differently
     mock_client = MagicMock()
+    # Empty bucket: every content-addressed blob is new unless a test says so.
+    mock_client.stat_object.side_effect = lambda *args, **kwargs: _raise(_no_such_key())
     service._client = mock_client
 
     return service
@@ -64,8 +82,8 @@ async def test_upload_file_success(minio_service, monkeypatch):
 
     object_name, size = await MinIOService.upload_file(minio_service, upload, application_id=1, file_type="doc")
 
-    assert object_name.startswith("applications/1/documents/")
-    assert object_name.endswith(".pdf")
+    assert object_name == MinIOService.blob_object_name(hashlib.sha256(b"fake-bytes").hexdigest())
+    assert object_name.startswith("blobs/")
     assert size == len(b"fake-bytes")
     minio_service.client.put_object.assert_called_once()
 
@@ -83,6 +101,55 @@ async def test_upload_file_rejects_large_file(minio_service, monkeypatch):
     minio_service.client.put_object.assert_not_called()
 
 
+@pytest.mark.asyncio
+async def test_upload_file_streams_chunks_with_hash(minio_service, monkeypatch):
+    """Uploads are read in chunks into a spool (rolling over to disk), hashed
+    on the fly, and handed to put_object with a part size for multipart."""
+    monkeypatch.setattr("app.services.minio_service.settings", _make_settings(max_file_size=10 * 1024 * 1024))
+    content = bytes(range(256)) * 12_000  # ~3MB: several chunks, past the in-memory spool
+    upload = _build_upload_file("transcript.pdf", content)
+    uploaded = {}
+    minio_service.client.put_object.side_effect = lambda **kwargs: uploaded.update(kwargs, body=kwargs["data"].read())
+
+    _, size = await MinIOService.upload_file(minio_service, upload, application_id=1, file_type="doc")
+
+    assert size == len(content)
+    assert upload.reads > 2
+    assert uploaded["body"] == content
+    assert uploaded["length"] == len(content)
+    assert uploaded["part_size"] == 5 * 1024 * 1024
+    assert uploaded["metadata"] == {"file-hash": hashlib.sha256(content).hexdigest()}
+
+
+@pytest.mark.asyncio
+async def test_oversized_upload_stops_reading_at_the_limit(minio_service, monkeypatch):
+    monkeypatch.setattr("app.services.minio_service.settings", _make_settings(max_file_size=1024 * 1024))
+    upload = _build_upload_file("large.pdf", b"x" * (20 * 1024 * 1024))
+
+    with pytest.raises(HTTPException) as exc:
+        await MinIOService.upload_file(minio_service, upload, application_id=1, file_type="doc")
+
+    assert exc.value.status_code == 413
+    assert upload.reads == 2  # the first chunk fits, the second crosses the limit
+    minio_service.client.put_object.assert_not_called()
+
+
+def test_roster_upload_from_path_streams_the_file(minio_service, monkeypatch, tmp_path):
+    monkeypatch.setattr("app.services.minio_service.settings", _make_settings())
+    path = tmp_path / "roster.xlsx"
+    path.write_bytes(b"roster-bytes" * 1000)
+    uploaded = {}
+    minio_service.client.put_object.side_effect = lambda **kwargs: uploaded.update(kwargs, body=kwargs["data"].read())
+
+    result = minio_service.upload_roster_file_from_path(str(path), roster_id=9, metadata={"task_id": "t1"})
+
+    assert result["object_name"].endswith("/9/roster.xlsx")
+    assert result["file_hash"] == hashlib.sha256(path.read_bytes()).hexdigest()
+    assert uploaded["body"] == path.read_bytes() and uploaded["bucket_name"] == "test-roster-bucket"
+    assert uploaded["metadata"]["file-hash"] == result["file_hash"]
+    assert uploaded["metadata"]["task_id"] == "t1"
+
+
 @pytest.mark.asyncio
 async def test_upload_file_invalid_extension(minio_service, monkeypatch):
     monkeypatch.setattr("app.services.minio_service.settings", _make_settings(allowed_file_types_list=["pdf"]))
@@ -114,8 +181,8 @@ async def test_upload_file_double_extension_bypass_blocked(minio_service, monkey
 @pytest.mark.asyncio
 async def test_upload_file_chinese_filename_keeps_extension(minio_service, monkeypatch):
     """A fully non-ASCII filename (勞保加保證明.pdf) must pass extension
-    validation and keep .pdf on the stored object name — sanitizing before
-    the extension check used to strip it to "pdf" and 415 the upload."""
+    validation — sanitizing before the extension check used to strip it to
+    "pdf" and 415 the upload."""
     monkeypatch.setattr("app.services.minio_service.settings", _make_settings())
 
     upload = _build_upload_file("勞保加保證明.pdf", b"data")
@@ -123,8 +190,7 @@ async def test_upload_file_chinese_filename_keeps_extension(minio_service, monke
 
     object_name, size = await MinIOService.upload_file(minio_service, upload, application_id=1, file_type="doc")
 
-    assert object_name.startswith("applications/1/documents/")
-    assert object_name.endswith("unnamed_file.pdf")
+    assert object_name == MinIOService.blob_object_name(hashlib.sha256(b"data").hexdigest())
     assert size == len(b"data")
     minio_service.client.put_object.assert_called_once()
 
@@ -141,7 +207,8 @@ async def test_upload_file_trailing_space_in_filename_accepted(minio_service, mo
 
     object_name, _ = await MinIOService.upload_file(minio_service, upload, application_id=1, file_type="doc")
 
-    assert object_name.endswith("report.pdf")
+    assert object_name.startswith("blobs/")
+    minio_service.client.put_object.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -161,6 +228,76 @@ async def test_upload_file_object_names_unique_within_same_second(minio_service,
     assert name1 != name2
 
 
+@pytest.mark.asyncio
+async def test_identical_content_is_stored_once(minio_service, monkeypatch):
+    monkeypatch.setattr("app.services.minio_service.settings", _make_settings())
+    name1, _ = await MinIOService.upload_file(
+        minio_service, _build_upload_file("a.pdf", b"same"), application_id=1, file_type="doc"
+    )
+    minio_service.client.stat_object.side_effect = None  # now it exists
+
+    name2, _ = await MinIOService.upload_file(
+        minio_service, _build_upload_file("b.pdf", b"same"), application_id=2, file_type="transcript"
+    )
+
+    assert name1 == name2
+    minio_service.client.put_object.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_upload_reserves_the_blob_before_the_dedupe_check(minio_service, monkeypatch):
+    monkeypatch.setattr("app.services.minio_service.settings", _make_settings())
+    calls = []
+
+    async def _reserve(object_name, size):
+        calls.append(("reserve", object_name, size))
+
+    minio_service.client.stat_object.side_effect = lambda *args, **kwargs: calls.append(("stat", args[1]))
+
+    name, _ = await MinIOService.upload_file(
+        minio_service, _build_upload_file("a.pdf", b"same"), application_id=1, file_type="doc", reserve=_reserve
+    )
+
+    assert calls == [("reserve", name, 4), ("stat", name)]
+    minio_service.client.put_object.assert_not_called()
+
+
+def test_adopt_blob_uses_stored_hash_and_copies_once(minio_service):
+    sha = hashlib.sha256(b"passbook").hexdigest()
+    source_stat = SimpleNamespace(metadata={"x-amz-meta-file-hash": sha}, size=8)
+    minio_service.client.stat_object.side_effect = [
+        source_stat,
+        _no_such_key(),
+        source_stat,
+        SimpleNamespace(),
+    ]
+
+    source = "user-profiles/1/bank-documents/x.jpg"
+    adopted = []
+    for _ in range(2):
+        assert minio_service.source_digest(source) == (sha, 8)
+        adopted.append(minio_service.adopt_blob(source, sha))
+
+    assert adopted == [MinIOService.blob_object_name(sha)] * 2
+    minio_service.client.get_object.assert_not_called()
+    minio_service.client.copy_object.assert_called_once()
+    source = minio_service.client.copy_object.call_args.kwargs["source"]
+    assert source.object_name == "user-profiles/1/bank-documents/x.jpg"
+
+
+def test_adopt_blob_hashes_legacy_objects_without_metadata(minio_service):
+    response = MagicMock()
+    response.stream.return_value = [b"pass", b"book"]
+    minio_service.client.get_object.side_effect = None
+    minio_service.client.get_object.return_value = response
+    minio_service.client.stat_object.side_effect = [SimpleNamespace(metadata={}, size=8)]
+
+    sha, size = minio_service.source_digest("user-profiles/1/bank-documents/legacy.jpg")
+
+    assert (sha, size) == (hashlib.sha256(b"passbook").hexdigest(), 8)
+    response.release_conn.assert_called_once()
+
+
 @pytest.mark.asyncio
 async def test_upload_file_no_extension_rejected(minio_service, monkeypatch):
     """A filename without any extension must still be rejected."""
@@ -207,6 +344,48 @@ def test_get_file_stream_not_found(minio_service):
     assert exc.value.status_code == 404
 
 
+def test_derivatives_live_under_their_own_prefix(minio_service):
+    minio_service.client.get_object.return_value.read.return_value = b"%PDF-cached"
+
+    assert minio_service.get_derivative("merge-page/v1/a.pdf@e1.pdf") == b"%PDF-cached"
+    minio_service.client.get_object.assert_called_once_with("test-bucket", "derivatives/merge-page/v1/a.pdf@e1.pdf")
+
+    minio_service.put_derivative("merge-page/v1/a.pdf@e1.pdf", b"%PDF-new", "application/pdf")
+    args, kwargs = minio_service.client.put_object.call_args
+    assert args[:2] == ("test-bucket", "derivatives/merge-page/v1/a.pdf@e1.pdf")
+    assert kwargs["length"] == len(b"%PDF-new")
+
+
+def test_missing_derivative_is_a_cache_miss(minio_service):
+    minio_service.client.get_object.side_effect = S3Error(
+        "NoSuchKey", "msg", "resource", "request_id", "host_id", "response"
+    )
+
+    assert minio_service.get_derivative("merge-page/v1/missing.pdf") is None
+
+
+def test_delete_derivatives_removes_everything_under_the_source(minio_service):
+    minio_service.client.list_objects.return_value = [
+        SimpleNamespace(object_name="derivatives/blobs/ab/abc/merge-page/v1/150dpi-q80/e1.pdf"),
+        SimpleNamespace(object_name="derivatives/blobs/ab/abc/thumb/v1/256px.jpg"),
+    ]
+
+    assert minio_service.delete_derivatives("blobs/ab/abc") == 2
+    minio_service.client.list_objects.assert_called_once_with(
+        "test-bucket", prefix="derivatives/blobs/ab/abc/", recursive=True
+    )
+    assert [c.args for c in minio_service.client.remove_object.call_args_list] == [
+        ("test-bucket", "derivatives/blobs/ab/abc/merge-page/v1/150dpi-q80/e1.pdf"),
+        ("test-bucket", "derivatives/blobs/ab/abc/thumb/v1/256px.jpg"),
+    ]
+
+
+def test_delete_derivatives_never_raises(minio_service):
+    minio_service.client.list_objects.side_effect = ConnectionError("minio down")
+
+    assert minio_service.delete_derivatives("blobs/ab/abc") == 0
+
+
 def test_delete_file_success(minio_service):
     assert minio_service.delete_file("file") is True
     minio_service.client.remove_object.assert_called_once_with("test-bucket", "file")
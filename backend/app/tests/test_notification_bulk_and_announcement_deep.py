@@ -3,8 +3,8 @@ Deep async-DB tests for NotificationService.markAllNotificationsAsRead +
 createSystemAnnouncement.
 
 Two related methods extending the unread/read coverage in #248:
-- markAllNotificationsAsRead bulk-flips personal `is_read` AND creates
-  NotificationRead rows for unread system announcements.
+- markAllNotificationsAsRead bulk-flips personal `is_read` AND advances the
+  user's read watermark past every current system announcement.
 - createSystemAnnouncement persists a Notification with user_id=NULL
   (the marker for system-wide visibility).
 
@@ -12,10 +12,11 @@ Contract pinned (5 cases):
 - createSystemAnnouncement: row persisted with user_id=NULL,
   related_resource_type='system', and meta_data round-trips.
 - markAllNotificationsAsRead: personal notifications flip is_read.
-- markAllNotificationsAsRead: unread system announcements get a
-  NotificationRead row for the user.
-- markAllNotificationsAsRead: expired system announcements are NOT
-  marked read (the expires_at filter).
+- markAllNotificationsAsRead: system announcements are covered by a
+  watermark row instead of one NotificationRead row each; announcements
+  created afterwards stay unread.
+- markAllNotificationsAsRead: expired system announcements are not
+  counted in the return value (the expires_at filter).
 - markAllNotificationsAsRead: total return value = personal + system count.
 """
 
@@ -25,7 +26,13 @@ import pytest
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.notification import Notification, NotificationPriority, NotificationRead, NotificationType
+from app.models.notification import (
+    Notification,
+    NotificationPriority,
+    NotificationRead,
+    NotificationReadWatermark,
+    NotificationType,
+)
 from app.models.user import User, UserRole, UserType
 from app.services.notification_service import NotificationService
 
@@ -128,36 +135,39 @@ async def test_mark_all_flips_personal_is_read(db: AsyncSession):
 
 
 @pytest.mark.asyncio
-async def test_mark_all_creates_notification_read_rows_for_system_announcements(db: AsyncSession):
+async def test_mark_all_advances_the_announcement_watermark(db: AsyncSession):
     user = await _seed_user(db, nycu_id="bulk_user_sys")
-    sys_a = await _seed_system(db, title="sys_a")
+    await _seed_system(db, title="sys_a")
     sys_b = await _seed_system(db, title="sys_b")
 
     service = NotificationService(db)
     await service.markAllNotificationsAsRead(user.id)
 
+    watermark = await db.get(NotificationReadWatermark, user.id)
+    assert watermark.last_announcement_id == sys_b.id
     rows = (await db.execute(select(NotificationRead).where(NotificationRead.user_id == user.id))).scalars().all()
-    notif_ids = {r.notification_id for r in rows}
-    assert sys_a.id in notif_ids
-    assert sys_b.id in notif_ids
+    assert rows == []
+    listed = await service.getUserNotifications(user.id)
+    assert [n["is_read"] for n in listed] == [True, True]
+    assert await service.getUnreadNotificationCount(user.id) == 0
+
+    # Announcements published afterwards are above the watermark.
+    sys_c = await _seed_system(db, title="sys_c")
+    assert await service.getUnreadNotificationCount(user.id) == 1
+    unread = await service.getUserNotifications(user.id, unread_only=True)
+    assert [n["id"] for n in unread] == [sys_c.id]
 
 
 @pytest.mark.asyncio
 async def test_mark_all_skips_expired_system_announcements(db: AsyncSession):
-    """Expired announcements shouldn't be marked read — they're already filtered out of the unread view."""
+    """Expired announcements shouldn't be counted — they're already filtered out of the unread view."""
     user = await _seed_user(db, nycu_id="bulk_user_expired")
     past = datetime.now(timezone.utc) - timedelta(days=1)
-    expired_sys = await _seed_system(db, title="expired_sys", expires_at=past)
-    fresh_sys = await _seed_system(db, title="fresh_sys")
+    await _seed_system(db, title="expired_sys", expires_at=past)
+    await _seed_system(db, title="fresh_sys")
 
     service = NotificationService(db)
-    await service.markAllNotificationsAsRead(user.id)
-
-    rows = (await db.execute(select(NotificationRead).where(NotificationRead.user_id == user.id))).scalars().all()
-    notif_ids = {r.notification_id for r in rows}
-    # Fresh announcement marked read; expired skipped.
-    assert fresh_sys.id in notif_ids
-    assert expired_sys.id not in notif_ids
+    assert await service.markAllNotificationsAsRead(user.id) == 1
 
 
 @pytest.mark.asyncio
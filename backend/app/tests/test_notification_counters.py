@@ -0,0 +1,328 @@
+"""Maintained unread-notification counters and the SSE push stream.
+
+The counter (app.services.notification_counter) is one Redis integer per
+user. NotificationService keeps it current on create / read / dismiss,
+announcement changes drop every counter, and each change is published for
+the per-worker broker that feeds ``GET /notifications/stream``. Redis is an
+in-memory fake that runs the adjust script in Python.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import cache as cache_mod
+from app.core.config import settings
+from app.services import notification_counter
+from app.services.notification_service import NotificationService
+from app.tests.test_notification_bulk_and_announcement_deep import _seed_user
+
+
+class _FakePubSub:
+    def __init__(self, redis: "FakeCounterRedis") -> None:
+        self.redis = redis
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, channel: bytes) -> None:
+        if self.redis.pubsub_broken:
+            raise ConnectionError("redis down")
+        self.redis.subscribers.append(self.queue)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def aclose(self) -> None:
+        if self.queue in self.redis.subscribers:
+            self.redis.subscribers.remove(self.queue)
+
+
+class FakeCounterRedis:
+    """get/mget/set/delete/scan, the counter scripts, and publish/subscribe."""
+
+    def __init__(self) -> None:
+        self.store: dict[bytes, bytes] = {}
+        self.ttl: dict[bytes, int] = {}
+        self.published: list = []
+        self.subscribers: list[asyncio.Queue] = []
+        self.pubsub_broken = False
+
+    async def get(self, key: bytes):
+        return self.store.get(key)
+
+    async def mget(self, *keys: bytes):
+        return [self.store.get(key) for key in keys]
+
+    async def set(self, key: bytes, value, ex=None, **_):
+        self.store[key] = str(value).encode("utf-8")
+        self.ttl[key] = ex
+        return True
+
+    async def delete(self, *keys: bytes):
+        return sum(1 for k in keys if self.store.pop(k, None) is not None)
+
+    async def scan(self, cursor: int = 0, match: bytes = b"*", count: int = 100):
+        prefix = match[:-1] if match.endswith(b"*") else match
+        return 0, [k for k in self.store if k.startswith(prefix)]
+
+    def _bump(self, key: bytes) -> None:
+        self.store[key] = str(int(self.store.get(key, 0)) + 1).encode("utf-8")
+
+    async def eval(self, script: str, numkeys: int, *keys_and_args):
+        keys, args = keys_and_args[:numkeys], keys_and_args[numkeys:]
+        if script == notification_counter._STORE_LUA:
+            counter, user_gen, all_gen = keys
+            seen = f"{self.store.get(user_gen, b'').decode()}:{self.store.get(all_gen, b'').decode()}"
+            if seen != args[2] or counter in self.store:
+                return 0
+            await self.set(counter, args[0], ex=args[1])
+            return 1
+        if script == notification_counter._DROP_LUA:
+            split = len(keys) - int(args[0])
+            await self.delete(*keys[:split])
+            for key in keys[split:]:
+                self._bump(key)
+            return split
+        assert script == notification_counter._ADJUST_LUA
+        half = len(keys) // 2
+        delta = int(args[0])
+        out = []
+        for key, gen in zip(keys[:half], keys[half:]):
+            self._bump(gen)
+            if key not in self.store:
+                out.append(-1)
+                continue
+            n = int(self.store[key]) + delta
+            if n < 0:
+                del self.store[key]
+                n = -1
+            else:
+                self.store[key] = str(n).encode("utf-8")
+            out.append(n)
+        return out
+
+    async def publish(self, channel: bytes, message: bytes):
+        self.published.append(notification_counter._decode(message))
+        for queue in self.subscribers:
+            queue.put_nowait({"type": "message", "channel": channel, "data": message})
+        return len(self.subscribers)
+
+    def pubsub(self) -> _FakePubSub:
+        return _FakePubSub(self)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = FakeCounterRedis()
+    monkeypatch.setattr(cache_mod, "get_cache", lambda: fake)
+    return fake
+
+
+def _cached(fake: FakeCounterRedis, user_id: int):
+    value = fake.store.get(notification_counter._key(user_id))
+    return None if value is None else int(value)
+
+
+@pytest.mark.asyncio
+async def test_counter_follows_create_read_and_dismiss(db, fake_redis):
+    user = await _seed_user(db, nycu_id="counter_personal")
+    service = NotificationService(db)
+    first = await service.createUserNotification(user_id=user.id, title="a", message="a")
+    assert _cached(fake_redis, user.id) is None  # nothing to adjust yet
+
+    assert await service.getUnreadNotificationCount(user.id) == 1
+    assert _cached(fake_redis, user.id) == 1
+
+    second = await service.createUserNotification(user_id=user.id, title="b", message="b")
+    await service.createUserNotification(user_id=user.id, title="c", message="c")
+    assert _cached(fake_redis, user.id) == 3
+
+    await service.markNotificationAsRead(first.id, user.id)
+    await service.markNotificationAsRead(first.id, user.id)  # already read: no second decrement
+    assert _cached(fake_redis, user.id) == 2
+
+    assert await service.dismissNotification(second.id, user.id) is True
+    assert _cached(fake_redis, user.id) == 1
+    assert fake_redis.published[-1] == {user.id: 1}
+    assert await service.getUnreadNotificationCount(user.id) == 1
+
+    # The maintained value matches a fresh count from the database.
+    await fake_redis.delete(notification_counter._key(user.id))
+    assert await service.getUnreadNotificationCount(user.id) == 1
+
+
+@pytest.mark.asyncio
+async def test_announcements_drop_every_counter(db, fake_redis):
+    alice = await _seed_user(db, nycu_id="counter_alice")
+    bob = await _seed_user(db, nycu_id="counter_bob")
+    service = NotificationService(db)
+    assert await service.getUnreadNotificationCount(alice.id) == 0
+    assert await service.getUnreadNotificationCount(bob.id) == 0
+
+    announcement = await service.createSystemAnnouncement(title="維護", message="維護")
+
+    assert _cached(fake_redis, alice.id) is None and _cached(fake_redis, bob.id) is None
+    assert fake_redis.published[-1] is None
+    assert await service.getUnreadNotificationCount(alice.id) == 1
+    await service.markNotificationAsRead(announcement.id, alice.id)
+    assert _cached(fake_redis, alice.id) == 0
+    assert await service.getUnreadNotificationCount(bob.id) == 1
+
+    await service.markAllNotificationsAsRead(bob.id)
+    assert fake_redis.published[-1] == {bob.id: 0}
+    assert await service.getUnreadNotificationCount(bob.id) == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_notify_adjusts_only_cached_counters(db, fake_redis):
+    alice = await _seed_user(db, nycu_id="counter_bulk_a")
+    bob = await _seed_user(db, nycu_id="counter_bulk_b")
+    service = NotificationService(db)
+    await service.getUnreadNotificationCount(alice.id)
+
+    await service.bulkNotifyUsers([alice.id, bob.id], title="t", message="m")
+
+    assert _cached(fake_redis, alice.id) == 1
+    assert _cached(fake_redis, bob.id) is None
+    assert fake_redis.published[-1] == {alice.id: 1, bob.id: None}
+
+
+@pytest.mark.asyncio
+async def test_a_recount_never_stores_over_a_concurrent_write(db, fake_redis):
+    user = await _seed_user(db, nycu_id="counter_race")
+    service = NotificationService(db)
+
+    # The reader misses and counts 0 ...
+    cached, generation = await notification_counter.get(user.id)
+    assert cached is None
+    # ... a notification commits meanwhile; its adjust finds no counter ...
+    await service.createUserNotification(user_id=user.id, title="t", message="m")
+    # ... and the reader's stale count is not stored.
+    await notification_counter.store(user.id, 0, generation)
+    assert _cached(fake_redis, user.id) is None
+
+    # Announcements bump the global generation the same way.
+    cached, generation = await notification_counter.get(user.id)
+    await service.createSystemAnnouncement(title="公告", message="公告")
+    await notification_counter.store(user.id, 1, generation)
+    assert _cached(fake_redis, user.id) is None
+
+    assert await service.getUnreadNotificationCount(user.id) == 2
+    assert _cached(fake_redis, user.id) == 2
+
+
+@pytest.mark.asyncio
+async def test_counter_ttl_stops_at_the_next_expiry(db, fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "notification_unread_counter_ttl_seconds", 3600)
+    user = await _seed_user(db, nycu_id="counter_ttl")
+    service = NotificationService(db)
+    soon = datetime.now(timezone.utc) + timedelta(seconds=90)
+    await service.createUserNotification(user_id=user.id, title="t", message="m", expires_at=soon)
+
+    assert await service.getUnreadNotificationCount(user.id) == 1
+    assert 0 < fake_redis.ttl[notification_counter._key(user.id)] <= 90
+
+
+@pytest.mark.asyncio
+async def test_counts_fall_back_to_the_database_when_redis_is_down(db, monkeypatch):
+    def _down():
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(cache_mod, "get_cache", _down)
+    user = await _seed_user(db, nycu_id="counter_down")
+    service = NotificationService(db)
+    await service.createUserNotification(user_id=user.id, title="t", message="m")
+
+    assert await service.getUnreadNotificationCount(user.id) == 1
+
+
+async def _next_event(stream) -> bytes:
+    while True:
+        chunk = await asyncio.wait_for(stream.__anext__(), timeout=2)
+        if not chunk.startswith(b":"):
+            return chunk
+
+
+async def _wait_for(predicate) -> None:
+    for _ in range(200):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+@pytest.mark.asyncio
+async def test_stream_pushes_count_changes(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "notification_stream_keepalive_seconds", 0.05)
+    monkeypatch.setattr(notification_counter, "_RESYNC_SPREAD_SECONDS", 0)
+    reads = iter([2, 5])
+
+    async def read_count():
+        return next(reads)
+
+    stream = notification_counter.unread_count_stream(7, read_count)
+    first = await stream.__anext__()
+    assert first == b'retry: 50\nevent: unread_count\ndata: {"count": 2}\n\n'
+    await _wait_for(lambda: notification_counter.broker.connected)
+
+    await notification_counter.publish({7: 3, 8: 1})
+    assert await _next_event(stream) == b'event: unread_count\ndata: {"count": 3}\n\n'
+    assert await asyncio.wait_for(stream.__anext__(), timeout=2) == b": keepalive\n\n"
+
+    await notification_counter.publish(None)  # announcement change: re-read
+    assert await _next_event(stream) == b'event: unread_count\ndata: {"count": 5}\n\n'
+
+    await stream.aclose()
+    assert notification_counter.broker._listener is None
+    await _wait_for(lambda: fake_redis.subscribers == [])  # listener closed its pub/sub
+
+
+@pytest.mark.asyncio
+async def test_stream_polls_while_pubsub_is_unavailable(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "notification_stream_keepalive_seconds", 0.05)
+    fake_redis.pubsub_broken = True
+    reads = iter([1, 1, 4])
+
+    async def read_count():
+        return next(reads)
+
+    stream = notification_counter.unread_count_stream(9, read_count)
+    assert (await stream.__anext__()).endswith(b'data: {"count": 1}\n\n')
+    assert await asyncio.wait_for(stream.__anext__(), timeout=2) == b": keepalive\n\n"  # unchanged
+    assert await asyncio.wait_for(stream.__anext__(), timeout=2) == b'event: unread_count\ndata: {"count": 4}\n\n'
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_returns_its_session_before_streaming(monkeypatch):
+    from app.api.v1.endpoints import notifications as endpoint
+
+    sessions = []
+
+    @asynccontextmanager
+    async def _session():
+        sessions.append("open")
+        yield object()
+        sessions.append("closed")
+
+    async def _user(token, db):
+        return SimpleNamespace(id=7)
+
+    monkeypatch.setattr(endpoint, "get_db_session", _session)
+    monkeypatch.setattr(endpoint, "get_current_user", _user)
+
+    response = await endpoint.streamUnreadNotificationCount(header_token="token", token=None)
+
+    assert sessions == ["open", "closed"]
+    assert response.media_type == "text/event-stream"
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_requires_a_token(client):
+    response = await client.get("/api/v1/notifications/stream")
+    assert response.status_code == 401
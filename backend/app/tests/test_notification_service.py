@@ -3,12 +3,13 @@ Unit tests for NotificationService
 """
 
 from datetime import datetime, timedelta, timezone
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.notification import Notification, NotificationPriority, NotificationType
+from app.services import notification_counter
 from app.services.notification_service import NotificationService
 
 
@@ -459,11 +460,15 @@ class TestNotificationService:
         """Test getting unread notification count"""
         user_id = 1
 
-        with patch.object(service.db, "execute") as mock_execute:
+        with (
+            patch.object(service.db, "execute") as mock_execute,
+            patch.object(notification_counter, "get", AsyncMock(return_value=(None, "3:"))),
+            patch.object(notification_counter, "store", AsyncMock()) as mock_store,
+        ):
             # Mock personal notifications count (3 unread)
             # Mock system notifications count (2 unread)
             mock_result = Mock()
-            mock_result.scalar.side_effect = [3, 2]
+            mock_result.one.side_effect = [(3, None), (2, None)]
             mock_execute.return_value = mock_result
 
             result = await service.getUnreadNotificationCount(user_id)
@@ -471,8 +476,19 @@ class TestNotificationService:
             # Total should be 3 + 2 = 5
             assert result == 5
 
-            # Verify both queries were executed
+            # Verify both queries were executed and the result cached
             assert mock_execute.call_count == 2
+            assert mock_store.await_args.args[:3] == (user_id, 5, "3:")
+
+    @pytest.mark.asyncio
+    async def test_get_unread_notification_count_cached(self, service):
+        """A cached counter answers without touching the database"""
+        with (
+            patch.object(service.db, "execute") as mock_execute,
+            patch.object(notification_counter, "get", AsyncMock(return_value=(4, "3:"))),
+        ):
+            assert await service.getUnreadNotificationCount(1) == 4
+            mock_execute.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_mark_notification_as_read_personal(self, service):
@@ -520,6 +536,7 @@ class TestNotificationService:
                 mock_notification,  # Notification found
                 None,  # No existing read record
             ]
+            mock_result.scalar.return_value = 0  # No read watermark
             mock_execute.return_value = mock_result
 
             result = await service.markNotificationAsRead(notification_id, user_id)
@@ -557,32 +574,31 @@ class TestNotificationService:
             patch.object(service.db, "execute") as mock_execute,
             patch.object(service.db, "add_all") as mock_add_all,
             patch.object(service.db, "commit") as mock_commit,
+            patch.object(notification_counter, "reset", AsyncMock()) as mock_reset,
         ):
             # Mock personal update result
             mock_personal_result = Mock()
             mock_personal_result.rowcount = 3
 
-            # Mock system notifications query result
+            # 3 unread system notifications, highest announcement id 7
             mock_system_result = Mock()
-            mock_system_result.fetchall.return_value = [
-                (1,),
-                (2,),
-                (3,),
-            ]  # 3 system notifications
+            mock_system_result.one.return_value = (3, 7)
 
             mock_execute.side_effect = [
                 mock_personal_result,  # Personal update result
                 mock_system_result,  # System notifications query result
+                Mock(),  # Watermark upsert
             ]
 
             result = await service.markAllNotificationsAsRead(user_id)
 
-            # Verify read records were created for system notifications
-            mock_add_all.assert_called_once()
-            added_records = mock_add_all.call_args[0][0]
-            assert len(added_records) == 3  # 3 system notifications
+            # System announcements are covered by the watermark, not per-row reads
+            mock_add_all.assert_not_called()
+            watermark_upsert = mock_execute.call_args_list[2].args[0]
+            assert watermark_upsert.table.name == "notification_read_watermarks"
 
             mock_commit.assert_called_once()
+            mock_reset.assert_awaited_once_with(user_id)
 
             # Total should be 3 personal + 3 system = 6
             assert result == 6
@@ -17,6 +17,8 @@ import pytest
 from PIL import Image
 from pypdf import PdfReader, PdfWriter
 
+from app.core.config import settings
+from app.services import pdf_merge
 from app.services.pdf_merge import MergeItem, build_merged_pdf
 
 A4_WIDTH_PT = 595  # rounded reportlab A4 width/height in points
@@ -327,3 +329,99 @@ class TestBuildMergedPdf:
         out = _merge([MergeItem(label="證明", filename="tricky2.pdf", content=buf.getvalue())])
         assert b"indirect-marker" not in out
         assert b"/JavaScript" not in out
+
+
+def _photo_jpeg(size=(4000, 3000)):
+    img = Image.effect_noise(size, 40).convert("RGB")
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=95)
+    return buf.getvalue()
+
+
+class TestImageDownsampling:
+    """No CJK font needed: image pages carry no text."""
+
+    def test_photo_is_downsampled_to_configured_dpi_and_embedded_as_jpeg(self, monkeypatch):
+        monkeypatch.setattr(settings, "merged_pdf_image_dpi", 150)
+        source = _photo_jpeg()
+
+        out = pdf_merge._image_page(source)
+
+        page = PdfReader(io.BytesIO(out)).pages[0]
+        [embedded] = page.images
+        # A4 minus margins is ~510pt wide: 510 / 72 * 150 ≈ 1062 px.
+        assert embedded.image.width <= 1063
+        assert b"DCTDecode" in out
+        assert len(out) < len(source) / 4
+
+    def test_small_image_is_not_upsampled(self):
+        out = pdf_merge._image_page(_png_bytes(size=(60, 90)))
+        [embedded] = PdfReader(io.BytesIO(out)).pages[0].images
+        assert embedded.image.size == (60, 90)
+
+    def test_orientation_survives_draft_decoding(self):
+        img = Image.new("RGB", (4000, 2000), (10, 200, 10))
+        exif = Image.Exif()
+        exif[274] = 6
+        buf = io.BytesIO()
+        img.save(buf, "JPEG", exif=exif)
+
+        out = pdf_merge._image_page(buf.getvalue())
+        [embedded] = PdfReader(io.BytesIO(out)).pages[0].images
+        assert embedded.image.height > embedded.image.width
+
+
+class _DictCache:
+    def __init__(self):
+        self.store = {}
+        self.puts = 0
+
+    def get_derivative(self, key):
+        return self.store.get(key)
+
+    def put_derivative(self, key, content, content_type):
+        self.puts += 1
+        self.store[key] = content
+
+
+class TestDerivativeCache:
+    def test_second_render_reuses_cached_derivative(self, monkeypatch):
+        cache = _DictCache()
+        item = MergeItem(label="照片", filename="a.jpg", content=_photo_jpeg((800, 600)), source_key="obj/a.jpg@e1")
+
+        first = pdf_merge._render_cached(item, "h", cache)
+
+        def _no_render(*args, **kwargs):
+            raise AssertionError("cached derivative should be reused")
+
+        monkeypatch.setattr(pdf_merge, "_render_item", _no_render)
+        assert pdf_merge._render_cached(item, "h", cache) == first
+        assert cache.puts == 1
+        [key] = cache.store
+        assert key == "obj/a.jpg/merge-page/v1/150dpi-q80/e1.pdf"
+
+    def test_render_settings_and_etag_are_part_of_the_key(self, monkeypatch):
+        base = pdf_merge.derivative_key("obj/a.jpg@e1")
+        assert pdf_merge.derivative_key("obj/a.jpg@e2") != base
+        monkeypatch.setattr(settings, "merged_pdf_image_dpi", 300)
+        assert pdf_merge.derivative_key("obj/a.jpg@e1") != base
+
+    def test_placeholders_and_unkeyed_items_are_not_cached(self, monkeypatch):
+        cache = _DictCache()
+        monkeypatch.setattr(pdf_merge, "_render_item", lambda item, heading: (b"%PDF-placeholder", False))
+
+        pdf_merge._render_cached(MergeItem(label="x", filename="x.doc", content=b"doc", source_key="k@e"), "h", cache)
+        pdf_merge._render_cached(MergeItem(label="y", filename="y.pdf", content=b"%PDF-"), "h", cache)
+
+        assert cache.store == {}
+
+    def test_cache_errors_fall_back_to_rendering(self):
+        class _Broken:
+            def get_derivative(self, key):
+                raise ConnectionError("minio down")
+
+            def put_derivative(self, key, content, content_type):
+                raise ConnectionError("minio down")
+
+        item = MergeItem(label="照片", filename="a.png", content=_png_bytes(), source_key="obj/a.png@e1")
+        assert pdf_merge._render_cached(item, "h", _Broken()).startswith(b"%PDF")
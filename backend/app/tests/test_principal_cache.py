@@ -0,0 +1,372 @@
+"""Tests for app.core.principal_cache.
+
+The cache replaces the per-request ``select(User) + selectinload`` in
+``get_current_user`` with a (user_id, iat)-keyed snapshot. The invariants
+pinned here:
+
+  * a hit issues no SQL and still returns a session-attached ``User`` with
+    ``admin_scholarships`` populated;
+  * invalidation — explicit, or from a committed change to the user or its
+    grants — forces the next lookup back to the database on every worker,
+    and a fill that raced it is not cached;
+  * tokens without ``iat`` and Redis failures fall through to the query.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Optional
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select
+
+from app.core import cache as cache_mod
+from app.core import principal_cache
+from app.core.config import settings
+from app.core.principal_cache import PrincipalSnapshot, invalidate_principals, load_current_user
+from app.models.scholarship import ScholarshipType
+from app.models.user import AdminScholarship, User, UserRole, UserType
+
+
+class FakePubSub:
+    def __init__(self, redis: "FakeAsyncRedis") -> None:
+        self._redis = redis
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, channel: bytes) -> None:
+        self._redis._check()
+        self._redis.subscribers.append(self)
+
+    async def listen(self):
+        while True:
+            yield await self._queue.get()
+
+    async def aclose(self) -> None:
+        if self in self._redis.subscribers:
+            self._redis.subscribers.remove(self)
+
+
+class FakeAsyncRedis:
+    """The scan/delete/eval/pubsub subset principal_cache touches; the Lua
+    scripts are re-implemented in Python."""
+
+    def __init__(self) -> None:
+        self._store: dict[bytes, tuple[object, Optional[float]]] = {}
+        self.subscribers: list[FakePubSub] = []
+        self.broken = False
+
+    def _check(self) -> None:
+        if self.broken:
+            raise ConnectionError("redis down")
+
+    def _get(self, key: bytes):
+        entry = self._store.get(key)
+        if entry is None or (entry[1] is not None and entry[1] < time.time()):
+            return None
+        return entry[0]
+
+    def _generation(self, user_key: bytes, global_key: bytes) -> bytes:
+        return (self._get(global_key) or b"0") + b":" + (self._get(user_key) or b"0")
+
+    async def delete(self, *keys: bytes):
+        return sum(1 for k in keys if self._store.pop(k, None) is not None)
+
+    async def scan(self, cursor: int = 0, match: bytes = b"*", count: int = 100):
+        self._check()
+        prefix = match[:-1] if match.endswith(b"*") else match
+        return 0, [k for k in self._store if k.startswith(prefix)]
+
+    async def eval(self, script: str, numkeys: int, *args):
+        self._check()
+        keys, argv = args[:numkeys], [a if isinstance(a, bytes) else str(a).encode() for a in args[numkeys:]]
+        if script == principal_cache._LOOKUP_LUA:
+            gen = self._generation(keys[1], keys[2])
+            entry = self._get(keys[0]) or {}
+            return [gen, entry.get(argv[0]) if entry.get(b"gen") == gen else None]
+        if script == principal_cache._FILL_LUA:
+            gen = self._generation(keys[1], keys[2])
+            if gen != argv[0]:
+                return 0
+            entry = self._get(keys[0]) or {}
+            if entry.get(b"gen") != gen:
+                entry = {}
+            entry.update({b"gen": gen, argv[1]: argv[2]})
+            self._store[keys[0]] = (entry, time.time() + int(argv[3]))
+            return 1
+        if script == principal_cache._INVALIDATE_LUA:
+            for key in keys:
+                value = int(self._get(key) or 0) + 1
+                self._store[key] = (str(value).encode(), time.time() + int(argv[0]))
+            for subscriber in self.subscribers:
+                subscriber._queue.put_nowait({"type": "message", "data": argv[2]})
+            return len(keys)
+        raise NotImplementedError(script)
+
+    def pubsub(self) -> FakePubSub:
+        return FakePubSub(self)
+
+
+@pytest_asyncio.fixture
+async def fake_redis(monkeypatch):
+    fake = FakeAsyncRedis()
+    await principal_cache._listener.stop()
+    monkeypatch.setattr(cache_mod, "_async_client", fake)
+    monkeypatch.setattr(settings, "principal_cache_ttl_seconds", 60)
+    monkeypatch.setattr(settings, "principal_cache_local_ttl_seconds", 10)
+    principal_cache.clear_local_for_tests()
+    yield fake
+    await principal_cache._listener.stop()
+    principal_cache.clear_local_for_tests()
+
+
+async def _settle() -> None:
+    """Let background signals and the pub/sub listener run."""
+    await cache_mod.wait_for_signals()
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def query_counter(db):
+    """Count SELECTs against the users table issued through the test engine."""
+    counts = {"users": 0}
+    sync_engine = db.bind.sync_engine
+
+    def _before(conn, cursor, statement, parameters, context, executemany):  # noqa: ARG001
+        if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+            counts["users"] += 1
+
+    event.listen(sync_engine, "before_cursor_execute", _before)
+    yield counts
+    event.remove(sync_engine, "before_cursor_execute", _before)
+
+
+async def _make_admin(db) -> User:
+    scholarship = ScholarshipType(code="pc_test", name="Principal cache test")
+    admin = User(
+        nycu_id="pc_admin",
+        name="Cache Admin",
+        email="pc@university.edu",
+        user_type=UserType.employee,
+        role=UserRole.admin,
+        college_code="E",
+        raw_data={"dept": "CS"},
+    )
+    db.add_all([scholarship, admin])
+    await db.flush()
+    db.add(AdminScholarship(admin_id=admin.id, scholarship_id=scholarship.id))
+    await db.commit()
+    return admin
+
+
+class TestSnapshot:
+    def test_round_trip_preserves_columns_enums_and_grants(self):
+        user = User(
+            id=7,
+            nycu_id="u7",
+            name="Seven",
+            user_type=UserType.employee,
+            role=UserRole.college,
+            college_code="C",
+            raw_data={"k": [1, 2]},
+        )
+        user.admin_scholarships = [AdminScholarship(id=3, admin_id=7, scholarship_id=11)]
+
+        snapshot = PrincipalSnapshot.from_json(PrincipalSnapshot.from_user(user).to_json())
+        rebuilt = snapshot.to_user()
+
+        assert snapshot.role == "college"
+        assert snapshot.college_code == "C"
+        assert snapshot.scholarship_ids == (11,)
+        assert rebuilt.role is UserRole.college
+        assert rebuilt.user_type is UserType.employee
+        assert rebuilt.raw_data == {"k": [1, 2]}
+        assert [a.scholarship_id for a in rebuilt.admin_scholarships] == [11]
+
+    def test_materialisations_do_not_share_mutable_state(self):
+        user = User(id=1, nycu_id="u1", role=UserRole.student, raw_data={"a": 1})
+        user.admin_scholarships = []
+        snapshot = PrincipalSnapshot.from_user(user)
+
+        first = snapshot.to_user()
+        first.raw_data["a"] = 2
+
+        assert snapshot.to_user().raw_data == {"a": 1}
+
+
+class TestLoadCurrentUser:
+    @pytest.mark.asyncio
+    async def test_second_lookup_issues_no_user_query(self, db, fake_redis, query_counter):
+        admin = await _make_admin(db)
+        db.expunge_all()
+
+        first = await load_current_user(db, admin.id, issued_at=1000)
+        assert query_counter["users"] == 1
+        db.expunge_all()
+
+        second = await load_current_user(db, admin.id, issued_at=1000)
+        assert query_counter["users"] == 1
+        assert second is not first
+        assert second in db
+        assert second.role is UserRole.admin
+        assert second.has_scholarship_permission(first.admin_scholarships[0].scholarship_id)
+
+    @pytest.mark.asyncio
+    async def test_cached_user_can_be_mutated_and_committed(self, db, fake_redis):
+        admin = await _make_admin(db)
+        db.expunge_all()
+        await load_current_user(db, admin.id, issued_at=1000)
+        db.expunge_all()
+
+        cached_user = await load_current_user(db, admin.id, issued_at=1000)
+        cached_user.name = "Renamed"
+        await db.commit()
+        db.expunge_all()
+
+        row = await db.get(User, admin.id)
+        assert row.name == "Renamed"
+
+    @pytest.mark.asyncio
+    async def test_redis_tier_serves_other_workers(self, db, fake_redis, query_counter):
+        admin = await _make_admin(db)
+        db.expunge_all()
+        await load_current_user(db, admin.id, issued_at=1000)
+        db.expunge_all()
+
+        # Simulate a different worker: empty L1, shared Redis.
+        principal_cache.clear_local_for_tests()
+        user = await load_current_user(db, admin.id, issued_at=1000)
+
+        assert query_counter["users"] == 1
+        assert user.college_code == "E"
+
+    @pytest.mark.asyncio
+    async def test_invalidate_forces_requery(self, db, fake_redis, query_counter):
+        admin = await _make_admin(db)
+        db.expunge_all()
+        await load_current_user(db, admin.id, issued_at=1000)
+        db.expunge_all()
+
+        await invalidate_principals(admin.id)
+        await load_current_user(db, admin.id, issued_at=1000)
+
+        assert query_counter["users"] == 2
+        assert fake_redis._store  # re-populated after the miss
+
+    @pytest.mark.asyncio
+    async def test_different_iat_is_a_different_key(self, db, fake_redis, query_counter):
+        admin = await _make_admin(db)
+        db.expunge_all()
+        await load_current_user(db, admin.id, issued_at=1000)
+        db.expunge_all()
+        await load_current_user(db, admin.id, issued_at=2000)
+
+        assert query_counter["users"] == 2
+
+    @pytest.mark.asyncio
+    async def test_token_without_iat_bypasses_cache(self, db, fake_redis, query_counter):
+        admin = await _make_admin(db)
+        db.expunge_all()
+        await load_current_user(db, admin.id, issued_at=None)
+        db.expunge_all()
+        await load_current_user(db, admin.id, issued_at=None)
+
+        assert query_counter["users"] == 2
+        assert not [key for key in fake_redis._store if b"principal:" in key]
+
+    @pytest.mark.asyncio
+    async def test_redis_outage_falls_through_to_database(self, db, fake_redis, query_counter):
+        admin = await _make_admin(db)
+        db.expunge_all()
+        fake_redis.broken = True
+
+        user = await load_current_user(db, admin.id, issued_at=1000)
+
+        assert user is not None and user.id == admin.id
+        assert query_counter["users"] == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_zero_ttl(self, db, fake_redis, query_counter, monkeypatch):
+        monkeypatch.setattr(settings, "principal_cache_ttl_seconds", 0)
+        admin = await _make_admin(db)
+        db.expunge_all()
+        await load_current_user(db, admin.id, issued_at=1000)
+        db.expunge_all()
+        await load_current_user(db, admin.id, issued_at=1000)
+
+        assert query_counter["users"] == 2
+
+
+class TestInvalidation:
+    @pytest.mark.asyncio
+    async def test_committed_role_change_reaches_every_tier(self, db, fake_redis, query_counter):
+        admin = await _make_admin(db)
+        db.expunge_all()
+        await load_current_user(db, admin.id, issued_at=1000)
+        db.expunge_all()
+
+        row = await db.get(User, admin.id)
+        row.role = UserRole.college
+        await db.commit()
+        await _settle()
+        db.expunge_all()
+
+        assert (await load_current_user(db, admin.id, issued_at=1000)).role is UserRole.college
+        assert query_counter["users"] == 3  # load, db.get, reload
+        db.expunge_all()
+
+        # Another worker with an empty L1 must not get the old snapshot from Redis.
+        principal_cache.clear_local_for_tests()
+        assert (await load_current_user(db, admin.id, issued_at=1000)).role is UserRole.college
+        assert query_counter["users"] == 3
+
+    @pytest.mark.asyncio
+    async def test_grant_removal_invalidates(self, db, fake_redis):
+        admin = await _make_admin(db)
+        db.expunge_all()
+        assert (await load_current_user(db, admin.id, issued_at=1000)).admin_scholarships
+
+        grants = await db.execute(select(AdminScholarship).where(AdminScholarship.admin_id == admin.id))
+        for grant in grants.scalars():
+            await db.delete(grant)
+        await db.commit()
+        await _settle()
+        db.expunge_all()
+
+        assert (await load_current_user(db, admin.id, issued_at=1000)).admin_scholarships == []
+
+    @pytest.mark.asyncio
+    async def test_other_worker_invalidation_clears_local_tier(self, db, fake_redis, query_counter):
+        admin = await _make_admin(db)
+        db.expunge_all()
+        await load_current_user(db, admin.id, issued_at=1000)
+        await _settle()
+        assert principal_cache._listener.connected
+        db.expunge_all()
+
+        # Published by another worker's commit hook.
+        await principal_cache._invalidation_command([admin.id])(fake_redis)
+        await _settle()
+        await load_current_user(db, admin.id, issued_at=1000)
+
+        assert query_counter["users"] == 2
+
+    @pytest.mark.asyncio
+    async def test_fill_racing_an_invalidation_is_not_cached(self, db, fake_redis, query_counter):
+        admin = await _make_admin(db)
+        db.expunge_all()
+        user = await db.get(User, admin.id)
+        await db.refresh(user, ["admin_scholarships"])
+        query_counter["users"] = 0
+
+        epoch = principal_cache._local_epoch
+        snapshot, generation = await principal_cache._lookup(admin.id, 1000)
+        assert snapshot is None
+        await invalidate_principals(admin.id)
+        await principal_cache.store_principal(user, 1000, generation, epoch)
+        db.expunge_all()
+
+        await load_current_user(db, admin.id, issued_at=1000)
+        assert query_counter["users"] == 1
@@ -0,0 +1,133 @@
+"""Per-request SQL query statistics (app.db.query_stats).
+
+The cursor-execute hooks feed every statement into the active
+``track_queries()`` blocks; MetricsMiddleware exports the per-request totals
+by route and, in development, as response headers; ``query_budget`` turns a
+declared query count into a test failure.
+"""
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.query_stats import statement_shape, track_queries
+from app.middleware.metrics_middleware import MetricsMiddleware
+from app.models.user import User, UserRole, UserType
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels=labels) or 0.0
+
+
+async def _add_users(db: AsyncSession, count: int) -> list:
+    users = [
+        User(
+            nycu_id=f"qs{index:04d}",
+            name=f"查詢統計{index}",
+            email=f"qs{index}@nycu.edu.tw",
+            user_type=UserType.student,
+            role=UserRole.student,
+        )
+        for index in range(count)
+    ]
+    db.add_all(users)
+    await db.commit()
+    return [user.id for user in users]
+
+
+async def _per_row(db: AsyncSession, ids: list) -> None:
+    for user_id in ids:
+        await db.execute(select(User.name).where(User.id == user_id))
+
+
+def test_statement_shape_folds_whitespace_and_in_lists():
+    assert statement_shape("SELECT users.id\n  FROM users WHERE users.id IN (?, ?, ?)") == (
+        "SELECT users.id FROM users WHERE users.id IN (...)"
+    )
+    assert statement_shape("SELECT 1 WHERE a IN ($1, $2)") == statement_shape("SELECT 1 WHERE a IN ($1, $2, $3)")
+    assert statement_shape("SELECT 1 WHERE a IN (%(a_1)s, %(a_2)s)") == "SELECT 1 WHERE a IN (...)"
+    # A single parameter in parentheses is not a list.
+    assert statement_shape("SELECT lower(?)") == "SELECT lower(?)"
+
+
+@pytest.mark.asyncio
+async def test_track_queries_counts_and_finds_repeats(db: AsyncSession):
+    ids = await _add_users(db, 4)
+
+    with track_queries() as outer:
+        await db.execute(select(User).where(User.id.in_(ids)))
+        with track_queries() as inner:
+            await _per_row(db, ids)
+
+    assert inner.count == 4
+    assert inner.duplicates == 3
+    assert inner.repeated()[0][1] == 4
+    assert outer.count == 5
+    assert outer.duplicates == 3
+    assert outer.duration >= inner.duration > 0
+
+    # Outside a block nothing is collected.
+    await _per_row(db, ids)
+    assert outer.count == 5
+
+
+def _app(db: AsyncSession, ids: list) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/query-stats/per-row")
+    async def per_row():
+        await _per_row(db, ids)
+        return {"ok": True}
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_middleware_exports_request_totals(db: AsyncSession, monkeypatch):
+    ids = await _add_users(db, 3)
+    labels = {"method": "GET", "endpoint": "/query-stats/per-row"}
+    before = {
+        "queries": _sample("db_queries_per_request_sum", **labels),
+        "duplicates": _sample("db_duplicate_queries_per_request_sum", **labels),
+        "requests": _sample("db_time_per_request_seconds_count", **labels),
+    }
+    transport = ASGITransport(app=_app(db, ids))
+
+    monkeypatch.setattr(settings, "db_query_stats_header", True)
+    monkeypatch.setattr(settings, "environment", "development")
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/query-stats/per-row")
+    assert response.headers["X-DB-Query-Count"] == "3"
+    assert response.headers["X-DB-Duplicate-Queries"] == "2"
+    assert float(response.headers["X-DB-Query-Time-Ms"]) >= 0
+
+    assert _sample("db_queries_per_request_sum", **labels) - before["queries"] == 3
+    assert _sample("db_duplicate_queries_per_request_sum", **labels) - before["duplicates"] == 2
+    assert _sample("db_time_per_request_seconds_count", **labels) - before["requests"] == 1
+
+    # Never in production, whatever the flag says.
+    monkeypatch.setattr(settings, "environment", "production")
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/query-stats/per-row")
+    assert "X-DB-Query-Count" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_query_budget_fails_on_n_plus_one(db: AsyncSession, query_budget):
+    ids = await _add_users(db, 5)
+
+    with query_budget(1):
+        await db.execute(select(User.name).where(User.id.in_(ids)))
+
+    with pytest.raises(AssertionError, match="5 SQL statements, budget 2; repeated: 5x SELECT users.name"):
+        with query_budget(2):
+            await _per_row(db, ids)
+
+    with pytest.raises(AssertionError, match="4 repeated statements, budget 0"):
+        with query_budget(10, max_duplicates=0):
+            await _per_row(db, ids)
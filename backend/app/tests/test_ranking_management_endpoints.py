@@ -278,6 +278,11 @@ class TestRankingAuthorization:
         response = await client.put(f"{RANKINGS_URL}/{ranking_sci.id}/order", json=[{"item_id": 1, "position": 1}])
         assert response.status_code == 403
 
+    async def test_cross_college_reorder_403(self, client, login, rank_users, ranking_sci):
+        login(rank_users["college_eng"])
+        response = await client.patch(f"{RANKINGS_URL}/{ranking_sci.id}/order", json={"order": [1]})
+        assert response.status_code == 403
+
     async def test_cross_college_finalize_403(self, client, login, rank_users, ranking_sci):
         login(rank_users["college_eng"])
         response = await client.post(f"{RANKINGS_URL}/{ranking_sci.id}/finalize")
@@ -376,6 +381,11 @@ class TestRankingValidationAndGuards:
         response = await client.put(f"{RANKINGS_URL}/999999/order", json=[{"item_id": 1, "position": 1}])
         assert response.status_code == 404
 
+    async def test_reorder_needs_order_or_moves_400(self, client, login, rank_users, ranking_eng):
+        login(rank_users["college_eng"])
+        response = await client.patch(f"{RANKINGS_URL}/{ranking_eng.id}/order", json={})
+        assert response.status_code == 400
+
     async def test_update_empty_name_422(self, client, login, rank_users, ranking_eng):
         login(rank_users["college_eng"])
         response = await client.put(f"{RANKINGS_URL}/{ranking_eng.id}", json={"ranking_name": ""})
@@ -0,0 +1,184 @@
+"""Delta ranking reorder (CollegeReviewService.reorder_ranking).
+
+Dragging one student used to reload every CollegeRankingItem with its
+Application and write two ORM UPDATEs per item. Reorders now read a bare
+(id, application_id, rank_position) projection, check the renewal-before-new
+rule with one aggregate and write only the changed rows, one UPDATE per table.
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.application import Application
+from app.models.college_review import CollegeRanking, CollegeRankingItem
+from app.models.enums import ApplicationStatus, ReviewStage, SubTypeSelectionMode
+from app.models.scholarship import ScholarshipType
+from app.models.user import User, UserRole, UserType
+from app.services.college_review_service import CollegeReviewService, InvalidRankingDataError
+
+
+@pytest_asyncio.fixture
+async def ranking(db: AsyncSession):
+    """Six ranked items; the first two are renewals."""
+    sch = ScholarshipType(code="reorder", name="reorder", description="x")
+    db.add(sch)
+    ranking = CollegeRanking(scholarship_type_id=1, sub_type_code="nstc", academic_year=115, ranking_status="draft")
+    db.add(ranking)
+    await db.commit()
+    await db.refresh(sch)
+    await db.refresh(ranking)
+
+    items = []
+    for idx in range(6):
+        user = User(
+            nycu_id=f"reorder_s{idx}",
+            name=f"S{idx}",
+            email=f"reorder_s{idx}@u.edu",
+            user_type=UserType.student,
+            role=UserRole.student,
+        )
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+        application = Application(
+            app_id=f"APP-115-0-RO{idx}",
+            user_id=user.id,
+            scholarship_type_id=sch.id,
+            sub_type_selection_mode=SubTypeSelectionMode.single,
+            academic_year=115,
+            status=ApplicationStatus.under_review,
+            review_stage=ReviewStage.college_ranked,
+            is_renewal=idx < 2,
+            agree_terms=True,
+            final_ranking_position=idx + 1,
+        )
+        db.add(application)
+        await db.commit()
+        await db.refresh(application)
+        item = CollegeRankingItem(ranking_id=ranking.id, application_id=application.id, rank_position=idx + 1)
+        db.add(item)
+        await db.commit()
+        await db.refresh(item)
+        items.append(item)
+    return ranking, [item.id for item in items]
+
+
+async def _order(db: AsyncSession, ranking_id: int) -> list:
+    rows = await db.execute(
+        select(CollegeRankingItem.id, CollegeRankingItem.rank_position, Application.final_ranking_position)
+        .join(Application, Application.id == CollegeRankingItem.application_id)
+        .where(CollegeRankingItem.ranking_id == ranking_id)
+        .order_by(CollegeRankingItem.rank_position)
+    )
+    return rows.all()
+
+
+@pytest.mark.asyncio
+async def test_move_writes_only_the_shifted_items(db, ranking):
+    ranking_obj, ids = ranking
+    service = CollegeReviewService(db)
+
+    _, changes = await service.reorder_ranking(ranking_obj.id, moves=[{"item_id": ids[5], "before_item_id": ids[3]}])
+
+    assert set(changes) == {ids[3], ids[4], ids[5]}
+    assert changes[ids[5]][1:] == (6, 4)
+    order = await _order(db, ranking_obj.id)
+    assert [row[0] for row in order] == [ids[0], ids[1], ids[2], ids[5], ids[3], ids[4]]
+    # Application.final_ranking_position follows the item.
+    assert all(row[1] == row[2] for row in order)
+
+
+@pytest.mark.asyncio
+async def test_reorder_issues_one_update_per_table(db, ranking):
+    ranking_obj, ids = ranking
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):  # noqa: ARG001
+        statements.append(statement.lstrip().upper())
+
+    engine = db.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        await CollegeReviewService(db).reorder_ranking(
+            ranking_obj.id, moves=[{"item_id": ids[2], "after_item_id": ids[5]}]
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+    updates = [s for s in statements if s.startswith("UPDATE")]
+    assert [s.split()[1] for s in updates if "RANK_POSITION" in s or "FINAL_RANKING_POSITION" in s] == [
+        "COLLEGE_RANKING_ITEMS",
+        "APPLICATIONS",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_permutation_must_cover_every_item(db, ranking):
+    ranking_obj, ids = ranking
+    service = CollegeReviewService(db)
+
+    with pytest.raises(InvalidRankingDataError):
+        await service.reorder_ranking(ranking_obj.id, order=ids[:-1])
+    with pytest.raises(InvalidRankingDataError):
+        await service.reorder_ranking(ranking_obj.id, order=ids + [ids[0]])
+
+    _, changes = await service.reorder_ranking(ranking_obj.id, order=[ids[1], ids[0]] + ids[2:])
+    assert set(changes) == {ids[0], ids[1]}
+
+    _, unchanged = await service.reorder_ranking(ranking_obj.id, order=[ids[1], ids[0]] + ids[2:])
+    assert unchanged == {}
+
+
+@pytest.mark.asyncio
+async def test_new_application_cannot_move_ahead_of_renewal(db, ranking):
+    ranking_obj, ids = ranking
+    service = CollegeReviewService(db)
+
+    with pytest.raises(InvalidRankingDataError):
+        await service.reorder_ranking(ranking_obj.id, moves=[{"item_id": ids[4], "before_item_id": ids[1]}])
+
+    assert [row[0] for row in await _order(db, ranking_obj.id)] == ids
+
+
+@pytest.mark.asyncio
+async def test_legacy_position_list_still_applies(db, ranking):
+    ranking_obj, ids = ranking
+    service = CollegeReviewService(db)
+
+    await service.update_ranking_order(
+        ranking_obj.id,
+        [{"item_id": ids[2], "position": 3}, {"item_id": ids[3], "position": 4}]
+        + [{"item_id": ids[4], "position": 6}, {"item_id": ids[5], "position": 5}],
+    )
+
+    assert [row[0] for row in await _order(db, ranking_obj.id)] == ids[:4] + [ids[5], ids[4]]
+
+
+@pytest.mark.asyncio
+async def test_postgres_updates_join_a_values_list():
+    db = MagicMock()
+    ranking_result = MagicMock()
+    ranking_result.scalar_one_or_none.return_value = CollegeRanking(id=1, is_finalized=False)
+    positions_result = MagicMock()
+    positions_result.all.return_value = [(1, 101, 1), (2, 102, 2)]
+    bounds_result = MagicMock()
+    bounds_result.one.return_value = (None, 1)
+    db.execute = AsyncMock(side_effect=[ranking_result, positions_result, bounds_result, MagicMock(), MagicMock()])
+    db.get_bind = MagicMock(return_value=MagicMock(dialect=postgresql.dialect()))
+    db.flush = AsyncMock()
+    db.refresh = AsyncMock()
+
+    await CollegeReviewService(db).reorder_ranking(1, order=[2, 1])
+
+    item_sql, application_sql = (
+        str(call.args[0].compile(dialect=postgresql.dialect())) for call in db.execute.call_args_list[3:]
+    )
+    assert item_sql.startswith("UPDATE college_ranking_items SET rank_position=rank_delta.position")
+    assert application_sql.startswith("UPDATE applications SET final_ranking_position=rank_delta.position")
+    for sql in (item_sql, application_sql):
+        assert "FROM (VALUES" in sql and "AS rank_delta (item_id, application_id, position)" in sql
@@ -15,24 +15,9 @@ class TestRateLimiter:
 
     @pytest.fixture
     def mock_redis(self):
-        """Mock Redis connection.
-
-        pipeline() is a *sync* call returning an async context manager, while the
-        pipe itself must be awaitable (zremrangebyscore/zcard/zadd/expire/execute
-        are all awaited in production code).
-        """
+        """Mock Redis connection: the GCRA script returns [limited, remaining]."""
         redis_mock = MagicMock()
-        pipe = AsyncMock()
-        pipe.execute.return_value = [
-            None,  # zremrangebyscore result
-            0,  # zcard result (current request count)
-            None,  # zadd result
-            None,  # expire result
-        ]
-        cm = MagicMock()
-        cm.__aenter__ = AsyncMock(return_value=pipe)
-        cm.__aexit__ = AsyncMock(return_value=False)
-        redis_mock.pipeline = MagicMock(return_value=cm)
+        redis_mock.eval = AsyncMock(return_value=[0, 9])
         return redis_mock
 
     @pytest.fixture
@@ -45,23 +30,17 @@ class TestRateLimiter:
     @pytest.mark.asyncio
     async def test_is_rate_limited_under_limit(self, rate_limiter, mock_redis):
         """Test rate limiting when under the limit"""
-        # Mock pipeline execution to return 0 current requests
-        pipeline_mock = AsyncMock()
-        pipeline_mock.execute.return_value = [None, 0, None, None]
-        mock_redis.pipeline.return_value.__aenter__ = AsyncMock(return_value=pipeline_mock)
-
         is_limited, remaining = await rate_limiter.is_rate_limited("test_key", 10, 3600)
 
         assert is_limited is False
-        assert remaining == 9  # 10 limit - 0 current - 1 for this request
+        assert remaining == 9  # 10 limit - 1 for this request
+        # One script call per check: key, limit, window, locally admitted requests
+        assert mock_redis.eval.call_args.args[1:] == (1, "gcra:test_key", 10, 3600, 0)
 
     @pytest.mark.asyncio
     async def test_is_rate_limited_at_limit(self, rate_limiter, mock_redis):
         """Test rate limiting when at the limit"""
-        # Mock pipeline execution to return limit number of requests
-        pipeline_mock = AsyncMock()
-        pipeline_mock.execute.return_value = [None, 10, None, None]  # Already at limit
-        mock_redis.pipeline.return_value.__aenter__ = AsyncMock(return_value=pipeline_mock)
+        mock_redis.eval.return_value = [1, 0]
 
         is_limited, remaining = await rate_limiter.is_rate_limited("test_key", 10, 3600)
 
@@ -72,7 +51,7 @@ class TestRateLimiter:
     async def test_is_rate_limited_redis_error_fails_open(self, rate_limiter, mock_redis):
         """Test that Redis errors fail open (don't block requests)"""
         # Mock Redis to raise an exception
-        mock_redis.pipeline.side_effect = Exception("Redis connection failed")
+        mock_redis.eval.side_effect = Exception("Redis connection failed")
 
         is_limited, remaining = await rate_limiter.is_rate_limited("test_key", 10, 3600)
 
@@ -1,4 +1,5 @@
 import asyncio
+import math
 import sys
 from types import SimpleNamespace
 
@@ -8,85 +9,118 @@ from fastapi import HTTPException, status
 from app.core import rate_limiting
 
 
-class FakePipeline:
-    def __init__(self, results):
-        self.results = results
-        self.commands = []
+class FakeRedis:
+    """Runs the GCRA script in Python against an adjustable Redis clock."""
 
-    async def __aenter__(self):
-        return self
+    def __init__(self):
+        self.store = {}
+        self.now_us = 1_700_000_000_000_000
+        self.calls = []
 
-    async def __aexit__(self, exc_type, exc, tb):
-        return False
+    def advance(self, seconds):
+        self.now_us += int(seconds * 1_000_000)
+
+    async def eval(self, script, numkeys, key, limit, window_seconds, debt):
+        assert script == rate_limiting._GCRA_LUA and numkeys == 1
+        self.calls.append((key, limit, window_seconds, debt))
+        period = window_seconds * 1_000_000
+        interval = period / limit
+        tat = max(self.store.get(key, self.now_us), self.now_us) + debt * interval
+        limited = tat + interval - period > self.now_us
+        if not limited:
+            tat += interval
+        if not limited or debt > 0:
+            self.store[key] = int(tat)
+        return [int(limited), max(0, math.floor((self.now_us + period - tat) / interval))]
 
-    async def zremrangebyscore(self, key, min_score, max_score):
-        self.commands.append(("zremrangebyscore", key, min_score, max_score))
+    async def close(self):
+        pass
 
-    async def zcard(self, key):
-        self.commands.append(("zcard", key))
 
-    async def zadd(self, key, mapping):
-        self.commands.append(("zadd", key, mapping))
+def _limiter(fake_redis, local_share=0.0):
+    limiter = rate_limiting.RateLimiter("redis://unused", local_share=local_share)
+    limiter.redis = fake_redis
+    return limiter
 
-    async def expire(self, key, ttl):
-        self.commands.append(("expire", key, ttl))
 
-    async def execute(self):
-        return self.results
+@pytest.mark.asyncio
+async def test_rate_limiter_under_limit():
+    fake_redis = FakeRedis()
+    limiter = _limiter(fake_redis)
 
+    results = [await limiter.is_rate_limited("user:1", limit=5, window_seconds=60) for _ in range(3)]
 
-class FakeRedis:
-    def __init__(self, pipeline_results):
-        self.pipeline_results = pipeline_results
-        self.pipelines_created = 0
+    assert results == [(False, 4), (False, 3), (False, 2)]
+    # One key, one value: memory does not grow with the request count.
+    assert list(fake_redis.store) == ["gcra:user:1"]
 
-    def pipeline(self):
-        result = self.pipeline_results[min(self.pipelines_created, len(self.pipeline_results) - 1)]
-        self.pipelines_created += 1
-        return FakePipeline(result)
 
-    async def close(self):
-        pass
+@pytest.mark.asyncio
+async def test_rate_limiter_hits_limit():
+    fake_redis = FakeRedis()
+    limiter = _limiter(fake_redis)
+
+    for _ in range(5):
+        assert (await limiter.is_rate_limited("key", limit=5, window_seconds=10))[0] is False
+
+    assert await limiter.is_rate_limited("key", limit=5, window_seconds=10) == (True, 0)
+    assert await limiter.is_rate_limited("key", limit=5, window_seconds=10) == (True, 0)
+
+    # Rejections are not charged: one emission interval later one request fits again.
+    fake_redis.advance(2)
+    assert await limiter.is_rate_limited("key", limit=5, window_seconds=10) == (False, 0)
+    assert (await limiter.is_rate_limited("key", limit=5, window_seconds=10))[0] is True
 
 
 @pytest.mark.asyncio
-async def test_rate_limiter_under_limit(monkeypatch):
-    pipeline_results = [[None, 2, None, True]]
-    fake_redis = FakeRedis(pipeline_results)
-    limiter = rate_limiting.RateLimiter.__new__(rate_limiting.RateLimiter)
-    limiter.redis = fake_redis
+async def test_rate_limiter_fail_open():
+    class BrokenRedis(FakeRedis):
+        async def eval(self, *args):  # type: ignore[override]
+            raise RuntimeError("redis down")
 
-    limited, remaining = await limiter.is_rate_limited("user:1", limit=5, window_seconds=60)
+    limiter = _limiter(BrokenRedis())
 
+    limited, remaining = await limiter.is_rate_limited("key", limit=3, window_seconds=10)
     assert limited is False
-    assert remaining == 2
+    assert remaining == 3
 
 
 @pytest.mark.asyncio
-async def test_rate_limiter_hits_limit(monkeypatch):
-    pipeline_results = [[None, 5, None, True]]
-    fake_redis = FakeRedis(pipeline_results)
-    limiter = rate_limiting.RateLimiter.__new__(rate_limiting.RateLimiter)
-    limiter.redis = fake_redis
+async def test_local_prefilter_batches_redis_round_trips():
+    fake_redis = FakeRedis()
+    limiter = _limiter(fake_redis, local_share=0.5)
 
-    limited, remaining = await limiter.is_rate_limited("key", limit=5, window_seconds=10)
+    results = [await limiter.is_rate_limited("key", limit=100, window_seconds=60) for _ in range(60)]
 
-    assert limited is True
-    assert remaining == 0
+    assert all(limited is False for limited, _ in results)
+    # A sync, 49 local admissions (half of the 99 remaining), a sync that charges
+    # them, then 9 more local ones: 60 requests in two round trips.
+    assert [debt for *_, debt in fake_redis.calls] == [0, 49]
+    assert results[-1] == (False, 40)
 
 
 @pytest.mark.asyncio
-async def test_rate_limiter_fail_open(monkeypatch):
-    class BrokenRedis(FakeRedis):
-        def pipeline(self):  # type: ignore[override]
-            raise RuntimeError("redis down")
+async def test_local_prefilter_defers_to_redis_near_the_limit():
+    fake_redis = FakeRedis()
+    limiter = _limiter(fake_redis, local_share=0.5)
 
-    limiter = rate_limiting.RateLimiter.__new__(rate_limiting.RateLimiter)
-    limiter.redis = BrokenRedis([])
+    results = [await limiter.is_rate_limited("key", limit=3, window_seconds=60) for _ in range(5)]
 
-    limited, remaining = await limiter.is_rate_limited("key", limit=3, window_seconds=10)
-    assert limited is False
-    assert remaining == 3
+    # Exactly the limit is admitted; with nothing left every check goes to Redis.
+    assert [limited for limited, _ in results] == [False, False, False, True, True]
+    assert [debt for *_, debt in fake_redis.calls] == [0, 1, 0, 0]
+
+
+@pytest.mark.asyncio
+async def test_local_prefilter_resyncs_stale_allowances(monkeypatch):
+    monkeypatch.setattr(rate_limiting, "_LOCAL_MAX_AGE_SECONDS", 0)
+    fake_redis = FakeRedis()
+    limiter = _limiter(fake_redis, local_share=0.5)
+
+    for _ in range(3):
+        await limiter.is_rate_limited("key", limit=100, window_seconds=60)
+
+    assert len(fake_redis.calls) == 3
 
 
 class StubLimiter:
@@ -154,18 +188,18 @@ def test_get_rate_limiter_prefers_settings_url(monkeypatch):
     created_urls = []
 
     class DummyLimiter:
-        def __init__(self, redis_url="redis://localhost:6379"):
-            created_urls.append(redis_url)
+        def __init__(self, redis_url="redis://localhost:6379", local_share=0.0):
+            created_urls.append((redis_url, local_share))
 
     monkeypatch.setattr(rate_limiting, "RateLimiter", DummyLimiter)
 
-    config_stub = SimpleNamespace(settings=SimpleNamespace(redis_url="redis://settings"))
+    config_stub = SimpleNamespace(settings=SimpleNamespace(redis_url="redis://settings", rate_limit_local_share=0.25))
     monkeypatch.setitem(sys.modules, "app.core.config", config_stub)
 
     limiter = rate_limiting.get_rate_limiter()
 
     assert isinstance(limiter, DummyLimiter)
-    assert created_urls == ["redis://settings"]
+    assert created_urls == [("redis://settings", 0.25)]
 
 
 def test_get_rate_limiter_fallbacks_to_default(monkeypatch):
@@ -174,14 +208,14 @@ def test_get_rate_limiter_fallbacks_to_default(monkeypatch):
     created_urls = []
 
     class FlakyLimiter:
-        def __init__(self, redis_url="redis://localhost:6379"):
+        def __init__(self, redis_url="redis://localhost:6379", local_share=0.0):
             created_urls.append(redis_url)
             if redis_url == "redis://broken":
                 raise RuntimeError("boom")
 
     monkeypatch.setattr(rate_limiting, "RateLimiter", FlakyLimiter)
 
-    config_stub = SimpleNamespace(settings=SimpleNamespace(redis_url="redis://broken"))
+    config_stub = SimpleNamespace(settings=SimpleNamespace(redis_url="redis://broken", rate_limit_local_share=0.0))
     monkeypatch.setitem(sys.modules, "app.core.config", config_stub)
 
     limiter = rate_limiting.get_rate_limiter()
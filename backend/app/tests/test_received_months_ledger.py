@@ -0,0 +1,267 @@
+"""Materialized 系統月份數 ledger (received_months_system_ledger).
+
+The ledger must always equal the roster aggregate it replaces: these tests
+drive each write path (create / exclude / restore / lock / bulk DML / roster
+delete / application soft delete / rollback) with the ledger enabled and
+compare the ledger-backed reads with the aggregate path.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, select, text, update
+
+from app.core.config import settings
+from app.db.query_stats import track_queries
+from app.models.application import Application
+from app.models.payment_roster import PaymentRoster, PaymentRosterItem, RosterCycle, RosterStatus, RosterTriggerType
+from app.models.received_months import ReceivedMonthsSystemLedger
+from app.models.scholarship import ScholarshipConfiguration, ScholarshipType
+from app.models.user import User, UserRole, UserType
+from app.services.received_months_service import calculate_received_months_bulk_async, get_paid_months_by_type_async
+from app.services.student_scholarship_history_service import StudentScholarshipHistoryService
+
+pytestmark = pytest.mark.integration
+
+STUDENT = "RML001"
+OTHER = "RML002"
+
+
+@pytest.fixture(autouse=True)
+def ledger_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "received_months_ledger_enabled", True)
+
+
+@pytest_asyncio.fixture
+async def seeded(db):
+    admin = User(
+        nycu_id="rml_admin", name="Admin", email="rml@nycu.edu.tw", user_type=UserType.employee, role=UserRole.admin
+    )
+    stype = ScholarshipType(code="rml_type", name="RML Scholarship")
+    db.add_all([admin, stype])
+    await db.flush()
+    cfg = ScholarshipConfiguration(
+        config_code="RML-CFG",
+        config_name="RML Config",
+        is_active=True,
+        scholarship_type_id=stype.id,
+        academic_year=114,
+        amount=10000,
+    )
+    db.add(cfg)
+    await db.commit()
+    return {"admin": admin, "type": stype, "config": cfg}
+
+
+def _roster(seeded, code: str, cycle: RosterCycle, status: RosterStatus = RosterStatus.COMPLETED) -> PaymentRoster:
+    return PaymentRoster(
+        roster_code=code,
+        scholarship_configuration_id=seeded["config"].id,
+        period_label=code,
+        academic_year=114,
+        roster_cycle=cycle,
+        trigger_type=RosterTriggerType.MANUAL,
+        status=status,
+        created_by=seeded["admin"].id,
+        started_at=datetime.now(timezone.utc),
+    )
+
+
+def _item(roster: PaymentRoster, student: str, application_id: int = 1, is_included: bool = True) -> PaymentRosterItem:
+    return PaymentRosterItem(
+        roster=roster,
+        application_id=application_id,
+        student_id_number=f"A{student}",
+        student_number=student,
+        student_name="Student",
+        scholarship_name="RML Scholarship",
+        scholarship_amount=10000,
+        is_included=is_included,
+    )
+
+
+async def _ledger(db) -> dict:
+    rows = (
+        await db.execute(
+            select(
+                ReceivedMonthsSystemLedger.student_number,
+                ReceivedMonthsSystemLedger.system_months,
+                ReceivedMonthsSystemLedger.paid_months,
+            )
+        )
+    ).all()
+    return {student: (system, paid) for student, system, paid in rows}
+
+
+async def _aggregate(db, seeded, students) -> dict:
+    settings.received_months_ledger_enabled = False
+    try:
+        return await calculate_received_months_bulk_async(db, students, seeded["config"].id)
+    finally:
+        settings.received_months_ledger_enabled = True
+
+
+async def test_creating_items_materializes_rows(db, seeded):
+    monthly = _roster(seeded, "RML-M", RosterCycle.MONTHLY)
+    half = _roster(seeded, "RML-H", RosterCycle.SEMI_YEARLY, status=RosterStatus.DRAFT)
+    db.add_all([_item(monthly, STUDENT), _item(half, STUDENT), _item(monthly, OTHER, is_included=False)])
+    await db.commit()
+
+    # 1 + 6 system months; only the COMPLETED monthly roster is paid out.
+    assert await _ledger(db) == {STUDENT: (7, 1)}
+    ledger = await calculate_received_months_bulk_async(db, [STUDENT, OTHER], seeded["config"].id)
+    assert ledger == {STUDENT: 7, OTHER: 0}
+    assert ledger == await _aggregate(db, seeded, [STUDENT, OTHER])
+
+
+async def test_exclude_restore_and_lock(db, seeded):
+    roster = _roster(seeded, "RML-Y", RosterCycle.YEARLY, status=RosterStatus.DRAFT)
+    item = _item(roster, STUDENT)
+    db.add(item)
+    await db.commit()
+    assert await _ledger(db) == {STUDENT: (12, 0)}
+
+    item.is_included = False
+    await db.commit()
+    assert await _ledger(db) == {}
+
+    item.is_included = True
+    await db.commit()
+    roster.status = RosterStatus.LOCKED
+    await db.commit()
+    assert await _ledger(db) == {STUDENT: (12, 12)}
+
+
+async def test_student_number_correction_moves_the_row(db, seeded):
+    roster = _roster(seeded, "RML-C", RosterCycle.MONTHLY)
+    item = _item(roster, STUDENT)
+    db.add(item)
+    await db.commit()
+
+    item.student_number = OTHER
+    await db.commit()
+    assert await _ledger(db) == {OTHER: (1, 1)}
+
+
+async def test_bulk_dml_and_roster_delete(db, seeded):
+    roster = _roster(seeded, "RML-B", RosterCycle.MONTHLY)
+    db.add_all([_item(roster, STUDENT), _item(roster, OTHER)])
+    await db.commit()
+
+    await db.execute(
+        update(PaymentRosterItem).where(PaymentRosterItem.student_number == OTHER).values(is_included=False)
+    )
+    await db.commit()
+    assert await _ledger(db) == {STUDENT: (1, 1)}
+
+    await db.execute(update(PaymentRoster).where(PaymentRoster.id == roster.id).values(status=RosterStatus.DRAFT))
+    await db.commit()
+    assert await _ledger(db) == {STUDENT: (1, 0)}
+
+    await db.execute(delete(PaymentRosterItem).where(PaymentRosterItem.roster_id == roster.id))
+    await db.commit()
+    assert await _ledger(db) == {}
+
+    second = _roster(seeded, "RML-D", RosterCycle.MONTHLY)
+    db.add(_item(second, STUDENT))
+    await db.commit()
+    await db.refresh(second, ["items"])
+    await db.delete(second)
+    await db.commit()
+    assert await _ledger(db) == {}
+
+
+async def test_rollback_discards_ledger_changes(db, seeded):
+    roster = _roster(seeded, "RML-R", RosterCycle.MONTHLY)
+    db.add(_item(roster, STUDENT))
+    await db.flush()
+    assert await _ledger(db) == {STUDENT: (1, 1)}
+
+    await db.rollback()
+    assert await _ledger(db) == {}
+
+
+async def test_application_soft_delete_only_moves_paid_months(db, seeded):
+    student = User(nycu_id=STUDENT, name="S", email="s@nycu.edu.tw", user_type=UserType.student, role=UserRole.student)
+    db.add(student)
+    await db.flush()
+    application = Application(
+        app_id="APP-RML-1",
+        user_id=student.id,
+        scholarship_type_id=seeded["type"].id,
+        scholarship_configuration_id=seeded["config"].id,
+        academic_year=114,
+        sub_type_selection_mode="single",
+        status="approved",
+    )
+    db.add(application)
+    await db.flush()
+    db.add(_item(_roster(seeded, "RML-A", RosterCycle.MONTHLY), STUDENT, application_id=application.id))
+    await db.commit()
+
+    application.deleted_at = datetime.now(timezone.utc)
+    await db.commit()
+    assert await _ledger(db) == {STUDENT: (1, 0)}
+    assert await get_paid_months_by_type_async(db, STUDENT) == {seeded["type"].id: 0}
+
+    # A bulk status change cannot move a ledger row: only the UPDATE itself runs.
+    with track_queries() as stats:
+        await db.execute(update(Application).where(Application.id == application.id).values(status="rejected"))
+    assert stats.count == 1
+
+    # Restoring through a bulk UPDATE of deleted_at does refresh the row.
+    await db.execute(update(Application).where(Application.id == application.id).values(deleted_at=None))
+    await db.commit()
+    assert await _ledger(db) == {STUDENT: (1, 1)}
+
+
+async def test_history_total_matches_payment_scan(db, seeded):
+    db.add_all(
+        [
+            _item(_roster(seeded, "RML-T1", RosterCycle.MONTHLY, status=RosterStatus.LOCKED), STUDENT),
+            _item(_roster(seeded, "RML-T2", RosterCycle.SEMI_YEARLY), STUDENT),
+            _item(_roster(seeded, "RML-T3", RosterCycle.YEARLY, status=RosterStatus.DRAFT), STUDENT),
+        ]
+    )
+    await db.commit()
+    service = StudentScholarshipHistoryService()
+
+    from_ledger = await service.get_total_received_months(db, STUDENT)
+    settings.received_months_ledger_enabled = False
+    try:
+        from_scan = await service.get_total_received_months(db, STUDENT)
+    finally:
+        settings.received_months_ledger_enabled = True
+    assert from_ledger == from_scan == 7
+
+
+def test_verify_detects_drift_and_rebuild_repairs(db_sync):
+    from app.services.received_months_service import calculate_received_months, rebuild_ledger, verify_ledger
+
+    admin = User(nycu_id="rml_sync", name="A", email="a@nycu.edu.tw", user_type=UserType.employee, role=UserRole.admin)
+    stype = ScholarshipType(code="rml_sync", name="RML Sync")
+    db_sync.add_all([admin, stype])
+    db_sync.flush()
+    cfg = ScholarshipConfiguration(
+        config_code="RML-SYNC", config_name="c", scholarship_type_id=stype.id, academic_year=114, amount=1
+    )
+    db_sync.add(cfg)
+    db_sync.flush()
+    roster = _roster({"config": cfg, "admin": admin}, "RML-S", RosterCycle.SEMI_YEARLY)
+    db_sync.add(_item(roster, STUDENT))
+    db_sync.commit()
+    assert verify_ledger(db_sync) == []
+    assert calculate_received_months(db_sync, STUDENT, cfg.id) == 6
+
+    # Raw SQL bypasses the hooks.
+    db_sync.execute(text("UPDATE received_months_system_ledger SET system_months = 99"))
+    db_sync.execute(text("DELETE FROM payment_roster_items WHERE student_number = :s"), {"s": "nobody"})
+    db_sync.commit()
+    drifts = verify_ledger(db_sync)
+    assert [(d.student_number, d.expected_system, d.actual_system) for d in drifts] == [(STUDENT, 6, 99)]
+
+    assert rebuild_ledger(db_sync) == 1
+    db_sync.commit()
+    assert verify_ledger(db_sync) == []
+    assert calculate_received_months(db_sync, STUDENT, cfg.id) == 6
@@ -51,6 +51,13 @@ from app.models.payment_roster import (  # noqa: E402
 )
 
 
+@pytest.fixture(autouse=True)
+def ledger_disabled(monkeypatch):
+    """Only the roster tables exist here, so read the aggregate path and keep
+    the ledger write hooks (which need received_months_system_ledger) off."""
+    monkeypatch.setattr(settings, "received_months_ledger_enabled", False)
+
+
 @pytest.fixture
 def db() -> Generator[Session, None, None]:
     """Fresh in-memory SQLite DB per test."""
@@ -0,0 +1,316 @@
+"""Tests for app.core.refdata_catalog.
+
+Pins the snapshot contract (indexes, read-only records that duck-type the
+ORM read helpers), the generation protocol (commit hooks drop the snapshot,
+a moved Redis generation forces a rebuild) and parity of the catalog-backed
+ManualDistributionService.get_quota_status with the query path.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import cache as cache_mod
+from app.core import refdata_catalog
+from app.core.config import settings
+from app.core.refdata_catalog import FrozenDict, FrozenList, build_catalog, get_refdata_catalog
+from app.models.enums import Semester
+from app.models.scholarship import ScholarshipConfiguration, ScholarshipRule, ScholarshipSubTypeConfig, ScholarshipType
+from app.models.user import User, UserRole, UserType
+from app.services.manual_distribution_service import ManualDistributionService
+
+
+class FakeRedis:
+    """Async get / incr; ``broken`` simulates an outage."""
+
+    def __init__(self) -> None:
+        self.store: dict[bytes, bytes] = {}
+        self.broken = False
+
+    async def get(self, key: bytes) -> Optional[bytes]:
+        if self.broken:
+            raise ConnectionError("redis down")
+        return self.store.get(key)
+
+    async def incr(self, key: bytes) -> int:
+        if self.broken:
+            raise ConnectionError("redis down")
+        value = int(self.store.get(key, b"0")) + 1
+        self.store[key] = str(value).encode()
+        return value
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(cache_mod, "_async_client", fake)
+    monkeypatch.setattr(cache_mod, "_sync_client", fake)
+    monkeypatch.setattr(settings, "refdata_catalog_enabled", True)
+    monkeypatch.setattr(settings, "refdata_catalog_check_interval_seconds", 0)
+    refdata_catalog.reset_for_tests()
+    yield fake
+    refdata_catalog.reset_for_tests()
+
+
+@pytest_asyncio.fixture
+async def seeded(db: AsyncSession):
+    sch = ScholarshipType(code="rc_phd", name="RC PhD", description="x")
+    db.add(sch)
+    await db.commit()
+    db.add_all(
+        [
+            ScholarshipSubTypeConfig(
+                scholarship_type_id=sch.id, sub_type_code="moe_1w", name="教育部", display_order=2, is_active=True
+            ),
+            ScholarshipSubTypeConfig(
+                scholarship_type_id=sch.id, sub_type_code="nstc", name="國科會", display_order=1, is_active=True
+            ),
+            ScholarshipSubTypeConfig(
+                scholarship_type_id=sch.id, sub_type_code="old", name="停用", display_order=0, is_active=False
+            ),
+            ScholarshipRule(
+                scholarship_type_id=sch.id, rule_name="gpa", rule_type="gpa", academic_year=115, priority=1
+            ),
+            ScholarshipRule(
+                scholarship_type_id=sch.id, rule_name="nat", rule_type="nationality", academic_year=115, priority=5
+            ),
+            ScholarshipRule(scholarship_type_id=sch.id, rule_name="tpl", rule_type="gpa", is_template=True, priority=9),
+        ]
+    )
+    prior = ScholarshipConfiguration(
+        scholarship_type_id=sch.id,
+        academic_year=114,
+        semester=None,
+        config_name="rc114",
+        config_code="rc_114",
+        amount=30000,
+        is_active=True,
+        has_college_quota=True,
+        quotas={"nstc": {"A": 2}},
+    )
+    db.add(prior)
+    await db.commit()
+    own = ScholarshipConfiguration(
+        scholarship_type_id=sch.id,
+        academic_year=115,
+        semester=Semester.yearly,
+        config_name="rc115",
+        config_code="rc_115",
+        amount=30000,
+        is_active=True,
+        has_college_quota=True,
+        quotas={"nstc": {"A": 3}, "moe_1w": {"A": 4}},
+        shared_quota_sources=[
+            {"source_config_code": "rc_114", "sub_types": ["nstc"]},
+            {"source_config_code": "missing", "sub_types": ["nstc"]},
+            "garbage",
+        ],
+        previous_config_id=prior.id,
+        effective_end_date=datetime.now(timezone.utc) + timedelta(days=30),
+    )
+    db.add(own)
+    await db.commit()
+    return {"sch": sch, "own": own, "prior": prior}
+
+
+class TestSnapshotLookups:
+    @pytest.mark.asyncio
+    async def test_indexes(self, db, seeded):
+        catalog = await build_catalog(db, generation=0)
+        sch, own, prior = seeded["sch"], seeded["own"], seeded["prior"]
+
+        assert catalog.scholarship_type(sch.id).code == "rc_phd"
+        assert catalog.scholarship_type_by_code("rc_phd").id == sch.id
+        assert catalog.configuration(own.id).config_code == "rc_115"
+        assert catalog.configuration_by_code("rc_114").id == prior.id
+        # "yearly" matches both the explicit enum and a NULL semester.
+        assert catalog.configuration_for(sch.id, 115, "yearly").id == own.id
+        assert catalog.configuration_for(sch.id, 114, "yearly").id == prior.id
+        assert catalog.configuration_for(sch.id, 114, "first") is None
+        assert catalog.active_configuration(sch.id, 115).id == own.id
+
+    @pytest.mark.asyncio
+    async def test_linked_and_previous_chains(self, db, seeded):
+        catalog = await build_catalog(db, generation=0)
+        own = catalog.configuration(seeded["own"].id)
+
+        assert [c.config_code for c in catalog.linked_configurations(own, "nstc")] == ["rc_114"]
+        assert catalog.linked_configurations(own, "moe_1w") == []
+        assert [c.id for c in catalog.previous_chain(own.id)] == [seeded["prior"].id]
+
+    @pytest.mark.asyncio
+    async def test_sub_types_and_rules_ordering(self, db, seeded):
+        catalog = await build_catalog(db, generation=0)
+        sch_id = seeded["sch"].id
+
+        assert [s.sub_type_code for s in catalog.sub_type_configs(sch_id)] == ["nstc", "moe_1w"]
+        assert len(catalog.sub_type_configs(sch_id, active_only=False)) == 3
+        assert [r.rule_name for r in catalog.rules(sch_id, academic_year=115)] == ["nat", "gpa"]
+        assert "tpl" in [r.rule_name for r in catalog.rules(sch_id, include_templates=True)]
+
+    @pytest.mark.asyncio
+    async def test_records_are_read_only_and_duck_type_model_helpers(self, db, seeded):
+        catalog = await build_catalog(db, generation=0)
+        own = catalog.configuration(seeded["own"].id)
+
+        assert isinstance(own.quotas, dict) and isinstance(own.quotas, FrozenDict)
+        assert isinstance(own.shared_quota_sources, FrozenList)
+        with pytest.raises(TypeError):
+            own.quotas["nstc"]["A"] = 99
+        with pytest.raises(TypeError):
+            own.shared_quota_sources.append({})
+        with pytest.raises(AttributeError):
+            own.config_code = "x"
+        assert own.is_effective is True
+        assert own.get_matrix_quota("moe_1w", "A") == 4
+        assert own.get_sub_type_total_quota("nstc") == 3
+        assert own.cycle == "115-yearly"
+
+    @pytest.mark.asyncio
+    async def test_build_leaves_identity_map_untouched(self, db, seeded):
+        db.expunge_all()
+        await build_catalog(db, generation=0)
+        assert len(db.identity_map) == 0
+
+
+class TestGeneration:
+    @pytest.mark.asyncio
+    async def test_disabled_returns_none(self, db, monkeypatch):
+        monkeypatch.setattr(settings, "refdata_catalog_enabled", False)
+        assert await get_refdata_catalog(db) is None
+
+    @pytest.mark.asyncio
+    async def test_snapshot_reused_until_refdata_commit(self, db, seeded, fake_redis):
+        first = await get_refdata_catalog(db)
+        assert await get_refdata_catalog(db) is first
+
+        # A commit that touches no reference table keeps the snapshot.
+        db.add(User(nycu_id="rc_u", name="U", user_type=UserType.student, role=UserRole.student))
+        await db.commit()
+        assert await get_refdata_catalog(db) is first
+
+        own = await db.get(ScholarshipConfiguration, seeded["own"].id)
+        own.config_name = "renamed"
+        await db.commit()
+        await cache_mod.wait_for_signals()
+
+        second = await get_refdata_catalog(db)
+        assert second is not first
+        assert second.generation == first.generation + 1
+        assert second.configuration(own.id).config_name == "renamed"
+
+    @pytest.mark.asyncio
+    async def test_bulk_update_bumps_generation(self, db, seeded, fake_redis):
+        first = await get_refdata_catalog(db)
+        await db.execute(
+            update(ScholarshipConfiguration)
+            .where(ScholarshipConfiguration.id == seeded["prior"].id)
+            .values(config_name="bulk")
+        )
+        await db.commit()
+
+        second = await get_refdata_catalog(db)
+        assert second is not first
+        assert second.configuration(seeded["prior"].id).config_name == "bulk"
+
+    @pytest.mark.asyncio
+    async def test_rollback_does_not_bump(self, db, seeded, fake_redis):
+        first = await get_refdata_catalog(db)
+        own = await db.get(ScholarshipConfiguration, seeded["own"].id)
+        own.config_name = "discarded"
+        await db.flush()
+        await db.rollback()
+
+        assert await get_refdata_catalog(db) is first
+
+    @pytest.mark.asyncio
+    async def test_remote_generation_change_triggers_rebuild(self, db, seeded, fake_redis):
+        first = await get_refdata_catalog(db)
+        # Another worker committed a change.
+        await fake_redis.incr((cache_mod.KEY_PREFIX + refdata_catalog.GENERATION_KEY).encode())
+
+        second = await get_refdata_catalog(db)
+        assert second is not first
+        assert second.generation == 1
+
+    @pytest.mark.asyncio
+    async def test_check_interval_throttles_redis(self, db, seeded, fake_redis, monkeypatch):
+        monkeypatch.setattr(settings, "refdata_catalog_check_interval_seconds", 3600)
+        first = await get_refdata_catalog(db)
+        await fake_redis.incr((cache_mod.KEY_PREFIX + refdata_catalog.GENERATION_KEY).encode())
+
+        assert await get_refdata_catalog(db) is first
+
+    @pytest.mark.asyncio
+    async def test_redis_outage_rebuilds_after_max_age(self, db, seeded, fake_redis, monkeypatch):
+        first = await get_refdata_catalog(db)
+        fake_redis.broken = True
+
+        assert await get_refdata_catalog(db) is first
+
+        monkeypatch.setattr(settings, "refdata_catalog_max_age_seconds", 0)
+        second = await get_refdata_catalog(db)
+        assert second is not first
+        assert second.generation == first.generation
+
+    @pytest.mark.asyncio
+    async def test_commit_hook_does_not_wait_for_redis(self, db, seeded, fake_redis):
+        await get_refdata_catalog(db)
+        fake_redis.broken = True
+        own = await db.get(ScholarshipConfiguration, seeded["own"].id)
+        own.config_name = "offline"
+        await db.commit()
+        await cache_mod.wait_for_signals()
+
+        # The local snapshot is dropped even though the INCR failed.
+        assert refdata_catalog._current is None
+
+
+class TestWritePathsReadTheDatabase:
+    @pytest.mark.asyncio
+    async def test_allocation_checks_ignore_a_stale_snapshot(self, db, seeded, fake_redis, monkeypatch):
+        monkeypatch.setattr(settings, "refdata_catalog_check_interval_seconds", 3600)
+        svc = ManualDistributionService(db)
+        own, prior = seeded["own"], seeded["prior"]
+        stale = await get_refdata_catalog(db)
+
+        # rc_115 also lists a source "missing"; it is created, but this worker
+        # has not seen the new generation yet.
+        late = ScholarshipConfiguration(
+            scholarship_type_id=seeded["sch"].id,
+            academic_year=113,
+            config_name="late",
+            config_code="missing",
+            amount=30000,
+            is_active=True,
+            quotas={"nstc": {"A": 1}},
+        )
+        db.add(late)
+        await db.commit()
+        refdata_catalog._current = stale
+
+        # The read path still serves the snapshot; the allocation check does not.
+        assert [c.id for c in await svc._resolve_linked_configs(own, "nstc")] == [prior.id]
+        assert await svc._allowed_config_ids(own, "nstc") == {own.id, prior.id, late.id}
+
+
+class TestQuotaStatusParity:
+    @pytest.mark.asyncio
+    async def test_catalog_path_matches_query_path(self, db, seeded, fake_redis, monkeypatch):
+        svc = ManualDistributionService(db)
+        sch_id = seeded["sch"].id
+
+        monkeypatch.setattr(settings, "refdata_catalog_enabled", False)
+        from_queries = await svc.get_quota_status(sch_id, 115, "yearly")
+        monkeypatch.setattr(settings, "refdata_catalog_enabled", True)
+        from_catalog = await svc.get_quota_status(sch_id, 115, "yearly")
+
+        assert from_catalog == from_queries
+        assert from_catalog["nstc"]["display_name"] == "國科會"
+        assert {c["config_code"] for c in from_catalog["nstc"]["by_config"]} == {"rc_115", "rc_114"}
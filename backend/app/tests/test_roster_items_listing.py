@@ -0,0 +1,214 @@
+"""GET /payment-rosters/{id}/items — projection listing + keyset paging.
+
+The list returns column projections only (no excel_row_data /
+verification_snapshot / rule_validation_result / bank_verification_details
+and no Application load); 學院/系所 come from the per-item snapshot taken at
+generation time. The heavy blobs are served by GET /{id}/items/{item_id}.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import Mock
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import event
+
+from app.models.application import Application, SubTypeSelectionMode
+from app.models.payment_roster import (
+    PaymentRoster,
+    PaymentRosterItem,
+    RosterCycle,
+    RosterStatus,
+    RosterTriggerType,
+    StudentVerificationStatus,
+)
+from app.models.user import User, UserRole
+
+BASE_TIME = datetime(2026, 3, 1, 8, 0, tzinfo=timezone.utc)
+
+
+@pytest_asyncio.fixture
+async def admin_client(client: AsyncClient):
+    from app.core.deps import get_current_user
+    from app.main import app
+
+    admin = Mock(spec=User)
+    admin.id = 1
+    admin.role = UserRole.admin
+    admin.has_role.side_effect = lambda role: admin.role == role
+    app.dependency_overrides[get_current_user] = lambda: admin
+    yield client
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+def _item(roster_id: int, n: int, **overrides) -> PaymentRosterItem:
+    values = dict(
+        roster_id=roster_id,
+        application_id=1000 + n,
+        student_id_number=f"A1000000{n:02d}",
+        student_number=f"31255{n:04d}",
+        student_name=f"學生{n}",
+        college_code="E",
+        college_name="電機學院",
+        department_name="電機工程學系",
+        scholarship_name="博士生獎學金",
+        scholarship_amount=Decimal("40000"),
+        verification_status=StudentVerificationStatus.VERIFIED,
+        is_included=True,
+        rule_validation_result={"is_eligible": True, "details": {"rule_1": {"rule_name": "GPA", "passed": True}}},
+        warning_rules=[],
+        failed_rules=[],
+        verification_snapshot={"student_info": {"std_pid": "A100000000"}},
+        excel_row_data={"學號": f"31255{n:04d}"},
+        bank_verification_details={"ocr": "x" * 100},
+        # Several rows share a timestamp so the id tie-breaker is exercised.
+        created_at=BASE_TIME + timedelta(seconds=n // 3),
+    )
+    values.update(overrides)
+    return PaymentRosterItem(**values)
+
+
+@pytest_asyncio.fixture
+async def roster(db) -> PaymentRoster:
+    r = PaymentRoster(
+        roster_code="ROSTER-LIST-1",
+        scholarship_configuration_id=1,
+        period_label="2026-03",
+        academic_year=114,
+        roster_cycle=RosterCycle.MONTHLY,
+        status=RosterStatus.COMPLETED,
+        trigger_type=RosterTriggerType.MANUAL,
+        created_by=1,
+    )
+    db.add(r)
+    await db.commit()
+    await db.refresh(r)
+    db.add_all([_item(r.id, n) for n in range(7)])
+    await db.commit()
+    return r
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_every_item_once_in_order(admin_client, roster):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        resp = await admin_client.get(f"/api/v1/payment-rosters/{roster.id}/items", params=params)
+        assert resp.status_code == 200, resp.text
+        page = resp.json()["data"]
+        assert len(page["items"]) <= 3
+        seen.extend(it["id"] for it in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 7
+    assert seen == sorted(seen)
+
+
+@pytest.mark.asyncio
+async def test_list_rows_are_projections_without_heavy_json(admin_client, roster):
+    resp = await admin_client.get(f"/api/v1/payment-rosters/{roster.id}/items")
+    first = resp.json()["data"]["items"][0]
+
+    for heavy in ("rule_validation_result", "verification_snapshot", "excel_row_data", "bank_verification_details"):
+        assert heavy not in first
+    assert first["is_eligible"] is True
+    assert first["student_id"] == "312550000"
+    assert first["college_code"] == "E"
+    assert first["department_name"] == "電機工程學系"
+    assert first["allocation_year"] == 114
+
+
+@pytest.mark.asyncio
+async def test_list_never_loads_applications(admin_client, roster, db):
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):  # noqa: ARG001
+        statements.append(statement.lower())
+
+    engine = db.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        resp = await admin_client.get(f"/api/v1/payment-rosters/{roster.id}/items")
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+    assert resp.status_code == 200
+    assert not any("from applications" in s for s in statements)
+
+
+@pytest.mark.asyncio
+async def test_legacy_items_fall_back_to_application_snapshot(admin_client, db):
+    application = Application(
+        app_id="APP-2026-LEGACY1",
+        user_id=1,
+        scholarship_type_id=1,
+        sub_type_selection_mode=SubTypeSelectionMode.single,
+        academic_year=114,
+        student_data={
+            "std_stdcode": "311000001",
+            "trm_academyno": "C",
+            "trm_academyname": "資訊學院",
+            "trm_depname": "資訊工程學系",
+        },
+    )
+    r = PaymentRoster(
+        roster_code="ROSTER-LIST-LEGACY",
+        scholarship_configuration_id=1,
+        period_label="2026-03",
+        academic_year=114,
+        roster_cycle=RosterCycle.MONTHLY,
+        status=RosterStatus.COMPLETED,
+        trigger_type=RosterTriggerType.MANUAL,
+        created_by=1,
+    )
+    db.add_all([application, r])
+    await db.commit()
+    db.add(
+        _item(
+            r.id,
+            0,
+            application_id=application.id,
+            student_number=None,
+            college_code=None,
+            college_name=None,
+            department_name=None,
+        )
+    )
+    await db.commit()
+
+    resp = await admin_client.get(f"/api/v1/payment-rosters/{r.id}/items")
+    item = resp.json()["data"]["items"][0]
+    assert item["student_id"] == "311000001"
+    assert item["college_code"] == "C"
+    assert item["college_name"] == "資訊學院"
+    assert item["department_name"] == "資訊工程學系"
+
+
+@pytest.mark.asyncio
+async def test_detail_endpoint_returns_heavy_snapshots(admin_client, roster, db):
+    item_id = (await admin_client.get(f"/api/v1/payment-rosters/{roster.id}/items")).json()["data"]["items"][0]["id"]
+
+    resp = await admin_client.get(f"/api/v1/payment-rosters/{roster.id}/items/{item_id}")
+    assert resp.status_code == 200
+    data = resp.json()["data"]
+    assert data["rule_validation_result"]["details"]["rule_1"]["rule_name"] == "GPA"
+    assert data["excel_row_data"] == {"學號": "312550000"}
+    assert data["bank_verification_details"]["ocr"].startswith("x")
+    assert data["student_id"] == "312550000"
+
+    missing = await admin_client.get(f"/api/v1/payment-rosters/{roster.id}/items/999999")
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_rejected(admin_client, roster):
+    resp = await admin_client.get(f"/api/v1/payment-rosters/{roster.id}/items", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
@@ -0,0 +1,94 @@
+"""Synthetic benchmark data (app.db.synthetic_data) and the hot paths it feeds.
+
+A small dataset is enough to check that the generator is deterministic and
+that every service ``scripts/bench_hot_paths.py`` times runs on it.
+"""
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.synthetic_data import SUB_TYPES, build_synthetic_dataset
+from app.models.application import Application
+from app.models.user import User
+from app.services.analytics_service import ScholarshipAnalyticsService
+from app.services.application_service import ApplicationService
+from app.services.college_review_service import CollegeReviewService
+from app.services.manual_distribution_service import ManualDistributionService
+
+
+async def _build(db: AsyncSession, students: int = 80, seed: int = 7):
+    return await db.run_sync(lambda session: build_synthetic_dataset(session, students=students, seed=seed))
+
+
+async def _snapshot(db: AsyncSession):
+    result = await db.execute(
+        select(Application.app_id, Application.status, Application.sub_scholarship_type).order_by(Application.app_id)
+    )
+    return result.all()
+
+
+@pytest.mark.asyncio
+async def test_same_seed_same_rows(db: AsyncSession, db_sync):
+    dataset = await _build(db)
+    other = build_synthetic_dataset(db_sync, students=80, seed=7)
+
+    assert (dataset.application_count, dataset.allocated_count) == (80, other.allocated_count)
+    assert dataset.ranking_ids == other.ranking_ids
+    rows = await _snapshot(db)
+    assert len(rows) == 80
+    assert [tuple(row) for row in rows] == [
+        tuple(row)
+        for row in db_sync.execute(
+            select(Application.app_id, Application.status, Application.sub_scholarship_type).order_by(
+                Application.app_id
+            )
+        ).all()
+    ]
+
+
+@pytest.mark.asyncio
+async def test_hot_paths_run_on_the_dataset(db: AsyncSession):
+    dataset = await _build(db)
+    approved = (
+        await db.execute(select(func.count()).select_from(Application).where(Application.status == "approved"))
+    ).scalar()
+    assert approved == dataset.allocated_count > 0
+
+    quota = await ManualDistributionService(db).get_quota_status(
+        dataset.scholarship_type_id, dataset.academic_year, "yearly"
+    )
+    assert set(quota) == {code for code, _ in SUB_TYPES}
+    own = [entry for sub_type in quota.values() for entry in sub_type["by_config"] if entry["is_own"]]
+    assert sum(entry["total"] - entry["remaining"] for entry in own) == dataset.allocated_count
+
+    analytics = await ScholarshipAnalyticsService(db).get_comprehensive_analytics(
+        dataset.period_start, dataset.period_end
+    )
+    assert analytics["overview"]["total_applications"] == dataset.application_count
+
+    reviews = await CollegeReviewService(db).get_applications_for_review(
+        scholarship_type_id=dataset.scholarship_type_id, academic_year=dataset.academic_year, college_code="E"
+    )
+    assert reviews
+    assert {item["app_id"] for item in reviews} <= {row.app_id for row in await _snapshot(db)}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("students", [40, 160])
+async def test_listing_query_budgets_do_not_grow_with_rows(db: AsyncSession, query_budget, students):
+    """Per-row lookups (N+1) in these listings show up as a blown budget at 160 students."""
+    dataset = await _build(db, students=students)
+    admin = await db.get(User, dataset.admin_id)
+
+    with query_budget(8, max_duplicates=0):
+        await CollegeReviewService(db).get_applications_for_review(
+            scholarship_type_id=dataset.scholarship_type_id, academic_year=dataset.academic_year, college_code="E"
+        )
+    # Four usage counts run once per sub-type (nstc / moe_1w), not per row.
+    with query_budget(10, max_duplicates=4 * (len(SUB_TYPES) - 1)):
+        await ManualDistributionService(db).get_quota_status(
+            dataset.scholarship_type_id, dataset.academic_year, "yearly"
+        )
+    with query_budget(4, max_duplicates=0):
+        await ApplicationService(db).get_applications(admin, skip=0, limit=100)
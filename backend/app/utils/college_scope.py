@@ -33,11 +33,12 @@ as the follow-up.
 
 from typing import Any, Optional
 
-from sqlalchemy import func
+from sqlalchemy import func, literal_column
 
 from app.models.application import Application
 from app.models.user import User
 from app.utils.application_helpers import get_college_code_from_data
+from app.utils.json_fields import json_text
 
 # Key precedence MUST stay in lock-step with get_college_code_from_data(). A
 # split here is the classic list-vs-detail divergence: an application carrying
@@ -82,15 +83,20 @@ def resolved_college_code_expr() -> Any:
     two answers — exactly the list-vs-detail divergence this module exists to
     prevent.
 
-    ``student_data[key].as_string()`` compiles to ``student_data ->> 'key'`` on
-    PostgreSQL and to ``JSON_EXTRACT(...)`` on SQLite, so the same predicate runs
-    in production *and* in the aiosqlite test suite
-    (``sa_func.json_extract_path_text``, used by ``college_review_service``, is
-    PostgreSQL-only and would blow up the test DB). Only ``std_pid`` is encrypted
-    in ``StudentDataJSON``, so these keys are plaintext and comparable in SQL.
+    ``json_text`` renders ``(student_data ->> 'key')`` with the key inlined on
+    PostgreSQL and ``JSON_EXTRACT(...)`` on SQLite, so the same predicate runs
+    in production *and* in the aiosqlite test suite. On PostgreSQL the whole
+    expression is, token for token, the ``ix_applications_student_data_college_code``
+    index definition (``COLLEGE_CODE_INDEX_SQL`` in ``models/application.py``);
+    the ``''`` is a literal rather than a bind parameter for the same reason.
+    Only ``std_pid`` is encrypted in ``StudentDataJSON``, so these keys are
+    plaintext and comparable in SQL.
     """
     return func.coalesce(
-        *(func.nullif(func.trim(Application.student_data[key].as_string()), "") for key in COLLEGE_CODE_KEYS)
+        *(
+            func.nullif(func.trim(json_text(Application.student_data, key)), literal_column("''"))
+            for key in COLLEGE_CODE_KEYS
+        )
     )
 
 
@@ -0,0 +1,71 @@
+"""SQL text extraction from the JSONB snapshot columns, shaped for their indexes.
+
+``applications.student_data`` / ``submitted_form_data`` are JSONB on
+PostgreSQL, with expression indexes on the snapshot keys the listings filter
+by (``models.application.SNAPSHOT_INDEXED_KEYS``, plus the college-scope
+COALESCE in ``college_scope.resolved_college_code_expr``). The planner only uses an
+expression index when the query contains the *same* expression, so:
+
+  • ``json_extract_path_text(student_data, 'k')`` is a different expression
+    from ``student_data ->> 'k'`` (and only accepts ``json``, not ``jsonb``);
+  • SQLAlchemy's ``student_data['k'].as_string()`` sends the key as a bound
+    parameter, which a generic (prepared) plan cannot match against the
+    index definition.
+
+``json_text`` renders ``(column ->> 'k')`` with the key inlined on
+PostgreSQL. Other dialects (SQLite in the test suite) get the usual
+``column['k'].as_string()`` — ``JSON_EXTRACT`` — so the same predicates run
+everywhere.
+"""
+
+from typing import Any
+
+from sqlalchemy import String
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import coercions, roles
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.visitors import InternalTraversal
+
+from app.models.application import Application
+
+
+class json_text(ColumnElement[str]):
+    """``column ->> 'field'`` as text, with the field name inlined on PostgreSQL."""
+
+    __visit_name__ = "json_text"
+    inherit_cache = True
+    type = String()
+
+    _traverse_internals = [
+        ("column", InternalTraversal.dp_clauseelement),
+        ("field", InternalTraversal.dp_string),
+    ]
+
+    def __init__(self, column: Any, field: str) -> None:
+        self.column = coercions.expect(roles.ExpressionElementRole, column)
+        self.field = field
+
+    @property
+    def _from_objects(self):
+        return self.column._from_objects
+
+
+@compiles(json_text)
+def _compile_json_text(element: json_text, compiler: Any, **kw: Any) -> str:
+    return compiler.process(element.column[element.field].as_string(), **kw)
+
+
+@compiles(json_text, "postgresql")
+def _compile_json_text_postgresql(element: json_text, compiler: Any, **kw: Any) -> str:
+    field = compiler.render_literal_value(element.field, String())
+    return f"({compiler.process(element.column, **kw)} ->> {field})"
+
+
+def student_field(key: str) -> json_text:
+    """``applications.student_data ->> key`` (the SIS snapshot)."""
+    return json_text(Application.student_data, key)
+
+
+def form_field(key: str) -> json_text:
+    """``applications.submitted_form_data ->> key``."""
+    return json_text(Application.submitted_form_data, key)
@@ -0,0 +1,50 @@
+"""
+Scheduler worker process
+獨立排程程序：只跑 APScheduler，不提供 HTTP
+
+Usage:
+    python -m app.worker
+
+API 節點設 ENABLE_SCHEDULER=false 時，排程改由此程序負責；可以起多個，
+彼此以 Redis 租約選出唯一的領導者（app.core.leader_election），
+其餘待命，領導者停止或當機後自動接手。
+"""
+
+import asyncio
+import logging
+import signal
+
+from app.services.roster_scheduler_service import shutdown_scheduler, start_scheduler_election
+
+logger = logging.getLogger(__name__)
+
+
+async def run_worker() -> None:
+    """Stand for scheduler leadership until SIGTERM / SIGINT"""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    # 不看 settings.enable_scheduler：該旗標是給 API 節點關閉內建排程用的
+    elector = await start_scheduler_election()
+    logger.info("Scheduler worker %s started", elector.identity)
+    try:
+        await stop.wait()
+    finally:
+        logger.info("Scheduler worker %s stopping", elector.identity)
+        await elector.stop()
+        await shutdown_scheduler()
+
+
+def main():
+    """Main entry point for the scheduler worker"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    asyncio.run(run_worker())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""Benchmark suite: hot service paths over deterministic synthetic data.
+
+Fills an empty database with ``app.db.synthetic_data`` (N students with
+applications across colleges and sub-types, professor reviews, distributed
+college rankings and a matrix quota) and times, in-process:
+
+  roster_generate       RosterService.generate_roster (yearly period, matrix mode)
+  roster_excel_export   ExcelExportService.export_roster_to_excel of that roster
+  quota_status          ManualDistributionService.get_quota_status
+  analytics             ScholarshipAnalyticsService.get_comprehensive_analytics
+  application_listing   ApplicationService.get_applications (admin, first page)
+  college_review_list   CollegeReviewService.get_applications_for_review (largest college)
+
+Each case runs ``--repeat`` times on a fresh session; results (min / median /
+max ms plus the run parameters) go to ``--output`` as JSON. With
+``--baseline`` the medians are compared against an earlier result file and
+the script exits 1 when a case is slower by more than ``--tolerance``.
+
+    # against a dedicated, EMPTY PostgreSQL database (recommended)
+    DATABASE_URL=postgresql+asyncpg://u:p@localhost/bench \\
+    DATABASE_URL_SYNC=postgresql://u:p@localhost/bench \\
+        python scripts/bench_hot_paths.py --students 5000 --output bench/after.json --baseline bench/before.json
+
+    # quick run on a throwaway SQLite file when DATABASE_URL is unset
+    cd backend && python scripts/bench_hot_paths.py --students 1000
+
+The schema is created with ``Base.metadata.create_all``; the script refuses
+to run against a database that already holds applications.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+if "DATABASE_URL" not in os.environ:
+    _sqlite_path = Path(tempfile.mkdtemp(prefix="bench-hot-paths-")) / "bench.db"
+    os.environ.update(
+        TESTING="true",
+        DATABASE_URL=f"sqlite+aiosqlite:///{_sqlite_path}",
+        DATABASE_URL_SYNC=f"sqlite:///{_sqlite_path}",
+    )
+os.environ.setdefault("ENVIRONMENT", "development")
+os.environ.setdefault("SECRET_KEY", "bench-hot-paths-secret-key-not-for-production")
+# Required settings; the export case never uploads (skip_minio_upload).
+os.environ.setdefault("MINIO_ACCESS_KEY", "bench")
+os.environ.setdefault("MINIO_SECRET_KEY", "bench")
+
+from sqlalchemy import create_engine, func, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.db.base_class import Base  # noqa: E402
+from app.db.synthetic_data import COLLEGES, build_synthetic_dataset  # noqa: E402
+from app.main import app as _app  # noqa: E402,F401  (registers every model)
+from app.models.application import Application  # noqa: E402
+from app.models.payment_roster import RosterCycle, RosterTriggerType  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.analytics_service import ScholarshipAnalyticsService  # noqa: E402
+from app.services.application_service import ApplicationService  # noqa: E402
+from app.services.college_review_service import CollegeReviewService  # noqa: E402
+from app.services.excel_export_service import ExcelExportService  # noqa: E402
+from app.services.manual_distribution_service import ManualDistributionService  # noqa: E402
+from app.services.roster_service import RosterService  # noqa: E402
+
+
+def _timed(fn) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+async def _timed_async(fn) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    await fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def _summary(runs: list) -> dict:
+    return {
+        "min_ms": round(min(runs), 3),
+        "median_ms": round(statistics.median(runs), 3),
+        "max_ms": round(max(runs), 3),
+        "runs_ms": [round(run, 3) for run in runs],
+    }
+
+
+def run_sync_cases(session_factory, dataset, repeat: int, selected: set) -> dict:
+    results = {}
+    generate = dict(
+        scholarship_configuration_id=dataset.configuration_id,
+        period_label=str(dataset.academic_year),
+        roster_cycle=RosterCycle.YEARLY,
+        academic_year=dataset.academic_year,
+        created_by_user_id=dataset.admin_id,
+        trigger_type=RosterTriggerType.MANUAL,
+        student_verification_enabled=False,
+    )
+
+    rosters, runs = [], []
+    for attempt in range(repeat):
+        with session_factory() as db:
+            service = RosterService(db)
+            runs.append(
+                _timed(lambda: rosters.append(service.generate_roster(force_regenerate=attempt > 0, **generate)))
+            )
+            db.commit()
+    roster_id = rosters[-1].id
+    if "roster_generate" in selected:
+        results["roster_generate"] = _summary(runs)
+
+    if "roster_excel_export" in selected:
+        export_dir = tempfile.mkdtemp(prefix="bench-roster-export-")
+        settings.roster_export_dir = export_dir
+        runs = []
+        for _ in range(repeat):
+            with session_factory() as db:
+                roster = RosterService(db).get_roster_by_id(roster_id)
+                service = ExcelExportService()
+                runs.append(_timed(lambda: service.export_roster_to_excel(roster, skip_minio_upload=True)))
+        results["roster_excel_export"] = _summary(runs)
+    return results
+
+
+async def run_async_cases(session_factory, dataset, repeat: int, selected: set) -> dict:
+    async with session_factory() as db:
+        admin = await db.get(User, dataset.admin_id)
+    college = COLLEGES[0][0]  # the largest college
+
+    cases = {
+        "quota_status": lambda db: ManualDistributionService(db).get_quota_status(
+            dataset.scholarship_type_id, dataset.academic_year, "yearly"
+        ),
+        "analytics": lambda db: ScholarshipAnalyticsService(db).get_comprehensive_analytics(
+            dataset.period_start, dataset.period_end
+        ),
+        "application_listing": lambda db: ApplicationService(db).get_applications(admin, skip=0, limit=100),
+        "college_review_list": lambda db: CollegeReviewService(db).get_applications_for_review(
+            scholarship_type_id=dataset.scholarship_type_id,
+            academic_year=dataset.academic_year,
+            college_code=college,
+        ),
+    }
+    results = {}
+    for name, case in cases.items():
+        if name not in selected:
+            continue
+        runs = []
+        for _ in range(repeat):
+            async with session_factory() as db:
+                runs.append(await _timed_async(lambda: case(db)))
+        results[name] = _summary(runs)
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Print the median ratio per case; return the names of regressed cases."""
+    regressions = []
+    print(f"{'case':22}{'baseline':>12}{'now':>12}{'ratio':>8}")
+    for name, result in results["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            print(f"{name:22}{'—':>12}{result['median_ms']:>12.1f}{'new':>8}")
+            continue
+        ratio = result["median_ms"] / before["median_ms"] if before["median_ms"] else float("inf")
+        flag = "  REGRESSION" if ratio > 1 + tolerance else ""
+        print(f"{name:22}{before['median_ms']:>12.1f}{result['median_ms']:>12.1f}{ratio:>8.2f}{flag}")
+        if flag:
+            regressions.append(name)
+    if baseline.get("meta", {}).get("students") != results["meta"]["students"]:
+        print("warning: baseline was recorded with a different --students; ratios are not comparable")
+    return regressions
+
+
+ALL_CASES = (
+    "roster_generate",
+    "roster_excel_export",
+    "quota_status",
+    "analytics",
+    "application_listing",
+    "college_review_list",
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=20261019)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--cases", nargs="*", choices=ALL_CASES, default=list(ALL_CASES))
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="earlier results JSON to compare medians against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed median slowdown (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    sync_engine = create_engine(settings.database_url_sync)
+    async_engine = create_async_engine(settings.database_url)
+    Base.metadata.create_all(sync_engine)
+    sync_sessions = sessionmaker(sync_engine, class_=Session, expire_on_commit=False)
+    async_sessions = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    with sync_sessions() as db:
+        if db.execute(select(func.count()).select_from(Application)).scalar():
+            print("refusing to run: the database already has applications (use an empty, dedicated database)")
+            return 2
+        built = {}
+        build_ms = _timed(lambda: built.update(dataset=build_synthetic_dataset(db, args.students, args.seed)))
+    dataset = built["dataset"]
+    print(
+        f"synthetic data: {dataset.application_count} applications, {dataset.allocated_count} allocated, "
+        f"{len(dataset.ranking_ids)} rankings ({build_ms:.0f} ms) on {sync_engine.dialect.name}"
+    )
+
+    selected = set(args.cases)
+    results = {}
+    results.update(run_sync_cases(sync_sessions, dataset, args.repeat, selected))
+    results.update(asyncio.run(run_async_cases(async_sessions, dataset, args.repeat, selected)))
+    asyncio.run(async_engine.dispose())
+    sync_engine.dispose()
+
+    report = {
+        "meta": {
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "dialect": sync_engine.dialect.name,
+            "students": args.students,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "applications": dataset.application_count,
+            "allocated": dataset.allocated_count,
+        },
+        "results": results,
+    }
+    print(f"{'case':22}{'min ms':>10}{'median ms':>12}{'max ms':>10}")
+    for name, result in results.items():
+        print(f"{name:22}{result['min_ms']:>10.1f}{result['median_ms']:>12.1f}{result['max_ms']:>10.1f}")
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+        print(f"results written to {args.output}")
+    if args.baseline:
+        regressions = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            print(f"regressed beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""Microbenchmark: BaseHTTPMiddleware stack vs. the pure-ASGI middleware.
+
+Builds two copies of the production middleware stack around one trivial
+JSON endpoint and drives them in-process (no sockets, no HTTP client), so
+the numbers are the middleware overhead plus FastAPI routing only:
+
+  before  the former ``BaseHTTPMiddleware`` versions of MetricsMiddleware
+          and SecurityHeadersMiddleware plus the ``@app.middleware("http")``
+          trace-ID function that main.py used to register
+  after   app.middleware.{request_id,security_headers,metrics}_middleware
+
+Reports requests/second and p50/p99 latency for each.
+
+    cd backend && python scripts/bench_middleware.py [--requests 20000] [--concurrency 32]
+
+Both stacks share the Prometheus registry, so each run adds samples to the
+``/bench`` series of this process only.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from fastapi import FastAPI, Request  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.core.metrics import (  # noqa: E402
+    http_errors_total,
+    http_request_duration_seconds,
+    http_requests_in_progress,
+    http_requests_total,
+    normalize_endpoint,
+)
+from app.middleware.metrics_middleware import MetricsMiddleware  # noqa: E402
+from app.middleware.request_id_middleware import RequestIdMiddleware  # noqa: E402
+from app.middleware.security_headers_middleware import (  # noqa: E402
+    API_CONTENT_SECURITY_POLICY,
+    NO_STORE_CACHE_CONTROL,
+    SecurityHeadersMiddleware,
+)
+
+
+class _LegacyMetricsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        method = request.method
+        endpoint = normalize_endpoint(request.url.path)
+        http_requests_in_progress.labels(method=method).inc()
+        start_time = time.perf_counter()
+        response = await call_next(request)
+        status_code = response.status_code
+        http_requests_total.labels(method=method, endpoint=endpoint, status=str(status_code)).inc()
+        http_request_duration_seconds.labels(method=method, endpoint=endpoint).observe(time.perf_counter() - start_time)
+        if status_code >= 400:
+            http_errors_total.labels(status_code=str(status_code), endpoint=endpoint).inc()
+        http_requests_in_progress.labels(method=method).dec()
+        return response
+
+
+class _LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        if "cache-control" not in response.headers:
+            response.headers["Cache-Control"] = NO_STORE_CACHE_CONTROL
+            response.headers["Pragma"] = "no-cache"
+        content_type = response.headers.get("content-type", "")
+        if content_type.startswith("application/json") and "content-security-policy" not in response.headers:
+            response.headers["Content-Security-Policy"] = API_CONTENT_SECURITY_POLICY
+        return response
+
+
+def _endpoint(app: FastAPI) -> FastAPI:
+    @app.get("/bench")
+    async def bench():
+        return {"ok": True}
+
+    return app
+
+
+def build_before() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(_LegacyMetricsMiddleware)
+    app.add_middleware(_LegacySecurityHeadersMiddleware)
+
+    @app.middleware("http")
+    async def add_trace_id_middleware(request: Request, call_next):
+        trace_id = str(uuid.uuid4())
+        request.state.trace_id = trace_id
+        response = await call_next(request)
+        response.headers["X-Trace-ID"] = trace_id
+        return response
+
+    return _endpoint(app)
+
+
+def build_after() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(RequestIdMiddleware)
+    return _endpoint(app)
+
+
+_SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/bench",
+    "raw_path": b"/bench",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [(b"host", b"bench")],
+    "client": ("127.0.0.1", 1234),
+    "server": ("bench", 80),
+}
+
+
+async def _one_request(app) -> float:
+    received = False
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    status = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    start = time.perf_counter()
+    await app(dict(_SCOPE), receive, send)
+    elapsed = time.perf_counter() - start
+    assert status == [200], status
+    return elapsed
+
+
+async def run(app, requests: int, concurrency: int) -> dict:
+    for _ in range(200):  # warm-up: route compilation, label children
+        await _one_request(app)
+
+    latencies: list = []
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            latencies.append(await _one_request(app))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    results = {}
+    for name, build in (("before", build_before), ("after", build_after)):
+        results[name] = asyncio.run(run(build(), args.requests, args.concurrency))
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, GET /bench")
+    print(f"{'':8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, r in results.items():
+        print(f"{name:8}{r['rps']:>10.0f}{r['p50_ms']:>10.3f}{r['p99_ms']:>10.3f}")
+    print(f"speed-up: {results['after']['rps'] / results['before']['rps']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Benchmark: loading applications with eager vs. lazy std_pid decryption.
+
+Creates an in-memory SQLite table with the ``StudentDataJSON`` column,
+inserts N rows (std_pid encrypted at rest, ~30 other snapshot keys), and
+loads them all through the ORM the way a list endpoint / analytics loop
+does — reading a few snapshot keys but not the ID:
+
+  eager     the former process_result_value (decrypt every row on load)
+  lazy      StudentDataJSON as it is now (decrypt on first std_pid read)
+  skip      lazy, loaded inside skip_pii_decryption()
+  lazy+pid  lazy, but every row's std_pid is read as well (worst case)
+
+    cd backend && python scripts/bench_pii_decryption.py [--rows 10000] [--repeat 9]
+
+Without PII_ENCRYPTION_KEYS the deterministic dev key is used.
+"""
+
+import argparse
+import gc
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+os.environ.setdefault("ENVIRONMENT", "development")
+
+from sqlalchemy import Column, Integer, create_engine, insert, select  # noqa: E402
+from sqlalchemy.orm import Session, declarative_base  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.core.encrypted_json import StudentDataJSON, skip_pii_decryption  # noqa: E402
+from app.core.pii_crypto import decrypt_pii, encrypt_pii, is_encrypted  # noqa: E402
+
+
+class EagerStudentDataJSON(StudentDataJSON):
+    """The load path before lazy decryption: one AES-GCM decrypt per row."""
+
+    cache_ok = True
+
+    def process_result_value(self, value, dialect):
+        if not isinstance(value, dict):
+            return value
+        pid = value.get("std_pid")
+        if not is_encrypted(pid):
+            return value
+        out = dict(value)
+        out["std_pid"] = decrypt_pii(pid)
+        return out
+
+
+Base = declarative_base()
+
+
+class LazyApp(Base):
+    __tablename__ = "bench_applications"
+    id = Column(Integer, primary_key=True)
+    student_data = Column(StudentDataJSON)
+
+
+class EagerApp(Base):
+    __tablename__ = "bench_applications"
+    __table_args__ = {"extend_existing": True}
+    __mapper_args__ = {"concrete": True}
+    id = Column(Integer, primary_key=True)
+    student_data = Column(EagerStudentDataJSON)
+
+
+def _snapshot(i: int) -> dict:
+    data = {f"std_field_{k}": f"value {k} of row {i}" for k in range(24)}
+    data.update(
+        std_pid=encrypt_pii(f"A{100000000 + i}"),
+        std_stdcode=f"3{i:08d}",
+        std_cname=f"學生{i}",
+        std_academyno="C",
+        trm_academyname="資訊學院",
+        trm_depname="資訊工程學系",
+        trm_year=114,
+    )
+    return data
+
+
+def _load(model, session: Session, read_pid: bool) -> int:
+    seen = 0
+    for app in session.execute(select(model)).scalars():
+        sd = app.student_data
+        seen += len(sd.get("std_cname", "")) + len(sd.get("trm_depname", ""))
+        if read_pid:
+            seen += len(sd["std_pid"])
+    return seen
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=9)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        # Already enveloped, so the bind processor leaves std_pid alone.
+        conn.execute(insert(LazyApp.__table__), [{"id": i, "student_data": _snapshot(i)} for i in range(args.rows)])
+
+    cases = {
+        "eager": lambda s: _load(EagerApp, s, read_pid=False),
+        "lazy": lambda s: _load(LazyApp, s, read_pid=False),
+        "skip": lambda s: _with_skip(s),
+        "lazy+pid": lambda s: _load(LazyApp, s, read_pid=True),
+    }
+
+    def _with_skip(session):
+        with skip_pii_decryption():
+            return _load(LazyApp, session, read_pid=False)
+
+    # Result processing alone: what each load strategy adds per row.
+    snapshots = [_snapshot(i) for i in range(args.rows)]
+    eager_td, lazy_td = EagerStudentDataJSON(), StudentDataJSON()
+    print(f"process_result_value x {args.rows}, best of {args.repeat}")
+    for name, td in (("eager", eager_td), ("lazy", lazy_td)):
+        best = min(_timed(lambda: [td.process_result_value(sd, None) for sd in snapshots]) for _ in range(args.repeat))
+        print(f"  {name:10}{best:>8.1f} ms")
+
+    # End to end through the ORM. Cases run interleaved so machine noise
+    # spreads over all of them.
+    timings = {name: [] for name in cases}
+    for _ in range(args.repeat):
+        for name, run in cases.items():
+            with Session(engine) as session:
+                timings[name].append(_timed(lambda: run(session)))
+    print(f"ORM load of {args.rows} applications, best / median of {args.repeat}")
+    for name, values in timings.items():
+        print(f"  {name:10}{min(values):>8.1f} ms{statistics.median(values):>8.1f} ms")
+
+
+def _timed(fn) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Benchmark: in-memory vs. write-only (streaming) payment-roster Excel writer.
+
+Builds a synthetic roster of N items (four sub-type/year sheets, red and
+amber rows, a rule-warning column) and renders it through both writers of
+ExcelExportService, without a template:
+
+  in_memory  _create_excel_file (openpyxl Workbook, styled cell by cell)
+  streaming  _create_excel_file_streaming (write-only workbook)
+
+Reports best / median wall time over the repeats, then the peak Python heap
+(tracemalloc, one extra run each) for both.
+
+    cd backend && python scripts/bench_roster_excel.py [--rows 1500] [--repeat 9]
+"""
+
+import argparse
+import gc
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+os.environ.setdefault("ENVIRONMENT", "development")
+
+from app.core.config import settings  # noqa: E402
+from app.services.excel_export_service import ExcelExportService  # noqa: E402
+
+SUB_TYPES = [("nstc", 114), ("nstc", 113), ("moe_1w", 114), (None, None)]
+
+
+def _make_roster() -> SimpleNamespace:
+    return SimpleNamespace(
+        id=None,
+        period_label="2025-H1",
+        roster_code="ROSTER-114-2025-H1-PHD001",
+        academic_year=114,
+        roster_cycle=SimpleNamespace(value="monthly"),
+        trigger_type=SimpleNamespace(value="manual"),
+        started_at=None,
+        completed_at=None,
+        total_applications=3,
+        qualified_count=2,
+        disqualified_count=1,
+        total_amount=120000,
+        student_verification_enabled=True,
+        verification_api_failures=0,
+    )
+
+
+def _make_items(count: int) -> list:
+    items = []
+    for idx in range(count):
+        sub_type, year = SUB_TYPES[idx % len(SUB_TYPES)]
+        is_included = idx % 3 != 0
+        rvr = None
+        if idx % 5 == 0:
+            rvr = {
+                "is_eligible": True,
+                "details": {"rule_9": {"passed": False, "rule_name": "在學狀態", "is_warning": True}},
+            }
+        items.append(
+            SimpleNamespace(
+                student_id_number=f"A{idx:09d}",
+                student_name=f"學生{idx}",
+                student_email=f"s{idx}@nycu.edu.tw",
+                bank_account=None if idx % 7 == 0 else "00012345678",
+                scholarship_name="博士班獎學金",
+                scholarship_amount=40000 + idx,
+                permanent_address="300新竹市東區大學路1001號",
+                application_identity="114新申請",
+                allocated_sub_type=sub_type,
+                allocation_year=year,
+                is_included=is_included,
+                verification_status="verified" if is_included else "withdrawn",
+                is_eligible=is_included,
+                rule_validation_result=rvr,
+                exclusion_reason=None if is_included else "學籍驗證未通過：已退學",
+                excel_row_data=None,
+                excel_remarks=None,
+            )
+        )
+    return items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1500)
+    parser.add_argument("--repeat", type=int, default=9)
+    args = parser.parse_args()
+
+    service = ExcelExportService()
+    roster = _make_roster()
+    items = _make_items(args.rows)
+    rule_columns = service._collect_rule_columns(items)
+    columns = service._build_export_columns(rule_columns)
+    rows, fills = service._prepare_excel_data(roster, items, rule_columns)
+    labels = [service._get_scholarship_sheet_label(item, roster.academic_year) for item in items]
+    kwargs = dict(
+        template_path="/nonexistent.xlsx",
+        columns=columns,
+        include_header=True,
+        include_statistics=True,
+        scholarship_labels=labels,
+    )
+    # The in-memory writer hands off to the streaming one when this is on.
+    settings.roster_excel_streaming = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = {
+            "in_memory": lambda: service._create_excel_file(rows, fills, f"{tmp}/in_memory.xlsx", roster, **kwargs),
+            "streaming": lambda: service._create_excel_file_streaming(
+                rows, fills, f"{tmp}/streaming.xlsx", roster, **kwargs
+            ),
+        }
+
+        # Cases run interleaved so machine noise spreads over both.
+        timings = {name: [] for name in cases}
+        for _ in range(args.repeat):
+            for name, run in cases.items():
+                timings[name].append(_timed(run))
+        print(f"roster of {args.rows} rows, best / median of {args.repeat}")
+        for name, values in timings.items():
+            print(f"  {name:10}{min(values):>8.1f} ms{statistics.median(values):>8.1f} ms")
+
+        print("peak Python heap (tracemalloc)")
+        for name, run in cases.items():
+            gc.collect()
+            tracemalloc.start()
+            try:
+                run()
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            print(f"  {name:10}{peak / 1024 / 1024:>8.1f} MiB")
+
+
+def _timed(fn) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+if __name__ == "__main__":
+    main()
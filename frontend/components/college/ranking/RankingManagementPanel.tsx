@@ -417,16 +417,11 @@ export function RankingManagementPanel({
       saveTimeoutRef.current = setTimeout(async () => {
         setSaveStatus("saving");
         try {
-          // Use ranking_item_id (CollegeRankingItem.id) not application_id
-          const rankingItems = newOrder.map((app, index) => ({
-            item_id: app.ranking_item_id,
-            position: index + 1,
-          }));
-
-          // Use updateRankingOrder API instead of updateRanking
-          const response = await apiClient.college.updateRankingOrder(
+          // Send the permutation of ranking_item_id (CollegeRankingItem.id, not
+          // application_id); the backend writes only the items that moved.
+          const response = await apiClient.college.reorderRanking(
             selectedRanking,
-            rankingItems
+            { order: newOrder.map(app => app.ranking_item_id) }
           );
 
           if (response.success) {
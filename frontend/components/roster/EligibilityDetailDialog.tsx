@@ -45,6 +45,9 @@ export interface EligibilityDetailItem {
   student_id?: string;
   is_eligible?: boolean | null;
   verification_message?: string | null;
+  /** List rows carry these instead of the full snapshot. */
+  failed_rules?: string[] | null;
+  warning_rules?: string[] | null;
   rule_validation_result?: RuleValidationResult | null;
 }
 
@@ -87,7 +90,7 @@ export function EligibilityBadge({ item }: { item: EligibilityDetailItem }) {
   if (!item.is_eligible) {
     return <StatusBadge tone="fail" label="不符合" />;
   }
-  if (item.rule_validation_result?.warning_rules?.length) {
+  if ((item.rule_validation_result?.warning_rules ?? item.warning_rules)?.length) {
     return <StatusBadge tone="warn" label="符合(警告)" />;
   }
   return <StatusBadge tone="pass" label="符合" />;
@@ -467,13 +467,27 @@ export function RosterDetailDialog({
 
     setLoading(true);
     try {
-      const response = await apiClient.paymentRosters.getRosterItems(period.roster_id);
-
-      if (response.success && response.data) {
+      // keyset 分頁：依 next_cursor 取完所有頁
+      const items: RosterItem[] = [];
+      let cursor: string | null = null;
+      let ok = false;
+      do {
+        const response = await apiClient.paymentRosters.getRosterItems(period.roster_id, {
+          cursor,
+          limit: 500,
+        });
+        if (!response.success || !response.data) break;
+        ok = true;
         // バックエンドは { items: [...] } または [...] を返す可能性がある
         // Backend may return { items: [...] } or a bare array
-        const raw = response.data as { items?: RosterItem[] } | RosterItem[];
-        const items: RosterItem[] = Array.isArray(raw) ? raw : (raw.items ?? []);
+        const raw = response.data as
+          | { items?: RosterItem[]; next_cursor?: string | null }
+          | RosterItem[];
+        items.push(...(Array.isArray(raw) ? raw : (raw.items ?? [])));
+        cursor = Array.isArray(raw) ? null : (raw.next_cursor ?? null);
+      } while (cursor);
+
+      if (ok) {
         setRosterItems(items);
 
         // Check if has matrix (multiple colleges)
@@ -494,6 +508,20 @@ export function RosterDetailDialog({
     }
   };
 
+  // 列表不含 rule_validation_result，點「詳情」時才取單筆完整內容
+  const openEligibilityDetail = async (item: RosterItem) => {
+    setEligibilityTarget(item);
+    if (!period.roster_id) return;
+    try {
+      const resp = await apiClient.paymentRosters.getRosterItem(period.roster_id, item.id);
+      if (resp.success && resp.data) {
+        setEligibilityTarget({ ...item, ...(resp.data as Partial<RosterItem>) });
+      }
+    } catch (error) {
+      logger.error("Failed to load roster item detail", { error: error });
+    }
+  };
+
   const fetchAuditLogs = async () => {
     if (!period.roster_id) return;
     setAuditLoading(true);
@@ -620,7 +648,7 @@ export function RosterDetailDialog({
                     size="sm"
                     variant="ghost"
                     className="text-primary no-underline"
-                    onClick={() => setEligibilityTarget(item)}
+                    onClick={() => openEligibilityDetail(item)}
                     title="查看資格對比結果"
                   >
                     詳情
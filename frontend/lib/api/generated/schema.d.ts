@@ -4657,7 +4657,11 @@ export interface paths {
         delete?: never;
         options?: never;
         head?: never;
-        patch?: never;
+        /**
+         * Reorder Ranking
+         * @description Reorder a ranking by permutation or drag-and-drop moves; only changed rows are written
+         */
+        patch: operations["reorder_ranking_api_v1_college_review_rankings__ranking_id__order_patch"];
         trace?: never;
     };
     "/api/v1/college-review/rankings/{ranking_id}/finalize": {
@@ -6705,7 +6709,12 @@ export interface paths {
             path?: never;
             cookie?: never;
         };
-        get?: never;
+        /**
+         * Get Roster Item
+         * @description 取得單一造冊明細完整內容（含資格驗證、學籍驗證、郵局帳號驗證快照與 Excel 列資料）
+         *     Get one roster item including its JSON snapshots
+         */
+        get: operations["get_roster_item_api_v1_payment_rosters__roster_id__items__item_id__get"];
         put?: never;
         post?: never;
         /**
@@ -10014,6 +10023,18 @@ export interface components {
              */
             rank_position: number | "N";
         };
+        /**
+         * RankingMove
+         * @description Move one ranking item directly before or after another
+         */
+        RankingMove: {
+            /** Item Id */
+            item_id: number;
+            /** Before Item Id */
+            before_item_id?: number | null;
+            /** After Item Id */
+            after_item_id?: number | null;
+        };
         /**
          * RankingOrderUpdate
          * @description Schema for updating ranking order
@@ -10024,6 +10045,22 @@ export interface components {
             /** Position */
             position: number;
         };
+        /**
+         * RankingReorderRequest
+         * @description Delta reorder: a full permutation of item ids, or a list of moves
+         */
+        RankingReorderRequest: {
+            /**
+             * Order
+             * @description Every CollegeRankingItem.id in the new order
+             */
+            order?: number[] | null;
+            /**
+             * Moves
+             * @description Moves applied in sequence to the current order
+             */
+            moves?: components["schemas"]["RankingMove"][] | null;
+        };
         /**
          * RankingUpdate
          * @description Schema for updating ranking metadata
@@ -19438,6 +19475,41 @@ export interface operations {
             };
         };
     };
+    reorder_ranking_api_v1_college_review_rankings__ranking_id__order_patch: {
+        parameters: {
+            query?: never;
+            header?: never;
+            path: {
+                ranking_id: number;
+            };
+            cookie?: never;
+        };
+        requestBody: {
+            content: {
+                "application/json": components["schemas"]["RankingReorderRequest"];
+            };
+        };
+        responses: {
+            /** @description Successful Response */
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": unknown;
+                };
+            };
+            /** @description Validation Error */
+            422: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["HTTPValidationError"];
+                };
+            };
+        };
+    };
     finalize_ranking_api_v1_college_review_rankings__ranking_id__finalize_post: {
         parameters: {
             query?: never;
@@ -21914,6 +21986,12 @@ export interface operations {
     get_roster_items_api_v1_payment_rosters__roster_id__items_get: {
         parameters: {
             query?: {
+                /** @description 上一頁回傳的 next_cursor */
+                cursor?: string | null;
+                /**
+                 * @deprecated
+                 * @description 僅在未提供 cursor 時使用（舊版 offset 分頁）
+                 */
                 skip?: number;
                 limit?: number;
                 verification_status?: components["schemas"]["StudentVerificationStatus"] | null;
@@ -21947,6 +22025,38 @@ export interface operations {
             };
         };
     };
+    get_roster_item_api_v1_payment_rosters__roster_id__items__item_id__get: {
+        parameters: {
+            query?: never;
+            header?: never;
+            path: {
+                roster_id: number;
+                item_id: number;
+            };
+            cookie?: never;
+        };
+        requestBody?: never;
+        responses: {
+            /** @description Successful Response */
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": unknown;
+                };
+            };
+            /** @description Validation Error */
+            422: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["HTTPValidationError"];
+                };
+            };
+        };
+    };
     lock_roster_api_v1_payment_rosters__roster_id__lock_post: {
         parameters: {
             query?: never;
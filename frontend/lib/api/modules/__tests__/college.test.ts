@@ -31,6 +31,7 @@ jest.mock("../../typed-client", () => ({
       GET: jest.fn(),
       POST: jest.fn(),
       PUT: jest.fn(),
+      PATCH: jest.fn(),
       DELETE: jest.fn(),
     },
     getToken: jest.fn(() => "test-token"),
@@ -45,6 +46,7 @@ const mockedRaw = typedClient.raw as unknown as {
   GET: jest.Mock;
   POST: jest.Mock;
   PUT: jest.Mock;
+  PATCH: jest.Mock;
   DELETE: jest.Mock;
 };
 
@@ -168,6 +170,18 @@ describe("createCollegeApi", () => {
     );
   });
 
+  it("reorderRanking PATCHes /order with a wrapped {order} body", async () => {
+    // Pin: the delta endpoint takes {order} or {moves}, unlike the bare
+    // array PUT above.
+    mockedRaw.PATCH.mockResolvedValueOnce({});
+    const api = createCollegeApi();
+    await api.reorderRanking(42, { order: [3, 1, 2] });
+    expect(mockedRaw.PATCH).toHaveBeenCalledWith(
+      "/api/v1/college-review/rankings/{ranking_id}/order",
+      { params: { path: { ranking_id: 42 } }, body: { order: [3, 1, 2] } }
+    );
+  });
+
   // ─── finalize / unfinalize distinct paths ─────────────────────────
 
   it("finalizeRanking and unfinalizeRanking hit DISTINCT paths (both POST, no body)", async () => {
@@ -310,3 +310,24 @@ describe("restoreRosterItem", () => {
     expect(mockedRaw.POST.mock.calls[0][1].body).toEqual({ reason_note: null });
   });
 });
+
+describe("roster items", () => {
+  it("getRosterItems forwards the keyset cursor", async () => {
+    mockedRaw.GET.mockResolvedValueOnce(_ok({ items: [], next_cursor: null, limit: 500 }));
+    const api = createPaymentRostersApi();
+    await api.getRosterItems(7, { cursor: "abc", limit: 500 });
+    expect(mockedRaw.GET).toHaveBeenCalledWith("/api/v1/payment-rosters/{roster_id}/items", {
+      params: { path: { roster_id: 7 }, query: { cursor: "abc", limit: 500 } },
+    });
+  });
+
+  it("getRosterItem GETs the single-item detail path", async () => {
+    mockedRaw.GET.mockResolvedValueOnce(_ok({ id: 42 }));
+    const api = createPaymentRostersApi();
+    await api.getRosterItem(7, 42);
+    expect(mockedRaw.GET).toHaveBeenCalledWith(
+      "/api/v1/payment-rosters/{roster_id}/items/{item_id}",
+      { params: { path: { roster_id: 7, item_id: 42 } } }
+    );
+  });
+});
@@ -214,6 +214,33 @@ export function createCollegeApi() {
       return toApiResponse<unknown>(response);
     },
 
+    /**
+     * Reorder ranking with a delta request: either every ranking item id in
+     * its new order, or drag-and-drop moves. Only moved items are written.
+     * Type-safe: Path parameter and request body validated against OpenAPI
+     */
+    reorderRanking: async (
+      rankingId: number,
+      reorder:
+        | { order: number[] }
+        | {
+            moves: Array<{
+              item_id: number;
+              before_item_id?: number | null;
+              after_item_id?: number | null;
+            }>;
+          }
+    ): Promise<ApiResponse<unknown>> => {
+      const response = await typedClient.raw.PATCH(
+        "/api/v1/college-review/rankings/{ranking_id}/order",
+        {
+          params: { path: { ranking_id: rankingId } },
+          body: reorder,
+        }
+      );
+      return toApiResponse<unknown>(response);
+    },
+
     /**
      * Finalize ranking (lock and approve)
      * Type-safe: Path parameter validated against OpenAPI
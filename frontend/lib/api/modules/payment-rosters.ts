@@ -233,13 +233,14 @@ export function createPaymentRostersApi() {
     },
 
     /**
-     * 取得造冊明細項目
+     * 取得造冊明細項目（keyset 分頁：回傳 { items, next_cursor, limit }，
+     * 將 next_cursor 帶回 cursor 取下一頁；不含大型 JSON 快照）
      * GET /api/v1/payment-rosters/{roster_id}/items
      */
     getRosterItems: async (
       roster_id: number,
       params?: {
-        skip?: number;
+        cursor?: string | null;
         limit?: number;
         is_included?: boolean | null;
       }
@@ -256,6 +257,18 @@ export function createPaymentRostersApi() {
       return toApiResponse(response);
     },
 
+    /**
+     * 取得單一造冊明細完整內容（含資格驗證 / 學籍驗證快照）
+     * GET /api/v1/payment-rosters/{roster_id}/items/{item_id}
+     */
+    getRosterItem: async (roster_id: number, item_id: number): Promise<ApiResponse<unknown>> => {
+      const response = await typedClient.raw.GET(
+        '/api/v1/payment-rosters/{roster_id}/items/{item_id}',
+        { params: { path: { roster_id, item_id } } }
+      );
+      return toApiResponse(response);
+    },
+
     /**
      * 排除造冊明細項目 (軟刪除: 學生繳回 / 放棄)
      * POST /api/v1/payment-rosters/{roster_id}/items/{item_id}/exclude